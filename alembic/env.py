@@ -40,7 +40,7 @@ def run_migrations_offline() -> None:
     # app imports are safe inside function scope after sys.path is configured
     from app.core.config import settings
     from app.db.session import Base
-    from app.models import user, ticket, feedback  # noqa: F401
+    from app.models import user, ticket, feedback, metrics_rollup, metrics_history  # noqa: F401
     
     # Prefer application DB URL over static alembic.ini value
     db_url = settings.DATABASE_URL or config.get_main_option("sqlalchemy.url")
@@ -68,7 +68,7 @@ def run_migrations_online() -> None:
     # Deferred to avoid circular import at alembic module load time
     from app.core.config import settings
     from app.db.session import Base
-    from app.models import user, ticket, feedback  # noqa: F401
+    from app.models import user, ticket, feedback, metrics_rollup, metrics_history  # noqa: F401
     
     # Prefer application DB URL over static alembic.ini value
     configuration = config.get_section(config.config_ini_section) or {}
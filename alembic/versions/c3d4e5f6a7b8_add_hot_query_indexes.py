@@ -0,0 +1,54 @@
+"""add composite and partial indexes for hot ticket queries
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6g7
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6a7b8'
+down_revision: Union[str, Sequence[str], None] = 'b2c3d4e5f6g7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# NOTE: feedback.ticket_id (looked up on every feedback write) is already
+# indexed by uq_feedback_ticket_id from the initial migration, so it needs no
+# extra index here.
+RESOLVED = sa.text('response IS NOT NULL')
+
+INDEXES = [
+    ('ix_tickets_status_created_at', ['status', 'created_at'], {}),
+    ('ix_tickets_created_at', ['created_at'], {}),
+    ('ix_tickets_user_id_created_at', ['user_id', 'created_at'], {}),
+    ('ix_tickets_status_assigned_agent_id', ['status', 'assigned_agent_id'], {}),
+    (
+        'ix_tickets_resolved_corpus',
+        ['status', 'created_at'],
+        {'sqlite_where': RESOLVED, 'postgresql_where': RESOLVED},
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tickets table writable while PostgreSQL builds
+    # the indexes; it cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, columns, kwargs in INDEXES:
+            op.create_index(name, 'tickets', columns, postgresql_concurrently=True, **kwargs)
+        # Leading column of ix_tickets_user_id_created_at
+        op.drop_index('ix_tickets_user_id', table_name='tickets')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tickets_user_id', 'tickets', ['user_id'], postgresql_concurrently=True)
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='tickets', postgresql_concurrently=True)
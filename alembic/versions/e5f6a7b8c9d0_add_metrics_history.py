@@ -0,0 +1,36 @@
+"""add metrics_history table and feedback created_at index
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, Sequence[str], None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('metrics_history',
+    sa.Column('bucket', sa.String(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('counters', sa.JSON(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket', 'bucket_start')
+    )
+    # The collector reads recent feedback by submission time
+    op.create_index(op.f('ix_feedback_created_at'), 'feedback', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_feedback_created_at'), table_name='feedback')
+    op.drop_table('metrics_history')
@@ -0,0 +1,42 @@
+"""add tickets.updated_at for similarity index sync
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, Sequence[str], None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                'updated_at',
+                sa.DateTime(),
+                server_default=sa.text('CURRENT_TIMESTAMP'),
+                nullable=False,
+            )
+        )
+    # Existing rows have not changed since creation as far as anyone knows
+    op.execute('UPDATE tickets SET updated_at = created_at')
+    # Worker processes re-sync their similarity index by last change
+    op.create_index('ix_tickets_updated_at', 'tickets', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_updated_at', table_name='tickets')
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
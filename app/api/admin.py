@@ -18,18 +18,30 @@ DO NOT:
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, Integer
+from datetime import datetime, timedelta
 from typing import Annotated, Any
 import logging
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models.ticket import Ticket
-from app.models.feedback import Feedback
 from app.models.user import User
 from app.api.auth import get_current_user
+from app.core.config import settings
 from app.constants import UserRole, TicketStatus
-from app.schemas.admin import MetricsResponse, AdminTicketListResponse, AdminTicketItem, FiltersMeta, PaginationMeta
+from app.services.metrics_history import BUCKETS, bucket_count, read_history, to_naive_utc, utcnow
+from app.services.metrics_service import admin_metrics, load_counters
+from app.services.response_cache import response_cache
+from app.utils.pagination import COUNT_MODES, InvalidCursor, decode_cursor, keyset_page, list_total
+from app.schemas.admin import (
+    MetricsResponse,
+    MetricsHistoryResponse,
+    AdminTicketListResponse,
+    AdminTicketItem,
+    FiltersMeta,
+    PaginationMeta,
+)
 from app.core.exceptions import (
     AuthorizationError,
     ValidationError,
@@ -69,19 +81,27 @@ def require_admin(current_user: Annotated[User, Depends(get_current_user)]) -> U
 
 
 @router.get("/metrics", response_model=MetricsResponse)
-def get_metrics(
+async def get_metrics(
     current_user: Annotated[User, Depends(require_admin)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    fresh: bool = Query(False, description="Aggregate now instead of reading the metrics rollup"),
 ):
     """
     Retrieve high-level system metrics.
     
     This endpoint provides aggregated statistics about the system performance
     and is restricted to admin users only.
+
+    Counters are read from the metrics rollup (one primary-key read) while
+    it is younger than METRICS_ROLLUP_MAX_AGE_SECONDS; otherwise, or with
+    ``fresh=true``, they are aggregated by a single query and the rollup is
+    updated.
     
     Args:
         current_user: Admin user (from require_admin dependency)
-        db: Database session dependency
+        db: Async database session dependency (queries do not hold a
+            threadpool worker while the database works)
+        fresh: Bypass the rollup
         
     Returns:
         Dictionary containing system metrics:
@@ -92,86 +112,15 @@ def get_metrics(
         - total_feedback: Total number of feedback entries
         - average_rating: Average feedback rating (1-5)
         - feedback_resolution_rate: Percentage of feedback indicating resolution
+        - response_cache: LLM response cache hit rate, evictions and saved
+          upstream latency (this process only)
         
     Raises:
         AuthorizationError: 403 if not admin, 500 for database errors
     """
     try:
-        # Ticket statistics
-        total_tickets = db.query(Ticket).count()
-        
-        tickets_by_status = (
-            db.query(Ticket.status, func.count(Ticket.id))
-            .group_by(Ticket.status)
-            .all()
-        )
-        
-        status_counts = {status: count for status, count in tickets_by_status}
-        
-        auto_resolved = status_counts.get(TicketStatus.AUTO_RESOLVED.value, 0)
-        escalated = status_counts.get(TicketStatus.ESCALATED.value, 0)
-        open_tickets = status_counts.get(TicketStatus.OPEN.value, 0)
-        
-        # Calculate rates (avoid division by zero)
-        auto_resolve_rate = (auto_resolved / total_tickets * 100) if total_tickets > 0 else 0
-        escalation_rate = (escalated / total_tickets * 100) if total_tickets > 0 else 0
-        
-        # Count unassigned escalated tickets
-        unassigned_escalated = db.query(Ticket).filter(
-            Ticket.status == TicketStatus.ESCALATED.value,
-            Ticket.assigned_agent_id.is_(None)
-        ).count()
-        
-        # Feedback statistics
-        total_feedback = db.query(Feedback).count()
-        
-        # Use a simpler approach for counting resolved feedback
-        resolved_feedback_count = db.query(Feedback).filter(Feedback.resolved.is_(True)).count()
-        avg_rating_result = db.query(func.avg(Feedback.rating)).scalar()
-        average_rating = float(avg_rating_result) if avg_rating_result else 0.0
-        
-        feedback_resolution_rate = (resolved_feedback_count / total_feedback * 100) if total_feedback > 0 else 0
-        
-        # Quality metrics
-        low_quality_tickets = db.query(Ticket).filter(
-            Ticket.quality_score.isnot(None),
-            Ticket.quality_score < 0.5
-        ).count()
-        
-        quality_by_intent = (
-            db.query(Ticket.intent, func.avg(Ticket.quality_score))
-            .filter(Ticket.quality_score.isnot(None))
-            .group_by(Ticket.intent)
-            .all()
-        )
-        
-        metrics = {
-            "tickets": {
-                "total": total_tickets,
-                "by_status": status_counts,
-                "auto_resolve_rate": round(auto_resolve_rate, 2),
-                "escalation_rate": round(escalation_rate, 2),
-                "open": open_tickets,
-                "auto_resolved": auto_resolved,
-                "escalated": escalated,
-                "unassigned_escalated": unassigned_escalated
-            },
-            "feedback": {
-                "total": total_feedback,
-                "average_rating": round(average_rating, 2),
-                "resolution_rate": round(feedback_resolution_rate, 2),
-                "resolved_count": resolved_feedback_count
-            },
-            "quality": {
-                "low_quality_count": low_quality_tickets,
-                "by_intent": {intent: round(float(score), 2) for intent, score in quality_by_intent if intent}
-            },
-            "system_health": {
-                "auto_resolve_rate_status": "good" if auto_resolve_rate >= 70 else "needs_improvement",
-                "escalation_rate_status": "good" if escalation_rate <= 30 else "needs_improvement",
-                "feedback_coverage": round((total_feedback / total_tickets * 100), 2) if total_tickets > 0 else 0
-            }
-        }
+        metrics = admin_metrics(await load_counters(db, fresh=fresh))
+        metrics["response_cache"] = response_cache.stats()
         
         logger.info(f"Admin metrics retrieved by user {current_user.id}")
         return metrics
@@ -181,26 +130,83 @@ def get_metrics(
         raise InternalError("Failed to retrieve metrics") from e
 
 
+@router.get("/metrics/history", response_model=MetricsHistoryResponse)
+async def get_metrics_history(
+    current_user: Annotated[User, Depends(require_admin)],
+    db: AsyncSession = Depends(get_async_db),
+    start: datetime | None = Query(None, alias="from", description="Range start (ISO-8601, default: 24h before to)"),
+    end: datetime | None = Query(None, alias="to", description="Range end, exclusive (ISO-8601, default: now)"),
+    bucket: str = Query("hour", pattern=f"^({'|'.join(BUCKETS)})$", description="Bucket size"),
+):
+    """
+    Retrieve per-interval ticket and feedback counters.
+
+    Reads the metrics history written by workers/metrics_collector.py, so
+    the cost depends on the number of buckets requested, not on the number
+    of tickets behind them. Intervals without activity are returned as zeros.
+    
+    Args:
+        current_user: Admin user (from require_admin dependency)
+        db: Async database session dependency
+        start: Range start (query parameter "from")
+        end: Range end, exclusive (query parameter "to")
+        bucket: minute | hour | day (minutes are kept for
+            METRICS_HISTORY_MINUTE_RETENTION_DAYS, hours and days longer)
+        
+    Returns:
+        Dictionary with the bucket size, the range and one point per bucket
+        
+    Raises:
+        AuthorizationError: 403 if not admin, ValidationError for an invalid
+        range, 500 for database errors
+    """
+    end = to_naive_utc(end) if end is not None else utcnow()
+    start = to_naive_utc(start) if start is not None else end - timedelta(days=1)
+    if start >= end:
+        raise ValidationError("'from' must be earlier than 'to'")
+    points = bucket_count(start, end, bucket)
+    if points > settings.METRICS_HISTORY_MAX_POINTS:
+        raise ValidationError(
+            f"Range spans {points} {bucket} buckets; the limit is {settings.METRICS_HISTORY_MAX_POINTS}. "
+            "Use a larger bucket or a shorter range."
+        )
+
+    try:
+        history = await read_history(db, bucket, start, end)
+        logger.info(f"Admin metrics history retrieved by user {current_user.id}: bucket={bucket}, points={points}")
+        return {"bucket": bucket, "start": start.isoformat(), "end": end.isoformat(), "points": history}
+
+    except Exception as e:
+        logger.exception("Failed to retrieve admin metrics history")
+        raise InternalError("Failed to retrieve metrics history") from e
+
+
 @router.get("/tickets", response_model=AdminTicketListResponse)
 def list_all_tickets(
     current_user: Annotated[User, Depends(require_admin)],
     db: Session = Depends(get_db),
     status_filter: str | None = Query(None, alias="status", description="Filter by ticket status"),
-    page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(50, ge=1, le=100, description="Items per page")
+    page: int = Query(1, ge=1, description="Page number (deprecated: page with cursor instead)"),
+    limit: int = Query(50, ge=1, le=100, description="Items per page"),
+    cursor: str | None = Query(None, description="pagination.next_cursor from the previous page"),
+    count: str = Query("cached", pattern=f"^({'|'.join(COUNT_MODES)})$", description="How to compute total"),
 ):
     """
     List all tickets with optional filtering and pagination.
     
     This endpoint provides access to all tickets in the system
-    and is restricted to admin users only.
+    and is restricted to admin users only. Pages are newest first; following
+    ``pagination.next_cursor`` keeps every page as cheap as the first.
     
     Args:
         current_user: Admin user (from require_admin dependency)
         db: Database session dependency
         status_filter: Optional filter for ticket status (from query parameter "status")
-        page: Page number for pagination
+        page: Page number for pagination (ignored when cursor is given)
         limit: Number of items per page
+        cursor: Opaque position returned as ``pagination.next_cursor``
+        count: ``exact``, ``cached`` (default), ``estimate`` or ``none``
+            (see :func:`app.utils.pagination.list_total`)
         
     Returns:
         Dictionary containing:
@@ -216,6 +222,11 @@ def list_all_tickets(
         raise ValidationError(
             f"Invalid status '{status_filter}'. Allowed statuses: {', '.join(sorted(ALLOWED_TICKET_STATUSES))}"
         )
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except InvalidCursor as exc:
+            raise ValidationError(str(exc)) from exc
     
     try:
         # Build base query
@@ -226,11 +237,11 @@ def list_all_tickets(
             query = query.filter(Ticket.status == status_filter)
         
         # Get total count for pagination
-        total_count = query.count()
+        total_count = list_total(query, count, key=("admin", status_filter))
         
         # Apply pagination
         offset = (page - 1) * limit
-        tickets = query.order_by(Ticket.created_at.desc()).offset(offset).limit(limit).all()
+        tickets, next_cursor = keyset_page(query, limit, cursor=cursor, offset=offset)
         
         # Convert to response format
         ticket_list = []
@@ -247,9 +258,9 @@ def list_all_tickets(
             ticket_list.append(ticket_data)
         
         # Calculate pagination info
-        total_pages = (total_count + limit - 1) // limit
-        has_next = page < total_pages
-        has_prev = page > 1
+        total_pages = (total_count + limit - 1) // limit if total_count is not None else None
+        has_next = next_cursor is not None
+        has_prev = cursor is not None or page > 1
         
         response = {
             "tickets": ticket_list,
@@ -259,7 +270,8 @@ def list_all_tickets(
                 "total": total_count,
                 "total_pages": total_pages,
                 "has_next": has_next,
-                "has_prev": has_prev
+                "has_prev": has_prev,
+                "next_cursor": next_cursor
             },
             "filters": {
                 "status": status_filter
@@ -25,6 +25,7 @@ import logging
 import secrets
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
@@ -47,11 +48,14 @@ from app.constants import (
     EMAIL_SEND_FAILED
 )
 
-from app.core.security import verify_password, create_access_token, hash_password, decode_token, check_password_truncation
+from app.core.bcrypt_executor import bcrypt_executor
+from app.core.exceptions import ServiceUnavailableError
+from app.core.security import create_access_token, hash_password, check_password_truncation
 from app.core.config import settings, ALLOWED_ROLES
 from app.core.otp import generate_otp, send_otp_email, log_otp_for_dev, is_otp_expired, get_otp_expiration_time
 from app.db.session import get_db
 from app.models.user import User
+from app.services.auth_cache import auth_cache
 from app.schemas.user import (
     UserLogin, UserCreate, UserResponse, Token,
     ForgotPasswordRequest, ForgotPasswordResponse,
@@ -91,10 +95,26 @@ def normalize_email(email: str) -> str:
     return normalized
 
 
-def authenticate_user(db: Session, email: str, password: str) -> User | None:
+def _find_user_by_email(db: Session, normalized_email: str) -> User | None:
+    """
+    Look up a user by normalized email, then release the session's connection.
+    
+    The caller goes on to wait for bcrypt; holding a pooled connection for
+    that long would let a login burst exhaust the connection pool.
+    """
+    try:
+        return db.query(User).filter(User.email == normalized_email).first()
+    finally:
+        db.close()
+
+
+async def authenticate_user(db: Session, email: str, password: str) -> User | None:
     """
     Authenticate a user by email and password.
     
+    The user lookup runs in the threadpool; the bcrypt check runs in the
+    bcrypt process pool (see app/core/bcrypt_executor.py).
+    
     Args:
         db: Database session
         email: User email address
@@ -105,6 +125,7 @@ def authenticate_user(db: Session, email: str, password: str) -> User | None:
         
     Raises:
         HTTPException: If database error occurs (500 Internal Server Error)
+        ServiceUnavailableError: If the bcrypt queue is full (503)
     """
     # Validate inputs
     if not email or not password:
@@ -114,29 +135,31 @@ def authenticate_user(db: Session, email: str, password: str) -> User | None:
         # Normalize email to lowercase for consistent storage and lookup
         normalized_email = normalize_email(email)
             
-        user = db.query(User).filter(User.email == normalized_email).first()
-        if not user:
-            return None
-        if not user.is_active:
-            return None
-        if not verify_password(password, user.hashed_password):
-            return None
-        return user
+        user = await run_in_threadpool(_find_user_by_email, db, normalized_email)
     except SQLAlchemyError as e:
         logger.exception("Database error during authentication")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=AUTH_SERVICE_UNAVAILABLE
         )
+    if not user:
+        return None
+    if not user.is_active:
+        return None
+    if not await bcrypt_executor.verify(password, user.hashed_password):
+        return None
+    return user
 
 
-def create_user(db: Session, user_create: UserCreate) -> UserResponse:
+def create_user(db: Session, user_create: UserCreate, hashed_password: str | None = None) -> UserResponse:
     """
     Create a new user with hashed password.
     
     Args:
         db: Database session
         user_create: UserCreate schema with email and password
+        hashed_password: bcrypt hash of the password, when the caller already
+            computed it off-thread; hashed here otherwise
         
     Returns:
         UserResponse schema with user information (no password)
@@ -157,7 +180,8 @@ def create_user(db: Session, user_create: UserCreate) -> UserResponse:
         if truncation_info["would_be_truncated"]:
             logger.info("Password will be truncated to fit bcrypt limit")
         
-        hashed_password = hash_password(user_create.password)
+        if hashed_password is None:
+            hashed_password = hash_password(user_create.password)
         
         # Use role from user_create, fallback to default if not provided
         user_role = getattr(user_create, 'role', None) or getattr(settings, 'DEFAULT_USER_ROLE', UserRole.USER.value)
@@ -228,7 +252,7 @@ def create_user(db: Session, user_create: UserCreate) -> UserResponse:
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     user_credentials: UserLogin,
     db: Annotated[Session, Depends(get_db)]
 ):
@@ -244,8 +268,9 @@ def login(
         
     Raises:
         HTTPException: If authentication fails (401 Unauthorized)
+        ServiceUnavailableError: If the bcrypt queue is full (503 with Retry-After)
     """
-    user = authenticate_user(db, user_credentials.email, user_credentials.password)
+    user = await authenticate_user(db, user_credentials.email, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -267,7 +292,7 @@ def login(
 
 
 @router.post("/register", response_model=UserResponse)
-def register(
+async def register(
     user_create: UserCreate,
     db: Annotated[Session, Depends(get_db)]
 ):
@@ -286,9 +311,11 @@ def register(
         
     Raises:
         HTTPException: If registration fails (400 Bad Request or 500 Internal Server Error)
+        ServiceUnavailableError: If the bcrypt queue is full (503 with Retry-After)
     """
+    hashed_password = await bcrypt_executor.hash(user_create.password)
     # Create new user - database constraints will handle duplicates
-    return create_user(db, user_create)
+    return await run_in_threadpool(create_user, db, user_create, hashed_password)
 
 
 def get_current_user(
@@ -300,6 +327,8 @@ def get_current_user(
     
     This function decodes the JWT token and retrieves the corresponding user
     from the database. It's used as a dependency for protected routes.
+    Verified tokens and users are cached per process (see
+    app/services/auth_cache.py), so repeat requests usually do neither.
     
     Args:
         token: JWT token from Authorization header
@@ -318,7 +347,7 @@ def get_current_user(
     )
     
     try:
-        payload = decode_token(token)
+        payload = auth_cache.verify_token(token)
         user_id_str: str = payload.get("sub")
         if user_id_str is None:
             raise credentials_exception
@@ -333,7 +362,7 @@ def get_current_user(
         raise credentials_exception
     
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = auth_cache.get_user(db, user_id)
         if user is None:
             raise credentials_exception
         return user
@@ -542,7 +571,7 @@ def verify_otp(
 
 
 @router.post("/reset-password", response_model=ResetPasswordResponse)
-def reset_password(
+async def reset_password(
     request: ResetPasswordRequest,
     db: Annotated[Session, Depends(get_db)]
 ):
@@ -558,9 +587,11 @@ def reset_password(
         
     Raises:
         HTTPException: If OTP is invalid/expired (400) or max attempts exceeded (429)
+        ServiceUnavailableError: If the bcrypt queue is full (503 with Retry-After)
     """
     try:
-        user = _verify_user_otp(db, request.email, request.otp)
+        # Database work stays in the threadpool; bcrypt goes to its process pool
+        user = await run_in_threadpool(_verify_user_otp, db, request.email, request.otp)
         
         # Check password truncation
         truncation_info = check_password_truncation(request.new_password)
@@ -568,7 +599,7 @@ def reset_password(
             logger.info("New password will be truncated to fit bcrypt limit")
         
         # Hash new password
-        new_hashed_password = hash_password(request.new_password)
+        new_hashed_password = await bcrypt_executor.hash(request.new_password)
         
         # Update password and clear OTP
         user.hashed_password = new_hashed_password
@@ -576,7 +607,7 @@ def reset_password(
         user.reset_otp_expires_at = None
         user.reset_otp_attempts = 0
         
-        db.commit()
+        await run_in_threadpool(db.commit)
         
         return ResetPasswordResponse(
             message="Password reset successfully"
@@ -584,16 +615,16 @@ def reset_password(
         
     except SQLAlchemyError as e:
         logger.exception("Database error in reset_password")
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=AUTH_SERVICE_UNAVAILABLE
         )
-    except HTTPException:
+    except (HTTPException, ServiceUnavailableError):
         raise
     except Exception as e:
         logger.exception("Unexpected error in reset_password")
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=AUTH_SERVICE_UNAVAILABLE
@@ -5,7 +5,7 @@ Purpose:
 Defines API endpoints for managing support tickets.
 
 Responsibilities:
-- Create support tickets
+- Create support tickets (one at a time or in bulk)
 - Retrieve ticket information
 - Trigger automated ticket resolution workflow
 
@@ -16,8 +16,12 @@ DO NOT:
 """
 
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
+from pydantic import ValidationError
 from sqlalchemy import update
 from sqlalchemy.orm import Session
 from typing import Annotated
@@ -27,6 +31,9 @@ from app.schemas.ticket import (
     TicketCreate,
     TicketResponse,
     TicketList,
+    TicketBatchCreate,
+    TicketBatchItemResult,
+    TicketBatchResponse,
 )
 from app.schemas.feedback import FeedbackCreate, FeedbackResponse, FeedbackCreateNested
 from app.models.ticket import Ticket
@@ -36,20 +43,26 @@ from app.services.feedback_service import create_feedback_record
 from app.services.classifier import classify_intent
 from app.services.response_generator import generate_response
 from app.services.decision_engine import decide_resolution
-from app.api.auth import decode_token, get_current_user
+from app.api.auth import get_current_user
 from app.api.dependencies import require_agent_or_admin
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.services.similarity_search import (
     find_similar_ticket,
     get_resolved_tickets,
     _get_cache_client,
     _cache_key
 )
+from app.services.similarity_index import similarity_index
 import json
-from app.core.limiter import limiter
+from app.core.limiter import charge, limiter
+from app.core.telemetry import stage_seconds
 from app.constants import TicketStatus, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, UserRole
+from app.constants import MAX_TICKET_WAIT_SECONDS, TICKET_WAIT_POLL_SECONDS
+from app.services.automation_queue import automation_queue
+from app.utils.pagination import COUNT_MODES, InvalidCursor, decode_cursor, keyset_page, list_total
 from app.services.ticket_service import run_ticket_automation, extract_user_id_from_token, extract_user_id_and_role_from_token
+from app.services.ticket_service import create_tickets_bulk, load_tickets, run_batch_automation, escalate_after_failure
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/tickets", tags=["Tickets"])
@@ -62,7 +75,14 @@ oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")
 def create_ticket(
     request: Request,
+    response: Response,
     ticket_data: TicketCreate,
+    async_processing: bool | None = Query(
+        None,
+        alias="async",
+        description="Defer automation to the background workers and answer 202 "
+                    "(defaults to TICKET_AUTOMATION_ASYNC)",
+    ),
     db: Session = Depends(get_db),
     token: str | None = Depends(oauth2_scheme_optional),
 ) -> TicketResponse:
@@ -73,16 +93,23 @@ def create_ticket(
     -----
     1. Validate input using TicketCreate schema
     2. Store ticket in database with status = 'open'
-    3. Run AI pipeline:
+    3. Async mode: queue the ticket for the background workers and return
+       it as 'open' with 202; clients poll GET /tickets/{id} (optionally
+       with ?wait=) for the result
+    4. Otherwise run AI pipeline inline:
        - Classify intent and confidence
        - Find similar resolved tickets
        - Make auto-resolve vs escalate decision
        - Generate response if auto-resolving
-    4. Update ticket with AI results
-    5. Return created ticket with AI processing results
+    5. Update ticket with AI results
+    6. Return created ticket with AI processing results
     
+    If the background queue is unavailable, async requests fall back to
+    inline processing (201).
+
     Args:
         ticket_data: Ticket creation data with message field
+        async_processing: Per-request override of TICKET_AUTOMATION_ASYNC
         db: Database session dependency
         
     Returns:
@@ -104,8 +131,16 @@ def create_ticket(
         
         # Save to database to get ID
         db.add(ticket)
-        db.commit()
+        with stage_seconds.time("ticket_insert"):
+            db.commit()
         db.refresh(ticket)
+
+        # Step 2a: Async mode — hand the ticket to the background workers
+        if async_processing is None:
+            async_processing = settings.TICKET_AUTOMATION_ASYNC
+        if async_processing and automation_queue.submit(ticket.id):
+            response.status_code = status.HTTP_202_ACCEPTED
+            return TicketResponse.model_validate(ticket)
         
         # Step 2: Run AI pipeline
         try:
@@ -114,18 +149,7 @@ def create_ticket(
         except Exception as ai_error:
             # AI failure: escalate for safety (never block user)
             logger.exception(f"AI pipeline failed for ticket {ticket.id}")
-            
-            # Rollback any partial AI processing, then escalate
-            db.rollback()
-            
-            ticket.status = TicketStatus.ESCALATED.value
-            ticket.intent = None
-            ticket.confidence = None
-            ticket.sub_intent = None 
-            ticket.response = None
-            
-            db.commit()
-            db.refresh(ticket)
+            ticket = escalate_after_failure(ticket, db)
         
         return TicketResponse.model_validate(ticket)
         
@@ -141,6 +165,108 @@ def create_ticket(
         )
 
 
+@router.post("/batch", response_model=TicketBatchResponse, status_code=status.HTTP_201_CREATED)
+@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")
+def create_tickets_batch(
+    request: Request,
+    batch: TicketBatchCreate,
+    db: Session = Depends(get_db),
+    token: str | None = Depends(oauth2_scheme_optional),
+) -> TicketBatchResponse:
+    """
+    Create many support tickets in one request with AI automation.
+
+    Flow:
+    -----
+    1. Charge one unit of RATE_LIMIT_BATCH_TICKETS_PER_MINUTE per submitted
+       item (429 when the client's ticket budget is spent)
+    2. Validate each item against TicketCreate; invalid items are reported
+       per index and skipped
+    3. Store all valid tickets with a single INSERT (status = 'open')
+    4. Run the AI pipeline over the whole batch (see run_batch_automation)
+    5. Write all results back with a single bulk UPDATE
+    6. Return one result per submitted item, in submission order
+
+    Args:
+        batch: Up to MAX_TICKET_BATCH_SIZE ticket items
+        db: Database session dependency
+
+    Returns:
+        TicketBatchResponse: Per-item results plus created / failed counts
+
+    Raises:
+        RateLimitExceeded: If the batch exceeds the client's ticket budget (429)
+        HTTPException: If the database insert fails
+    """
+    charge(
+        request,
+        f"{settings.RATE_LIMIT_BATCH_TICKETS_PER_MINUTE}/minute",
+        cost=len(batch.tickets),
+        scope="tickets-batch-items",
+    )
+    results: list[TicketBatchItemResult | None] = [None] * len(batch.tickets)
+    messages, positions = [], []
+    for position, item in enumerate(batch.tickets):
+        try:
+            messages.append(TicketCreate.model_validate(item).message)
+            positions.append(position)
+        except ValidationError as exc:
+            results[position] = TicketBatchItemResult(
+                index=position,
+                error="; ".join(
+                    f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}"
+                    for error in exc.errors()
+                ),
+            )
+
+    try:
+        user_id = extract_user_id_from_token(token)
+        tickets = create_tickets_bulk(messages, user_id, db)
+        ticket_ids = [ticket.id for ticket in tickets]
+
+        try:
+            tickets = run_batch_automation(tickets, db)
+
+        except Exception:
+            # AI failure: escalate the whole batch for safety (never block user)
+            logger.exception(f"AI pipeline failed for ticket batch {ticket_ids}")
+            db.rollback()
+
+            db.execute(
+                update(Ticket)
+                .where(Ticket.id.in_(ticket_ids))
+                .values(
+                    status=TicketStatus.ESCALATED.value,
+                    intent=None,
+                    confidence=None,
+                    sub_intent=None,
+                    response=None,
+                )
+            )
+            db.commit()
+            tickets = load_tickets(ticket_ids, db)
+
+    except HTTPException:
+        raise
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to create ticket batch")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error occurred while creating tickets"
+        )
+
+    for position, ticket in zip(positions, tickets):
+        results[position] = TicketBatchItemResult(
+            index=position, ticket=TicketResponse.model_validate(ticket)
+        )
+    return TicketBatchResponse(
+        results=results,
+        created=len(tickets),
+        failed=len(batch.tickets) - len(tickets),
+    )
+
+
 @router.get("/", response_model=TicketList)
 def list_tickets(
     ticket_status: str | None = Query(
@@ -149,23 +275,37 @@ def list_tickets(
         alias="status"
     ),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Deprecated: page with cursor instead"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    count: str = Query("cached", pattern=f"^({'|'.join(COUNT_MODES)})$", description="How to compute total"),
     db: Session = Depends(get_db),
     token: str | None = Depends(oauth2_scheme_optional),
 ) -> TicketList:
     """
     List all tickets with optional status filtering.
+
+    Pages are newest first. Follow ``next_cursor`` to read the next page;
+    every page costs the same as the first, however deep.
     
     Args:
         ticket_status: Optional status filter
+        cursor: Opaque position returned as ``next_cursor``
+        count: ``exact``, ``cached`` (default), ``estimate`` or ``none``
+            (see :func:`app.utils.pagination.list_total`)
         db: Database session dependency
         
     Returns:
         TicketList: List of tickets matching criteria
         
     Raises:
-        HTTPException: If database operation fails
+        HTTPException: 400 for an invalid cursor, 500 if the database operation fails
     """
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except InvalidCursor as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
     try:
         # Extract user_id and role from optional token
         user_id, user_role = extract_user_id_and_role_from_token(token)
@@ -178,19 +318,20 @@ def list_tickets(
             query = query.filter(Ticket.status == ticket_status)
         
         # Apply user filter for non-admin/agent users
+        scoped_user_id = None
         if user_id and user_role not in [UserRole.ADMIN.value, UserRole.AGENT.value]:
             query = query.filter(Ticket.user_id == user_id)
+            scoped_user_id = user_id
         
-        # Get total before pagination
-        total = query.count()
+        total = list_total(query, count, key=("tickets", ticket_status, scoped_user_id))
 
         # Execute query with pagination (order by creation date, newest first)
-        tickets = query.order_by(Ticket.created_at.desc()).limit(limit).offset(offset).all()
+        tickets, next_cursor = keyset_page(query, limit, cursor=cursor, offset=offset)
         
         # Convert to response schemas
         ticket_responses = [TicketResponse.model_validate(ticket) for ticket in tickets]
         
-        return TicketList(tickets=ticket_responses, total=total)
+        return TicketList(tickets=ticket_responses, total=total, next_cursor=next_cursor)
         
     except HTTPException:
         # Re-raise HTTP exceptions (including 401 from token validation)
@@ -224,15 +365,28 @@ def tickets_health():
 
 
 @router.get("/{ticket_id}", response_model=TicketResponse)
-def get_ticket(
+async def get_ticket(
     ticket_id: int,
+    wait: float = Query(
+        0,
+        ge=0,
+        le=MAX_TICKET_WAIT_SECONDS,
+        description="Long-poll: wait up to this many seconds while the ticket is still open",
+    ),
     db: Session = Depends(get_db),
 ) -> TicketResponse:
     """
     Retrieve a single ticket by ID.
+
+    With ``wait`` > 0 the request is held while the ticket is still
+    ``open`` (queued for background automation) and answered as soon as
+    it is processed or the wait expires, whichever comes first. The
+    request's session is closed before waiting and each re-check uses a
+    short-lived one, so pollers never hold pooled connections.
     
     Args:
         ticket_id: ID of the ticket to retrieve
+        wait: Maximum long-poll duration in seconds
         db: Database session dependency
         
     Returns:
@@ -242,14 +396,28 @@ def get_ticket(
         HTTPException: If ticket not found (404) or database error (500)
     """
     try:
-        # Query ticket by ID
-        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-        
-        if not ticket:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Ticket with ID {ticket_id} not found"
-            )
+        # Query ticket by ID (off the event loop: the session is synchronous)
+        ticket = await run_in_threadpool(_get_ticket_or_404, ticket_id, db)
+        if ticket.status == TicketStatus.OPEN.value and wait > 0:
+            await run_in_threadpool(db.close)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while ticket.status == TicketStatus.OPEN.value:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            # Woken early when this process's workers finish the ticket; the
+            # re-check below also catches tickets processed elsewhere.
+            done_here = await automation_queue.wait_for(ticket_id, min(remaining, TICKET_WAIT_POLL_SECONDS))
+            if (
+                not done_here
+                and deadline > loop.time()
+                and await automation_queue.processed_elsewhere(ticket_id) is False
+            ):
+                # Redis says no worker finished it yet: skip the database round trip
+                continue
+            ticket = await run_in_threadpool(_recheck_ticket, ticket_id)
         
         return TicketResponse.model_validate(ticket)
         
@@ -264,6 +432,25 @@ def get_ticket(
         )
 
 
+def _get_ticket_or_404(ticket_id: int, db: Session) -> Ticket:
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ticket with ID {ticket_id} not found"
+        )
+    return ticket
+
+
+def _recheck_ticket(ticket_id: int) -> Ticket:
+    """Re-read a long-polled ticket with its own session, released right after."""
+    db = SessionLocal()
+    try:
+        return _get_ticket_or_404(ticket_id, db)
+    finally:
+        db.close()
+
+
 @router.post("/{ticket_id}/assign", response_model=TicketResponse)
 def assign_ticket(
     ticket_id: int,
@@ -428,6 +615,8 @@ def close_ticket(
                 detail=f"Ticket {ticket_id} not found",
             )
 
+        similarity_index.index_ticket(ticket)
+        similarity_index.bump_generation([ticket_id])
         logger.info(f"Ticket {ticket_id} closed by user {current_user.id}")
         return TicketResponse.model_validate(ticket)
 
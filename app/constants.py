@@ -32,6 +32,13 @@ class UserRole(str, Enum):
 DEFAULT_PAGE_SIZE = 50
 MAX_PAGE_SIZE = 100
 
+# Bulk ticket ingestion (POST /tickets/batch)
+MAX_TICKET_BATCH_SIZE = 100
+
+# Long-polling GET /tickets/{id}?wait= (seconds)
+MAX_TICKET_WAIT_SECONDS = 30
+TICKET_WAIT_POLL_SECONDS = 0.5
+
 
 
 # Similarity thresholds
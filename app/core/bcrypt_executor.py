@@ -0,0 +1,119 @@
+"""
+app/core/bcrypt_executor.py
+
+Purpose:
+Run bcrypt hashing and verification off the request threads.
+
+Responsibilities:
+- Own a process pool (BCRYPT_POOL_WORKERS processes, one per core by
+  default) that runs app.core.security.hash_password / verify_password
+- Expose them as awaitables, so auth endpoints wait without holding a
+  threadpool thread that ticket requests need
+- Bound the work in flight (BCRYPT_MAX_PENDING); beyond it callers get
+  ServiceUnavailableError (503 with Retry-After) instead of queueing
+
+The pool is created on first use with the ``spawn`` start method (forking a
+process that already runs threads and an event loop is unsafe) and is
+recreated if a worker process dies. BCRYPT_POOL_WORKERS=0 runs bcrypt in
+the threadpool instead, as before this module existed; the pending limit
+still applies.
+
+DO NOT:
+- Implement hashing here (see app/core/security.py)
+- Raise HTTP-specific exceptions here
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.security import hash_password, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class _BcryptExecutor:
+    """Process pool plus in-flight accounting shared by every request."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self.rejected = 0
+
+    @property
+    def workers(self) -> int:
+        if settings.BCRYPT_POOL_WORKERS is not None:
+            return settings.BCRYPT_POOL_WORKERS
+        return os.cpu_count() or 1
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info("Started bcrypt process pool with %d workers", self.workers)
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= settings.BCRYPT_MAX_PENDING:
+                self.rejected += 1
+                raise ServiceUnavailableError(
+                    "Authentication is busy, please retry shortly",
+                    retry_after=settings.BCRYPT_RETRY_AFTER_SECONDS,
+                )
+            self._pending += 1
+        try:
+            if self.workers == 0:
+                return await run_in_threadpool(fn, *args)
+            pool = self._get_pool()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            except BrokenProcessPool as exc:
+                logger.error("bcrypt worker process died; restarting the pool")
+                self._discard_pool(pool)
+                raise ServiceUnavailableError(
+                    "Authentication is temporarily unavailable",
+                    retry_after=settings.BCRYPT_RETRY_AFTER_SECONDS,
+                ) from exc
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, plain_password: str) -> str:
+        """Awaitable :func:`app.core.security.hash_password`."""
+        return await self._run(hash_password, plain_password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Awaitable :func:`app.core.security.verify_password`."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; the next call starts a new pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+bcrypt_executor = _BcryptExecutor()
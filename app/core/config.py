@@ -57,6 +57,32 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     CORS_ORIGINS: list[str] = []
     DEFAULT_USER_ROLE: str = "user"
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    """
+    Verified access tokens kept per process (LRU), each until its ``exp``
+    claim, so repeat requests skip signature verification. 0 disables.
+    """
+    AUTH_USER_CACHE_SECONDS: float = 30.0
+    """
+    How long an authenticated user's id / email / role / active flag is
+    reused without reading the users table. ORM updates and deletes of a
+    user invalidate it in the writing process at once; other processes
+    may serve the old values for up to this long. 0 disables.
+    """
+    AUTH_USER_CACHE_SIZE: int = 10000
+    """Most users kept in the user cache (LRU)."""
+    BCRYPT_POOL_WORKERS: int | None = None
+    """
+    Processes hashing / verifying passwords for login, register and password
+    reset. None = one per CPU core; 0 = hash in the request threadpool.
+    """
+    BCRYPT_MAX_PENDING: int = 64
+    """
+    bcrypt operations queued or running before further logins get 503 with
+    Retry-After (a login storm then sheds load instead of stalling tickets).
+    """
+    BCRYPT_RETRY_AFTER_SECONDS: int = 1
+    """Retry-After sent with the 503 when the bcrypt queue is full."""
     
     @field_validator("DEFAULT_USER_ROLE")
     @classmethod
@@ -79,6 +105,42 @@ class Settings(BaseSettings):
     """
     DATABASE_POOL_SIZE: int = 5
     DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: int = 30
+    """Seconds to wait for a pooled connection before failing the request."""
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800
+    """Replace connections older than this (stay under server / proxy idle limits)."""
+    DATABASE_POOL_PRE_PING: bool = True
+    """Test connections on checkout so dropped ones are replaced, not surfaced as errors."""
+    DATABASE_STATEMENT_TIMEOUT_MS: int = 30000
+    """PostgreSQL statement_timeout for every connection. 0 disables it."""
+    DATABASE_ASYNC_URL: str | None = None
+    """
+    URL for the async engine (get_async_db). Default: DATABASE_URL with its
+    driver swapped (sqlite → aiosqlite, postgresql → asyncpg).
+    """
+    METRICS_ROLLUP_MAX_AGE_SECONDS: int = 60
+    """
+    /admin/metrics serves the metrics rollup while it is younger than this,
+    then re-aggregates. Run workers/metrics_collector.py more often than
+    this to keep admin requests off the aggregate query.
+    """
+    METRICS_HISTORY_LOOKBACK_SECONDS: int = 3600
+    """
+    Each collector run re-aggregates this much recent history, so status
+    changes of recently created tickets reach their buckets.
+    """
+    METRICS_HISTORY_MINUTE_RETENTION_DAYS: int = 2
+    METRICS_HISTORY_HOUR_RETENTION_DAYS: int = 90
+    METRICS_HISTORY_DAY_RETENTION_DAYS: int = 730
+    METRICS_HISTORY_MAX_POINTS: int = 2000
+    """Largest number of buckets one /admin/metrics/history request may return."""
+    LIST_COUNT_CACHE_SECONDS: float = 30.0
+    """
+    How long a ticket-list total is reused (``count=cached``, the default).
+    Totals may lag recent writes by up to this long.
+    """
+    LIST_COUNT_CACHE_MAX_KEYS: int = 1024
+    """Most filter combinations (status, user) whose totals are cached at once."""
 
     # -------------------------------------------------
     # AI / NLP Configuration
@@ -89,8 +151,81 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-4o-mini"
     OPENAI_TIMEOUT: int = 8
     OPENAI_MAX_TOKENS: int = 200
+    OPENAI_BASE_URL: str | None = None
+    """Override the OpenAI API base URL (proxy, gateway or local stub). None = api.openai.com."""
+    OPENAI_MAX_CONCURRENCY: int = 8
+    """
+    Maximum in-flight OpenAI calls per process; also the size of the shared
+    client's connection pool. Further calls wait for a free slot.
+    """
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    """Size of the in-process cache of OpenAI replies (LRU). 0 disables the cache."""
+    RESPONSE_CACHE_TTL_SECONDS: int = 86400
+    """Lifetime of a cached reply, in process and in Redis."""
+    RESPONSE_CACHE_MAX_DISTANCE: int = 0
+    """
+    Largest SimHash distance (differing bits out of 64) at which a cached
+    reply is reused for a near-duplicate message. 0 = same words only (any
+    order, case or punctuation). One changed word moves the fingerprint
+    5-10 bits, whether it is "asap" or "photo" -> "video", so raising this
+    reuses replies for messages that ask something else. Messages that
+    negate differently ("not", "don't", "never") never share a reply.
+    """
+    RESPONSE_CACHE_REDIS: bool = False
+    """Also share cached replies across processes through Redis (REDIS_URL)."""
     SIMILARITY_THRESHOLD: float = 0.7
+    SIMILARITY_CACHE_TTL_SECONDS: int = 86400
+    """
+    Lifetime of a cached similarity result in Redis. Results are keyed by the
+    corpus generation, so corpus changes never serve stale entries; the TTL
+    only bounds memory.
+    """
+    SIMILARITY_CACHE_LOCAL_MAX_ENTRIES: int = 4096
+    """
+    Size of the in-process LRU of similarity results kept in front of Redis.
+    0 disables the local tier (every lookup goes to Redis, when configured).
+    """
+    SIMILARITY_CACHE_LOCAL_TTL_SECONDS: int = 3600
+    """Lifetime of a similarity result in the in-process tier."""
+    SIMILARITY_CACHE_GENERATION_REFRESH_SECONDS: float = 1.0
+    """
+    How often (seconds) each process re-reads the shared corpus generation
+    from Redis. Bounds how long another process's corpus change can go
+    unnoticed; this process's own changes take effect immediately.
+    """
+    SIMILARITY_CHANGE_LOG_GENERATIONS: int = 10000
+    """
+    How many recent corpus generations keep their changed ticket IDs in
+    Redis. A process further behind than this re-syncs its similarity index
+    by ``updated_at`` instead of re-reading just the logged tickets.
+    """
     MAX_SIMILAR_TICKETS_TO_CHECK: int = 100
+    SIMILARITY_INDEX_SYNC_SECONDS: int = 30
+    """
+    How often (seconds) each process re-syncs its in-memory similarity index
+    with tickets resolved by other processes.
+    """
+    SIMILARITY_INDEX_IDF_DRIFT: float = 0.1
+    """
+    Relative change in corpus size after which the in-memory similarity
+    index recomputes its IDF table and document norms (on the next search).
+    Between recomputes IDF is pinned, so a search only touches the postings
+    of its own terms.
+    """
+    SIMILARITY_INDEX_SYNC_LOOKBACK_SECONDS: int = 600
+    """
+    Margin subtracted from the last sync time when re-reading changed tickets
+    (by ``updated_at``), so rows stamped just before a sync but committed
+    after it, or stamped by a host with a slightly slow clock, are not missed.
+    """
+    EMBEDDINGS_PATH: str = "embeddings.json"
+    """
+    Embedding artifact written by workers/embedding_builder.py. Loaded at
+    startup as the similarity snapshot when present. JSON and binary
+    (``--format binary``, memory-mapped) artifacts are detected automatically.
+    """
+    EMBEDDINGS_RELOAD_SECONDS: int = 60
+    """How often (seconds) to check for a newer artifact. 0 disables hot-swap."""
     
     # -------------------------------------------------
     # Decision Engine (Technical Spec § 9.4)
@@ -111,21 +246,107 @@ class Settings(BaseSettings):
             )
         return v
 
+    # -------------------------------------------------
+    # Ticket Automation
+    # -------------------------------------------------
+    TICKET_AUTOMATION_ASYNC: bool = False
+    """
+    Default mode for POST /tickets. When True the ticket is stored as open,
+    answered with 202 and automated by the background worker pool; clients
+    poll (or long-poll with ?wait=) GET /tickets/{id}. Per-request override:
+    ?async=true|false.
+    """
+    AUTOMATION_QUEUE_BACKEND: str = "memory"  # memory | redis
+    """
+    Queue feeding the automation workers. "memory" is an in-process asyncio
+    queue; "redis" is a Redis list (REDIS_URL) shared by all API processes.
+    """
+    AUTOMATION_WORKERS: int = 4
+    """Number of concurrent automation workers per process."""
+    AUTOMATION_QUEUE_MAX_SIZE: int = 1000
+    """
+    Capacity of the "memory" queue. When it is full, POST /tickets automates
+    the ticket inline (201) instead of queueing it.
+    """
+    AUTOMATION_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    """
+    "redis" queue: a ticket taken by a worker and not acknowledged within
+    this long (its process died) is put back on the queue. Keep it well
+    above the slowest automation run, or a ticket may be automated twice.
+    """
+    AUTOMATION_DRAIN_TIMEOUT_SECONDS: float = 10.0
+    """How long shutdown waits for queued and in-progress automation to finish."""
+    AUTOMATION_STALE_OPEN_SECONDS: int = 300
+    """
+    At startup, tickets still open this long after creation are queued again
+    (their queue entry was lost, e.g. with the memory queue of a process that
+    stopped). 0 disables the sweep.
+    """
+
+    @field_validator("AUTOMATION_QUEUE_BACKEND")
+    @classmethod
+    def validate_automation_queue_backend(cls, v: str):
+        if v not in ("memory", "redis"):
+            raise ValueError("AUTOMATION_QUEUE_BACKEND must be 'memory' or 'redis'")
+        return v
+
     # -------------------------------------------------
     # Logging & Monitoring
     # -------------------------------------------------
     LOG_LEVEL: str = "INFO"
     SENTRY_DSN: str | None = None
+    METRICS_ENABLED: bool = True
+    """Time HTTP requests and serve all latency histograms at GET /metrics (Prometheus format)."""
     
     # -------------------------------------------------
     # Cache / Queue (Optional)
     # -------------------------------------------------
     REDIS_URL: str | None = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    """Connection pool size per process (per client flavour: sync and asyncio)."""
+    REDIS_POOL_TIMEOUT: float = 1.0
+    """Seconds a caller waits for a free pooled connection before failing."""
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+    """Connect / read timeout of a Redis command, in seconds."""
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    """Idle seconds after which a pooled connection is PINGed before reuse."""
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    REDIS_CIRCUIT_FAILURE_WINDOW_SECONDS: float = 10.0
+    """
+    The Redis circuit breaker opens after REDIS_CIRCUIT_FAILURE_THRESHOLD
+    failures within this window; callers then skip Redis entirely.
+    """
+    REDIS_CIRCUIT_COOLDOWN_SECONDS: float = 30.0
+    """How long the breaker stays open before one request probes Redis again."""
 
     # -------------------------------------------------
     # Rate Limiting
     # -------------------------------------------------
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_BATCH_TICKETS_PER_MINUTE: int = 200
+    """
+    Tickets one client may submit through POST /tickets/batch per minute
+    (each ticket costs one unit, on top of the per-request limit). Must be
+    at least the largest batch (100) or full batches are always rejected.
+    """
+    RATE_LIMIT_STORAGE: str = "memory"
+    """
+    Where rate-limit counters live: "memory" (per worker process, so N
+    processes allow N times the limit) or "redis" (shared through REDIS_URL,
+    falling back to per-process counters while Redis is unavailable).
+    """
+    RATE_LIMIT_LOCAL_BUCKETS: int = 10000
+    """
+    Keys tracked by the per-process token buckets that reject clients over
+    the limit without a Redis round trip ("redis" storage only; 0 disables).
+    """
+
+    @field_validator("RATE_LIMIT_STORAGE")
+    @classmethod
+    def validate_rate_limit_storage(cls, v: str):
+        if v not in ("memory", "redis"):
+            raise ValueError("RATE_LIMIT_STORAGE must be 'memory' or 'redis'")
+        return v
     
     # -------------------------------------------------
     # Support Configuration
@@ -227,9 +227,14 @@ async def api_exception_handler(request: Request, exc: BaseAPIException) -> JSON
             headers=headers
         )
     
+    headers = {}
+    if exc.details and "retry_after" in exc.details:
+        headers["Retry-After"] = str(exc.details["retry_after"])
+
     return JSONResponse(
         status_code=exc.status_code,
-        content=create_error_response(exc, include_details=False)
+        content=create_error_response(exc, include_details=False),
+        headers=headers
     )
 
 
@@ -140,6 +140,18 @@ class RateLimitError(BaseAPIException):
         )
 
 
+class ServiceUnavailableError(BaseAPIException):
+    """Raised when a dependency is saturated or down; clients should retry."""
+
+    def __init__(self, message: str = "Service temporarily unavailable", retry_after: int | None = None):
+        super().__init__(
+            message=message,
+            status_code=503,
+            error_code="SERVICE_UNAVAILABLE",
+            details={"retry_after": retry_after} if retry_after is not None else None
+        )
+
+
 # Error type to HTTP status code mapping.
 # AIServiceError maps to 200 because the handler returns 200 with fallback content.
 ERROR_RESPONSE_STATUS_MAPPING = {
@@ -151,6 +163,7 @@ ERROR_RESPONSE_STATUS_MAPPING = {
     AIServiceError: 200,  # Special case: AI failures return 200 with fallback
     DatabaseError: 500,
     RateLimitError: 429,
+    ServiceUnavailableError: 503,
 }
 
 
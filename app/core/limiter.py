@@ -1,5 +1,81 @@
+"""
+app/core/limiter.py
+
+Purpose:
+The slowapi limiter shared by every rate-limited route.
+
+Responsibilities:
+- Key limits per authenticated user (``user:<id>``) when the request carries
+  a valid Bearer token, and per client IP (``ip:<address>``) otherwise
+- Count with the sliding-window-counter strategy: two counters per key,
+  no per-hit timestamps, so memory stays flat however hard a client pushes
+- Store counters per process (RATE_LIMIT_STORAGE=memory) or in Redis shared
+  by all processes and pods (RATE_LIMIT_STORAGE=redis, see
+  app/services/rate_limit_storage.py)
+- Charge body-dependent costs (one unit per ticket of a batch) from inside
+  a route, where the parsed body is known (``charge``)
+
+DO NOT:
+- Reject requests with invalid tokens here (an invalid token is keyed by
+  IP; authentication errors belong to the route's dependencies)
+"""
+
+from fastapi import Request
+from jose import JWTError
+from limits import parse
 from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from slowapi.wrappers import Limit
+
+from app.core.config import settings
+from app.services.auth_cache import auth_cache
+from app.services.rate_limit_storage import SharedRedisStorage
+
+
+def rate_limit_key(request: Request) -> str:
+    """Rate-limit key: the token's user when authenticated, else the client IP."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            user_id = auth_cache.verify_token(token).get("sub")
+        except JWTError:
+            user_id = None
+        if user_id is not None:
+            return f"user:{user_id}"
+    return f"ip:{get_remote_address(request)}"
+
+
+def _storage_uri() -> str:
+    if settings.RATE_LIMIT_STORAGE == "redis":
+        return f"{SharedRedisStorage.STORAGE_SCHEME[0]}://"
+    return "memory://"
+
+
+limiter = Limiter(
+    key_func=rate_limit_key,
+    headers_enabled=False,
+    storage_uri=_storage_uri(),
+    strategy="sliding-window-counter",
+)
+
+
+def charge(request: Request, limit_value: str, cost: int, scope: str) -> None:
+    """
+    Take *cost* units of *limit_value* (e.g. ``"200/minute"``) for the request's key.
 
-limiter = Limiter(key_func=get_remote_address, headers_enabled=False, storage_uri="memory://")
+    The ``@limiter.limit`` decorator runs before the route sees its body, so
+    limits whose cost depends on the body are charged here instead. *scope*
+    keeps these counters apart from the route's request counters.
 
+    Raises:
+        RateLimitExceeded: When fewer than *cost* units are left (answered
+            with 429, like the decorator's limits).
+    """
+    if not limiter.enabled:
+        return
+    item = parse(limit_value)
+    if not limiter.limiter.hit(item, rate_limit_key(request), scope, cost=cost):
+        raise RateLimitExceeded(
+            Limit(item, rate_limit_key, scope, False, None, None, None, cost, False)
+        )
@@ -0,0 +1,203 @@
+"""
+app/core/telemetry.py
+
+Purpose:
+Latency histograms for HTTP requests and the ticket automation pipeline,
+exposed at GET /metrics in the Prometheus text format.
+
+Responsibilities:
+- Keep fixed-bucket histograms in process memory (one lock-protected row
+  of counters per label set, no per-observation allocation)
+- Time every HTTP request by method, route template and status code
+  (RequestMetricsMiddleware)
+- Time the pipeline stages of app/services/ticket_service.py
+- Render all histograms in the Prometheus text exposition format
+
+Labels only ever take bounded values: the standard HTTP methods (anything
+else is ``other``), route templates (``/tickets/{id}``, never the concrete
+path; unmatched paths share one label), fixed stage names and response
+sources. Histograms are per process: with several worker processes, each
+one reports its own requests.
+
+DO NOT:
+- Label by user, ticket id, raw path or any other unbounded value
+- Import prometheus_client (the text format is small enough to write here)
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+"""Upper bounds in seconds: 50 µs (pipeline stages) up to 10 s (slow requests)."""
+
+UNMATCHED_ROUTE = "unmatched"
+KNOWN_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+OTHER_METHOD = "other"
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class _Timer:
+    """Context manager observing the elapsed time into one histogram series."""
+
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: "Histogram", labels: tuple[str, ...]) -> None:
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._started, *self._labels)
+
+
+class Histogram:
+    """
+    Cumulative-on-render histogram with a fixed label schema.
+
+    Each label set owns one list: a count per bucket (the last one is
+    +Inf), then the sum and the count of observations.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...],
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, seconds: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            row = self._series.get(labels)
+            if row is None:
+                if len(labels) != len(self.labelnames):
+                    raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+                row = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            row[index] += 1
+            row[-2] += seconds
+            row[-1] += 1
+
+    def time(self, *labels: str) -> _Timer:
+        """``with histogram.time("stage"):`` observes the block's duration."""
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            row = self._series.get(labels)
+            return row[-1] if row else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted((labels, list(row)) for labels, row in self._series.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = [_format_float(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, row in series:
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, row):
+                cumulative += bucket_count
+                bucket_labels = ",".join(pairs + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            label_text = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{label_text} {_format_float(row[-2])}")
+            lines.append(f"{self.name}_count{label_text} {row[-1]}")
+        return lines
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Registry:
+    """The process's histograms, in registration order."""
+
+    def __init__(self) -> None:
+        self._histograms: list[Histogram] = []
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...]) -> Histogram:
+        histogram = Histogram(name, documentation, labelnames)
+        self._histograms.append(histogram)
+        return histogram
+
+    def clear(self) -> None:
+        for histogram in self._histograms:
+            histogram.clear()
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = _Registry()
+
+request_seconds = registry.histogram(
+    "srs_http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status"),
+)
+stage_seconds = registry.histogram(
+    "srs_pipeline_stage_duration_seconds",
+    "Ticket automation pipeline latency by stage.",
+    ("stage",),
+)
+automation_seconds = registry.histogram(
+    "srs_ticket_automation_duration_seconds",
+    "Whole ticket automation run by outcome (response source, or escalated).",
+    ("response_source",),
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware timing each HTTP request into ``request_seconds``.
+
+    The route template is read from ``scope["route"]``, which FastAPI's
+    router sets on the shared scope once a route matched.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            request_seconds.observe(
+                time.perf_counter() - started,
+                scope["method"] if scope["method"] in KNOWN_METHODS else OTHER_METHOD,
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+            )
@@ -5,10 +5,11 @@ Purpose:
 Database engine and session management for the application.
 
 Responsibilities:
-- Create SQLAlchemy engine (connection pool)
+- Create SQLAlchemy engine (connection pool sized and checked per Settings)
 - Provide session factory (SessionLocal)
+- Provide the optional async engine / AsyncSession factory (async_db)
 - Expose Base class for ORM models (User, Ticket, Feedback)
-- Provide FastAPI dependency (get_db) for per-request DB sessions
+- Provide FastAPI dependencies (get_db / get_async_db) for per-request sessions
 - Provide init_db() to create tables on startup
 
 Reference: docs/specification/TECHNICAL_SPEC.md § 5.3 Data Layer
@@ -19,35 +20,96 @@ DO NOT:
 - Commit transactions in this file
 """
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
+# -------------------------------------------------
+# Pool Configuration
+# -------------------------------------------------
+
+# Async driver per sync dialect, used when DATABASE_ASYNC_URL is not set
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def engine_options(url: str) -> dict:
+    """
+    Return ``create_engine`` / ``create_async_engine`` keyword arguments for *url*.
+
+    SQLite: check_same_thread=False required (SQLite default forbids shared
+    connections); pool sizing does not apply.
+    Server databases: bounded pool (DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW),
+    pre-ping so dead connections are replaced transparently, recycling before
+    server / proxy idle timeouts, and a per-statement timeout.
+    """
+    database_url = make_url(url)
+    backend = database_url.get_backend_name()
+    if backend == "sqlite":
+        if database_url.get_driver_name() == "aiosqlite":
+            # aiosqlite connections belong to the event loop that opened them
+            return {"poolclass": NullPool}
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+    timeout_ms = settings.DATABASE_STATEMENT_TIMEOUT_MS
+    if backend == "postgresql" and timeout_ms > 0:
+        if database_url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+
+
+def async_database_url(url: str | None = None) -> str:
+    """
+    Return the async-driver URL: DATABASE_ASYNC_URL, or *url* (default
+    DATABASE_URL) with its driver swapped for aiosqlite / asyncpg.
+    """
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    database_url = make_url(url or settings.DATABASE_URL)
+    driver = _ASYNC_DRIVERS.get(database_url.drivername)
+    if driver is None:
+        raise RuntimeError(
+            f"No async driver known for '{database_url.drivername}'; set DATABASE_ASYNC_URL"
+        )
+    database_url = database_url.set(drivername=driver)
+    sslmode = database_url.query.get("sslmode")
+    if driver == "postgresql+asyncpg" and sslmode is not None:
+        # asyncpg spells libpq's sslmode as ssl
+        database_url = database_url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return database_url.render_as_string(hide_password=False)
+
+
 # -------------------------------------------------
 # Database Engine
 # -------------------------------------------------
 
 """
 Engine is the core interface to the database.
-- Manages connection pooling
+- Manages connection pooling (see engine_options)
 - Executes SQL via sessions
-
-SQLite: check_same_thread=False required (SQLite default forbids shared connections)
-PostgreSQL: Do NOT pass check_same_thread (not supported)
 """
-_connect_args = (
-    {"check_same_thread": False}
-    if "sqlite" in settings.DATABASE_URL.lower()
-    else {}
-)
-
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args=_connect_args,
     echo=settings.DEBUG,  # Log SQL in development only
+    **engine_options(settings.DATABASE_URL),
 )
 
 # -------------------------------------------------
@@ -67,6 +129,57 @@ SessionLocal = sessionmaker(
     class_=Session,
 )
 
+# -------------------------------------------------
+# Async Engine / Session Factory (optional)
+# -------------------------------------------------
+
+
+class _AsyncDatabase:
+    """
+    Lazily created async engine and AsyncSession factory.
+
+    Built on first use so the async driver (aiosqlite / asyncpg) is only
+    required by deployments that serve async database routes.
+    """
+
+    def __init__(self) -> None:
+        self._engine = None
+        self._sessionmaker = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            url = async_database_url()
+            self._engine = create_async_engine(url, echo=settings.DEBUG, **engine_options(url))
+        return self._engine
+
+    @property
+    def sessionmaker(self):
+        """AsyncSession factory (same transaction settings as SessionLocal)."""
+        if self._sessionmaker is None:
+            from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+            self._sessionmaker = async_sessionmaker(
+                bind=self.engine,
+                class_=AsyncSession,
+                autoflush=False,
+                # Loaded attributes stay usable after commit without an
+                # implicit (and, under asyncio, forbidden) lazy refresh
+                expire_on_commit=False,
+            )
+        return self._sessionmaker
+
+    async def dispose(self) -> None:
+        """Close pooled connections; the engine is rebuilt on next use."""
+        engine, self._engine, self._sessionmaker = self._engine, None, None
+        if engine is not None:
+            await engine.dispose()
+
+
+async_db = _AsyncDatabase()
+
 # -------------------------------------------------
 # Declarative Base
 # -------------------------------------------------
@@ -112,6 +225,24 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator:
+    """
+    Async counterpart of :func:`get_db` for ``async def`` route handlers.
+
+    Usage:
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        @router.get("/metrics")
+        async def get_metrics(db: AsyncSession = Depends(get_async_db)):
+            total = await db.scalar(select(func.count(Ticket.id)))
+
+    The session is closed when the request ends (even on error); waiting on
+    the database no longer holds a threadpool worker.
+    """
+    async with async_db.sessionmaker() as db:
+        yield db
+
+
 # -------------------------------------------------
 # Table Initialization
 # -------------------------------------------------
@@ -125,7 +256,7 @@ def init_db() -> None:
     Safe to call multiple times: creates only missing tables.
     """
     # Import models so they register with Base.metadata (side-effect imports)
-    from app.models import feedback, ticket, user
+    from app.models import feedback, metrics_history, metrics_rollup, ticket, user
 
     Base.metadata.create_all(bind=engine)
 
@@ -15,19 +15,27 @@ This file is responsible ONLY for:
 - Do NOT implement AI logic here
 """
 
+import asyncio
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from app.core.limiter import limiter
 
 from app.api import auth, demo, tickets, feedback, admin
+from app.core.bcrypt_executor import bcrypt_executor
 from app.core.config import settings
 from app.core.error_handlers import setup_exception_handlers
-from app.db.session import engine, init_db
+from app.core.telemetry import CONTENT_TYPE, RequestMetricsMiddleware, registry
+from app.db.session import async_db, engine, init_db
+from app.services.automation_queue import automation_queue
+from app.services.llm_client import llm_client
+from app.services.redis_client import redis_manager
+from app.services.similarity_index import similarity_index, watch_embedding_artifact
 
 
 # --------------------------------------------------
@@ -45,16 +53,37 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 
     Startup tasks:
     - Initialize database connections / create tables
+    - Load the prebuilt embedding artifact and watch it for newer builds
+    - Start the background ticket automation workers
 
     Shutdown tasks:
+    - Stop the automation workers and the embedding artifact watcher
+    - Close the shared LLM client's and Redis clients' connection pools
+    - Stop the bcrypt worker processes
     - Dispose of SQLAlchemy engine connection pool
     """
     # --- Startup ---
     init_db()
 
+    similarity_index.load_artifact(settings.EMBEDDINGS_PATH)
+    watcher = None
+    if settings.EMBEDDINGS_RELOAD_SECONDS > 0:
+        watcher = asyncio.create_task(watch_embedding_artifact())
+    await automation_queue.start()
+
     yield
 
     # --- Shutdown ---
+    await automation_queue.stop()
+    await asyncio.to_thread(llm_client.reset)
+    await redis_manager.aclose()
+    redis_manager.reset()
+    await async_db.dispose()
+    await asyncio.to_thread(bcrypt_executor.shutdown)
+    if watcher is not None:
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
     engine.dispose()
 
 
@@ -104,6 +133,10 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Request latency histograms (pure ASGI, so streaming is not wrapped)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(RequestMetricsMiddleware)
+
     # Rate Limit Setup (decorator-only mode)
     app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -155,6 +188,16 @@ def create_app() -> FastAPI:
             "service": "automated-customer-support",
         }
 
+    # --------------------------------------------------
+    # Metrics Endpoint
+    # --------------------------------------------------
+
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", tags=["Health"], include_in_schema=False)
+        def prometheus_metrics() -> PlainTextResponse:
+            """Request and pipeline-stage latency histograms (Prometheus text format)."""
+            return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
     return app
 
 
@@ -81,7 +81,8 @@ class Feedback(Base):
         DateTime,
         default=lambda: datetime.now(timezone.utc),
         nullable=False,
-        doc="Timestamp when feedback was submitted",
+        index=True,
+        doc="Timestamp when feedback was submitted (indexed for metrics history)",
     )
 
     # -------------------------------------------------
@@ -0,0 +1,52 @@
+"""
+app/models/metrics_history.py
+
+Purpose:
+Defines the MetricsHistory database model.
+
+Responsibilities:
+- Store per-interval ticket / feedback counters (minute, hour and day
+  buckets) for admin dashboards
+
+DO NOT:
+- Compute or downsample counters here (see app/services/metrics_history.py)
+- Write database queries here
+"""
+
+from sqlalchemy import JSON, Column, DateTime, String
+
+from app.db.session import Base
+
+
+class MetricsHistory(Base):
+    """
+    MetricsHistory ORM model.
+
+    One row per (bucket size, bucket start). The composite primary key is
+    the index history reads use, so a read costs the number of buckets
+    requested, not the number of tickets behind them.
+    """
+
+    __tablename__ = "metrics_history"
+
+    # -------------------------------------------------
+    # Columns
+    # -------------------------------------------------
+
+    bucket = Column(
+        String,
+        primary_key=True,
+        doc="Bucket size: minute | hour | day",
+    )
+
+    bucket_start = Column(
+        DateTime,
+        primary_key=True,
+        doc="Start of the interval (UTC, naive)",
+    )
+
+    counters = Column(
+        JSON,
+        nullable=False,
+        doc="Counters for tickets created and feedback submitted in the interval",
+    )
@@ -0,0 +1,54 @@
+"""
+app/models/metrics_rollup.py
+
+Purpose:
+Defines the MetricsRollup database model.
+
+Responsibilities:
+- Store the latest aggregated ticket / feedback counters so /admin/metrics
+  is a primary-key read instead of a scan of both tables
+
+DO NOT:
+- Compute metrics here (see app/services/metrics_service.py)
+- Write database queries here
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import JSON, Column, DateTime, String
+
+from app.db.session import Base
+
+
+class MetricsRollup(Base):
+    """
+    MetricsRollup ORM model.
+
+    One row per rollup name (currently only ``global``). Refreshed by the
+    metrics collector worker, and by /admin/metrics when the row is older
+    than METRICS_ROLLUP_MAX_AGE_SECONDS.
+    """
+
+    __tablename__ = "metrics_rollup"
+
+    # -------------------------------------------------
+    # Columns
+    # -------------------------------------------------
+
+    name = Column(
+        String,
+        primary_key=True,
+        doc="Rollup name (e.g. 'global')",
+    )
+
+    counters = Column(
+        JSON,
+        nullable=False,
+        doc="Raw aggregate counters (see metrics_service.aggregate_counters)",
+    )
+
+    computed_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        doc="When the counters were aggregated",
+    )
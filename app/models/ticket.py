@@ -16,7 +16,7 @@ DO NOT:
 """
 
 from datetime import datetime, timezone
-from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 
 from app.constants import TicketStatus
@@ -33,6 +33,32 @@ class Ticket(Base):
 
     __tablename__ = "tickets"
 
+    # Indexes for the hot access paths (created by migration c3d4e5f6a7b8 on
+    # existing databases; tests/models/test_query_plans.py checks every
+    # listed query uses one):
+    # - status + created_at: status-filtered listings, newest first
+    # - created_at: unfiltered listings, newest first
+    # - user_id + created_at: a user's own tickets, newest first
+    # - status + assigned_agent_id: unassigned escalations, claim updates
+    # - resolved corpus (partial, response IS NOT NULL): similarity corpus
+    #   and index bootstrap
+    # - updated_at (migration f6a7b8c9d0e1): similarity index sync
+    __table_args__ = (
+        Index("ix_tickets_status_created_at", "status", "created_at"),
+        Index("ix_tickets_created_at", "created_at"),
+        Index("ix_tickets_user_id_created_at", "user_id", "created_at"),
+        Index("ix_tickets_status_assigned_agent_id", "status", "assigned_agent_id"),
+        Index("ix_tickets_assigned_agent_id", "assigned_agent_id"),
+        Index(
+            "ix_tickets_resolved_corpus",
+            "status",
+            "created_at",
+            sqlite_where=text("response IS NOT NULL"),
+            postgresql_where=text("response IS NOT NULL"),
+        ),
+        Index("ix_tickets_updated_at", "updated_at"),
+    )
+
     def __init__(self, **kwargs):
         """Initialize Ticket with default status if not provided."""
         if 'status' not in kwargs:
@@ -127,6 +153,14 @@ class Ticket(Base):
         doc="Timestamp when the ticket was created",
     )
 
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        doc="Timestamp of the last change to the ticket (status, response, quality score, ...)",
+    )
+
     # -------------------------------------------------
     # Relationships
     # -------------------------------------------------
@@ -41,6 +41,21 @@ class SystemHealthSchema(BaseModel):
     feedback_coverage: float
 
 
+class ResponseCacheStatsSchema(BaseModel):
+    """Process-local statistics of the LLM response cache."""
+    entries: int
+    hits: int
+    exact_hits: int
+    near_hits: int
+    redis_hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    lru_evictions: int
+    expirations: int
+    saved_latency_seconds: float
+
+
 class MetricsResponse(BaseModel):
     """
     Response schema for GET /admin/metrics.
@@ -49,6 +64,33 @@ class MetricsResponse(BaseModel):
     feedback: FeedbackStatsSchema
     quality: QualityStatsSchema
     system_health: SystemHealthSchema
+    response_cache: ResponseCacheStatsSchema | None = None
+
+
+class MetricsHistoryPoint(BaseModel):
+    """Counters for tickets created and feedback submitted in one bucket."""
+    bucket_start: str
+    tickets: int
+    by_status: dict[str, int]
+    by_intent: dict[str, int]
+    auto_resolved: int
+    escalated: int
+    auto_resolve_rate: float
+    escalation_rate: float
+    feedback: int
+    feedback_resolved: int
+    rating_sum: int
+    average_rating: float
+
+
+class MetricsHistoryResponse(BaseModel):
+    """
+    Response schema for GET /admin/metrics/history.
+    """
+    bucket: str
+    start: str
+    end: str
+    points: list[MetricsHistoryPoint]
 
 
 class AdminTicketItem(BaseModel):
@@ -65,10 +107,11 @@ class AdminTicketItem(BaseModel):
 class PaginationMeta(BaseModel):
     page: int
     limit: int
-    total: int
-    total_pages: int
+    total: int | None = None
+    total_pages: int | None = None
     has_next: bool
     has_prev: bool
+    next_cursor: str | None = None
 
 
 class FiltersMeta(BaseModel):
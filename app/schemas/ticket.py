@@ -15,9 +15,12 @@ DO NOT:
 - Change ticket status here
 """
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from datetime import datetime
+from typing import Any
+
+from app.constants import MAX_TICKET_BATCH_SIZE
 
 
 class TicketCreate(BaseModel):
@@ -90,8 +93,57 @@ class TicketList(BaseModel):
 
     Fields:
     - tickets: List of TicketResponse objects
+    - total: Matching tickets (None when count=none)
+    - next_cursor: Pass as ``cursor`` for the next page; None on the last page
     """
 
     tickets: list[TicketResponse]
-    total: int = 0
+    total: int | None = 0
+    next_cursor: str | None = None
+
+
+class TicketBatchCreate(BaseModel):
+    """
+    Schema used when a client submits many tickets at once.
+
+    Used in:
+    POST /tickets/batch
+
+    Fields:
+    - tickets: Items shaped like TicketCreate. Each item is validated on its
+      own, so one malformed item is reported in the response instead of
+      rejecting the whole batch.
+    """
+
+    tickets: list[Any] = Field(min_length=1, max_length=MAX_TICKET_BATCH_SIZE)
+
+
+class TicketBatchItemResult(BaseModel):
+    """
+    Outcome of one item of a batch submission.
+
+    Exactly one of ``ticket`` (created and processed) or ``error``
+    (rejected, nothing stored) is set.
+    """
+
+    index: int
+    ticket: TicketResponse | None = None
+    error: str | None = None
+
+
+class TicketBatchResponse(BaseModel):
+    """
+    Schema returned for a batch submission.
+
+    Used in:
+    POST /tickets/batch
+
+    Fields:
+    - results: One entry per submitted item, in submission order
+    - created: Number of tickets created
+    - failed: Number of rejected items
+    """
 
+    results: list[TicketBatchItemResult]
+    created: int
+    failed: int
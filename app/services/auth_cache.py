@@ -0,0 +1,191 @@
+"""
+app/services/auth_cache.py
+
+Purpose:
+Per-process caches in front of JWT verification and the users table, so an
+authenticated request normally costs neither a signature check nor a
+database read.
+
+Responsibilities:
+- Keep verified token claims keyed by a hash of the token, each until the
+  token's ``exp`` claim (LRU bounded by AUTH_TOKEN_CACHE_SIZE)
+- Keep a snapshot of each authenticated user (id, email, role, active flag)
+  for AUTH_USER_CACHE_SECONDS (LRU bounded by AUTH_USER_CACHE_SIZE)
+- Invalidate a user's snapshot whenever the ORM updates or deletes that user
+  (role change, deactivation, password reset, ...), at flush and again
+  after commit
+
+Invalidation is process-local. Other workers keep serving their snapshot
+until it expires, so AUTH_USER_CACHE_SECONDS bounds how long a role change
+takes to apply everywhere. Writes that bypass the ORM (Core UPDATE/DELETE)
+are only picked up by that expiry.
+
+DO NOT:
+- Raise HTTP errors here (see app/api/auth.py)
+- Cache failed verifications (invalid tokens are re-checked every time)
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.security import decode_token
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Session.info key collecting user ids updated in the current transaction
+_PENDING_KEY = "auth_cache_invalidate"
+
+
+class _UserSnapshot:
+    __slots__ = ("id", "email", "role", "is_active", "expires_at")
+
+    def __init__(self, user: User, expires_at: float) -> None:
+        self.id = user.id
+        self.email = user.email
+        self.role = user.role
+        self.is_active = user.is_active
+        self.expires_at = expires_at
+
+    def to_user(self) -> User:
+        """A detached User carrying the cached columns."""
+        return User(id=self.id, email=self.email, role=self.role, is_active=self.is_active)
+
+
+class _AuthCache:
+    """Verified-token and user caches shared by every request in the process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tokens: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._users: OrderedDict[int, _UserSnapshot] = OrderedDict()
+        self.token_hits = 0
+        self.token_misses = 0
+        self.user_hits = 0
+        self.user_misses = 0
+
+    # -------------------------------------------------
+    # Tokens
+    # -------------------------------------------------
+
+    def verify_token(self, token: str) -> dict:
+        """
+        Return the claims of *token*, verifying it only if not cached.
+
+        Raises:
+            jose.JWTError: If the token is invalid or expired.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    self._tokens.move_to_end(key)
+                    self.token_hits += 1
+                    return dict(cached[1])
+                del self._tokens[key]
+            self.token_misses += 1
+
+        payload = decode_token(token)
+        exp = payload.get("exp")
+        if settings.AUTH_TOKEN_CACHE_SIZE > 0 and isinstance(exp, (int, float)):
+            with self._lock:
+                self._tokens[key] = (float(exp), dict(payload))
+                self._tokens.move_to_end(key)
+                while len(self._tokens) > settings.AUTH_TOKEN_CACHE_SIZE:
+                    self._tokens.popitem(last=False)
+        return payload
+
+    # -------------------------------------------------
+    # Users
+    # -------------------------------------------------
+
+    def get_user(self, db: Session, user_id: int) -> User | None:
+        """
+        Return user *user_id*, from the cache when its snapshot is current.
+
+        A cached user is a detached ``User`` with id, email, role and
+        is_active set; other columns are not loaded.
+        """
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._users.get(user_id)
+            if snapshot is not None:
+                if snapshot.expires_at > now:
+                    self._users.move_to_end(user_id)
+                    self.user_hits += 1
+                    return snapshot.to_user()
+                del self._users[user_id]
+            self.user_misses += 1
+
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is not None and settings.AUTH_USER_CACHE_SECONDS > 0:
+            snapshot = _UserSnapshot(user, now + settings.AUTH_USER_CACHE_SECONDS)
+            with self._lock:
+                self._users[user_id] = snapshot
+                self._users.move_to_end(user_id)
+                while len(self._users) > settings.AUTH_USER_CACHE_SIZE:
+                    self._users.popitem(last=False)
+        return user
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    # -------------------------------------------------
+    # Housekeeping
+    # -------------------------------------------------
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+            self.token_hits = self.token_misses = 0
+            self.user_hits = self.user_misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tokens": len(self._tokens),
+                "token_hits": self.token_hits,
+                "token_misses": self.token_misses,
+                "users": len(self._users),
+                "user_hits": self.user_hits,
+                "user_misses": self.user_misses,
+            }
+
+
+auth_cache = _AuthCache()
+
+
+# -------------------------------------------------
+# Invalidation on user writes
+# -------------------------------------------------
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_written(mapper, connection, target: User) -> None:
+    auth_cache.invalidate_user(target.id)
+    # Again after commit: a request may re-cache the old row in between
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        auth_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
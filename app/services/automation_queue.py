@@ -0,0 +1,590 @@
+"""
+app/services/automation_queue.py
+
+Purpose:
+Background processing of ticket automation for the async create mode.
+
+Responsibilities:
+- Queue ticket IDs whose automation was deferred by POST /tickets
+- Run a pool of workers that automate queued tickets off the request path
+- Let long-polling requests wait for a ticket to leave the ``open`` status,
+  including tickets finished by other processes (Redis done markers)
+- Make sure a ticket answered with 202 is eventually automated: failed
+  tickets are retried, shutdown drains the queue, and startup re-queues
+  tickets left ``open`` for longer than AUTOMATION_STALE_OPEN_SECONDS
+
+The queue backend is pluggable: an in-process ``asyncio.Queue`` by default,
+or a Redis list shared by every API process (``AUTOMATION_QUEUE_BACKEND``).
+Workers are asyncio tasks; the automation itself (DB work and a possible LLM
+call) runs in a thread so the event loop is never blocked.
+
+Delivery is at-least-once. The memory queue is bounded
+(AUTOMATION_QUEUE_MAX_SIZE; when full, POST /tickets automates inline) and
+lives only as long as the process: what shutdown cannot drain in
+AUTOMATION_DRAIN_TIMEOUT_SECONDS stays ``open`` until a startup sweep. The
+Redis queue moves each taken ticket to a processing list with a lease
+(BLMOVE); a worker acknowledges it when done, and a reaper puts tickets
+whose lease is older than AUTOMATION_VISIBILITY_TIMEOUT_SECONDS back on the
+queue (their process died). A redelivered ticket that was finished
+meanwhile is skipped, since only ``open`` tickets are automated.
+
+DO NOT:
+- Implement classification / resolution logic here (see ticket_service)
+- Handle HTTP request/response here
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from app.constants import MAX_TICKET_WAIT_SECONDS, TicketStatus
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.ticket import Ticket
+from app.services.redis_client import redis_manager
+from app.services.ticket_service import escalate_after_failure, run_ticket_automation
+
+logger = logging.getLogger(__name__)
+
+# Redis list holding queued ticket IDs (LPUSH to enqueue, BLMOVE to consume)
+REDIS_QUEUE_KEY = "srs:automation:queue"
+
+# Tickets taken by a worker and not yet acknowledged, and when each was taken
+REDIS_PROCESSING_KEY = "srs:automation:processing"
+REDIS_LEASES_KEY = "srs:automation:leases"
+
+# Held by the process sweeping stale open tickets, so only one process does
+REDIS_SWEEP_LOCK_KEY = "srs:automation:sweep"
+
+# Marker set (with the final status) when a worker finishes a ticket, so
+# long-polls in any process can skip database re-checks until it appears
+REDIS_DONE_KEY_PREFIX = "srs:automation:done"
+REDIS_DONE_TTL_SECONDS = 2 * MAX_TICKET_WAIT_SECONDS
+
+# How long a worker blocks on an empty queue before re-checking for shutdown
+REDIS_POP_TIMEOUT_SECONDS = 1
+
+# Upper bound on waiting for an enqueue to be acknowledged by the loop
+SUBMIT_TIMEOUT_SECONDS = 2.0
+
+# Failed tickets are retried after a pause, a bounded number of times (memory
+# queue; Redis redelivers them through the reaper)
+RETRY_DELAY_SECONDS = 5.0
+MAX_ATTEMPTS = 3
+
+# Most stale open tickets re-queued by one startup sweep
+SWEEP_LIMIT = 1000
+
+# Move a ticket from the processing list back to the queue, unless another
+# process already did (LREM finds nothing); drop its lease either way
+REQUEUE_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 1 then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+end
+redis.call('ZREM', KEYS[3], ARGV[1])
+"""
+
+
+class InMemoryAutomationQueue:
+    """
+    Process-local queue backed by a bounded :class:`asyncio.Queue`.
+
+    Args:
+        max_size: Capacity; :meth:`put` raises ``asyncio.QueueFull`` beyond it.
+    """
+
+    def __init__(self, max_size: int = 0) -> None:
+        self._queue: asyncio.Queue[int] = asyncio.Queue(maxsize=max(0, max_size))
+        self._attempts: Counter[int] = Counter()
+
+    async def put(self, ticket_id: int) -> None:
+        self._queue.put_nowait(ticket_id)
+
+    async def get(self) -> int | None:
+        """Next ticket ID, or None when nothing arrived within the poll timeout."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), REDIS_POP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            return None
+
+    async def ack(self, ticket_id: int) -> None:
+        self._attempts.pop(ticket_id, None)
+        self._queue.task_done()
+
+    async def nack(self, ticket_id: int) -> None:
+        """Retry *ticket_id* after RETRY_DELAY_SECONDS, up to MAX_ATTEMPTS times."""
+        self._attempts[ticket_id] += 1
+        if self._attempts[ticket_id] < MAX_ATTEMPTS:
+            asyncio.get_running_loop().call_later(RETRY_DELAY_SECONDS, self._retry, ticket_id)
+        else:
+            del self._attempts[ticket_id]
+            logger.error(f"Giving up on ticket {ticket_id} after {MAX_ATTEMPTS} attempts; it stays open")
+        self._queue.task_done()
+
+    def _retry(self, ticket_id: int) -> None:
+        try:
+            self._queue.put_nowait(ticket_id)
+        except asyncio.QueueFull:
+            logger.error(f"Automation queue full; ticket {ticket_id} stays open")
+
+    async def join(self) -> None:
+        """Wait until every queued ticket was acknowledged."""
+        await self._queue.join()
+
+    async def release(self, ticket_ids: list[int]) -> None:
+        """Give up tickets this process cannot finish (nothing outlives it here)."""
+        pending = list(ticket_ids)
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            logger.warning(
+                f"Stopping with {len(pending)} unfinished ticket(s) {sorted(pending)}; "
+                "they stay open until the next startup sweep"
+            )
+
+    async def queued_ids(self) -> set[int]:
+        return set()
+
+    async def claim_sweep(self, seconds: int) -> bool:
+        return True
+
+    async def reap(self, visibility_timeout: float) -> int:
+        return 0
+
+    def full(self) -> bool:
+        return self._queue.full()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisAutomationQueue:
+    """
+    Queue backed by a Redis list, shared by every process using *key*.
+
+    Any API process running the worker pool may pick up a ticket, so
+    deferred automation survives a restart of the process that accepted it.
+    Taken tickets wait in a processing list, each with a lease in a sorted
+    set, until the worker acknowledges them.
+    """
+
+    def __init__(
+        self,
+        client,
+        key: str = REDIS_QUEUE_KEY,
+        processing_key: str = REDIS_PROCESSING_KEY,
+        leases_key: str = REDIS_LEASES_KEY,
+    ) -> None:
+        self._client = client
+        self._key = key
+        self._processing_key = processing_key
+        self._leases_key = leases_key
+        self._requeue = client.register_script(REQUEUE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, key: str = REDIS_QUEUE_KEY) -> "RedisAutomationQueue":
+        import redis.asyncio as redis_asyncio
+
+        return cls(redis_asyncio.from_url(url, decode_responses=True), key)
+
+    async def put(self, ticket_id: int) -> None:
+        await self._client.lpush(self._key, ticket_id)
+
+    async def get(self) -> int | None:
+        """Take the next ticket ID onto the processing list, or None on timeout."""
+        item = await self._client.blmove(
+            self._key, self._processing_key, REDIS_POP_TIMEOUT_SECONDS, "RIGHT", "LEFT"
+        )
+        if item is None:
+            return None
+        await self._client.zadd(self._leases_key, {item: time.time()})
+        return int(item)
+
+    async def ack(self, ticket_id: int) -> None:
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.lrem(self._processing_key, 1, ticket_id)
+            pipe.zrem(self._leases_key, ticket_id)
+            await pipe.execute()
+
+    async def nack(self, ticket_id: int) -> None:
+        """Leave the ticket leased; the reaper redelivers it once the lease expires."""
+
+    async def release(self, ticket_ids: list[int]) -> None:
+        """Put tickets taken by this process back on the queue for other processes."""
+        for ticket_id in ticket_ids:
+            await self._requeue(
+                keys=[self._processing_key, self._key, self._leases_key], args=[ticket_id]
+            )
+
+    async def reap(self, visibility_timeout: float) -> int:
+        """
+        Re-queue tickets leased longer than *visibility_timeout* seconds ago.
+
+        A ticket on the processing list without a lease (its process died
+        between BLMOVE and ZADD) gets one now, so it is reaped a timeout later.
+
+        Returns:
+            The number of tickets put back on the queue.
+        """
+        taken = await self._client.lrange(self._processing_key, 0, -1)
+        now = time.time()
+        if taken:
+            await self._client.zadd(self._leases_key, {item: now for item in taken}, nx=True)
+        expired = await self._client.zrangebyscore(self._leases_key, "-inf", now - visibility_timeout)
+        await self.release([int(item) for item in expired])
+        taken = set(taken)
+        return sum(1 for item in expired if item in taken)
+
+    async def queued_ids(self) -> set[int]:
+        """IDs waiting on the queue or held by a worker."""
+        queued = await self._client.lrange(self._key, 0, -1)
+        taken = await self._client.lrange(self._processing_key, 0, -1)
+        return {int(item) for item in queued + taken}
+
+    async def claim_sweep(self, seconds: int) -> bool:
+        """True for the one process allowed to sweep in the next *seconds*."""
+        return bool(await self._client.set(REDIS_SWEEP_LOCK_KEY, 1, nx=True, ex=max(1, int(seconds))))
+
+    def full(self) -> bool:
+        return False
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+def find_stale_open_tickets(older_than_seconds: float, limit: int = SWEEP_LIMIT) -> list[int]:
+    """IDs of tickets still ``open`` more than *older_than_seconds* after creation, oldest first."""
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=older_than_seconds)
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Ticket.id)
+            .filter(Ticket.status == TicketStatus.OPEN.value, Ticket.created_at < cutoff)
+            .order_by(Ticket.id)
+            .limit(limit)
+            .all()
+        )
+        return [ticket_id for ticket_id, in rows]
+    finally:
+        db.close()
+
+
+def process_queued_ticket(ticket_id: int) -> str | None:
+    """
+    Automate one deferred ticket in its own database session.
+
+    Tickets that are missing or no longer ``open`` (already processed, or
+    handled by an agent meanwhile) are skipped. A pipeline failure escalates
+    the ticket, exactly like the inline path.
+
+    Returns:
+        The ticket's final status, or None if it was skipped.
+    """
+    db = SessionLocal()
+    try:
+        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+        if ticket is None or ticket.status != TicketStatus.OPEN.value:
+            return None
+        try:
+            ticket = run_ticket_automation(ticket=ticket, db=db)
+        except Exception:
+            logger.exception(f"AI pipeline failed for ticket {ticket_id}")
+            ticket = escalate_after_failure(ticket, db)
+        return ticket.status
+    finally:
+        db.close()
+
+
+class _AutomationWorkerPool:
+    """
+    Process-wide pool of automation workers.
+
+    :meth:`start` / :meth:`stop` are called from the application lifespan.
+    :meth:`submit` may be called from any thread (sync endpoints run in a
+    threadpool); it hands the ticket ID to the event loop that owns the queue.
+    """
+
+    def __init__(self) -> None:
+        self._queue: InMemoryAutomationQueue | RedisAutomationQueue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._workers: list[asyncio.Task] = []
+        self._reaper: asyncio.Task | None = None
+        self._accepting = False
+        self._stopping = False
+        self._in_flight: dict[asyncio.Task, int] = {}
+        self._completed: dict[int, asyncio.Event] = {}
+        self._waiting: Counter[int] = Counter()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self, workers: int | None = None, backend: str | None = None) -> None:
+        """
+        Create the queue, spawn the workers on the running event loop and
+        re-queue stale open tickets (see :meth:`sweep_stale_tickets`).
+        """
+        if self.running:
+            return
+        workers = workers or settings.AUTOMATION_WORKERS
+        backend = backend or settings.AUTOMATION_QUEUE_BACKEND
+
+        if backend == "redis" and settings.REDIS_URL:
+            self._queue = RedisAutomationQueue.from_url(settings.REDIS_URL)
+        else:
+            if backend == "redis":
+                logger.warning("AUTOMATION_QUEUE_BACKEND=redis but REDIS_URL is unset; using memory")
+            self._queue = InMemoryAutomationQueue(settings.AUTOMATION_QUEUE_MAX_SIZE)
+
+        self._loop = asyncio.get_running_loop()
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"automation-worker-{number}")
+            for number in range(workers)
+        ]
+        if isinstance(self._queue, RedisAutomationQueue):
+            self._reaper = asyncio.create_task(self._reap_periodically(), name="automation-reaper")
+        self._accepting = True
+        logger.info(f"Started {workers} automation workers ({type(self._queue).__name__})")
+        await self.sweep_stale_tickets()
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """
+        Stop taking tickets, drain, then cancel the workers and release the queue.
+
+        New submissions are refused at once (callers automate inline). The
+        memory queue is worked off for up to *timeout* seconds (default
+        AUTOMATION_DRAIN_TIMEOUT_SECONDS); Redis workers only finish the
+        ticket in hand, leaving the rest of the shared queue to other
+        processes. Tickets still unfinished after the timeout are handed
+        back (Redis) or left ``open`` for the next startup sweep (memory).
+        """
+        if timeout is None:
+            timeout = settings.AUTOMATION_DRAIN_TIMEOUT_SECONDS
+        deadline = time.monotonic() + timeout
+        self._accepting = False
+        workers, queue = self._workers, self._queue
+
+        if isinstance(queue, InMemoryAutomationQueue) and workers:
+            try:
+                await asyncio.wait_for(queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._stopping = True
+        # Idle workers are only polling the queue; busy ones finish their ticket
+        busy = {worker for worker in workers if worker in self._in_flight}
+        for worker in set(workers) - busy:
+            worker.cancel()
+        if busy:
+            _, still_busy = await asyncio.wait(busy, timeout=max(0.0, deadline - time.monotonic()))
+            for worker in still_busy:
+                worker.cancel()
+        for worker in workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+
+        if queue is not None:
+            try:
+                await queue.release(list(self._in_flight.values()))
+            except Exception:
+                logger.exception("Failed to release unfinished automation tickets")
+            await queue.close()
+        self._workers = []
+        self._reaper = None
+        self._in_flight.clear()
+        self._queue = None
+        self._loop = None
+        self._completed.clear()
+        self._waiting.clear()
+
+    def submit(self, ticket_id: int) -> bool:
+        """
+        Queue *ticket_id* for background automation.
+
+        Returns:
+            True once the ticket is queued; False if the pool is not running
+            (or stopping), the memory queue is full or the enqueue failed, in
+            which case the caller should automate the ticket inline.
+        """
+        loop, queue = self._loop, self._queue
+        if not self.running or not self._accepting or loop is None or queue is None:
+            return False
+        try:
+            if _on_loop(loop):
+                if queue.full():
+                    raise asyncio.QueueFull
+                loop.create_task(queue.put(ticket_id))
+            else:
+                asyncio.run_coroutine_threadsafe(queue.put(ticket_id), loop).result(
+                    timeout=SUBMIT_TIMEOUT_SECONDS
+                )
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Automation queue full; ticket {ticket_id} is automated inline")
+            return False
+        except Exception:
+            logger.exception(f"Failed to queue ticket {ticket_id} for automation")
+            return False
+
+    async def sweep_stale_tickets(self) -> int:
+        """
+        Queue tickets left ``open`` longer than AUTOMATION_STALE_OPEN_SECONDS.
+
+        Catches tickets answered with 202 whose queue entry was lost (memory
+        queue of a process that stopped, automation that kept failing). With
+        Redis only one process sweeps per period, and tickets already queued
+        or in processing are skipped. Never raises.
+
+        Returns:
+            The number of tickets queued.
+        """
+        stale_after = settings.AUTOMATION_STALE_OPEN_SECONDS
+        queue = self._queue
+        if stale_after <= 0 or queue is None:
+            return 0
+        queued = 0
+        try:
+            if not await queue.claim_sweep(stale_after):
+                return 0
+            ticket_ids = await asyncio.to_thread(find_stale_open_tickets, stale_after)
+            known = await queue.queued_ids()
+            for ticket_id in ticket_ids:
+                if ticket_id in known:
+                    continue
+                if queue.full():
+                    logger.warning("Automation queue full; remaining stale tickets wait for the next sweep")
+                    break
+                await queue.put(ticket_id)
+                queued += 1
+        except Exception:
+            logger.exception("Sweep of stale open tickets failed")
+        if queued:
+            logger.info(f"Re-queued {queued} ticket(s) left open for over {stale_after}s")
+        return queued
+
+    async def wait_for(self, ticket_id: int, timeout: float) -> bool:
+        """
+        Wait up to *timeout* seconds for this process to finish *ticket_id*.
+
+        Only automation done by this process's workers is observed; callers
+        long-polling across processes must also check
+        :meth:`processed_elsewhere` or the database afterwards.
+
+        Returns:
+            True if the ticket was processed here within *timeout*.
+        """
+        event = self._completed.setdefault(ticket_id, asyncio.Event())
+        self._waiting[ticket_id] += 1
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiting[ticket_id] -= 1
+            if not self._waiting[ticket_id]:
+                del self._waiting[ticket_id]
+                # Nobody is waiting any more: do not keep the event around
+                if self._completed.get(ticket_id) is event:
+                    del self._completed[ticket_id]
+
+    async def processed_elsewhere(self, ticket_id: int) -> bool | None:
+        """
+        Check the Redis done marker of *ticket_id*.
+
+        Returns:
+            Whether some process's worker finished the ticket, or None when
+            Redis is unavailable (the caller must check the database).
+        """
+        client = await redis_manager.get_async()
+        if client is None:
+            return None
+        try:
+            return bool(await client.exists(f"{REDIS_DONE_KEY_PREFIX}:{ticket_id}"))
+        except Exception:
+            redis_manager.record_failure()
+            return None
+
+    async def _mark_done(self, ticket_id: int, status: str) -> None:
+        client = await redis_manager.get_async()
+        if client is None:
+            return
+        try:
+            await client.setex(f"{REDIS_DONE_KEY_PREFIX}:{ticket_id}", REDIS_DONE_TTL_SECONDS, status)
+        except Exception:
+            redis_manager.record_failure()
+
+    async def _reap_periodically(self) -> None:
+        visibility_timeout = settings.AUTOMATION_VISIBILITY_TIMEOUT_SECONDS
+        while True:
+            try:
+                reaped = await self._queue.reap(visibility_timeout)
+                if reaped:
+                    logger.warning(f"Re-queued {reaped} ticket(s) whose worker did not acknowledge them")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Automation queue reaper failed")
+            await asyncio.sleep(max(1.0, visibility_timeout / 2))
+
+    async def _work(self) -> None:
+        current = asyncio.current_task()
+        while not self._stopping:
+            try:
+                ticket_id = await self._queue.get()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Automation queue read failed")
+                await asyncio.sleep(REDIS_POP_TIMEOUT_SECONDS)
+                continue
+            if ticket_id is None:
+                continue
+            self._in_flight[current] = ticket_id
+            try:
+                final_status = await asyncio.to_thread(process_queued_ticket, ticket_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Not acknowledged: retried later (see the queue's nack)
+                logger.exception(f"Background automation failed for ticket {ticket_id}")
+                del self._in_flight[current]
+                await self._settle(self._queue.nack, ticket_id)
+                continue
+            del self._in_flight[current]
+            await self._settle(self._queue.ack, ticket_id)
+            if final_status is not None:
+                await self._mark_done(ticket_id, final_status)
+            event = self._completed.pop(ticket_id, None)
+            if event is not None:
+                event.set()
+
+    @staticmethod
+    async def _settle(method, ticket_id: int) -> None:
+        try:
+            await method(ticket_id)
+        except Exception:
+            logger.exception(f"Failed to settle ticket {ticket_id} on the automation queue")
+
+
+def _on_loop(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+automation_queue = _AutomationWorkerPool()
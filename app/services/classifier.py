@@ -1,7 +1,12 @@
 import re
+
+
 def _boundary_match(keyword: str, text: str) -> bool:
     """
     Check if keyword appears as a whole word/phrase in text (boundary-aware matching).
+
+    This is the reference definition of a keyword hit; classify_intent uses
+    the precompiled _KeywordMatcher, which must agree with it.
     
     Args:
         keyword: The keyword to match (can be multi-word)
@@ -23,6 +28,236 @@ def _boundary_match(keyword: str, text: str) -> bool:
     return bool(re.search(pattern, text, re.IGNORECASE))
 
 
+# -------- Intent Classification Rules -------- #
+
+INTENT_PATTERNS = {
+    "login_issue": {
+        "keywords": [
+            "login", "signin", "sign in", "log in", "authentication", "password",
+            "credentials", "access", "account access", "cant login", "unable to login",
+            "forgot password", "reset password", "locked out", "account locked",
+            "sign in issue", "login problem", "authentication failed",
+            "locked", "blocked", "suspended", "2fa", "two factor", "attempts"
+        ],
+        "confidence": 0.85
+    },
+    "payment_issue": {
+        "keywords": [
+            "payment", "billing", "charge", "charged", "transaction", "credit card",
+            "debit card", "invoice", "receipt", "refund", "payment failed",
+            "billing issue", "payment problem", "overcharged", "double charge",
+            "payment declined", "wrong charge", "money", "cost", "price"
+        ],
+        "confidence": 0.9
+    },
+    "account_issue": {
+        "keywords": [
+            "account", "profile", "settings", "personal information", "email",
+            "phone number", "address", "update account", "delete account",
+            "account settings", "profile update", "change email", "change phone",
+            "deactivate", "suspend", "close account", "personal data"
+        ],
+        "confidence": 0.8
+    },
+    "technical_issue": {
+        "keywords": [
+            "error", "bug", "crash", "slow", "performance", "broken", "not working",
+            "glitch", "issue", "problem", "technical", "system", "server",
+            "down", "unavailable", "timeout", "loading", "freeze", "frozen",
+            "crashing", "fails", "failed", "malfunction"
+        ],
+        "confidence": 0.75
+    },
+    "feature_request": {
+        "keywords": [
+            "feature", "request", "suggestion", "improvement", "enhancement",
+            "add", "implement", "new feature", "would like", "wish", "hope",
+            "suggest", "recommend", "feedback", "idea", "could you", "can you",
+            "would be great", "nice to have", "should have",
+            "improve", "better", "enhance", "search"
+        ],
+        "confidence": 0.8
+    },
+    "general_query": {
+        "keywords": [
+            "question", "help", "how", "what", "where", "when", "why", "information",
+            "clarification", "explain", "understand", "guide", "tutorial",
+            "documentation", "support", "assistance", "contact", "info"
+        ],
+        "patterns": [
+            r"how (?:do|can|should|would)",
+            r"what (?:is|are|do|can)",
+            r"where (?:can|do|is)",
+            r"when (?:can|do|is)",
+            r"why (?:do|can|is)",
+            r"explain (?:please|kindly)",
+            r"help (?:me|with)",
+            r"contact (?:support|you)"
+        ],
+        "confidence": 0.7
+    }
+}
+
+# Priority order: more specific intents first
+INTENT_PRIORITY = [
+    "payment_issue",
+    "login_issue",
+    "account_issue",
+    "technical_issue",
+    "feature_request",
+    "general_query"
+]
+
+SUB_INTENT_PATTERNS: dict[str, list[tuple[str, list[str]]]] = {
+    "login_issue": [
+        ("password_reset",    ["forgot", "reset", "remember", "lost", "recovery"]),
+        ("account_locked",    ["locked", "lock", "blocked", "2fa", "two factor", "suspended", "attempts"]),
+        ("wrong_credentials", ["credentials", "wrong", "invalid"]),
+    ],
+    "payment_issue": [
+        ("duplicate_charge",  ["twice", "double", "duplicate", "refund", "unexpected"]),
+        ("payment_declined",  ["declined", "failed", "rejected"]),
+        ("billing_question",  ["invoice", "receipt", "plan", "pricing"]),
+    ],
+    "account_issue": [
+        ("delete_account",    ["delete", "remove", "close", "cancel", "deactivate", "gdpr"]),
+        ("update_info",       ["update", "change", "edit", "email", "phone", "name", "profile"]),
+    ],
+    "technical_issue": [
+        ("crash_error",       ["crash", "error", "bug", "broken", "not working", "fails"]),
+        ("performance",       ["slow", "loading", "lag", "freeze", "timeout"]),
+    ],
+    "feature_request": [
+        ("new_feature",       ["add", "new", "build", "implement", "wish"]),
+        ("improvement",       ["improve", "better", "enhance"]),
+    ],
+    "general_query": [
+        ("how_to",            ["how", "steps", "guide", "tutorial"]),
+        ("pricing_plan",      ["price", "cost", "plan", "upgrade"]),
+    ],
+}
+
+# Keywords consulted by the special-case confidence rules in classify_intent
+_EXPLAIN_BILLING = ("explain", "billing")
+_PAYMENT_ACTION_VERBS = ["charge", "charged", "failed", "declined", "debit", "refund", "transaction"]
+_ACCOUNT_PRIORITY_KEYWORDS = ["account", "delete", "profile"]
+_LOGIN_PRIORITY_KEYWORDS = ["locked", "blocked", "suspended", "attempts", "2fa", "two factor"]
+
+
+def _trie_regex(words) -> str:
+    """
+    Return a regex matching any of *words*, factored into a character trie.
+
+    Python's regex engine tries alternatives one by one; sharing prefixes
+    lets a failing offset be rejected after one character instead of after
+    trying every word. Where one word is a prefix of another, the longer
+    one is tried first.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class _KeywordMatcher:
+    """
+    Finds every keyword and pattern hit in a normalized message in one pass.
+
+    classify_intent normalizes text to lowercase ``[a-z0-9 ]`` with single
+    spaces, so a single-word keyword matches at word boundaries exactly when
+    it is one of the text's space-separated tokens: a set lookup.
+
+    Multi-word keywords match as plain substrings (see _boundary_match). They
+    are found by one compiled trie regex tried at every offset, which yields
+    the longest phrase starting there; any shorter phrase that also matches
+    at that offset is a prefix of it and comes from a precomputed table.
+
+    The general_query patterns are combined into one alternation of named
+    groups, tried only at offsets where one of their literal prefixes starts.
+    They begin with distinct words, so at most one matches per offset.
+    """
+
+    def __init__(self, phrases, patterns) -> None:
+        phrases = set(phrases)
+        self._phrase_prefixes = {
+            phrase: frozenset(other for other in phrases if phrase.startswith(other))
+            for phrase in phrases
+        }
+        self._phrase_regex = re.compile("(?=(" + _trie_regex(phrases) + "))")
+
+        self._pattern_names = {f"p{i}": pattern for i, pattern in enumerate(patterns)}
+        alternation = "|".join(f"(?P<{name}>{pattern})" for name, pattern in self._pattern_names.items())
+        prefixes = [re.match(r"[a-z0-9 ]*", pattern).group() for pattern in patterns]
+        guard = "(?=" + _trie_regex(prefixes) + ")" if all(prefixes) else ""
+        self._pattern_regex = re.compile(guard + "(?=" + alternation + ")")
+
+    def match(self, text: str) -> "_KeywordHits":
+        phrases = set()
+        for found in self._phrase_regex.finditer(text):
+            phrases.update(self._phrase_prefixes[found.group(1)])
+        patterns = {
+            self._pattern_names[found.lastgroup] for found in self._pattern_regex.finditer(text)
+        }
+        return _KeywordHits(set(text.split()), phrases, patterns)
+
+
+class _KeywordHits:
+    """Keyword and pattern hits for one message."""
+
+    def __init__(self, tokens: set, phrases: set, patterns: set) -> None:
+        self.tokens = tokens
+        self.phrases = phrases
+        self.patterns = patterns
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in (self.phrases if " " in keyword else self.tokens)
+
+    def any(self, keywords) -> bool:
+        return any(keyword in self for keyword in keywords)
+
+
+class _IntentRule:
+    """An intent's keywords split by how they match, for set-based counting."""
+
+    def __init__(self, config: dict) -> None:
+        # Keyword lists hold distinct entries, so set sizes equal match counts
+        self.words = frozenset(kw for kw in config["keywords"] if " " not in kw)
+        self.phrases = frozenset(kw for kw in config["keywords"] if " " in kw)
+        self.patterns = tuple(config.get("patterns", []))
+        self.confidence = config["confidence"]
+
+    def keyword_matches(self, hits: _KeywordHits) -> int:
+        return len(self.words & hits.tokens) + len(self.phrases & hits.phrases)
+
+    def pattern_matches(self, hits: _KeywordHits) -> int:
+        return sum(1 for pattern in self.patterns if pattern in hits.patterns)
+
+
+_MATCHER = _KeywordMatcher(
+    phrases=[
+        keyword
+        for keyword in (
+            [kw for config in INTENT_PATTERNS.values() for kw in config["keywords"]]
+            + _PAYMENT_ACTION_VERBS + _ACCOUNT_PRIORITY_KEYWORDS + _LOGIN_PRIORITY_KEYWORDS
+        )
+        if " " in keyword
+    ],
+    patterns=[pattern for config in INTENT_PATTERNS.values() for pattern in config.get("patterns", [])],
+)
+_RULES = {intent: _IntentRule(INTENT_PATTERNS[intent]) for intent in INTENT_PRIORITY}
+
+
 def classify_intent(message: str) -> dict[str, str | float | None]:
     """
     Classify user intent using rule-based keyword matching.
@@ -65,114 +300,19 @@ def classify_intent(message: str) -> dict[str, str | float | None]:
             "sub_intent": None,
         }
 
-    # -------- Intent Classification Rules -------- #
-    
-    intent_patterns = {
-        "login_issue": {
-            "keywords": [
-                "login", "signin", "sign in", "log in", "authentication", "password",
-                "credentials", "access", "account access", "cant login", "unable to login",
-                "forgot password", "reset password", "locked out", "account locked",
-                "sign in issue", "login problem", "authentication failed",
-                "locked", "blocked", "suspended", "2fa", "two factor", "attempts"
-            ],
-            "confidence": 0.85
-        },
-        "payment_issue": {
-            "keywords": [
-                "payment", "billing", "charge", "charged", "transaction", "credit card",
-                "debit card", "invoice", "receipt", "refund", "payment failed",
-                "billing issue", "payment problem", "overcharged", "double charge",
-                "payment declined", "wrong charge", "money", "cost", "price"
-            ],
-            "confidence": 0.9
-        },
-        "account_issue": {
-            "keywords": [
-                "account", "profile", "settings", "personal information", "email",
-                "phone number", "address", "update account", "delete account",
-                "account settings", "profile update", "change email", "change phone",
-                "deactivate", "suspend", "close account", "personal data"
-            ],
-            "confidence": 0.8
-        },
-        "technical_issue": {
-            "keywords": [
-                "error", "bug", "crash", "slow", "performance", "broken", "not working",
-                "glitch", "issue", "problem", "technical", "system", "server",
-                "down", "unavailable", "timeout", "loading", "freeze", "frozen",
-                "crashing", "fails", "failed", "malfunction"
-            ],
-            "confidence": 0.75
-        },
-        "feature_request": {
-            "keywords": [
-                "feature", "request", "suggestion", "improvement", "enhancement",
-                "add", "implement", "new feature", "would like", "wish", "hope",
-                "suggest", "recommend", "feedback", "idea", "could you", "can you",
-                "would be great", "nice to have", "should have",
-                "improve", "better", "enhance", "search"
-            ],
-            "confidence": 0.8
-        },
-        "general_query": {
-            "keywords": [
-                "question", "help", "how", "what", "where", "when", "why", "information",
-                "clarification", "explain", "understand", "guide", "tutorial",
-                "documentation", "support", "assistance", "contact", "info"
-            ],
-            "patterns": [
-                r"how (?:do|can|should|would)",
-                r"what (?:is|are|do|can)",
-                r"where (?:can|do|is)",
-                r"when (?:can|do|is)",
-                r"why (?:do|can|is)",
-                r"explain (?:please|kindly)",
-                r"help (?:me|with)",
-                r"contact (?:support|you)"
-            ],
-            "confidence": 0.7
-        }
-    }
+    hits = _MATCHER.match(text)
 
     # -------- Matching Logic -------- #
     
     best_match = None
     highest_score = 0
     
-    # Priority order: more specific intents first
-    intent_priority = [
-        "payment_issue",
-        "login_issue", 
-        "account_issue",
-        "technical_issue",
-        "feature_request",
-        "general_query"
-    ]
-    
-    # Reorder intents by priority
-    ordered_intents = {}
-    for intent in intent_priority:
-        if intent in intent_patterns:
-            ordered_intents[intent] = intent_patterns[intent]
-    
-    for intent, config in ordered_intents.items():
-        keywords = config["keywords"]
-        base_confidence = config["confidence"]
-        patterns = config.get("patterns", [])
-        
-        # Count keyword matches
-        match_count = 0
-        pattern_matches = 0
+    for intent, rule in _RULES.items():
+        base_confidence = rule.confidence
         
-        for keyword in keywords:
-            if _boundary_match(keyword, text):
-                match_count += 1
-        
-        # Check pattern matches (higher weight)
-        for pattern in patterns:
-            if re.search(pattern, text):
-                pattern_matches += 1
+        # Count keyword and pattern matches (patterns carry a higher weight)
+        match_count = rule.keyword_matches(hits)
+        pattern_matches = rule.pattern_matches(hits)
         
         if match_count > 0 or pattern_matches > 0:
             # Calculate confidence based on matches and base confidence
@@ -188,71 +328,40 @@ def classify_intent(message: str) -> dict[str, str | float | None]:
             elif len(text) < 10:
                 calculated_confidence *= 0.9
             
+            explain_billing = all(keyword in hits for keyword in _EXPLAIN_BILLING)
+
             # Special handling for general queries with "explain" + billing context
-            if intent == "general_query" and _boundary_match("explain", text) and _boundary_match("billing", text):
+            if intent == "general_query" and explain_billing:
                 calculated_confidence = max(calculated_confidence, 0.95)
             
             # Special handling: reduce payment_issue confidence for "explain" queries without action verbs
-            if intent == "payment_issue" and _boundary_match("explain", text) and _boundary_match("billing", text):
+            if intent == "payment_issue" and explain_billing:
                 # Check if this is an informational query (no action verbs like charge, failed, etc.)
-                action_verbs = ["charge", "charged", "failed", "declined", "debit", "refund", "transaction"]
-                has_action_verb = any(_boundary_match(verb, text) for verb in action_verbs)
-                if not has_action_verb:
+                if not hits.any(_PAYMENT_ACTION_VERBS):
                     calculated_confidence *= 0.7  # Reduce confidence for informational queries
             
             # Special handling: if account_issue has account keywords, give it priority
-            if intent == "account_issue" and any(_boundary_match(kw, text) for kw in ["account", "delete", "profile"]):
+            if intent == "account_issue" and hits.any(_ACCOUNT_PRIORITY_KEYWORDS):
                 calculated_confidence = max(calculated_confidence, 0.9)
 
             # Special handling: locked/blocked/suspended are login signals even when "account" is present
-            if intent == "login_issue" and any(_boundary_match(kw, text) for kw in ["locked", "blocked", "suspended", "attempts", "2fa", "two factor"]):
+            if intent == "login_issue" and hits.any(_LOGIN_PRIORITY_KEYWORDS):
                 calculated_confidence = max(calculated_confidence, 0.92)
             
             if calculated_confidence > highest_score:
                 highest_score = calculated_confidence
                 best_match = intent
             elif calculated_confidence == highest_score and best_match:
-                # Tie-breaker: use priority order (earlier in intent_priority wins)
-                current_priority = intent_priority.index(intent) if intent in intent_priority else len(intent_priority)
-                best_priority = intent_priority.index(best_match) if best_match in intent_priority else len(intent_priority)
-                if current_priority < best_priority:
+                # Tie-breaker: use priority order (earlier in INTENT_PRIORITY wins)
+                if INTENT_PRIORITY.index(intent) < INTENT_PRIORITY.index(best_match):
                     highest_score = calculated_confidence
                     best_match = intent
 
     # -------- Sub-intent Detection -------- #
 
-    sub_intent_patterns: dict[str, list[tuple[str, list[str]]]] = {
-        "login_issue": [
-            ("password_reset",    ["forgot", "reset", "remember", "lost", "recovery"]),
-            ("account_locked",    ["locked", "lock", "blocked", "2fa", "two factor", "suspended", "attempts"]),
-            ("wrong_credentials", ["credentials", "wrong", "invalid"]),
-        ],
-        "payment_issue": [
-            ("duplicate_charge",  ["twice", "double", "duplicate", "refund", "unexpected"]),
-            ("payment_declined",  ["declined", "failed", "rejected"]),
-            ("billing_question",  ["invoice", "receipt", "plan", "pricing"]),
-        ],
-        "account_issue": [
-            ("delete_account",    ["delete", "remove", "close", "cancel", "deactivate", "gdpr"]),
-            ("update_info",       ["update", "change", "edit", "email", "phone", "name", "profile"]),
-        ],
-        "technical_issue": [
-            ("crash_error",       ["crash", "error", "bug", "broken", "not working", "fails"]),
-            ("performance",       ["slow", "loading", "lag", "freeze", "timeout"]),
-        ],
-        "feature_request": [
-            ("new_feature",       ["add", "new", "build", "implement", "wish"]),
-            ("improvement",       ["improve", "better", "enhance"]),
-        ],
-        "general_query": [
-            ("how_to",            ["how", "steps", "guide", "tutorial"]),
-            ("pricing_plan",      ["price", "cost", "plan", "upgrade"]),
-        ],
-    }
-
     sub_intent: str | None = None
     if best_match:
-        for sub_intent_name, keywords in sub_intent_patterns.get(best_match, []):
+        for sub_intent_name, keywords in SUB_INTENT_PATTERNS.get(best_match, []):
             if any(kw in text for kw in keywords):
                 sub_intent = sub_intent_name
                 break
@@ -274,3 +383,27 @@ def classify_intent(message: str) -> dict[str, str | float | None]:
         "sub_intent": None,
     }
 
+
+def classify_intents(messages: list[str]) -> list[dict[str, str | float | None]]:
+    """
+    Classify a batch of messages.
+
+    Results are identical to calling :func:`classify_intent` per message;
+    repeated messages (common in bulk imports) are classified only once.
+
+    Args:
+        messages (list[str]): Raw ticket messages
+
+    Returns:
+        list[dict]: One classification per message, in input order
+    """
+    classified: dict[str, dict] = {}
+    results = []
+    for message in messages:
+        if not isinstance(message, str):
+            results.append(classify_intent(message))
+            continue
+        if message not in classified:
+            classified[message] = classify_intent(message)
+        results.append(dict(classified[message]))
+    return results
@@ -0,0 +1,350 @@
+"""
+app/services/embedding_store.py
+
+Purpose:
+Load the embedding artifact written by ``workers/embedding_builder.py`` so the
+API can serve similarity search from it.
+
+Two on-disk formats are supported:
+
+- JSON (legacy): ``{"idf": {...}, "vectors": [{"ticket_id", "vector"}]}``
+- Binary: a small JSON header followed by raw little-endian arrays (see
+  :func:`write_binary_embeddings`). The arrays are memory-mapped read-only
+  and used in place, so every API worker shares the same pages through the
+  OS page cache instead of parsing its own copy.
+
+Responsibilities:
+- Parse either format into a :class:`SparseScoringEngine`
+- Write the binary format
+- Expose the artifact's build metadata (newest embedded ticket ID, build time)
+- Detect when a newer build has replaced the file on disk
+
+DO NOT:
+- Query the database here
+- Build embeddings here (that is the worker's job)
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Mapping, Sequence
+
+from app.services.sparse_scoring import SparseScoringEngine
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Binary artifact layout: MAGIC, uint32 header length, JSON header, then the
+# sections below at 8-byte aligned offsets, all little-endian.
+BINARY_MAGIC = b"SRSEMB\x00\x01"
+BINARY_FORMAT_VERSION = 1
+_ALIGNMENT = 8
+
+# Section name → array typecode. The column-major (CSC) view is stored too so
+# loading never has to transpose the matrix. Sections in _OPTIONAL_SECTIONS
+# may be absent from the header.
+_SECTIONS = (
+    ("vocab_offsets", "I"),
+    ("vocab_blob", "B"),
+    ("idf", "f"),
+    ("indptr", "q"),
+    ("indices", "i"),
+    ("data", "f"),
+    ("ticket_ids", "q"),
+    ("col_ptr", "q"),
+    ("col_rows", "i"),
+    ("col_data", "f"),
+    ("doc_freq", "I"),
+)
+_OPTIONAL_SECTIONS = {"doc_freq"}
+_NUMPY_DTYPES = {"I": "<u4", "B": "u1", "f": "<f4", "q": "<i8", "i": "<i4"}
+
+
+class EmbeddingSnapshot:
+    """A loaded embedding artifact plus the file identity it was read from."""
+
+    def __init__(
+        self,
+        engine: SparseScoringEngine,
+        last_ticket_id: int,
+        built_at: str | None,
+        path: Path,
+        mtime_ns: int,
+        size: int,
+        mapping: mmap.mmap | None = None,
+        doc_freq: Sequence[int] | None = None,
+        metadata: dict | None = None,
+    ) -> None:
+        self.engine = engine
+        self.last_ticket_id = last_ticket_id
+        self.built_at = built_at
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        # Binary artifacts: the engine's arrays are views into this mapping
+        self.mapping = mapping
+        # Document frequency per engine column, when the build recorded it
+        self.doc_freq = doc_freq
+        # Extra build metadata (e.g. document_count, last_updated_at)
+        self.metadata = metadata or {}
+
+    @property
+    def signature(self) -> tuple[int, int]:
+        return self.mtime_ns, self.size
+
+
+def artifact_signature(path: Path) -> tuple[int, int] | None:
+    """Return ``(mtime_ns, size)`` of *path*, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def is_binary_artifact(path: Path) -> bool:
+    """Return True if *path* starts with the binary artifact magic bytes."""
+    with Path(path).open("rb") as fh:
+        return fh.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def load_embeddings(path: Path) -> EmbeddingSnapshot:
+    """
+    Load an embedding artifact from *path*.
+
+    The format is detected from the file's leading bytes, so JSON and binary
+    artifacts can both be configured as ``EMBEDDINGS_PATH``.
+
+    Args:
+        path: Location of the artifact produced by the embedding builder.
+
+    Returns:
+        The parsed snapshot.
+
+    Raises:
+        FileNotFoundError: If *path* does not exist.
+        ValueError: If the file is not a valid embedding artifact.
+    """
+    path = Path(path)
+    signature = artifact_signature(path)
+    if signature is None:
+        raise FileNotFoundError(path)
+
+    if is_binary_artifact(path):
+        return _load_binary(path, signature)
+
+    with path.open("r", encoding="utf-8") as fh:
+        try:
+            data = json.load(fh)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Embedding artifact {path} is not valid JSON") from e
+
+    if not isinstance(data, dict) or "idf" not in data or "vectors" not in data:
+        raise ValueError(f"Embedding artifact {path} is missing 'idf' or 'vectors'")
+
+    vectors = [(int(v["ticket_id"]), v["vector"]) for v in data["vectors"]]
+    engine = SparseScoringEngine.from_vectors(data["idf"], vectors)
+    doc_freq = None
+    if "doc_freq" in data:
+        doc_freq = [int(data["doc_freq"].get(word, 0)) for word in engine.vocabulary]
+
+    last_ticket_id = data.get("last_ticket_id")
+    if last_ticket_id is None:
+        # Artifacts written before build metadata existed
+        last_ticket_id = max((ticket_id for ticket_id, _ in vectors), default=0)
+
+    logger.info("Loaded embedding artifact %s (%d vectors)", path, len(engine))
+    return EmbeddingSnapshot(
+        engine=engine,
+        last_ticket_id=int(last_ticket_id),
+        built_at=data.get("built_at"),
+        path=path,
+        mtime_ns=signature[0],
+        size=signature[1],
+        doc_freq=doc_freq,
+        metadata={
+            key: value for key, value in data.items()
+            if key not in ("idf", "vectors", "doc_freq", "last_ticket_id", "built_at")
+        },
+    )
+
+
+def write_binary_embeddings(
+    engine: SparseScoringEngine,
+    path: Path,
+    last_ticket_id: int,
+    built_at: str | None = None,
+    doc_freq: Mapping[str, int] | None = None,
+    metadata: dict | None = None,
+) -> None:
+    """
+    Write *engine* to *path* in the binary artifact format.
+
+    The file is written next to the target and then atomically renamed over
+    it. Processes that still map the previous file keep reading the old
+    pages until they swap to the new one.
+
+    Args:
+        engine: The scoring engine to persist.
+        path: Destination file.
+        last_ticket_id: Newest ticket ID included in the build.
+        built_at: ISO-8601 build timestamp.
+        doc_freq: Optional document frequency per vocabulary word, kept so
+            incremental builds can extend the artifact.
+        metadata: Optional extra JSON-serializable build metadata.
+    """
+    path = Path(path)
+    words = sorted(engine.vocabulary, key=engine.vocabulary.get)
+    encoded = [word.encode("utf-8") for word in words]
+    vocab_offsets = [0]
+    for word in encoded:
+        vocab_offsets.append(vocab_offsets[-1] + len(word))
+
+    col_ptr, col_rows, col_data = engine.column_view()
+    payloads = {
+        "vocab_offsets": _pack("I", vocab_offsets),
+        "vocab_blob": b"".join(encoded),
+        "idf": _pack("f", engine.idf),
+        "indptr": _pack("q", engine.indptr),
+        "indices": _pack("i", engine.indices),
+        "data": _pack("f", engine.data),
+        "ticket_ids": _pack("q", engine.ticket_ids),
+        "col_ptr": _pack("q", col_ptr),
+        "col_rows": _pack("i", col_rows),
+        "col_data": _pack("f", col_data),
+    }
+    if doc_freq is not None:
+        payloads["doc_freq"] = _pack("I", [doc_freq.get(word, 0) for word in words])
+    sections = [(name, typecode) for name, typecode in _SECTIONS if name in payloads]
+
+    header = {
+        "version": BINARY_FORMAT_VERSION,
+        "vocabulary_size": len(words),
+        "ticket_count": len(engine),
+        "nnz": len(engine.indices),
+        "last_ticket_id": int(last_ticket_id),
+        "built_at": built_at,
+        "metadata": metadata or {},
+        "sections": {},
+    }
+    # Offsets depend on the header length, which depends on the offsets;
+    # settle on a fixed point (the header only grows while digits are added).
+    header_len = 0
+    while True:
+        offset = _align(len(BINARY_MAGIC) + 4 + header_len)
+        for name, _ in sections:
+            header["sections"][name] = {"offset": offset, "length": len(payloads[name])}
+            offset = _align(offset + len(payloads[name]))
+        encoded_header = json.dumps(header, sort_keys=True).encode("utf-8")
+        if len(encoded_header) <= header_len:
+            break
+        header_len = len(encoded_header)
+    encoded_header = encoded_header.ljust(header_len)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as fh:
+        fh.write(BINARY_MAGIC)
+        fh.write(struct.pack("<I", header_len))
+        fh.write(encoded_header)
+        for name, _ in sections:
+            fh.write(b"\x00" * (header["sections"][name]["offset"] - fh.tell()))
+            fh.write(payloads[name])
+    os.replace(tmp_path, path)
+    logger.info("Binary embeddings written to %s (%d vectors).", path, len(engine))
+
+
+def _load_binary(path: Path, signature: tuple[int, int]) -> EmbeddingSnapshot:
+    """Memory-map a binary artifact and build an engine over views into it."""
+    with path.open("rb") as fh:
+        try:
+            mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            raise ValueError(f"Embedding artifact {path} is truncated") from e
+
+    try:
+        start = len(BINARY_MAGIC)
+        (header_len,) = struct.unpack_from("<I", mapping, start)
+        header = json.loads(bytes(mapping[start + 4:start + 4 + header_len]))
+        if header.get("version") != BINARY_FORMAT_VERSION:
+            raise ValueError(
+                f"Embedding artifact {path} has unsupported version {header.get('version')!r}"
+            )
+        sections = {
+            name: _view(mapping, typecode, header["sections"][name])
+            for name, typecode in _SECTIONS
+            if name in header["sections"] or name not in _OPTIONAL_SECTIONS
+        }
+    except (struct.error, KeyError, TypeError, json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Embedding artifact {path} has a corrupt header") from e
+
+    offsets = sections["vocab_offsets"]
+    blob = bytes(sections["vocab_blob"])
+    vocabulary = {
+        blob[offsets[i]:offsets[i + 1]].decode("utf-8"): i
+        for i in range(header["vocabulary_size"])
+    }
+    engine = SparseScoringEngine(
+        vocabulary=vocabulary,
+        idf=sections["idf"],
+        indptr=sections["indptr"],
+        indices=sections["indices"],
+        data=sections["data"],
+        ticket_ids=sections["ticket_ids"],
+        columns=(sections["col_ptr"], sections["col_rows"], sections["col_data"]),
+    )
+
+    logger.info("Mapped binary embedding artifact %s (%d vectors)", path, len(engine))
+    return EmbeddingSnapshot(
+        engine=engine,
+        last_ticket_id=int(header["last_ticket_id"]),
+        built_at=header.get("built_at"),
+        path=path,
+        mtime_ns=signature[0],
+        size=signature[1],
+        mapping=mapping,
+        doc_freq=sections.get("doc_freq"),
+        metadata=header.get("metadata"),
+    )
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _pack(typecode: str, values) -> bytes:
+    """Serialize *values* as a little-endian array of *typecode*."""
+    if np is not None:
+        return np.asarray(values, dtype=_NUMPY_DTYPES[typecode]).tobytes()
+    packed = array(typecode, values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _view(mapping: mmap.mmap, typecode: str, section: dict):
+    """Return a read-only array over *section* of *mapping* without copying."""
+    offset, length = section["offset"], section["length"]
+    if offset + length > len(mapping):
+        raise ValueError("section extends past the end of the file")
+    if np is not None:
+        dtype = np.dtype(_NUMPY_DTYPES[typecode])
+        return np.frombuffer(mapping, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+    view = memoryview(mapping)[offset:offset + length]
+    if typecode == "B":
+        return view
+    if sys.byteorder != "little":
+        # Big-endian hosts cannot use the little-endian bytes in place
+        swapped = array(typecode, view.tobytes())
+        swapped.byteswap()
+        return swapped
+    return view.cast(typecode)
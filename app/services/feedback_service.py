@@ -5,6 +5,7 @@ from fastapi import HTTPException, status
 from app.models.feedback import Feedback
 from app.models.ticket import Ticket
 from app.constants import TicketStatus
+from app.services.similarity_index import similarity_index
 
 from app.utils.service_helpers import compute_quality_score
 
@@ -51,6 +52,10 @@ def create_feedback_record(db: Session, ticket_id: int, rating: int, resolved: b
     # Commit both operations together
     db.commit()
     db.refresh(feedback)
+
+    # Keep the similarity index's quality gate input current
+    similarity_index.update_quality(ticket_id, ticket.quality_score)
+    similarity_index.bump_generation([ticket_id])
     
     logger.info(f"Feedback created for ticket {ticket_id}: rating={rating}, resolved={resolved}")
     return feedback
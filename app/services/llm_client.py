@@ -0,0 +1,163 @@
+"""
+app/services/llm_client.py
+
+Purpose:
+Shared, pooled client for LLM chat completions (OpenAI API).
+
+Responsibilities:
+- Keep one AsyncOpenAI client, and with it one persistent HTTP connection
+  pool, per process
+- Cap in-flight upstream calls with a semaphore (OPENAI_MAX_CONCURRENCY)
+- Coalesce concurrent identical prompts so one upstream call serves them all
+- Offer a blocking entry point for the synchronous automation pipeline
+
+The client runs on a dedicated event-loop thread. Sync callers (request
+threadpool, automation workers) and async callers on other loops all submit
+to that loop, so they share the same connections, limit and in-flight table.
+HTTP/2 is used when the optional ``h2`` package is installed.
+
+DO NOT:
+- Build prompts or choose fallbacks here (see response_generator)
+- Make resolution decisions here
+"""
+
+import asyncio
+import logging
+import threading
+from collections.abc import Hashable
+
+from app.core.config import settings
+
+try:
+    from openai import AsyncOpenAI
+except ImportError:
+    AsyncOpenAI = None
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Extra time a blocking caller waits beyond OPENAI_TIMEOUT for a queued call
+# (time spent waiting on the semaphore counts against the caller's budget).
+SYNC_WAIT_MARGIN_SECONDS = 2.0
+
+
+class LLMClient:
+    """
+    Concurrency-limited, coalescing wrapper around one AsyncOpenAI client.
+
+    Must be used from a single event loop (the one that owns the client).
+    """
+
+    def __init__(self, client, max_concurrency: int) -> None:
+        self._client = client
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.upstream_calls = 0
+
+    async def complete(self, key: Hashable, messages: list[dict], **params) -> str:
+        """
+        Return the completion text for *messages*.
+
+        Calls made while another call with the same *key* is in flight share
+        that call's result (or exception) instead of going upstream again.
+        """
+        call = self._inflight.get(key)
+        if call is None:
+            call = asyncio.ensure_future(self._create(messages, params))
+            self._inflight[key] = call
+            call.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A cancelled caller must not cancel the call other callers share
+        return await asyncio.shield(call)
+
+    async def _create(self, messages: list[dict], params: dict) -> str:
+        async with self._semaphore:
+            self.upstream_calls += 1
+            response = await self._client.chat.completions.create(messages=messages, **params)
+        return response.choices[0].message.content.strip()
+
+    async def aclose(self) -> None:
+        await self._client.close()
+
+
+class _LLMClientManager:
+    """Process-wide owner of the LLM event-loop thread and client."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: LLMClient | None = None
+
+    @property
+    def available(self) -> bool:
+        return AsyncOpenAI is not None
+
+    def get(self) -> tuple[asyncio.AbstractEventLoop, LLMClient]:
+        """Return the client loop and client, starting them on first use."""
+        with self._lock:
+            if self._client is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="llm-client", daemon=True)
+                thread.start()
+                self._client = asyncio.run_coroutine_threadsafe(_build_client(), loop).result()
+                self._loop, self._thread = loop, thread
+            return self._loop, self._client
+
+    def complete_sync(self, key: Hashable, messages: list[dict], **params) -> str:
+        """Blocking :meth:`LLMClient.complete` for synchronous callers."""
+        loop, client = self.get()
+        future = asyncio.run_coroutine_threadsafe(client.complete(key, messages, **params), loop)
+        try:
+            return future.result(timeout=settings.OPENAI_TIMEOUT + SYNC_WAIT_MARGIN_SECONDS)
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def complete(self, key: Hashable, messages: list[dict], **params) -> str:
+        """:meth:`LLMClient.complete` for async callers on any event loop."""
+        loop, client = self.get()
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(client.complete(key, messages, **params), loop)
+        )
+
+    def reset(self) -> None:
+        """Close the client and stop its loop; the next call builds a new one."""
+        with self._lock:
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5)
+        except Exception:
+            logger.debug("LLM client close failed", exc_info=True)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+async def _build_client() -> LLMClient:
+    """Create the AsyncOpenAI client and its connection pool (runs on the client loop)."""
+    import httpx
+
+    limit = settings.OPENAI_MAX_CONCURRENCY
+    http_client = httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+        timeout=settings.OPENAI_TIMEOUT,
+    )
+    client = AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        timeout=settings.OPENAI_TIMEOUT,
+        http_client=http_client,
+    )
+    return LLMClient(client, max_concurrency=limit)
+
+
+llm_client = _LLMClientManager()
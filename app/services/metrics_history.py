@@ -0,0 +1,255 @@
+"""
+app/services/metrics_history.py
+
+Purpose:
+Time-bucketed history of ticket and feedback counters for admin dashboards.
+
+Responsibilities:
+- Aggregate tickets created and feedback submitted per minute, from a
+  bounded recent window (cost follows new activity, not table size)
+- Downsample minute → hour → day buckets and prune each resolution after
+  its retention period
+- Read a range of buckets, zero-filling intervals without activity
+
+Each bucket counts the tickets *created* in it, by their status at the time
+of the last collection, so the collector re-aggregates the last
+METRICS_HISTORY_LOOKBACK_SECONDS on every run to pick up later status
+changes (automation, escalation, close).
+
+DO NOT:
+- Handle HTTP concerns here (see app/api/admin.py)
+- Schedule collection here (see workers/metrics_collector.py)
+"""
+
+import logging
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.constants import TicketStatus
+from app.core.config import settings
+from app.models.feedback import Feedback
+from app.models.metrics_history import MetricsHistory
+from app.models.ticket import Ticket
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Each resolution is rebuilt from the next finer one
+_DOWNSAMPLE = (("hour", "minute"), ("day", "hour"))
+
+
+def utcnow() -> datetime:
+    """Naive UTC now, matching how ticket timestamps are stored."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def to_naive_utc(moment: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC; naive input is taken as UTC."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def floor_bucket(moment: datetime, bucket: str) -> datetime:
+    """Return the start of the *bucket*-sized interval containing *moment*."""
+    if bucket == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if bucket == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def empty_counters() -> dict:
+    return {
+        "tickets": 0,
+        "by_status": {},
+        "by_intent": {},
+        "feedback": 0,
+        "feedback_resolved": 0,
+        "rating_sum": 0,
+    }
+
+
+def _add(into: dict, other: dict) -> None:
+    for key in ("tickets", "feedback", "feedback_resolved", "rating_sum"):
+        into[key] += other[key]
+    for key in ("by_status", "by_intent"):
+        for name, count in other[key].items():
+            into[key][name] = into[key].get(name, 0) + count
+
+
+# ---------------------------------------------------------------------------
+# Collection
+# ---------------------------------------------------------------------------
+
+def _collection_start(db: Session, now: datetime) -> datetime:
+    """First minute to (re)aggregate: the lookback window, or everything on first run."""
+    last = db.scalar(
+        select(func.max(MetricsHistory.bucket_start)).where(MetricsHistory.bucket == "minute")
+    )
+    if last is None:
+        earliest = [
+            moment
+            for moment in (db.scalar(select(func.min(Ticket.created_at))),
+                           db.scalar(select(func.min(Feedback.created_at))))
+            if moment is not None
+        ]
+        start = min(earliest, default=now)
+    else:
+        start = min(last, now - timedelta(seconds=settings.METRICS_HISTORY_LOOKBACK_SECONDS))
+    return floor_bucket(to_naive_utc(start), "minute")
+
+
+def _minute_counters(db: Session, start: datetime) -> dict[datetime, dict]:
+    buckets: dict[datetime, dict] = {}
+    tickets = db.execute(
+        select(Ticket.created_at, Ticket.status, Ticket.intent)
+        .where(Ticket.created_at >= start)
+        .execution_options(yield_per=1000)
+    )
+    for created_at, status, intent in tickets:
+        counters = buckets.setdefault(floor_bucket(to_naive_utc(created_at), "minute"), empty_counters())
+        counters["tickets"] += 1
+        counters["by_status"][status] = counters["by_status"].get(status, 0) + 1
+        if intent:
+            counters["by_intent"][intent] = counters["by_intent"].get(intent, 0) + 1
+    feedback = db.execute(
+        select(Feedback.created_at, Feedback.resolved, Feedback.rating)
+        .where(Feedback.created_at >= start)
+        .execution_options(yield_per=1000)
+    )
+    for created_at, resolved, rating in feedback:
+        counters = buckets.setdefault(floor_bucket(to_naive_utc(created_at), "minute"), empty_counters())
+        counters["feedback"] += 1
+        counters["feedback_resolved"] += 1 if resolved else 0
+        counters["rating_sum"] += rating
+    return buckets
+
+
+def _replace(db: Session, bucket: str, start: datetime, buckets: dict[datetime, dict]) -> None:
+    db.execute(
+        delete(MetricsHistory).where(MetricsHistory.bucket == bucket, MetricsHistory.bucket_start >= start)
+    )
+    db.add_all(
+        MetricsHistory(bucket=bucket, bucket_start=bucket_start, counters=counters)
+        for bucket_start, counters in buckets.items()
+    )
+    db.flush()
+
+
+def _downsample(db: Session, bucket: str, source: str, start: datetime) -> None:
+    start = floor_bucket(start, bucket)
+    buckets: dict[datetime, dict] = {}
+    rows = db.execute(
+        select(MetricsHistory.bucket_start, MetricsHistory.counters)
+        .where(MetricsHistory.bucket == source, MetricsHistory.bucket_start >= start)
+    )
+    for bucket_start, counters in rows:
+        _add(buckets.setdefault(floor_bucket(bucket_start, bucket), empty_counters()), counters)
+    _replace(db, bucket, start, buckets)
+
+
+def _prune(db: Session, now: datetime) -> None:
+    retention_days = {
+        "minute": settings.METRICS_HISTORY_MINUTE_RETENTION_DAYS,
+        "hour": settings.METRICS_HISTORY_HOUR_RETENTION_DAYS,
+        "day": settings.METRICS_HISTORY_DAY_RETENTION_DAYS,
+    }
+    for bucket, days in retention_days.items():
+        db.execute(
+            delete(MetricsHistory).where(
+                MetricsHistory.bucket == bucket,
+                MetricsHistory.bucket_start < now - timedelta(days=days),
+            )
+        )
+
+
+def record_history(db: Session, now: datetime | None = None) -> int:
+    """
+    Bring the history up to *now*: re-aggregate recent minutes, downsample
+    them into hours and days, and prune expired buckets.
+
+    Returns:
+        Number of minute buckets written.
+    """
+    now = to_naive_utc(now) if now is not None else utcnow()
+    start = _collection_start(db, now)
+    minutes = _minute_counters(db, start)
+    try:
+        _replace(db, "minute", start, minutes)
+        for bucket, source in _DOWNSAMPLE:
+            _downsample(db, bucket, source, start)
+        _prune(db, now)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logger.info("Metrics history updated from %s (%d minute buckets)", start.isoformat(), len(minutes))
+    return len(minutes)
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def bucket_count(start: datetime, end: datetime, bucket: str) -> int:
+    """Number of *bucket* intervals a ``[start, end)`` read returns."""
+    first = floor_bucket(start, bucket)
+    return max(0, -(-(end - first) // BUCKETS[bucket]))
+
+
+def history_point(bucket_start: datetime, counters: dict) -> dict:
+    """Shape one bucket for the API, adding the derived rates."""
+    tickets = counters["tickets"]
+    by_status = counters["by_status"]
+    auto_resolved = by_status.get(TicketStatus.AUTO_RESOLVED.value, 0)
+    escalated = by_status.get(TicketStatus.ESCALATED.value, 0)
+    feedback = counters["feedback"]
+    return {
+        "bucket_start": bucket_start.isoformat(),
+        "tickets": tickets,
+        "by_status": by_status,
+        "by_intent": counters["by_intent"],
+        "auto_resolved": auto_resolved,
+        "escalated": escalated,
+        "auto_resolve_rate": round(auto_resolved / tickets * 100, 2) if tickets else 0.0,
+        "escalation_rate": round(escalated / tickets * 100, 2) if tickets else 0.0,
+        "feedback": feedback,
+        "feedback_resolved": counters["feedback_resolved"],
+        "rating_sum": counters["rating_sum"],
+        "average_rating": round(counters["rating_sum"] / feedback, 2) if feedback else 0.0,
+    }
+
+
+def _fill(rows: Iterable, start: datetime, end: datetime, bucket: str) -> list[dict]:
+    stored = dict(rows)
+    points = []
+    moment = floor_bucket(start, bucket)
+    while moment < end:
+        points.append(history_point(moment, stored.get(moment) or empty_counters()))
+        moment += BUCKETS[bucket]
+    return points
+
+
+async def read_history(db: AsyncSession, bucket: str, start: datetime, end: datetime) -> list[dict]:
+    """Return one point per *bucket* interval in ``[start, end)``, oldest first."""
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    rows = await db.execute(
+        select(MetricsHistory.bucket_start, MetricsHistory.counters)
+        .where(
+            MetricsHistory.bucket == bucket,
+            MetricsHistory.bucket_start >= floor_bucket(start, bucket),
+            MetricsHistory.bucket_start < end,
+        )
+        .order_by(MetricsHistory.bucket_start)
+    )
+    return _fill(rows.tuples().all(), start, end, bucket)
@@ -0,0 +1,211 @@
+"""
+app/services/metrics_service.py
+
+Purpose:
+Aggregate ticket and feedback metrics and maintain the metrics rollup.
+
+Responsibilities:
+- Compute every admin / collector counter with one aggregate query
+  (GROUP BY intent, status with conditional SUM(CASE ...) columns, joined
+  to a one-row feedback aggregate)
+- Store the counters in the metrics_rollup table and serve them from it
+  while they are younger than METRICS_ROLLUP_MAX_AGE_SECONDS
+- Shape the counters into the /admin/metrics payload
+
+The rollup is refreshed by workers/metrics_collector.py and, when it has
+gone stale, by the next /admin/metrics request. ``fresh=True`` bypasses it.
+
+DO NOT:
+- Handle HTTP concerns here (see app/api/admin.py)
+- Put process-local statistics (caches) in the rollup
+"""
+
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, case, func, select, true
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.constants import TicketStatus
+from app.core.config import settings
+from app.models.feedback import Feedback
+from app.models.metrics_rollup import MetricsRollup
+from app.models.ticket import Ticket
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = "global"
+
+# Tickets scoring below this are reported as low quality
+LOW_QUALITY_THRESHOLD = 0.5
+
+
+def aggregate_statement():
+    """Return the single SELECT that yields every metrics counter."""
+    feedback = select(
+        func.count(Feedback.id).label("feedback_total"),
+        func.coalesce(func.sum(case((Feedback.resolved.is_(True), 1), else_=0)), 0).label("feedback_resolved"),
+        func.avg(Feedback.rating).label("average_rating"),
+    ).subquery("feedback_totals")
+
+    return (
+        select(
+            Ticket.intent,
+            Ticket.status,
+            func.count(Ticket.id).label("tickets"),
+            func.sum(case(
+                (and_(Ticket.status == TicketStatus.ESCALATED.value, Ticket.assigned_agent_id.is_(None)), 1),
+                else_=0,
+            )).label("unassigned_escalated"),
+            func.sum(case((Ticket.quality_score < LOW_QUALITY_THRESHOLD, 1), else_=0)).label("low_quality"),
+            func.sum(Ticket.quality_score).label("quality_sum"),
+            func.count(Ticket.quality_score).label("quality_count"),
+            feedback.c.feedback_total,
+            feedback.c.feedback_resolved,
+            feedback.c.average_rating,
+        )
+        # Outer join so feedback totals come back even with no tickets
+        .select_from(feedback)
+        .outerjoin(Ticket, true())
+        .group_by(
+            Ticket.intent,
+            Ticket.status,
+            feedback.c.feedback_total,
+            feedback.c.feedback_resolved,
+            feedback.c.average_rating,
+        )
+    )
+
+
+def counters_from_rows(rows) -> dict:
+    """Fold the rows of :func:`aggregate_statement` into one counters dict."""
+    counters = {
+        "tickets_total": 0,
+        "by_status": {},
+        "by_intent": {},
+        "unassigned_escalated": 0,
+        "low_quality_count": 0,
+        "quality_by_intent": {},
+        "feedback_total": 0,
+        "feedback_resolved": 0,
+        "average_rating": None,
+    }
+    for row in rows:
+        counters["feedback_total"] = row.feedback_total or 0
+        counters["feedback_resolved"] = int(row.feedback_resolved or 0)
+        counters["average_rating"] = float(row.average_rating) if row.average_rating is not None else None
+        if not row.tickets:
+            continue  # The outer-join row of an empty tickets table
+        counters["tickets_total"] += row.tickets
+        counters["by_status"][row.status] = counters["by_status"].get(row.status, 0) + row.tickets
+        counters["unassigned_escalated"] += int(row.unassigned_escalated or 0)
+        counters["low_quality_count"] += int(row.low_quality or 0)
+        if row.intent is not None:
+            counters["by_intent"][row.intent] = counters["by_intent"].get(row.intent, 0) + row.tickets
+            if row.quality_count:
+                quality_sum, quality_count = counters["quality_by_intent"].get(row.intent, (0.0, 0))
+                counters["quality_by_intent"][row.intent] = (
+                    quality_sum + float(row.quality_sum), quality_count + row.quality_count
+                )
+    counters["quality_by_intent"] = {
+        intent: [quality_sum, quality_count]
+        for intent, (quality_sum, quality_count) in counters["quality_by_intent"].items()
+    }
+    return counters
+
+
+def aggregate_counters(db: Session) -> dict:
+    """Compute the counters now (one query)."""
+    return counters_from_rows(db.execute(aggregate_statement()))
+
+
+def _is_current(rollup: MetricsRollup | None) -> bool:
+    if rollup is None:
+        return False
+    computed_at = rollup.computed_at
+    if computed_at.tzinfo is None:
+        computed_at = computed_at.replace(tzinfo=timezone.utc)  # SQLite drops the zone
+    age = (datetime.now(timezone.utc) - computed_at).total_seconds()
+    return age < settings.METRICS_ROLLUP_MAX_AGE_SECONDS
+
+
+def refresh_rollup(db: Session) -> dict:
+    """Recompute the counters and store them in the rollup; return them."""
+    counters = aggregate_counters(db)
+    db.merge(MetricsRollup(name=ROLLUP_NAME, counters=counters, computed_at=datetime.now(timezone.utc)))
+    db.commit()
+    return counters
+
+
+async def load_counters(db: AsyncSession, fresh: bool = False) -> dict:
+    """
+    Return the counters from the rollup, recomputing them when stale.
+
+    Args:
+        fresh: Skip the rollup and aggregate now (the result is stored).
+    """
+    if not fresh:
+        rollup = await db.get(MetricsRollup, ROLLUP_NAME)
+        if _is_current(rollup):
+            return rollup.counters
+
+    counters = counters_from_rows(await db.execute(aggregate_statement()))
+    try:
+        await db.merge(MetricsRollup(name=ROLLUP_NAME, counters=counters, computed_at=datetime.now(timezone.utc)))
+        await db.commit()
+    except IntegrityError:
+        # Another request stored the rollup first; its counters are as new
+        await db.rollback()
+    return counters
+
+
+def admin_metrics(counters: dict) -> dict:
+    """Shape *counters* into the /admin/metrics payload (without cache stats)."""
+    total_tickets = counters["tickets_total"]
+    status_counts = counters["by_status"]
+    auto_resolved = status_counts.get(TicketStatus.AUTO_RESOLVED.value, 0)
+    escalated = status_counts.get(TicketStatus.ESCALATED.value, 0)
+    open_tickets = status_counts.get(TicketStatus.OPEN.value, 0)
+
+    # Calculate rates (avoid division by zero)
+    auto_resolve_rate = (auto_resolved / total_tickets * 100) if total_tickets > 0 else 0
+    escalation_rate = (escalated / total_tickets * 100) if total_tickets > 0 else 0
+
+    total_feedback = counters["feedback_total"]
+    resolved_feedback_count = counters["feedback_resolved"]
+    average_rating = counters["average_rating"] or 0.0
+    feedback_resolution_rate = (resolved_feedback_count / total_feedback * 100) if total_feedback > 0 else 0
+
+    return {
+        "tickets": {
+            "total": total_tickets,
+            "by_status": status_counts,
+            "auto_resolve_rate": round(auto_resolve_rate, 2),
+            "escalation_rate": round(escalation_rate, 2),
+            "open": open_tickets,
+            "auto_resolved": auto_resolved,
+            "escalated": escalated,
+            "unassigned_escalated": counters["unassigned_escalated"],
+        },
+        "feedback": {
+            "total": total_feedback,
+            "average_rating": round(average_rating, 2),
+            "resolution_rate": round(feedback_resolution_rate, 2),
+            "resolved_count": resolved_feedback_count,
+        },
+        "quality": {
+            "low_quality_count": counters["low_quality_count"],
+            "by_intent": {
+                intent: round(quality_sum / quality_count, 2)
+                for intent, (quality_sum, quality_count) in counters["quality_by_intent"].items()
+                if intent and quality_count
+            },
+        },
+        "system_health": {
+            "auto_resolve_rate_status": "good" if auto_resolve_rate >= 70 else "needs_improvement",
+            "escalation_rate_status": "good" if escalation_rate <= 30 else "needs_improvement",
+            "feedback_coverage": round((total_feedback / total_tickets * 100), 2) if total_tickets > 0 else 0,
+        },
+    }
@@ -0,0 +1,281 @@
+"""
+app/services/rate_limit_storage.py
+
+Purpose:
+Rate-limit storage shared by every worker process and pod, for the
+``sliding-window-counter`` strategy of the ``limits`` library (used by
+slowapi, see app/core/limiter.py).
+
+Responsibilities:
+- Keep each key's previous / current window counters in Redis and decide a
+  hit with one atomic Lua script (one round trip, no read-modify-write race)
+- Reject locally, without Redis, keys whose local token bucket is empty:
+  a client that exceeded the limit against this process alone exceeded it
+  everywhere, so floods stop costing Redis round trips
+- Fall back to a per-process memory window while Redis is not configured,
+  unreachable or its circuit breaker is open
+
+Selected with RATE_LIMIT_STORAGE=redis, which registers the ``srs-redis://``
+storage scheme. Connections come from the shared pool in redis_client.py.
+
+DO NOT:
+- Decide rate-limit keys or limits here (see app/core/limiter.py)
+- Open Redis connections here (see app/services/redis_client.py)
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from limits.storage import MemoryStorage, SlidingWindowCounterSupport, Storage
+
+from app.core.config import settings
+from app.services.redis_client import redis_manager
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "srs:ratelimit"
+
+# Sliding-window counter in one call. KEYS: previous, current window count.
+# ARGV: limit, window (ms), amount. The current counter is created with a TTL
+# of two windows; once its TTL falls below one window, that window is over
+# and the counter becomes the previous one. The previous count is weighted
+# by the share of its window still inside the sliding window (its TTL).
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+
+local current_ttl = redis.call('PTTL', KEYS[2])
+if current_ttl > 0 and current_ttl < window then
+    redis.call('RENAME', KEYS[2], KEYS[1])
+    redis.call('SET', KEYS[2], 0, 'PX', current_ttl + window)
+    current_ttl = current_ttl + window
+end
+
+local previous = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous_ttl = math.max(redis.call('PTTL', KEYS[1]), 0)
+local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+
+if math.floor(previous * previous_ttl / window) + current + amount > limit then
+    return 0
+end
+if current_ttl > 0 then
+    redis.call('INCRBY', KEYS[2], amount)
+else
+    redis.call('SET', KEYS[2], amount, 'PX', window * 2)
+end
+return 1
+"""
+
+
+class LocalTokenBuckets:
+    """
+    Per-key token buckets refilled at ``limit / window``, LRU-bounded.
+
+    Only ever says "no" for keys this process alone has already pushed past
+    their limit; a "yes" still needs the shared counter.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def take(self, key: str, limit: int, window: float, amount: int = 1) -> bool:
+        if self.max_keys <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(limit), now]
+            else:
+                tokens, updated = bucket
+                bucket[0] = min(float(limit), tokens + (now - updated) * limit / window)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            if bucket[0] < amount:
+                return False
+            bucket[0] -= amount
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SharedRedisStorage(Storage, SlidingWindowCounterSupport):
+    """
+    ``limits`` storage backed by the shared Redis pool (scheme ``srs-redis``).
+
+    Counters for other strategies (``incr`` / ``get``) are implemented for
+    completeness; the limiter only uses the sliding window.
+    """
+
+    STORAGE_SCHEME = ["srs-redis"]
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, **options) -> None:
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.local = MemoryStorage()
+        self.prefilter = LocalTokenBuckets(settings.RATE_LIMIT_LOCAL_BUCKETS)
+        self._script = None
+        self._script_client = None
+        self.redis_hits = 0
+        self.prefiltered = 0
+        self.fallbacks = 0
+
+    @property
+    def base_exceptions(self):
+        import redis
+
+        return redis.RedisError
+
+    @staticmethod
+    def _keys(key: str) -> tuple[str, str]:
+        # One hash tag per limit key keeps both counters in the same cluster slot
+        return f"{REDIS_KEY_PREFIX}:{{{key}}}:previous", f"{REDIS_KEY_PREFIX}:{{{key}}}:current"
+
+    def _sliding_window_script(self, client):
+        if self._script is None or self._script_client is not client:
+            self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+            self._script_client = client
+        return self._script
+
+    def _redis_failed(self, operation: str) -> None:
+        redis_manager.record_failure()
+        self.fallbacks += 1
+        logger.warning("Rate-limit %s failed in Redis; using the per-process window", operation, exc_info=True)
+
+    # -------------------------------------------------
+    # Sliding window counter
+    # -------------------------------------------------
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        if not self.prefilter.take(key, limit, expiry, amount):
+            self.prefiltered += 1
+            return False
+        client = redis_manager.get()
+        if client is None:
+            self.fallbacks += 1
+            return self.local.acquire_sliding_window_entry(key, limit, expiry, amount)
+        try:
+            allowed = self._sliding_window_script(client)(
+                keys=list(self._keys(key)), args=[limit, int(expiry * 1000), amount]
+            )
+        except Exception:
+            self._redis_failed("hit")
+            return self.local.acquire_sliding_window_entry(key, limit, expiry, amount)
+        self.redis_hits += 1
+        return bool(allowed)
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        client = redis_manager.get()
+        if client is None:
+            return self.local.get_sliding_window(key, expiry)
+        previous_key, current_key = self._keys(key)
+        try:
+            with client.pipeline(transaction=False) as pipe:
+                pipe.get(previous_key).pttl(previous_key).get(current_key).pttl(current_key)
+                previous, previous_ttl, current, current_ttl = pipe.execute()
+        except Exception:
+            self._redis_failed("window read")
+            return self.local.get_sliding_window(key, expiry)
+        if 0 < current_ttl < expiry * 1000:
+            # The current window is over; report what the next hit's shift will see
+            previous, previous_ttl, current, current_ttl = current, current_ttl, 0, current_ttl + expiry * 1000
+        return (
+            int(previous or 0), max(previous_ttl, 0) / 1000,
+            int(current or 0), max(current_ttl, 0) / 1000,
+        )
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.local.clear_sliding_window(key, expiry)
+        client = redis_manager.get()
+        if client is not None:
+            try:
+                client.delete(*self._keys(key))
+            except Exception:
+                self._redis_failed("clear")
+
+    # -------------------------------------------------
+    # Plain counters
+    # -------------------------------------------------
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        client = redis_manager.get()
+        if client is None:
+            return self.local.incr(key, expiry, amount)
+        redis_key = f"{REDIS_KEY_PREFIX}:{key}"
+        try:
+            with client.pipeline() as pipe:
+                pipe.set(redis_key, 0, ex=int(expiry), nx=True).incrby(redis_key, amount)
+                return pipe.execute()[-1]
+        except Exception:
+            self._redis_failed("incr")
+            return self.local.incr(key, expiry, amount)
+
+    def get(self, key: str) -> int:
+        client = redis_manager.get()
+        if client is None:
+            return self.local.get(key)
+        try:
+            return int(client.get(f"{REDIS_KEY_PREFIX}:{key}") or 0)
+        except Exception:
+            self._redis_failed("get")
+            return self.local.get(key)
+
+    def get_expiry(self, key: str) -> float:
+        client = redis_manager.get()
+        if client is None:
+            return self.local.get_expiry(key)
+        try:
+            return time.time() + max(client.ttl(f"{REDIS_KEY_PREFIX}:{key}"), 0)
+        except Exception:
+            self._redis_failed("expiry read")
+            return self.local.get_expiry(key)
+
+    def clear(self, key: str) -> None:
+        self.local.clear(key)
+        client = redis_manager.get()
+        if client is not None:
+            try:
+                client.delete(f"{REDIS_KEY_PREFIX}:{key}")
+            except Exception:
+                self._redis_failed("clear")
+
+    # -------------------------------------------------
+    # Housekeeping
+    # -------------------------------------------------
+
+    def check(self) -> bool:
+        client = redis_manager.get()
+        if client is None:
+            return False
+        try:
+            return bool(client.ping())
+        except Exception:
+            redis_manager.record_failure()
+            return False
+
+    def reset(self) -> int | None:
+        """Clear every rate-limit counter (local and shared)."""
+        self.prefilter.clear()
+        cleared = self.local.reset() or 0
+        client = redis_manager.get()
+        if client is not None:
+            try:
+                keys = list(client.scan_iter(match=f"{REDIS_KEY_PREFIX}:*", count=1000))
+                if keys:
+                    cleared += client.delete(*keys)
+            except Exception:
+                self._redis_failed("reset")
+        return cleared
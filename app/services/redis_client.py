@@ -0,0 +1,288 @@
+"""
+app/services/redis_client.py
+
+Purpose:
+Process-wide Redis clients (sync and asyncio) shared by the caches.
+
+Responsibilities:
+- Own one bounded, health-checked connection pool per client flavour
+- Trip a circuit breaker after repeated failures, so callers skip Redis for a
+  cool-down window instead of each paying the socket timeout
+- Probe Redis once when the cool-down ends before letting traffic back
+
+Callers treat Redis as optional: ``get()`` / ``get_async()`` return None when
+Redis is not configured or the breaker is open, and callers report errors
+with :meth:`_RedisClientManager.record_failure` instead of tearing the client
+down. A single failed command no longer drops every pooled connection.
+
+DO NOT:
+- Put cache key or serialisation logic here (see the cache modules)
+- Use these clients for blocking commands (BRPOP etc.); the socket timeout
+  is sized for cache round trips (see automation_queue)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Closed → open → half-open breaker driven by recorded failures.
+
+    Opens when ``failure_threshold`` failures happen within ``window_seconds``
+    and stays open for ``cooldown_seconds``. Afterwards one caller is let
+    through to probe (half-open): success closes the breaker, failure opens
+    it for another cool-down.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, window_seconds: float, cooldown_seconds: float) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._failures: deque[float] = deque(maxlen=self.failure_threshold)
+        self._opened_at: float | None = None
+        self._probing = False
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return self.CLOSED
+            if self._probing or time.monotonic() - self._opened_at >= self.cooldown_seconds:
+                return self.HALF_OPEN
+            return self.OPEN
+
+    def acquire(self) -> str | None:
+        """
+        Ask to use the protected resource.
+
+        Returns:
+            ``"closed"`` to proceed normally, ``"probe"`` if this caller must
+            probe and report via :meth:`record_success` / :meth:`record_failure`,
+            or None to skip the resource.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return self.CLOSED
+            if self._probing or time.monotonic() - self._opened_at < self.cooldown_seconds:
+                return None
+            self._probing = True
+            return "probe"
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Redis circuit closed")
+            self._opened_at = None
+            self._probing = False
+            self._failures.clear()
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._opened_at is not None:
+                # A failed probe (or a straggler) restarts the cool-down
+                self._opened_at = now
+                self._probing = False
+                return
+            self._failures.append(now)
+            if len(self._failures) == self.failure_threshold and now - self._failures[0] <= self.window_seconds:
+                self._opened_at = now
+                self._failures.clear()
+                self.trips += 1
+                logger.warning(
+                    "Redis circuit opened after %d failures; skipping Redis for %ss",
+                    self.failure_threshold, self.cooldown_seconds,
+                )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures.clear()
+            self._opened_at = None
+            self._probing = False
+            self.trips = 0
+
+
+class _RedisClientManager:
+    """Lazy-initializing holder of the pooled Redis clients and their breaker.
+
+    Args:
+        pool_kwargs: Extra keyword arguments for the sync connection pool
+            (tests pass a fakeredis ``connection_class`` here).
+        async_pool_kwargs: Same for the asyncio connection pool.
+    """
+
+    def __init__(self, pool_kwargs: dict | None = None, async_pool_kwargs: dict | None = None) -> None:
+        self._pool_kwargs = pool_kwargs or {}
+        self._async_pool_kwargs = async_pool_kwargs or {}
+        self._lock = threading.Lock()
+        self._client = None
+        self._async_client = None
+        self._async_loop: asyncio.AbstractEventLoop | None = None
+        self.breaker = CircuitBreaker(
+            settings.REDIS_CIRCUIT_FAILURE_THRESHOLD,
+            settings.REDIS_CIRCUIT_FAILURE_WINDOW_SECONDS,
+            settings.REDIS_CIRCUIT_COOLDOWN_SECONDS,
+        )
+
+    @staticmethod
+    def _pool_options() -> dict:
+        return {
+            "decode_responses": True,
+            "max_connections": settings.REDIS_MAX_CONNECTIONS,
+            "timeout": settings.REDIS_POOL_TIMEOUT,
+            "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+            "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT,
+            "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL,
+        }
+
+    # ------------------------------------------------------------------
+    # Sync client
+    # ------------------------------------------------------------------
+
+    def get(self):
+        """Return the pooled Redis client, or None (not configured / breaker open)."""
+        if not settings.REDIS_URL:
+            return None
+        admission = self.breaker.acquire()
+        if admission is None:
+            return None
+        client = self._client or self._create()
+        if client is None:
+            if admission == "probe":
+                self.breaker.record_failure()
+            return None
+        if admission == "probe":
+            try:
+                client.ping()
+            except Exception:
+                self.breaker.record_failure()
+                return None
+            self.breaker.record_success()
+        return client
+
+    def _create(self):
+        with self._lock:
+            if self._client is not None:
+                return self._client
+            try:
+                import redis
+
+                pool = redis.BlockingConnectionPool.from_url(
+                    settings.REDIS_URL, **self._pool_options(), **self._pool_kwargs
+                )
+                self._client = redis.Redis(connection_pool=pool)
+            except Exception:
+                logger.exception("Failed to create Redis client")
+                # Do not cache the failure — allow retry on next call
+                return None
+            return self._client
+
+    # ------------------------------------------------------------------
+    # Asyncio client
+    # ------------------------------------------------------------------
+
+    async def get_async(self):
+        """
+        Return the pooled asyncio Redis client for the running loop, or None.
+
+        asyncio connections belong to the loop that opened them, so a client
+        is kept per loop (in practice: the server's one loop).
+        """
+        if not settings.REDIS_URL:
+            return None
+        admission = self.breaker.acquire()
+        if admission is None:
+            return None
+        client = self._async_client_for(asyncio.get_running_loop())
+        if client is None:
+            if admission == "probe":
+                self.breaker.record_failure()
+            return None
+        if admission == "probe":
+            try:
+                await client.ping()
+            except Exception:
+                self.breaker.record_failure()
+                return None
+            self.breaker.record_success()
+        return client
+
+    def _async_client_for(self, loop: asyncio.AbstractEventLoop):
+        with self._lock:
+            if self._async_client is not None and self._async_loop is loop:
+                return self._async_client
+            try:
+                import redis.asyncio as redis_asyncio
+
+                pool = redis_asyncio.BlockingConnectionPool.from_url(
+                    settings.REDIS_URL, **self._pool_options(), **self._async_pool_kwargs
+                )
+                self._async_client = redis_asyncio.Redis(connection_pool=pool)
+                self._async_loop = loop
+            except Exception:
+                logger.exception("Failed to create asyncio Redis client")
+                return None
+            return self._async_client
+
+    async def aclose(self) -> None:
+        """Close the asyncio client (call from the loop that owns it)."""
+        with self._lock:
+            client, self._async_client, self._async_loop = self._async_client, None, None
+        if client is not None:
+            try:
+                await client.aclose(close_connection_pool=True)
+            except Exception:
+                pass  # Already broken — nothing useful we can do
+
+    # ------------------------------------------------------------------
+    # Failure reporting / teardown
+    # ------------------------------------------------------------------
+
+    def record_failure(self) -> None:
+        """Report a failed Redis command; enough of them open the breaker."""
+        self.breaker.record_failure()
+
+    def reset(self) -> None:
+        """Disconnect the sync pool, drop both clients and close the breaker.
+
+        Calls ``close()`` on the synchronous client (which disconnects all
+        pooled sockets) before dropping the reference so file descriptors
+        are released promptly. Any error from ``close()`` is suppressed.
+        """
+        with self._lock:
+            client, self._client = self._client, None
+            self._async_client = self._async_loop = None
+        if client is not None:
+            try:
+                client.close()
+                client.connection_pool.disconnect()
+            except Exception:
+                pass  # Already broken — nothing useful we can do
+        self.breaker.reset()
+
+
+redis_manager = _RedisClientManager()
+
+
+def get_redis():
+    """Return the shared sync Redis client, or None."""
+    return redis_manager.get()
+
+
+async def get_async_redis():
+    """Return the shared asyncio Redis client for the running loop, or None."""
+    return await redis_manager.get_async()
@@ -0,0 +1,341 @@
+"""
+app/services/response_cache.py
+
+Purpose:
+Cache of LLM-generated replies, so near-duplicate tickets reuse an answer
+instead of calling OpenAI again.
+
+Responsibilities:
+- Key replies by (intent, sub_intent, negation cues, SimHash fingerprint
+  of the message)
+- Serve exact and, when enabled, near-duplicate hits (fingerprints a few
+  bits apart)
+- Evict by LRU (size bound) and TTL in process; optional Redis tier
+- Track hit rate, evictions and the upstream latency saved by hits
+
+Near-duplicate lookup uses the pigeonhole trick: a fingerprint is split into
+``max_distance + 1`` bands, and any two fingerprints within ``max_distance``
+bits agree exactly on at least one band. Each band is indexed, so a lookup
+only compares against fingerprints sharing a band instead of every entry.
+The Redis tier is exact-match only; its hits are promoted into the local
+tier, where near-duplicate matching happens.
+
+SimHash cannot tell "delete my account" from "do not delete my account"
+(a few bits apart), so the negation cues of a message (not, no, never,
+n't, ...) are part of the key: a reply is only reused for a message that
+negates the same way. Near matching is off by default
+(RESPONSE_CACHE_MAX_DISTANCE=0): one changed word ("photo" / "video")
+moves a fingerprint about as far as real paraphrases do.
+
+DO NOT:
+- Call OpenAI here (see llm_client / response_generator)
+- Make resolution decisions here
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from app.core.config import settings
+from app.services.redis_client import redis_manager
+from app.utils.text_processing import tokenize
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+
+NEGATION_WORDS = frozenset({
+    "not", "no", "never", "nor", "none", "nothing", "nobody", "neither", "nowhere", "without",
+})
+# Contractions written without the apostrophe ("dont"); with it, tokenize
+# splits them into "don" + "t"
+NEGATED_CONTRACTIONS = frozenset({
+    "cannot", "cant", "dont", "doesnt", "didnt", "wont", "wouldnt", "shouldnt", "couldnt",
+    "isnt", "arent", "wasnt", "werent", "havent", "hasnt", "hadnt",
+})
+
+REDIS_KEY_PREFIX = "srs:response"
+
+
+def simhash(text: str) -> int:
+    """
+    Return the 64-bit SimHash of *text*'s token multiset.
+
+    Messages with the same words (in any order, any case or punctuation)
+    share a fingerprint; messages differing in a few words land a few bits
+    apart. Token hashes use blake2b so fingerprints are stable across
+    processes (required by the Redis tier).
+    """
+    weights = [0] * FINGERPRINT_BITS
+    for token, count in Counter(tokenize(text)).items():
+        token_hash = int.from_bytes(
+            hashlib.blake2b(token.encode(), digest_size=FINGERPRINT_BITS // 8).digest(), "big"
+        )
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += count if token_hash >> bit & 1 else -count
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def negation_cues(text: str) -> tuple[str, ...]:
+    """
+    Return the sorted negation cues of *text*; every n't form counts as "not".
+
+    "don't", "dont", "cannot" and "do not" all yield ``("not",)``, so they
+    share cache entries; "never" and "no" are kept apart.
+    """
+    cues = []
+    previous = ""
+    for token in tokenize(text):
+        if token in NEGATION_WORDS:
+            cues.append(token)
+        elif token in NEGATED_CONTRACTIONS or (token == "t" and previous.endswith("n")):
+            cues.append("not")
+        previous = token
+    return tuple(sorted(cues))
+
+
+def _bands(fingerprint: int, count: int) -> list[tuple[int, int]]:
+    """Split *fingerprint* into *count* ``(band number, band value)`` pairs."""
+    width = FINGERPRINT_BITS // count
+    bands = []
+    for band in range(count):
+        shift = band * width
+        bits = width if band < count - 1 else FINGERPRINT_BITS - shift
+        bands.append((band, fingerprint >> shift & ((1 << bits) - 1)))
+    return bands
+
+
+class _Entry:
+    __slots__ = ("response", "expires_at", "latency")
+
+    def __init__(self, response: str, expires_at: float, latency: float) -> None:
+        self.response = response
+        self.expires_at = expires_at
+        self.latency = latency
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU + TTL cache of generated replies with near-duplicate lookup.
+
+    Args:
+        max_entries: Size bound of the local tier; 0 disables the cache.
+        ttl_seconds: Lifetime of an entry.
+        max_distance: Largest Hamming distance (bits) served as a near hit;
+            0 restricts hits to identical fingerprints.
+        redis_client: Optional callable returning a Redis client (or None).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        max_distance: int,
+        redis_client=None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max(0, min(max_distance, FINGERPRINT_BITS - 1))
+        self._redis_client = redis_client
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._bands: dict[tuple, set[tuple]] = {}
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._stats = Counter()
+        self._saved_latency = 0.0
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(self, intent: str, sub_intent: str | None, message: str) -> str | None:
+        """Return a cached reply for *message* (exact or near-duplicate), or None."""
+        if self.max_entries <= 0:
+            return None
+        scope = (intent, sub_intent, negation_cues(message))
+        fingerprint = simhash(message)
+        key = (scope, fingerprint)
+        now = time.monotonic()
+
+        with self._lock:
+            hit_key, entry, kind = key, self._live_entry(key, now), "exact"
+            if entry is None and self.max_distance:
+                hit_key, entry = self._nearest(scope, fingerprint, now)
+                kind = "near"
+            if entry is not None:
+                self._entries.move_to_end(hit_key)
+                return self._record_hit(kind, entry)
+
+        entry = self._redis_get(scope, fingerprint)
+        with self._lock:
+            if entry is not None:
+                self._store(key, entry)
+                return self._record_hit("redis", entry)
+            self._stats["misses"] += 1
+        return None
+
+    def put(
+        self, intent: str, sub_intent: str | None, message: str, response: str, latency: float = 0.0
+    ) -> None:
+        """
+        Cache *response* for *message*.
+
+        Args:
+            latency: Seconds the upstream call took; credited as saved
+                latency every time the entry is served.
+        """
+        if self.max_entries <= 0 or not response:
+            return
+        scope = (intent, sub_intent, negation_cues(message))
+        fingerprint = simhash(message)
+        entry = _Entry(response, time.monotonic() + self.ttl_seconds, latency)
+        with self._lock:
+            self._store((scope, fingerprint), entry)
+        self._redis_put(scope, fingerprint, entry)
+
+    def clear(self) -> None:
+        """Drop every local entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._bands.clear()
+            self._reset_stats()
+
+    def stats(self) -> dict:
+        """Return hit / miss / eviction counters and the upstream latency saved."""
+        with self._lock:
+            hits = self._stats["exact_hits"] + self._stats["near_hits"] + self._stats["redis_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "hits": hits,
+                "exact_hits": self._stats["exact_hits"],
+                "near_hits": self._stats["near_hits"],
+                "redis_hits": self._stats["redis_hits"],
+                "misses": self._stats["misses"],
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._stats["lru_evictions"] + self._stats["expirations"],
+                "lru_evictions": self._stats["lru_evictions"],
+                "expirations": self._stats["expirations"],
+                "saved_latency_seconds": round(self._saved_latency, 3),
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Local tier (callers hold the lock)
+    # ------------------------------------------------------------------
+
+    def _record_hit(self, kind: str, entry: _Entry) -> str:
+        self._stats[f"{kind}_hits"] += 1
+        self._saved_latency += entry.latency
+        return entry.response
+
+    def _live_entry(self, key: tuple, now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            self._remove(key)
+            self._stats["expirations"] += 1
+            return None
+        return entry
+
+    def _nearest(
+        self, scope: tuple, fingerprint: int, now: float
+    ) -> tuple[tuple | None, _Entry | None]:
+        candidates = set()
+        for band in _bands(fingerprint, self.max_distance + 1):
+            candidates |= self._bands.get((scope, *band), set())
+        best_key, best_entry, best_distance = None, None, self.max_distance + 1
+        for key in candidates:
+            distance = (key[1] ^ fingerprint).bit_count()
+            if distance < best_distance:
+                entry = self._live_entry(key, now)
+                if entry is not None:
+                    best_key, best_entry, best_distance = key, entry, distance
+        return best_key, best_entry
+
+    def _store(self, key: tuple, entry: _Entry) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        else:
+            for band in _bands(key[1], self.max_distance + 1):
+                self._bands.setdefault((key[0], *band), set()).add(key)
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self._stats["lru_evictions"] += 1
+
+    def _remove(self, key: tuple) -> None:
+        del self._entries[key]
+        for band in _bands(key[1], self.max_distance + 1):
+            band_key = (key[0], *band)
+            members = self._bands.get(band_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._bands[band_key]
+
+    # ------------------------------------------------------------------
+    # Redis tier
+    # ------------------------------------------------------------------
+
+    def _redis(self):
+        return self._redis_client() if self._redis_client is not None else None
+
+    @staticmethod
+    def _redis_key(scope: tuple, fingerprint: int) -> str:
+        intent, sub_intent, negations = scope
+        return f"{REDIS_KEY_PREFIX}:{intent}:{sub_intent or '-'}:{'+'.join(negations) or '-'}:{fingerprint:016x}"
+
+    def _redis_get(self, scope: tuple, fingerprint: int) -> _Entry | None:
+        client = self._redis()
+        if client is None:
+            return None
+        try:
+            raw = client.get(self._redis_key(scope, fingerprint))
+            if raw is None:
+                return None
+            data = json.loads(raw)
+            return _Entry(data["response"], time.monotonic() + self.ttl_seconds, data.get("latency", 0.0))
+        except Exception:
+            logger.debug("Response cache Redis read failed", exc_info=True)
+            redis_manager.record_failure()
+            return None
+
+    def _redis_put(self, scope: tuple, fingerprint: int, entry: _Entry) -> None:
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.setex(
+                self._redis_key(scope, fingerprint),
+                int(self.ttl_seconds),
+                json.dumps({"response": entry.response, "latency": entry.latency}),
+            )
+        except Exception:
+            logger.debug("Response cache Redis write failed", exc_info=True)
+            redis_manager.record_failure()
+
+
+def _redis_tier():
+    """Redis client for the shared tier, when enabled and configured."""
+    if not settings.RESPONSE_CACHE_REDIS:
+        return None
+    return redis_manager.get()
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_distance=settings.RESPONSE_CACHE_MAX_DISTANCE,
+    redis_client=_redis_tier,
+)
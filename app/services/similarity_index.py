@@ -0,0 +1,721 @@
+"""
+app/services/similarity_index.py
+
+Purpose:
+In-memory inverted index over the resolved-ticket corpus used by
+similarity search.
+
+Responsibilities:
+- Keep a term → posting list (ticket ID → term frequency) mapping
+- Score only the tickets that share at least one term with a query
+- Stay in sync as tickets reach auto_resolved / closed
+- Layer the live index over the embedding builder's prebuilt snapshot
+- Keep the corpus generation counter that namespaces cached similarity results
+
+Scoring is identical to the reference path in
+``similarity_search.find_similar_ticket``: IDF is derived from the document
+frequencies of the indexed corpus plus the query itself, and candidates are
+ranked by TF-IDF cosine similarity.
+
+DO NOT:
+- Make resolution decisions here
+- Call external services here
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.constants import TicketStatus
+from app.core.config import settings
+from app.models.ticket import Ticket
+from app.services.embedding_store import EmbeddingSnapshot, artifact_signature, load_embeddings
+from app.utils.text_processing import idf_from_document_frequencies, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Statuses whose responses are worth reusing for new tickets
+INDEXED_STATUSES = (TicketStatus.AUTO_RESOLVED.value, TicketStatus.CLOSED.value)
+
+
+class InvertedIndex:
+    """
+    Thread-safe term → posting list index of resolved tickets.
+
+    Each posting stores the term frequency of the term in the ticket
+    (``count / total_tokens``) divided by the ticket's TF-IDF norm. IDF is
+    pinned, so that norm is computed once in :meth:`add` and a query only
+    pays one multiply-add per posting of its own terms.
+
+    By default IDF is a table derived from the index's own document
+    frequencies. It is recomputed, together with every stored norm, on the
+    first search after the corpus size has drifted by more than
+    ``SIMILARITY_INDEX_IDF_DRIFT`` since the last recompute. Terms missing
+    from the table weigh what a term only the query contains weighs in the
+    reference path. Scores therefore track ``find_similar_ticket`` closely
+    rather than exactly (it also counts the query as a document). Passing
+    *idf* (a ``word -> idf`` callable) pins it for good instead, which puts
+    scores in the same space as a prebuilt snapshot.
+    """
+
+    def __init__(self, idf: Callable[[str], float] | None = None) -> None:
+        self._fixed_idf = idf
+        self._lock = threading.RLock()
+        self._postings: dict[str, dict[int, float]] = {}
+        self._doc_tf: dict[int, dict[str, float]] = {}
+        self._docs: dict[int, dict] = {}
+        self._idf_table: dict[str, float] = {}
+        self._idf_docs = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, ticket_id: int) -> bool:
+        return ticket_id in self._docs
+
+    def idf_of(self, word: str) -> float:
+        """Return the pinned IDF of *word*."""
+        if self._fixed_idf is not None:
+            return self._fixed_idf(word)
+        idf = self._idf_table.get(word)
+        if idf is None:
+            # Weighed as the reference path weighs a term only the query has
+            idf = math.log((self._idf_docs + 2) / 2) + 1
+        return idf
+
+    def add(
+        self,
+        ticket_id: int,
+        message: str,
+        response: str | None = None,
+        quality_score: float | None = None,
+    ) -> bool:
+        """
+        Index a resolved ticket (or refresh an already indexed one).
+
+        Returns:
+            True if the ticket is in the index afterwards, False if its message
+            produced no tokens.
+        """
+        with self._lock:
+            existing = self._docs.get(ticket_id)
+            if existing is not None and existing["message"] == message:
+                # Message unchanged — only the payload needs refreshing
+                existing["response"] = response
+                existing["quality_score"] = quality_score
+                return True
+
+            tokens = tokenize(message)
+            if not tokens:
+                self.remove(ticket_id)
+                return False
+
+            if existing is not None:
+                self.remove(ticket_id)
+
+            total = len(tokens)
+            tf = {word: count / total for word, count in Counter(tokens).items()}
+            self._doc_tf[ticket_id] = tf
+            self._post(ticket_id, tf)
+            self._docs[ticket_id] = {
+                "id": ticket_id,
+                "message": message,
+                "response": response,
+                "quality_score": quality_score,
+            }
+            return True
+
+    def remove(self, ticket_id: int) -> None:
+        """Drop a ticket from the index. Unknown IDs are ignored."""
+        with self._lock:
+            tf = self._doc_tf.pop(ticket_id, None)
+            self._docs.pop(ticket_id, None)
+            if not tf:
+                return
+            for word in tf:
+                postings = self._postings.get(word)
+                if postings is None:
+                    continue
+                postings.pop(ticket_id, None)
+                if not postings:
+                    del self._postings[word]
+
+    def update_quality(self, ticket_id: int, quality_score: float | None) -> None:
+        """Refresh the stored quality score of an indexed ticket."""
+        with self._lock:
+            doc = self._docs.get(ticket_id)
+            if doc is not None:
+                doc["quality_score"] = quality_score
+
+    def get_document(self, ticket_id: int) -> dict | None:
+        """Return a copy of the stored ticket payload, or None if not indexed."""
+        with self._lock:
+            doc = self._docs.get(ticket_id)
+            return dict(doc) if doc is not None else None
+
+    def clear(self) -> None:
+        """Remove every ticket from the index."""
+        with self._lock:
+            self._postings.clear()
+            self._doc_tf.clear()
+            self._docs.clear()
+            self._idf_table = {}
+            self._idf_docs = 0
+
+    def search(self, message: str, top_k: int = 1) -> list[tuple[int, float]]:
+        """
+        Return the ``top_k`` most similar indexed tickets for *message*.
+
+        Only tickets sharing at least one term with the query are scored,
+        with one multiply-add per shared term.
+        Ties are broken in favour of the most recent (highest) ticket ID.
+
+        Args:
+            message: Query text.
+            top_k: Maximum number of results to return.
+
+        Returns:
+            List of ``(ticket_id, cosine_similarity)`` tuples, best first.
+        """
+        tokens = tokenize(message)
+        if not tokens or top_k <= 0:
+            return []
+
+        query_total = len(tokens)
+        query_tf = {word: count / query_total for word, count in Counter(tokens).items()}
+
+        with self._lock:
+            if not self._docs:
+                return []
+            self._refresh_idf_if_drifted()
+
+            query_vec = {word: weight * self.idf_of(word) for word, weight in query_tf.items()}
+            query_norm = math.sqrt(sum(v * v for v in query_vec.values()))
+            if query_norm == 0:
+                return []
+
+            dots: dict[int, float] = {}
+            for word, query_weight in query_vec.items():
+                postings = self._postings.get(word)
+                if not postings:
+                    continue
+                weight = query_weight * self.idf_of(word) / query_norm
+                for ticket_id, unit_tf in postings.items():
+                    dots[ticket_id] = dots.get(ticket_id, 0.0) + weight * unit_tf
+
+            best = heapq.nlargest(top_k, dots.items(), key=_score_then_id)
+        return best
+
+    def _post(self, ticket_id: int, tf: dict[str, float]) -> None:
+        """Write *ticket_id*'s postings, scaled by its norm under the pinned IDF."""
+        norm = math.sqrt(sum((weight * self.idf_of(word)) ** 2 for word, weight in tf.items()))
+        for word, weight in tf.items():
+            self._postings.setdefault(word, {})[ticket_id] = weight / norm if norm else 0.0
+
+    def _refresh_idf_if_drifted(self) -> None:
+        """Recompute the IDF table and every norm once the corpus size has drifted enough."""
+        if self._fixed_idf is not None:
+            return
+        size = len(self._docs)
+        if self._idf_docs and abs(size - self._idf_docs) <= self._idf_docs * settings.SIMILARITY_INDEX_IDF_DRIFT:
+            return
+        self._idf_table = idf_from_document_frequencies(
+            {word: len(postings) for word, postings in self._postings.items()}, size
+        )
+        self._idf_docs = size
+        for ticket_id, tf in self._doc_tf.items():
+            self._post(ticket_id, tf)
+
+
+def _score_then_id(hit: tuple[int, float]) -> tuple[float, int]:
+    return hit[1], hit[0]
+
+
+class _SnapshotSearch:
+    """
+    Similarity source that layers the live index over a prebuilt snapshot.
+
+    The snapshot (loaded from the embedding builder's artifact) covers the
+    bulk of the corpus; the live delta index covers tickets resolved since
+    it was built. Both score in the snapshot's IDF space, so their results
+    can be merged directly. Snapshot hits are hydrated from *db* in one
+    query, which also drops tickets that are no longer reusable.
+    """
+
+    # Extra snapshot candidates fetched so that hits without a reusable
+    # response (e.g. escalated-then-closed tickets) do not empty the result.
+    CANDIDATE_SLACK = 4
+
+    def __init__(self, snapshot: EmbeddingSnapshot, delta: InvertedIndex, db: Session) -> None:
+        self._snapshot = snapshot
+        self._delta = delta
+        self._db = db
+        self._documents: dict[int, dict] = {}
+
+    def search(self, message: str, top_k: int = 1) -> list[tuple[int, float]]:
+        return self.search_many([message], top_k=top_k)[0]
+
+    def search_many(self, messages: list[str], top_k: int = 1) -> list[list[tuple[int, float]]]:
+        """
+        Search for every message at once.
+
+        The snapshot is scored with :meth:`SparseScoringEngine.search_many`
+        and all snapshot hits of the batch are hydrated in a single query.
+        """
+        if top_k <= 0:
+            return [[] for _ in messages]
+        delta_hits = [self._delta.search(message, top_k=top_k) for message in messages]
+        snapshot_hits = [
+            [(ticket_id, score) for ticket_id, score in hits if ticket_id not in self._delta]
+            for hits in self._snapshot.engine.search_many(
+                messages, top_k=top_k + self.CANDIDATE_SLACK
+            )
+        ]
+        self._hydrate({ticket_id for hits in snapshot_hits for ticket_id, _ in hits})
+
+        results = []
+        for delta, snapshot in zip(delta_hits, snapshot_hits):
+            snapshot = [hit for hit in snapshot if hit[0] in self._documents]
+            merged = sorted(delta + snapshot, key=lambda hit: (hit[1], hit[0]), reverse=True)
+            results.append(merged[:top_k])
+        return results
+
+    def _hydrate(self, ticket_ids: set[int]) -> None:
+        """Load reusable snapshot tickets among *ticket_ids* into the document cache."""
+        missing = [ticket_id for ticket_id in ticket_ids if ticket_id not in self._documents]
+        if not missing:
+            return
+        rows = self._db.query(
+            Ticket.id, Ticket.message, Ticket.response, Ticket.quality_score
+        ).filter(
+            Ticket.id.in_(missing),
+            Ticket.status.in_(INDEXED_STATUSES),
+            Ticket.response.isnot(None),
+        )
+        for row in rows:
+            self._documents[row.id] = {
+                "id": row.id,
+                "message": row.message,
+                "response": row.response,
+                "quality_score": row.quality_score,
+            }
+
+    def get_document(self, ticket_id: int) -> dict | None:
+        doc = self._delta.get_document(ticket_id)
+        if doc is None and ticket_id in self._documents:
+            doc = dict(self._documents[ticket_id])
+        return doc
+
+
+GENERATION_KEY = "srs:similarity:generation"
+CHANGES_KEY = "srs:similarity:changes"
+CHANGES_FLOOR_KEY = "srs:similarity:changes:floor"
+
+# Advance the generation and log the changed ticket IDs under it, atomically.
+# KEYS: generation, change log (ticket ID -> last generation that changed it),
+# floor (generations at or below it have been trimmed from the log).
+# ARGV: generations to keep, then the changed ticket IDs.
+BUMP_SCRIPT = """
+local generation = redis.call('INCR', KEYS[1])
+for i = 2, #ARGV do
+    redis.call('ZADD', KEYS[2], generation, ARGV[i])
+end
+local floor = generation - tonumber(ARGV[1])
+if floor > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', floor)
+    redis.call('SET', KEYS[3], floor)
+end
+return generation
+"""
+
+
+class _CorpusGeneration:
+    """
+    Counter bumped whenever the resolved corpus changes.
+
+    Cached similarity results are keyed under the current generation, so a
+    bump makes every earlier result unreachable instead of waiting for its
+    TTL. With Redis the counter is shared (``INCR``) and each process re-reads
+    it at most once every ``SIMILARITY_CACHE_GENERATION_REFRESH_SECONDS``;
+    without Redis it is a per-process counter.
+
+    Each shared bump also records the IDs of the tickets it changed, so a
+    process that sees the generation move can apply exactly those changes
+    (:meth:`changes_since`) before it computes anything under the new one.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._value = 0
+        self._checked_at: float | None = None
+        self._script = None
+        self._script_client = None
+
+    @staticmethod
+    def _redis():
+        # Imported lazily: similarity_search depends on this module
+        from app.services.similarity_search import _get_cache_client, _redis_manager
+
+        return _get_cache_client(), _redis_manager
+
+    def current(self) -> int:
+        """Return the current generation (from Redis when the local copy is stale)."""
+        now = time.monotonic()
+        checked_at = self._checked_at
+        if checked_at is not None and now - checked_at < settings.SIMILARITY_CACHE_GENERATION_REFRESH_SECONDS:
+            return self._value
+        cache, manager = self._redis()
+        if cache is None:
+            return self._value
+        try:
+            raw = cache.get(GENERATION_KEY)
+        except Exception:
+            manager.record_failure()
+            return self._value
+        with self._lock:
+            self._value = int(raw or 0)
+            self._checked_at = now
+            return self._value
+
+    def _bump_script(self, client):
+        if self._script is None or self._script_client is not client:
+            self._script = client.register_script(BUMP_SCRIPT)
+            self._script_client = client
+        return self._script
+
+    def bump(self, ticket_ids: Iterable[int] = ()) -> int:
+        """Advance the generation, logging *ticket_ids* as changed by it; return the new value."""
+        cache, manager = self._redis()
+        if cache is not None:
+            try:
+                value = int(self._bump_script(cache)(
+                    keys=[GENERATION_KEY, CHANGES_KEY, CHANGES_FLOOR_KEY],
+                    args=[settings.SIMILARITY_CHANGE_LOG_GENERATIONS, *ticket_ids],
+                ))
+            except Exception:
+                manager.record_failure()
+            else:
+                with self._lock:
+                    self._value = value
+                    self._checked_at = time.monotonic()
+                    return value
+        with self._lock:
+            self._value += 1
+            return self._value
+
+    def changes_since(self, seen: int, generation: int) -> set[int] | None:
+        """
+        IDs of the tickets changed by the bumps after *seen* up to *generation*.
+
+        Returns None when they cannot be known: no Redis, or the log has
+        already been trimmed past *seen*. The caller must then re-sync
+        some other way.
+        """
+        cache, manager = self._redis()
+        if cache is None:
+            return None
+        try:
+            pipe = cache.pipeline(transaction=True)
+            pipe.get(CHANGES_FLOOR_KEY)
+            pipe.zrangebyscore(CHANGES_KEY, f"({seen}", generation)
+            floor, ticket_ids = pipe.execute()
+        except Exception:
+            manager.record_failure()
+            return None
+        if int(floor or 0) > seen:
+            return None
+        return {int(ticket_id) for ticket_id in ticket_ids}
+
+    def reset(self) -> None:
+        """Forget the local copy (tests)."""
+        with self._lock:
+            self._value = 0
+            self._checked_at = None
+
+
+corpus_generation = _CorpusGeneration()
+
+
+class _SimilarityIndexManager:
+    """
+    Process-wide holder for the resolved-ticket index.
+
+    When an embedding artifact has been loaded (see :meth:`load_artifact`),
+    it serves as the base snapshot and the live index only holds tickets
+    resolved or changed after it was built. Without one, the live index is
+    bootstrapped from the database on first use.
+
+    The live index is kept current in two ways:
+
+    - write paths call :meth:`index_ticket` / :meth:`update_quality` directly,
+      then :meth:`bump_generation` once their changes are committed;
+    - :meth:`get` re-reads the tickets changed since its last sync (by
+      ``updated_at``) at most once every ``SIMILARITY_INDEX_SYNC_SECONDS``,
+      so that tickets resolved, closed or rated by other worker processes
+      are picked up too;
+    - when another process has bumped the corpus generation, :meth:`get`
+      first re-reads the tickets logged by those bumps (falling back to the
+      ``updated_at`` sync when the log cannot tell), so nothing is computed
+      and cached under the new generation from an index that lacks them.
+    """
+
+    def __init__(self) -> None:
+        self._index = InvertedIndex()
+        self._snapshot: EmbeddingSnapshot | None = None
+        self._artifact_path: Path | None = None
+        self._lock = threading.Lock()
+        self._synced_at: datetime | None = None
+        self._last_sync_monotonic = 0.0
+        self._generation: int | None = None
+
+    @property
+    def index(self) -> InvertedIndex:
+        return self._index
+
+    @property
+    def snapshot(self) -> EmbeddingSnapshot | None:
+        return self._snapshot
+
+    def get(self, db: Session) -> InvertedIndex | _SnapshotSearch:
+        """Return the similarity source, syncing the live index from *db* when stale."""
+        # Sync before results are cached under a generation this index has
+        # not seen, or they would be stored as fresh while missing its changes
+        generation = corpus_generation.current()
+        if generation != self._generation or self._needs_sync():
+            with self._lock:
+                if self._needs_sync():
+                    self._sync(db)
+                elif generation != self._generation:
+                    self._catch_up(db, generation)
+                self._generation = generation
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return _SnapshotSearch(snapshot, self._index, db)
+        return self._index
+
+    def _needs_sync(self) -> bool:
+        if self._synced_at is None:
+            return True
+        elapsed = time.monotonic() - self._last_sync_monotonic
+        return elapsed >= settings.SIMILARITY_INDEX_SYNC_SECONDS
+
+    @property
+    def generation(self) -> int | None:
+        """Corpus generation whose changes the live index has applied (None before the first sync)."""
+        return self._generation
+
+    def _catch_up(self, db: Session, generation: int) -> None:
+        """Apply the tickets changed by other processes' bumps since the last seen generation."""
+        changed = None
+        if self._generation is not None and generation > self._generation:
+            changed = corpus_generation.changes_since(self._generation, generation)
+        if changed is None:
+            self._sync(db)
+            return
+        if not changed:
+            return
+        try:
+            self._apply_rows(
+                db.query(
+                    Ticket.id, Ticket.message, Ticket.status, Ticket.response, Ticket.quality_score
+                ).filter(Ticket.id.in_(changed)),
+                missing=changed,
+            )
+        except Exception:
+            logger.exception("Similarity index catch-up failed; re-syncing")
+            self._sync(db)
+
+    def _sync(self, db: Session) -> None:
+        started_at = datetime.now(timezone.utc)
+        try:
+            if self._synced_at is None:
+                self._bootstrap(db)
+            else:
+                self._apply_changes(db, self._synced_at)
+        except Exception:
+            logger.exception("Similarity index sync failed; serving the current index")
+            self._last_sync_monotonic = time.monotonic()
+            return
+        self._synced_at = started_at
+        self._last_sync_monotonic = time.monotonic()
+
+    def _bootstrap(self, db: Session) -> None:
+        """Index every reusable ticket (those the snapshot may lack, when there is one)."""
+        query = db.query(
+            Ticket.id, Ticket.message, Ticket.response, Ticket.quality_score
+        ).filter(
+            Ticket.status.in_(INDEXED_STATUSES),
+            Ticket.response.isnot(None),
+        )
+        if self._snapshot is not None:
+            query = query.filter(self._newer_than_snapshot(self._snapshot))
+
+        added = 0
+        for row in query.order_by(Ticket.id).yield_per(1000):
+            if self._index.add(row.id, row.message, row.response, row.quality_score):
+                added += 1
+        logger.info("Similarity index bootstrapped with %d ticket(s)", added)
+
+    @staticmethod
+    def _newer_than_snapshot(snapshot: EmbeddingSnapshot):
+        """
+        Filter for tickets the snapshot may be missing or have stale.
+
+        That is every ticket above its high-water mark, plus older tickets
+        changed since it was built (e.g. an escalated ticket an agent closed).
+        """
+        newer = Ticket.id > snapshot.last_ticket_id
+        if not snapshot.built_at:
+            return newer
+        try:
+            built_at = datetime.fromisoformat(snapshot.built_at)
+        except ValueError:
+            logger.warning("Unreadable built_at %r in %s; indexing tickets above its high-water mark only",
+                           snapshot.built_at, snapshot.path)
+            return newer
+        cutoff = built_at - timedelta(seconds=settings.SIMILARITY_INDEX_SYNC_LOOKBACK_SECONDS)
+        return or_(newer, Ticket.updated_at >= cutoff)
+
+    def _apply_changes(self, db: Session, since: datetime) -> None:
+        """
+        Re-read every ticket changed since *since* and add, refresh or drop it.
+
+        Any write to a ticket (resolution, close, feedback quality score)
+        moves its ``updated_at``, however old the ticket is. The lookback
+        margin covers transactions that committed after this process last
+        synced but stamped their rows before it.
+        """
+        cutoff = since - timedelta(seconds=settings.SIMILARITY_INDEX_SYNC_LOOKBACK_SECONDS)
+        query = db.query(
+            Ticket.id, Ticket.message, Ticket.status, Ticket.response, Ticket.quality_score
+        ).filter(Ticket.updated_at >= cutoff)
+        self._apply_rows(query.order_by(Ticket.updated_at).yield_per(1000))
+
+    def _apply_rows(self, rows, missing: set[int] | None = None) -> None:
+        """
+        Add, refresh or drop each ticket row according to its status.
+
+        IDs in *missing* that no row was returned for (deleted tickets) are
+        dropped too.
+        """
+        missing = set(missing or ())
+        for row in rows:
+            missing.discard(row.id)
+            if row.status in INDEXED_STATUSES and row.response:
+                self._index.add(row.id, row.message, row.response, row.quality_score)
+            else:
+                self._index.remove(row.id)
+        for ticket_id in missing:
+            self._index.remove(ticket_id)
+
+    def load_artifact(self, path: Path | str) -> bool:
+        """
+        Load the embedding artifact at *path* and swap it in as the snapshot.
+
+        The path is remembered even if the file does not exist yet, so
+        :meth:`reload_if_changed` picks up the first build when it appears.
+
+        Returns:
+            True if a snapshot was loaded and swapped in.
+        """
+        self._artifact_path = Path(path)
+        try:
+            snapshot = load_embeddings(self._artifact_path)
+        except FileNotFoundError:
+            logger.info("No embedding artifact at %s; similarity index will bootstrap from the database", path)
+            return False
+        except Exception:
+            logger.exception("Failed to load embedding artifact %s; keeping the current index", path)
+            return False
+
+        # The live index restarts in the new snapshot's IDF space and is
+        # re-synced with tickets newer than the snapshot on the next get().
+        delta = InvertedIndex(idf=snapshot.engine.idf_of)
+        with self._lock:
+            self._snapshot = snapshot
+            self._index = delta
+            self._synced_at = None
+            self._last_sync_monotonic = 0.0
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Hot-swap the snapshot if the artifact file changed on disk."""
+        if self._artifact_path is None:
+            return False
+        signature = artifact_signature(self._artifact_path)
+        if signature is None:
+            return False
+        if self._snapshot is not None and signature == self._snapshot.signature:
+            return False
+        if not self.load_artifact(self._artifact_path):
+            return False
+        # Scores come from the new snapshot now; earlier cached results are stale
+        corpus_generation.bump()
+        return True
+
+    def index_ticket(self, ticket: Ticket) -> None:
+        """Add *ticket* to the index if it is resolved with a reusable response."""
+        if ticket.status in INDEXED_STATUSES and ticket.response:
+            self._index.add(ticket.id, ticket.message, ticket.response, ticket.quality_score)
+
+    def update_quality(self, ticket_id: int, quality_score: float | None) -> None:
+        self._index.update_quality(ticket_id, quality_score)
+
+    def bump_generation(self, ticket_ids: Iterable[int] = ()) -> int:
+        """
+        Invalidate cached similarity results after a committed corpus change.
+
+        Call after the change has been applied to this process's index, with
+        the IDs of the tickets it touched: other processes re-read exactly
+        those tickets before serving the new generation. If no other process
+        bumped in between, this index is current for the new generation and
+        the next :meth:`get` does not need to catch up.
+        """
+        seen = self._generation
+        generation = corpus_generation.bump(ticket_ids)
+        if seen is not None and generation == seen + 1:
+            self._generation = generation
+        return generation
+
+    def reset(self) -> None:
+        """Drop the snapshot and all indexed tickets; the next :meth:`get` re-bootstraps."""
+        with self._lock:
+            self._index = InvertedIndex()
+            self._snapshot = None
+            self._artifact_path = None
+            self._synced_at = None
+            self._last_sync_monotonic = 0.0
+            self._generation = None
+
+
+similarity_index = _SimilarityIndexManager()
+
+
+def get_similarity_index(db: Session) -> InvertedIndex | _SnapshotSearch:
+    """Return the process-wide resolved-ticket similarity source, syncing it if stale."""
+    return similarity_index.get(db)
+
+
+async def watch_embedding_artifact(interval: float | None = None) -> None:
+    """
+    Poll the embedding artifact and hot-swap it when a newer build appears.
+
+    Runs until cancelled; intended to be started from the application lifespan.
+    """
+    interval = interval or settings.EMBEDDINGS_RELOAD_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(similarity_index.reload_if_changed)
+        except Exception:
+            logger.exception("Embedding artifact reload failed")
@@ -1,11 +1,18 @@
 import json
 import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 
 from app.utils.text_processing import tokenize, compute_idf, tf_idf_vector
 from app.core.config import settings
 from app.models.ticket import Ticket
-from app.utils.service_helpers import CacheHelper, ErrorHelper, MetricsHelper
+from app.utils.service_helpers import CacheHelper, MetricsHelper
 from app.constants import TicketStatus
+from app.services.redis_client import redis_manager
+from app.services.similarity_index import InvertedIndex, corpus_generation, similarity_index
+from app.services.sparse_scoring import SparseScoringEngine
 from sqlalchemy.orm import Session
 
 
@@ -22,68 +29,232 @@ class _SafeEncoder(json.JSONEncoder):
 SafeEncoder = _SafeEncoder
 
 
-class _RedisClientManager:
-    """Lazy-initializing, encapsulated Redis client holder.
+# Shared pooled client and circuit breaker (see redis_client)
+_redis_manager = redis_manager
 
-    Avoids module-level mutable state and ``global`` statements.
-    Call :meth:`get` to retrieve (or create) the client.
-    Call :meth:`reset` to clear a failed connection so the next
-    call to :meth:`get` will attempt a fresh connection.
+
+def _get_cache_client():
+    """Return the shared Redis client, or None (not configured / circuit open)."""
+    return _redis_manager.get()
+
+
+def _cache_key(message: str, generation: int | None = None) -> str:
     """
+    Generate a cache key from the message content.
 
-    def __init__(self) -> None:
-        self._client = None
+    Keys are namespaced by the corpus generation (current one by default), so
+    results cached before a corpus change are never served after it.
+    """
+    if generation is None:
+        generation = corpus_generation.current()
+    digest = CacheHelper.make_cache_key("srs:similarity", message)[:32]
+    return f"srs:similarity:{generation}:{digest}"
 
-    def get(self):
-        """Return a Redis client if REDIS_URL is configured, else None."""
-        if self._client is not None:
-            return self._client
 
-        if not settings.REDIS_URL:
-            return None
+def _index_generation() -> int:
+    """
+    Generation to cache index lookups under: the one the process's index has
+    applied, so a bump read between ``get_similarity_index`` and the lookup
+    never labels results from the older index as current.
+    """
+    generation = similarity_index.generation
+    return corpus_generation.current() if generation is None else generation
 
-        try:
-            import redis
-            self._client = redis.from_url(
-                settings.REDIS_URL, decode_responses=True, socket_timeout=1
-            )
-            return self._client
-        except Exception as e:
-            ErrorHelper.log_only(e, "Failed to create Redis client")
-            # Do not cache the failure — allow retry on next call
-            return None
 
-    def reset(self) -> None:
-        """Disconnect the connection pool and clear the cached client.
+# Stampede lock: how long a Redis lock lives if its holder dies, how long
+# other processes wait for the holder's result, and how often they poll.
+SIMILARITY_LOCK_SECONDS = 5
+SIMILARITY_LOCK_WAIT_SECONDS = 0.5
+SIMILARITY_LOCK_POLL_SECONDS = 0.05
 
-        Calls ``close()`` on the synchronous client (which disconnects all
-        pooled sockets) before dropping the reference so file descriptors
-        are released promptly.  Any error from ``close()`` is suppressed —
-        the reference is always cleared via ``finally``.
-        """
-        if self._client is not None:
-            try:
-                self._client.close()
-            except Exception:
-                pass  # Already broken — nothing useful we can do
-            finally:
-                self._client = None
+_MISSING = object()
 
 
-_redis_manager = _RedisClientManager()
+class _SimilarityCache:
+    """Two-tier cache of raw (threshold-independent) similarity results.
 
+    An in-process LRU (size- and TTL-bounded) sits in front of Redis, so a
+    repeated message costs neither a Redis round trip nor a ``json.loads``.
+    Results are stored parsed; callers must treat them as read-only.
 
-def _get_cache_client():
-    """Return a Redis client if REDIS_URL is configured, else None."""
-    return _redis_manager.get()
+    :meth:`get_or_compute` guards recomputation against stampedes: threads
+    of one process wait on a per-key lock, and processes sharing Redis wait
+    (briefly) on a ``SET NX`` lock for the holder's result. Writes go out in
+    one pipelined round trip together with the lock release.
 
+    Redis errors are reported to the circuit breaker and degrade to the
+    local tier.
+    """
 
-def _cache_key(message: str) -> str:
-    """Generate a cache key from the message content."""
-    return CacheHelper.make_cache_key("srs:similarity", message)[:32]
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, tuple[float, dict | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, list] = {}  # key -> [Lock, users]
+        self.stats = Counter()
+
+    def get_or_compute(self, key: str, compute) -> dict | None:
+        """Return the cached result for *key*, computing and storing it on a miss."""
+        value = self._local_get(key)
+        if value is not _MISSING:
+            return value
+
+        with self._key_lock(key):
+            # Another thread may have computed it while we waited
+            value = self._local_get(key)
+            if value is not _MISSING:
+                return value
+
+            cache = _get_cache_client()
+            value = self._redis_get(cache, key)
+            if value is _MISSING:
+                locked = self._redis_lock(cache, key)
+                if locked is False:
+                    value = self._redis_wait(cache, key)
+            if value is not _MISSING:
+                self._local_put({key: value})
+                return value
+
+            value = compute()
+            self.stats["computed"] += 1
+            self._local_put({key: value})
+            self._redis_put(cache, {key: value}, release_lock=key if locked else None)
+            return value
+
+    def get_many(self, keys: list[str]) -> dict[str, dict | None]:
+        """Return the cached results among *keys* (one ``MGET`` for local misses)."""
+        found = {}
+        for key in keys:
+            value = self._local_get(key)
+            if value is not _MISSING:
+                found[key] = value
+        missing = [key for key in keys if key not in found]
+        cache = _get_cache_client() if missing else None
+        if cache is not None:
+            try:
+                values = cache.mget(missing)
+            except Exception:
+                _redis_manager.record_failure()
+                return found
+            from_redis = {key: json.loads(raw) for key, raw in zip(missing, values) if raw is not None}
+            self.stats["redis_hits"] += len(from_redis)
+            self._local_put(from_redis)
+            found.update(from_redis)
+        return found
+
+    def set_many(self, items: dict[str, dict | None]) -> None:
+        """Store *items* locally and in Redis (one pipelined round trip)."""
+        self._local_put(items)
+        self._redis_put(_get_cache_client(), items)
+
+    def clear(self) -> None:
+        """Drop every local entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.stats.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Local tier
+    # ------------------------------------------------------------------
+
+    def _local_get(self, key: str):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.stats["local_hits"] += 1
+            return value
+
+    def _local_put(self, items: dict[str, dict | None]) -> None:
+        max_entries = settings.SIMILARITY_CACHE_LOCAL_MAX_ENTRIES
+        if max_entries <= 0 or not items:
+            return
+        expires_at = time.monotonic() + settings.SIMILARITY_CACHE_LOCAL_TTL_SECONDS
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    # ------------------------------------------------------------------
+    # Redis tier
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"{key}:lock"
+
+    def _redis_get(self, cache, key: str):
+        if cache is None:
+            return _MISSING
+        try:
+            raw = cache.get(key)
+        except Exception:
+            _redis_manager.record_failure()
+            return _MISSING
+        if raw is None:
+            return _MISSING
+        self.stats["redis_hits"] += 1
+        return json.loads(raw)
+
+    def _redis_lock(self, cache, key: str) -> bool | None:
+        """Try to take the stampede lock: True = held, False = busy, None = no Redis."""
+        if cache is None:
+            return None
+        try:
+            return bool(cache.set(self._lock_key(key), "1", nx=True, ex=SIMILARITY_LOCK_SECONDS))
+        except Exception:
+            _redis_manager.record_failure()
+            return None
 
+    def _redis_wait(self, cache, key: str):
+        """Poll for the result of the process holding the lock; give up after a short wait."""
+        deadline = time.monotonic() + SIMILARITY_LOCK_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(SIMILARITY_LOCK_POLL_SECONDS)
+            value = self._redis_get(cache, key)
+            if value is not _MISSING:
+                return value
+        self.stats["lock_timeouts"] += 1
+        return _MISSING
+
+    def _redis_put(self, cache, items: dict[str, dict | None], release_lock: str | None = None) -> None:
+        if cache is None or not items:
+            return
+        try:
+            pipe = cache.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, settings.SIMILARITY_CACHE_TTL_SECONDS, json.dumps(value, cls=SafeEncoder))
+            if release_lock is not None:
+                pipe.delete(self._lock_key(release_lock))
+            pipe.execute()
+        except Exception:
+            _redis_manager.record_failure()
 
 
+similarity_cache = _SimilarityCache()
 
 
 def _cosine_similarity(tfidf1: dict[str, float], tfidf2: dict[str, float]) -> float:
@@ -118,7 +289,12 @@ def _cosine_similarity(tfidf1: dict[str, float], tfidf2: dict[str, float]) -> fl
 
 
 def get_resolved_tickets(db: Session) -> list[Ticket]:
-    """Fetch recent successfully resolved tickets for similarity search."""
+    """
+    Fetch recent successfully resolved tickets for similarity search.
+
+    Only the 50 most recent tickets are returned. The request path searches
+    the full corpus through :func:`find_similar_in_index` instead.
+    """
     return (
         db.query(Ticket)
         .filter(
@@ -131,6 +307,17 @@ def get_resolved_tickets(db: Session) -> list[Ticket]:
     )
 
 
+def _validate_threshold(similarity_threshold: float | None) -> float:
+    """Apply the configured default and validate a similarity threshold."""
+    if similarity_threshold is None:
+        similarity_threshold = settings.SIMILARITY_THRESHOLD
+    if not isinstance(similarity_threshold, (int, float)):
+        raise ValueError("similarity_threshold must be a numeric value")
+    if not (0.0 <= similarity_threshold <= 1.0):
+        raise ValueError("similarity_threshold must be between 0.0 and 1.0")
+    return similarity_threshold
+
+
 def find_similar_ticket(new_message: str, resolved_tickets: list[dict], similarity_threshold: float = None) -> dict | None:
     """
     Find the most similar resolved ticket to a new ticket message.
@@ -153,32 +340,20 @@ def find_similar_ticket(new_message: str, resolved_tickets: list[dict], similari
     if not resolved_tickets or not isinstance(resolved_tickets, list):
         return None
 
-    # Try cache first
-    cache = _get_cache_client()
-    key = _cache_key(new_message) if cache else None
+    similarity_threshold = _validate_threshold(similarity_threshold)
 
-    # Validate similarity_threshold parameter
-    if similarity_threshold is None:
-        similarity_threshold = settings.SIMILARITY_THRESHOLD
-    if not isinstance(similarity_threshold, (int, float)):
-        raise ValueError("similarity_threshold must be a numeric value")
-    if not (0.0 <= similarity_threshold <= 1.0):
-        raise ValueError("similarity_threshold must be between 0.0 and 1.0")
+    # The cached raw result is threshold-independent; apply this call's threshold
+    raw_result = similarity_cache.get_or_compute(
+        _cache_key(new_message), lambda: _best_match(new_message, resolved_tickets)
+    )
+    if raw_result and raw_result.get("similarity_score", 0.0) >= similarity_threshold:
+        return raw_result
+
+    return None
 
-    # Check cache hit (threshold-independent)
-    if cache and key:
-        try:
-            cached = cache.get(key)
-            if cached is not None:
-                cached_data = json.loads(cached)
-                # Apply current threshold to cached raw result
-                if cached_data and cached_data.get("similarity_score", 0.0) >= similarity_threshold:
-                    return cached_data
-                return None  # Message is in cache but doesn't meet this threshold
-        except Exception:
-            _redis_manager.reset()
-            cache = None
 
+def _best_match(new_message: str, resolved_tickets: list[dict]) -> dict | None:
+    """Score *new_message* against every ticket; return the best raw result."""
     # Extract messages from resolved tickets
     ticket_messages = []
     for ticket in resolved_tickets:
@@ -220,28 +395,117 @@ def find_similar_ticket(new_message: str, resolved_tickets: list[dict], similari
             best_match = ticket_message
             best_ticket = ticket
 
-    # Prepare raw result (best match found, for caching)
-    raw_result = None
-    if best_match:
-        raw_result = {
-            "matched_text": best_match,
-            "similarity_score": round(best_similarity, 3),
-            "ticket": best_ticket,
-            "quality_score": best_ticket.get("quality_score"),
-        }
-
-    # Record raw result to cache (threshold-independent)
-    if cache and key:
-        try:
-            # We always cache the best found match so future calls with lower thresholds can use it
-            cache.setex(key, 300, json.dumps(raw_result, cls=SafeEncoder))
-        except Exception:
-            _redis_manager.reset()
-            cache = None
+    if not best_match:
+        return None
+    return {
+        "matched_text": best_match,
+        "similarity_score": round(best_similarity, 3),
+        "ticket": best_ticket,
+        "quality_score": best_ticket.get("quality_score"),
+    }
+
+
+def find_similar_in_index(
+    new_message: str,
+    index: InvertedIndex | SparseScoringEngine,
+    similarity_threshold: float = None,
+) -> dict | None:
+    """
+    Find the most similar resolved ticket using the in-memory inverted index.
+
+    Index-backed counterpart of :func:`find_similar_ticket`: it searches the
+    whole resolved corpus but only scores tickets that share a term with
+    *new_message*. Cache behaviour and the return format are the same.
+
+    Args:
+        new_message: The new ticket message to find matches for
+        index: Inverted index or sparse scoring engine over resolved tickets
+        similarity_threshold: Minimum similarity score to consider a match
+
+    Returns:
+        Dict with {"matched_text", "similarity_score", "ticket", "quality_score"}
+        or None if no match above threshold
+    """
+    if not new_message or not isinstance(new_message, str):
+        return None
+
+    similarity_threshold = _validate_threshold(similarity_threshold)
+
+    raw_result = similarity_cache.get_or_compute(
+        _cache_key(new_message, _index_generation()),
+        lambda: _index_result(index, index.search(new_message, top_k=1)),
+    )
 
-    # Check if raw result meets the requested threshold for THIS call
     if raw_result and raw_result["similarity_score"] >= similarity_threshold:
         return raw_result
-    
+
     return None
 
+
+def find_similar_in_index_batch(
+    messages: list[str],
+    index: InvertedIndex | SparseScoringEngine,
+    similarity_threshold: float = None,
+) -> list[dict | None]:
+    """
+    Batch counterpart of :func:`find_similar_in_index`.
+
+    Results are looked up in the in-process tier first; the remaining
+    messages are fetched with one ``MGET``. The misses are scored together
+    through the source's ``search_many`` when it has one, and written back in
+    one pipelined round trip.
+
+    Args:
+        messages: New ticket messages to find matches for
+        index: Inverted index or sparse scoring engine over resolved tickets
+        similarity_threshold: Minimum similarity score to consider a match
+
+    Returns:
+        One result (same format as :func:`find_similar_in_index`) or None per
+        message, aligned with *messages*.
+    """
+    similarity_threshold = _validate_threshold(similarity_threshold)
+    raw_results: list[dict | None] = [None] * len(messages)
+    pending = [
+        position for position, message in enumerate(messages)
+        if message and isinstance(message, str)
+    ]
+
+    generation = _index_generation()
+    keys = {position: _cache_key(messages[position], generation) for position in pending}
+    cached = similarity_cache.get_many(list(dict.fromkeys(keys.values())))
+    for position in pending:
+        if keys[position] in cached:
+            raw_results[position] = cached[keys[position]]
+    pending = [position for position in pending if keys[position] not in cached]
+
+    if pending:
+        queries = [messages[position] for position in pending]
+        if hasattr(index, "search_many"):
+            batch_hits = index.search_many(queries, top_k=1)
+        else:
+            batch_hits = [index.search(query, top_k=1) for query in queries]
+        for position, hits in zip(pending, batch_hits):
+            raw_results[position] = _index_result(index, hits)
+        similarity_cache.set_many({keys[position]: raw_results[position] for position in pending})
+
+    return [
+        result if result and result.get("similarity_score", 0.0) >= similarity_threshold else None
+        for result in raw_results
+    ]
+
+
+def _index_result(index, hits: list[tuple[int, float]]) -> dict | None:
+    """Turn the best ``(ticket_id, score)`` hit into the similarity result format."""
+    if not hits:
+        return None
+    ticket_id, similarity = hits[0]
+    best_ticket = index.get_document(ticket_id)
+    if best_ticket is None:
+        return None
+    return {
+        "matched_text": best_ticket["message"],
+        "similarity_score": round(similarity, 3),
+        "ticket": best_ticket,
+        "quality_score": best_ticket.get("quality_score"),
+    }
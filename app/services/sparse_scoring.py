@@ -0,0 +1,438 @@
+"""
+app/services/sparse_scoring.py
+
+Purpose:
+Vectorized cosine scoring over a frozen snapshot of the resolved-ticket corpus.
+
+Responsibilities:
+- Hold the corpus as a row-normalized CSR sparse matrix with a fixed
+  vocabulary → column map and a fixed IDF vector
+- Score a query against every row with one sparse matrix-vector product
+  and return the top-k rows
+- Score a batch of queries in a single vectorized pass
+
+NumPy is used when installed; otherwise the same arrays are kept in
+``array.array`` buffers and scored in pure Python. The dict-based path in
+``similarity_search.find_similar_ticket`` remains the reference
+implementation the scores are tested against.
+
+DO NOT:
+- Query the database here
+- Make resolution decisions here
+"""
+
+import heapq
+import math
+from array import array
+from collections import Counter
+from typing import Iterable, Sequence
+
+from app.utils.text_processing import compute_idf, tokenize
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+
+# Query terms missing from the vocabulary get the same default weight as in
+# text_processing.tf_idf_vector, so query norms match the reference path.
+DEFAULT_IDF = 1.0
+
+
+class SparseScoringEngine:
+    """
+    CSR matrix of L2-normalized TF-IDF rows, one row per resolved ticket.
+
+    Row ``i`` describes ticket ``ticket_ids[i]``; its non-zero entries are
+    ``data[indptr[i]:indptr[i + 1]]`` at columns ``indices[indptr[i]:indptr[i + 1]]``.
+
+    Scoring multiplies the matrix by the normalized query vector. The product
+    is evaluated column-wise (a CSC view is derived once from the CSR arrays),
+    so the cost is proportional to the postings of the query's own terms
+    rather than to the whole matrix.
+    """
+
+    def __init__(
+        self,
+        vocabulary: dict[str, int],
+        idf: Sequence[float],
+        indptr: Sequence[int],
+        indices: Sequence[int],
+        data: Sequence[float],
+        ticket_ids: Sequence[int],
+        documents: dict[int, dict] | None = None,
+        columns: tuple[Sequence[int], Sequence[int], Sequence[float]] | None = None,
+    ) -> None:
+        if len(indptr) != len(ticket_ids) + 1:
+            raise ValueError("indptr must have exactly one more entry than ticket_ids")
+        if len(indices) != len(data):
+            raise ValueError("indices and data must have the same length")
+        if len(idf) != len(vocabulary):
+            raise ValueError("idf must have one entry per vocabulary term")
+
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.ticket_ids = ticket_ids
+        self.documents = documents or {}
+        self._columns = columns
+
+    def __len__(self) -> int:
+        return len(self.ticket_ids)
+
+    @property
+    def backend(self) -> str:
+        """Name of the array backend in use: ``"numpy"`` or ``"python"``."""
+        return "numpy" if np is not None else "python"
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_documents(
+        cls,
+        ticket_ids: Iterable[int],
+        messages: Iterable[str],
+        idf: dict[str, float] | None = None,
+        documents: dict[int, dict] | None = None,
+    ) -> "SparseScoringEngine":
+        """
+        Build an engine from raw ticket messages.
+
+        Args:
+            ticket_ids: Ticket ID for each message.
+            messages: Ticket messages, aligned with *ticket_ids*.
+            idf: Fixed IDF table. Computed from *messages* when omitted.
+            documents: Optional ticket payloads returned by :meth:`get_document`.
+
+        Returns:
+            A new engine. Messages without tokens are skipped.
+        """
+        ticket_ids = list(ticket_ids)
+        messages = list(messages)
+        if idf is None:
+            idf = compute_idf(messages)
+
+        vocabulary = {word: column for column, word in enumerate(sorted(idf))}
+        idf_values = [idf[word] for word in sorted(idf)]
+
+        # Typed buffers keep large builds compact while rows are appended
+        row_ids, indptr, indices, data = array("q"), array("q", [0]), array("q"), array("d")
+        for ticket_id, message in zip(ticket_ids, messages):
+            row = _normalized_row(message, vocabulary, idf_values)
+            if not row:
+                continue
+            for column, value in row:
+                indices.append(column)
+                data.append(value)
+            indptr.append(len(indices))
+            row_ids.append(ticket_id)
+
+        return cls(
+            vocabulary=vocabulary,
+            idf=_float_array(idf_values),
+            indptr=_int_array(indptr, wide=True),
+            indices=_int_array(indices),
+            data=_float_array(data),
+            ticket_ids=_int_array(row_ids, wide=True),
+            documents=documents,
+        )
+
+    @classmethod
+    def from_vectors(
+        cls,
+        idf: dict[str, float],
+        vectors: Iterable[tuple[int, dict[str, float]]],
+        documents: dict[int, dict] | None = None,
+    ) -> "SparseScoringEngine":
+        """
+        Build an engine from precomputed (un-normalized) TF-IDF vectors.
+
+        This is the shape written by ``workers/embedding_builder.py``.
+
+        Args:
+            idf: IDF table the vectors were computed with.
+            vectors: ``(ticket_id, {word: tf_idf})`` pairs.
+            documents: Optional ticket payloads returned by :meth:`get_document`.
+        """
+        vocabulary = {word: column for column, word in enumerate(sorted(idf))}
+        idf_values = [idf[word] for word in sorted(idf)]
+
+        # Typed buffers keep large builds compact while rows are appended
+        row_ids, indptr, indices, data = array("q"), array("q", [0]), array("q"), array("d")
+        for ticket_id, vector in vectors:
+            norm = math.sqrt(sum(value * value for value in vector.values()))
+            if norm == 0:
+                continue
+            row = sorted(
+                (vocabulary[word], value / norm)
+                for word, value in vector.items()
+                if word in vocabulary
+            )
+            if not row:
+                continue
+            for column, value in row:
+                indices.append(column)
+                data.append(value)
+            indptr.append(len(indices))
+            row_ids.append(ticket_id)
+
+        return cls(
+            vocabulary=vocabulary,
+            idf=_float_array(idf_values),
+            indptr=_int_array(indptr, wide=True),
+            indices=_int_array(indices),
+            data=_float_array(data),
+            ticket_ids=_int_array(row_ids, wide=True),
+            documents=documents,
+        )
+
+    def idf_of(self, word: str) -> float:
+        """Return the fixed IDF of *word*, or :data:`DEFAULT_IDF` if unknown."""
+        column = self.vocabulary.get(word)
+        return float(self.idf[column]) if column is not None else DEFAULT_IDF
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def query_vector(self, message: str) -> dict[int, float]:
+        """
+        Return the L2-normalized query vector as ``{column: weight}``.
+
+        Terms outside the vocabulary contribute to the norm (with
+        :data:`DEFAULT_IDF`) but have no column, exactly like the dict path.
+        """
+        tokens = tokenize(message)
+        if not tokens:
+            return {}
+        total = len(tokens)
+        weights = {}
+        norm_sq = 0.0
+        for word, count in Counter(tokens).items():
+            column = self.vocabulary.get(word)
+            word_idf = float(self.idf[column]) if column is not None else DEFAULT_IDF
+            weight = (count / total) * word_idf
+            norm_sq += weight * weight
+            if column is not None:
+                weights[column] = weight
+        if norm_sq == 0:
+            return {}
+        norm = math.sqrt(norm_sq)
+        return {column: weight / norm for column, weight in weights.items()}
+
+    def scores(self, message: str) -> dict[int, float]:
+        """Return ``{ticket_id: cosine_similarity}`` for every row sharing a term."""
+        rows, values = self._score_rows(self.query_vector(message))
+        return {int(self.ticket_ids[row]): float(value) for row, value in zip(rows, values)}
+
+    def search(self, message: str, top_k: int = 1) -> list[tuple[int, float]]:
+        """
+        Return the ``top_k`` best ``(ticket_id, score)`` pairs, best first.
+
+        Ties are broken in favour of the highest ticket ID, matching
+        :meth:`InvertedIndex.search`.
+        """
+        if top_k <= 0:
+            return []
+        rows, values = self._score_rows(self.query_vector(message))
+        if len(rows) == 0:
+            return []
+
+        if np is not None:
+            if len(values) > top_k:
+                # Keep everything scoring at least the k-th best value so that
+                # ties at the cut-off are still resolved by ticket ID below.
+                kth_best = np.partition(values, len(values) - top_k)[len(values) - top_k]
+                keep = np.flatnonzero(values >= kth_best)
+                rows, values = rows[keep], values[keep]
+            candidate_ids = np.asarray(self.ticket_ids)[rows]
+            order = np.lexsort((candidate_ids, values))[::-1][:top_k]
+            return [(int(candidate_ids[i]), float(values[i])) for i in order]
+
+        best = heapq.nlargest(
+            top_k, ((value, self.ticket_ids[row]) for row, value in zip(rows, values))
+        )
+        return [(ticket_id, value) for value, ticket_id in best]
+
+    def search_many(self, messages: Sequence[str], top_k: int = 1) -> list[list[tuple[int, float]]]:
+        """
+        Run :meth:`search` for every message in one vectorized pass.
+
+        The postings of all queries are gathered into a single
+        ``(query, row) → score`` reduction, so a batch costs one sort over
+        the touched postings instead of one dense accumulator per query.
+        Results are identical to calling :meth:`search` per message.
+
+        Returns:
+            One result list per message, aligned with *messages*.
+        """
+        results: list[list[tuple[int, float]]] = [[] for _ in messages]
+        if top_k <= 0 or len(self.ticket_ids) == 0:
+            return results
+        if np is None:
+            return [self.search(message, top_k=top_k) for message in messages]
+
+        col_ptr, col_rows, col_data = self.column_view()
+        col_rows = np.asarray(col_rows)
+        col_data = np.asarray(col_data)
+        query_parts, row_parts, value_parts = [], [], []
+        for position, message in enumerate(messages):
+            for column, weight in self.query_vector(message).items():
+                start, end = col_ptr[column], col_ptr[column + 1]
+                if start == end:
+                    continue
+                query_parts.append(np.full(end - start, position, dtype=np.int64))
+                row_parts.append(col_rows[start:end])
+                value_parts.append(col_data[start:end] * weight)
+        if not row_parts:
+            return results
+
+        n_rows = len(self.ticket_ids)
+        keys = np.concatenate(query_parts) * n_rows + np.concatenate(row_parts)
+        keys, inverse = np.unique(keys, return_inverse=True)
+        values = np.bincount(inverse, weights=np.concatenate(value_parts))
+        positions, rows = np.divmod(keys, n_rows)
+
+        # Keys are sorted, so each query's entries form one contiguous group.
+        # Lower each group's floor to its k-th distinct best score; only the
+        # entries at or above it can make the cut, which keeps the final sort
+        # small while preserving tie-breaking at the cut-off.
+        starts = np.flatnonzero(np.r_[True, positions[1:] != positions[:-1]])
+        sizes = np.diff(np.r_[starts, len(positions)])
+        floor = np.full(len(starts), np.inf)
+        for _ in range(top_k):
+            below = np.where(values < np.repeat(floor, sizes), values, -np.inf)
+            floor = np.maximum.reduceat(below, starts)
+        keep = np.flatnonzero((values >= np.repeat(floor, sizes)) & (values != 0))
+        positions, rows, values = positions[keep], rows[keep], values[keep]
+        candidate_ids = np.asarray(self.ticket_ids)[rows]
+
+        # Ascending by query, then score, then ticket ID: each query's best
+        # hits are the tail of its group, with ties going to the highest ID.
+        order = np.lexsort((candidate_ids, values, positions))
+        grouped = positions[order]
+        bounds = np.searchsorted(grouped, np.arange(len(messages) + 1))
+        for position in range(len(messages)):
+            start, end = bounds[position], bounds[position + 1]
+            best = order[max(start, end - top_k):end][::-1]
+            results[position] = [(int(candidate_ids[i]), float(values[i])) for i in best]
+        return results
+
+    def get_document(self, ticket_id: int) -> dict | None:
+        """Return the stored payload for *ticket_id*, if one was provided."""
+        doc = self.documents.get(ticket_id)
+        return dict(doc) if doc is not None else None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _score_rows(self, query: dict[int, float]):
+        """Multiply the matrix by *query*; return (row indices, scores) of non-zero rows."""
+        if not query or len(self.ticket_ids) == 0:
+            return [], []
+        col_ptr, col_rows, col_data = self.column_view()
+
+        if np is not None:
+            col_rows = np.asarray(col_rows)
+            col_data = np.asarray(col_data)
+            row_parts, value_parts = [], []
+            for column, weight in query.items():
+                start, end = col_ptr[column], col_ptr[column + 1]
+                if start == end:
+                    continue
+                row_parts.append(col_rows[start:end])
+                value_parts.append(col_data[start:end] * weight)
+            if not row_parts:
+                return [], []
+            # Accumulate over the touched rows only (as search_many does), so
+            # the cost follows the posting lists, not the corpus size.
+            rows, inverse = np.unique(np.concatenate(row_parts), return_inverse=True)
+            values = np.bincount(inverse, weights=np.concatenate(value_parts))
+            keep = np.flatnonzero(values)
+            return rows[keep], values[keep]
+
+        accumulated: dict[int, float] = {}
+        for column, weight in query.items():
+            for entry in range(col_ptr[column], col_ptr[column + 1]):
+                row = col_rows[entry]
+                accumulated[row] = accumulated.get(row, 0.0) + col_data[entry] * weight
+        return list(accumulated.keys()), list(accumulated.values())
+
+    def column_view(self):
+        """
+        Return the column-major (CSC) view used for scoring.
+
+        The view is ``(col_ptr, col_rows, col_data)``: the entries of column
+        ``c`` are rows ``col_rows[col_ptr[c]:col_ptr[c + 1]]`` with values
+        from the same slice of ``col_data``. It is derived from the CSR arrays
+        on first use unless it was supplied to the constructor.
+        """
+        if self._columns is not None:
+            return self._columns
+
+        n_columns = len(self.vocabulary)
+        if np is not None:
+            indptr = np.asarray(self.indptr, dtype=np.int64)
+            indices = np.asarray(self.indices)
+            row_of_entry = np.repeat(
+                np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr)
+            )
+            order = np.argsort(indices, kind="stable")
+            col_ptr = np.zeros(n_columns + 1, dtype=np.int64)
+            np.cumsum(np.bincount(indices, minlength=n_columns), out=col_ptr[1:])
+            self._columns = (col_ptr, row_of_entry[order], np.asarray(self.data)[order])
+        else:
+            # Counting sort of the CSR entries by column
+            col_ptr = array("q", [0]) * (n_columns + 1)
+            for column in self.indices:
+                col_ptr[column + 1] += 1
+            for column in range(n_columns):
+                col_ptr[column + 1] += col_ptr[column]
+            cursor = array("q", col_ptr)
+            col_rows = array("q", [0]) * len(self.indices)
+            col_data = array("d", [0.0]) * len(self.indices)
+            for row in range(len(self.ticket_ids)):
+                for entry in range(self.indptr[row], self.indptr[row + 1]):
+                    column = self.indices[entry]
+                    col_rows[cursor[column]] = row
+                    col_data[cursor[column]] = self.data[entry]
+                    cursor[column] += 1
+            self._columns = (col_ptr, col_rows, col_data)
+        return self._columns
+
+
+def _normalized_row(
+    message: str, vocabulary: dict[str, int], idf_values: Sequence[float]
+) -> list[tuple[int, float]]:
+    """Return the sorted ``(column, weight)`` entries of one L2-normalized row."""
+    tokens = tokenize(message)
+    if not tokens:
+        return []
+    total = len(tokens)
+    entries = []
+    for word, count in Counter(tokens).items():
+        column = vocabulary.get(word)
+        weight = (count / total) * (idf_values[column] if column is not None else DEFAULT_IDF)
+        entries.append((column, weight))
+    norm = math.sqrt(sum(weight * weight for _, weight in entries))
+    if norm == 0:
+        return []
+    # Terms outside a fixed vocabulary still count towards the norm but
+    # cannot be stored, mirroring how the dict path treats them.
+    return sorted((column, weight / norm) for column, weight in entries if column is not None)
+
+
+def _float_array(values: Sequence[float]):
+    return np.asarray(values, dtype=np.float64) if np is not None else array("d", values)
+
+
+def _int_array(values: Sequence[int], wide: bool = False):
+    if np is not None:
+        return np.asarray(values, dtype=np.int64 if wide else np.int32)
+    return array("q" if wide else "i", values)
@@ -7,30 +7,36 @@ Backend / Service Layer
 
 Responsibilities:
 - Run AI automation pipeline for ticket classification and resolution
+- Run the same pipeline over bulk-ingested ticket batches
 - Extract user identity from optional JWT tokens
 - Coordinate classifier, similarity search, decision engine, and response generator
+- Time each stage of the single-ticket pipeline (see app/core/telemetry.py)
 
 DO NOT:
 - Handle HTTP request/response here
 - Access FastAPI Request/Response objects directly
 """
 
-import json
 import logging
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
 from app.constants import TicketStatus
 from app.core.config import settings
+from app.core.telemetry import automation_seconds, stage_seconds
 from app.models.ticket import Ticket
-from app.services.classifier import classify_intent
+from app.services.auth_cache import auth_cache
+from app.services.classifier import classify_intent, classify_intents
 from app.services.decision_engine import decide_resolution
 from app.services.response_generator import generate_response
+from app.services.similarity_index import get_similarity_index, similarity_index
 from app.services.similarity_search import (
-    find_similar_ticket,
-    get_resolved_tickets,
-    _get_cache_client,
-    _cache_key,
+    find_similar_in_index,
+    find_similar_in_index_batch,
 )
 
 logger = logging.getLogger(__name__)
@@ -50,10 +56,7 @@ def extract_user_id_from_token(token: str | None) -> int | None:
     if not token:
         return None
     try:
-        # Import here to avoid circular imports — auth depends on models,
-        # ticket_service must not depend on api.auth at module level.
-        from app.core.security import decode_token  # local import avoids circular dep
-        payload = decode_token(token)
+        payload = auth_cache.verify_token(token)
         sub = payload.get("sub")
         if sub:
             return int(sub)
@@ -75,8 +78,7 @@ def extract_user_id_and_role_from_token(token: str | None) -> tuple[int | None,
     if not token:
         return None, None
     try:
-        from app.core.security import decode_token
-        payload = decode_token(token)
+        payload = auth_cache.verify_token(token)
         sub = payload.get("sub")
         role = payload.get("role")
         user_id = int(sub) if sub else None
@@ -92,11 +94,14 @@ def run_ticket_automation(ticket: Ticket, db: Session) -> Ticket:
 
     Steps:
         1. Classify intent via classifier service
-        2. Check similarity cache; fall back to DB query + similarity search
+        2. Find a similar resolved ticket (similarity cache, then the index)
         3. Make auto-resolve vs. escalate decision
         4. Generate a response for auto-resolved tickets
         5. Persist results and return the updated ticket
 
+    Each step and the whole run are timed into the histograms of
+    app/core/telemetry.py (served at GET /metrics).
+
     Args:
         ticket: Ticket ORM instance (already persisted with an ID).
         db: Active SQLAlchemy session.
@@ -104,8 +109,11 @@ def run_ticket_automation(ticket: Ticket, db: Session) -> Ticket:
     Returns:
         Updated Ticket instance with intent, confidence, status, and response set.
     """
+    started = time.perf_counter()
+
     # --- Step 1: Classify intent ---
-    classification = classify_intent(ticket.message)
+    with stage_seconds.time("classify_intent"):
+        classification = classify_intent(ticket.message)
     intent = classification["intent"]
     confidence = classification["confidence"]
     sub_intent = classification.get("sub_intent")
@@ -114,49 +122,33 @@ def run_ticket_automation(ticket: Ticket, db: Session) -> Ticket:
     ticket.confidence = confidence
     ticket.sub_intent = sub_intent
 
-    # --- Step 2: Similarity search (cache-first) ---
-    cache = _get_cache_client()
-    key = _cache_key(ticket.message) if cache else None
-    similar_result = None
-
-    if cache and key:
-        try:
-            cached = cache.get(key)
-            if cached:
-                similar_result = json.loads(cached)
-                logger.info(f"Similarity cache hit for ticket {ticket.id}")
-        except Exception:
-            pass  # Cache failure is non-fatal; fall through to DB
-
-    if similar_result is None:
-        resolved_tickets = get_resolved_tickets(db)
-        resolved_tickets_data = [
-            {"message": t.message, "response": t.response, "quality_score": t.quality_score}
-            for t in resolved_tickets
-        ]
-        similar_result = find_similar_ticket(
+    # --- Step 2: Similarity search (one two-tier cache lookup, then the index) ---
+    with stage_seconds.time("similarity_lookup"):
+        similar_result = find_similar_in_index(
             ticket.message,
-            resolved_tickets_data,
+            get_similarity_index(db),
             similarity_threshold=settings.SIMILARITY_THRESHOLD,
         )
 
     similar_quality_score = similar_result.get("quality_score") if similar_result else None
 
     # --- Step 3: Resolution decision ---
-    decision = decide_resolution(confidence)
+    with stage_seconds.time("decide_resolution"):
+        decision = decide_resolution(confidence)
 
     # --- Step 4: Generate response or escalate ---
     if decision == "AUTO_RESOLVE":
         similar_solution = (
             similar_result["ticket"]["response"] if similar_result else None
         )
-        response_text, response_source = generate_response(
-            intent,
-            ticket.message,
-            similar_solution=similar_solution,
-            sub_intent=sub_intent,
-            similar_quality_score=similar_quality_score,
-        )
+        with stage_seconds.time("generate_response"):
+            response_text, response_source = generate_response(
+                intent,
+                ticket.message,
+                similar_solution=similar_solution,
+                sub_intent=sub_intent,
+                similar_quality_score=similar_quality_score,
+            )
         ticket.response = response_text
         ticket.response_source = response_source
         ticket.status = TicketStatus.AUTO_RESOLVED.value
@@ -174,7 +166,193 @@ def run_ticket_automation(ticket: Ticket, db: Session) -> Ticket:
 
     # --- Step 5: Persist ---
     db.add(ticket)
-    db.commit()
+    with stage_seconds.time("db_commit"):
+        db.commit()
+    db.refresh(ticket)
+
+    # Make the freshly resolved ticket searchable for the next request
+    similarity_index.index_ticket(ticket)
+    if ticket.status == TicketStatus.AUTO_RESOLVED.value:
+        similarity_index.bump_generation([ticket.id])
+
+    automation_seconds.observe(time.perf_counter() - started, ticket.response_source or "escalated")
+    return ticket
+
+
+def escalate_after_failure(ticket: Ticket, db: Session) -> Ticket:
+    """
+    Escalate *ticket* after the automation pipeline failed for it.
+
+    Rolls back any partial AI processing and clears the AI fields so the
+    ticket goes to a human agent (never block the user).
+    """
+    db.rollback()
+
+    ticket.status = TicketStatus.ESCALATED.value
+    ticket.intent = None
+    ticket.confidence = None
+    ticket.sub_intent = None
+    ticket.response = None
+
+    with stage_seconds.time("db_commit"):
+        db.commit()
     db.refresh(ticket)
     return ticket
 
+
+def create_tickets_bulk(messages: list[str], user_id: int | None, db: Session) -> list[Ticket]:
+    """
+    Store one ``open`` ticket per message using a single INSERT statement.
+
+    Args:
+        messages: Ticket messages, already validated.
+        user_id: Owner of every ticket in the batch, or None.
+        db: Active SQLAlchemy session.
+
+    Returns:
+        The created tickets, in the order of *messages*.
+    """
+    if not messages:
+        return []
+    inserted = db.execute(
+        insert(Ticket).returning(Ticket.id, Ticket.message),
+        [
+            {"message": message, "status": TicketStatus.OPEN.value, "user_id": user_id}
+            for message in messages
+        ],
+    ).all()
+    db.commit()
+
+    # RETURNING order of a multi-row INSERT is not guaranteed on every
+    # backend (asking SQLAlchemy to sort makes SQLite insert row by row).
+    # Rows with the same message are interchangeable, so match on it.
+    ids_by_message: dict[str, deque[int]] = defaultdict(deque)
+    for ticket_id, message in sorted(inserted):
+        ids_by_message[message].append(ticket_id)
+    return load_tickets([ids_by_message[message].popleft() for message in messages], db)
+
+
+def load_tickets(ticket_ids: list[int], db: Session) -> list[Ticket]:
+    """Load *ticket_ids* with one query, preserving the given order."""
+    tickets = {
+        ticket.id: ticket
+        for ticket in db.query(Ticket).filter(Ticket.id.in_(ticket_ids))
+    }
+    return [tickets[ticket_id] for ticket_id in ticket_ids if ticket_id in tickets]
+
+
+def run_batch_automation(tickets: list[Ticket], db: Session) -> list[Ticket]:
+    """
+    Run the AI automation pipeline over a batch of tickets.
+
+    Same steps and outcomes as :func:`run_ticket_automation`, but each stage
+    handles the whole batch at once:
+        1. Classify every message (repeated messages are classified once)
+        2. One cache round trip plus one vectorized similarity pass
+        3. Decide and generate a response per ticket, up to
+           OPENAI_MAX_CONCURRENCY tickets at a time (the LLM calls dominate
+           and would otherwise run one after another); a failure here
+           escalates only that ticket
+        4. Persist all results with a single bulk UPDATE and one commit
+
+    Args:
+        tickets: Ticket ORM instances (already persisted with IDs).
+        db: Active SQLAlchemy session.
+
+    Returns:
+        The updated tickets, in input order.
+    """
+    if not tickets:
+        return []
+
+    messages = [ticket.message for ticket in tickets]
+    ticket_ids = [ticket.id for ticket in tickets]
+
+    # --- Steps 1-2: Classification and similarity for the whole batch ---
+    classifications = classify_intents(messages)
+    similar_results = find_similar_in_index_batch(
+        messages,
+        get_similarity_index(db),
+        similarity_threshold=settings.SIMILARITY_THRESHOLD,
+    )
+
+    # --- Step 3: Per-ticket decision and response (bounded parallelism) ---
+    workers = max(1, min(settings.OPENAI_MAX_CONCURRENCY, len(tickets)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-automation") as executor:
+        rows = list(executor.map(
+            _safe_automation_row, ticket_ids, messages, classifications, similar_results
+        ))
+
+    # --- Step 4: Persist (bulk UPDATE by primary key) ---
+    db.execute(update(Ticket), rows)
+    db.commit()
+
+    tickets = load_tickets(ticket_ids, db)
+    for ticket in tickets:
+        similarity_index.index_ticket(ticket)
+    resolved_ids = [ticket.id for ticket in tickets if ticket.status == TicketStatus.AUTO_RESOLVED.value]
+    if resolved_ids:
+        similarity_index.bump_generation(resolved_ids)
+    return tickets
+
+
+def _safe_automation_row(
+    ticket_id: int, message: str, classification: dict, similar_result: dict | None
+) -> dict:
+    """:func:`_automation_row`, escalating the ticket when it fails."""
+    try:
+        return _automation_row(ticket_id, message, classification, similar_result)
+    except Exception:
+        # AI failure: escalate for safety (never block the rest of the batch)
+        logger.exception(f"AI pipeline failed for ticket {ticket_id}")
+        return {
+            "id": ticket_id,
+            "intent": None,
+            "confidence": None,
+            "sub_intent": None,
+            "status": TicketStatus.ESCALATED.value,
+            "response": None,
+            "response_source": None,
+        }
+
+
+def _automation_row(
+    ticket_id: int, message: str, classification: dict, similar_result: dict | None
+) -> dict:
+    """Decide one batch ticket and return its bulk UPDATE parameters."""
+    intent = classification["intent"]
+    confidence = classification["confidence"]
+    sub_intent = classification.get("sub_intent")
+    row = {
+        "id": ticket_id,
+        "intent": intent,
+        "confidence": confidence,
+        "sub_intent": sub_intent,
+        "status": TicketStatus.ESCALATED.value,
+        "response": None,
+        "response_source": None,
+    }
+
+    if decide_resolution(confidence) == "AUTO_RESOLVE":
+        response_text, response_source = generate_response(
+            intent,
+            message,
+            similar_solution=similar_result["ticket"]["response"] if similar_result else None,
+            sub_intent=sub_intent,
+            similar_quality_score=similar_result.get("quality_score") if similar_result else None,
+        )
+        row.update(
+            status=TicketStatus.AUTO_RESOLVED.value,
+            response=response_text,
+            response_source=response_source,
+        )
+        logger.info(
+            f"Ticket {ticket_id} auto_resolved with intent {intent} "
+            f"(confidence: {confidence})"
+        )
+    else:
+        logger.info(
+            f"Ticket {ticket_id} escalated with intent {intent} "
+            f"(confidence: {confidence})"
+        )
+    return row
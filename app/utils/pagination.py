@@ -0,0 +1,167 @@
+"""
+app/utils/pagination.py
+
+Purpose:
+Keyset (cursor) pagination and list totals for the ticket listing endpoints.
+
+Responsibilities:
+- Encode / decode opaque ``(created_at, id)`` cursors
+- Fetch one page newest-first with a keyset predicate, so page N costs the
+  same index range read as page 1 (no OFFSET rows to skip)
+- Produce list totals on request: exact, cached for a short TTL, or
+  estimated from planner statistics (PostgreSQL)
+
+DO NOT:
+- Apply access control or filters here (callers build the base query)
+"""
+
+import base64
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from datetime import datetime
+
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import Query
+
+from app.core.config import settings
+from app.models.ticket import Ticket
+
+logger = logging.getLogger(__name__)
+
+# Accepted values of the ``count`` query parameter
+COUNT_MODES = ("exact", "cached", "estimate", "none")
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor this server did not issue."""
+
+
+def encode_cursor(ticket: Ticket) -> str:
+    """Return the opaque cursor pointing just past *ticket*."""
+    payload = json.dumps([ticket.created_at.isoformat(), ticket.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Return the ``(created_at, id)`` position encoded in *cursor*."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, ticket_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid pagination cursor") from exc
+
+
+def keyset_page(
+    query: Query, limit: int, cursor: str | None = None, offset: int = 0
+) -> tuple[list[Ticket], str | None]:
+    """
+    Return one newest-first page of *query* and the cursor of the next page.
+
+    With *cursor* the page starts strictly after that position, so the cost
+    does not grow with depth. *offset* is kept for clients still paging by
+    number and is ignored when a cursor is given.
+
+    Returns:
+        ``(tickets, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    query = query.order_by(Ticket.created_at.desc(), Ticket.id.desc())
+    if cursor is not None:
+        created_at, ticket_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Ticket.created_at, Ticket.id) < tuple_(created_at, ticket_id))
+    elif offset:
+        query = query.offset(offset)
+    # One extra row tells whether another page exists without counting
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
+
+
+class _CountCache:
+    """
+    Per-filter list totals, recomputed at most once per TTL.
+
+    Entries are kept in write order. Every entry lives for the same TTL, so
+    the oldest write is also the first to expire: each insert drops expired
+    entries from the front, then the oldest ones beyond
+    LIST_COUNT_CACHE_MAX_KEYS (one key per status/user filter would
+    otherwise grow without bound).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: OrderedDict[Hashable, tuple[float, int]] = OrderedDict()
+
+    def get_or_count(self, key: Hashable, count: Callable[[], int]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._counts.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        total = count()
+        with self._lock:
+            self._counts.pop(key, None)
+            self._counts[key] = (now + settings.LIST_COUNT_CACHE_SECONDS, total)
+            self._prune(now)
+        return total
+
+    def _prune(self, now: float) -> None:
+        while self._counts:
+            expires_at, _ = next(iter(self._counts.values()))
+            if expires_at > now and len(self._counts) <= settings.LIST_COUNT_CACHE_MAX_KEYS:
+                break
+            self._counts.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+list_counts = _CountCache()
+
+
+def _estimate_count(query: Query) -> int | None:
+    """Row estimate for *query* from the PostgreSQL planner, or None elsewhere."""
+    session = query.session
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    statement = query.order_by(None).statement.compile(
+        dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = session.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def list_total(query: Query, mode: str, key: Hashable) -> int | None:
+    """
+    Return the total row count of *query* according to *mode*.
+
+    Args:
+        mode: ``exact`` counts now; ``cached`` reuses a count younger than
+            LIST_COUNT_CACHE_SECONDS (totals may lag recent writes by that
+            much); ``estimate`` uses planner statistics where available and
+            falls back to ``cached``; ``none`` skips the count.
+        key: Identifies the filter combination for the cache.
+    """
+    if mode == "none":
+        return None
+    if mode == "exact":
+        return query.order_by(None).count()
+    if mode == "estimate":
+        try:
+            estimate = _estimate_count(query)
+        except Exception:
+            logger.debug("Planner row estimate failed; counting instead", exc_info=True)
+            estimate = None
+        if estimate is not None:
+            return estimate
+    return list_counts.get_or_count(key, lambda: query.order_by(None).count())
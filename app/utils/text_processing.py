@@ -6,7 +6,7 @@ Shared text processing utilities for TF-IDF tokenization.
 
 import math
 import re
-from typing import Dict, List
+from typing import Dict, Iterable, List, Mapping
 from collections import Counter
 from app.utils.service_helpers import ValidationHelper
 
@@ -40,22 +40,40 @@ def compute_idf(corpus: List[str]) -> Dict[str, float]:
     Returns:
         Dictionary of word -> IDF score
     """
-    total_docs = len(corpus)
+    return idf_from_document_frequencies(document_frequencies(corpus), len(corpus))
+
+
+def document_frequencies(corpus: Iterable[str]) -> Counter:
+    """
+    Count the documents in *corpus* containing each word.
+
+    Args:
+        corpus: Texts to count
+
+    Returns:
+        Counter of word -> number of documents containing it
+    """
     doc_counts = Counter()
-    
-    # Count documents containing each word
     for doc_text in corpus:
-        doc_tokens = set(tokenize(doc_text))
-        for token in doc_tokens:
-            doc_counts[token] += 1
-    
-    # Calculate IDF for each word
-    idf_scores = {}
-    for word in doc_counts:
-        idf = math.log((total_docs + 1) / (doc_counts[word] + 1)) + 1
-        idf_scores[word] = idf
-    
-    return idf_scores
+        doc_counts.update(set(tokenize(doc_text)))
+    return doc_counts
+
+
+def idf_from_document_frequencies(doc_counts: Mapping[str, int], total_docs: int) -> Dict[str, float]:
+    """
+    Turn document frequencies into IDF scores.
+
+    Args:
+        doc_counts: Word -> number of documents containing it
+        total_docs: Number of documents the counts were taken over
+
+    Returns:
+        Dictionary of word -> IDF score (same formula as compute_idf)
+    """
+    return {
+        word: math.log((total_docs + 1) / (count + 1)) + 1
+        for word, count in doc_counts.items()
+    }
 
 
 def tf_idf_vector(text: str, idf: Dict[str, float]) -> Dict[str, float]:
@@ -0,0 +1,116 @@
+"""
+benchmarks/compare.py
+
+Purpose:
+--------
+Compare a benchmark run against a saved baseline and flag regressions.
+
+Both files are the JSON written by ``benchmarks/suite.py --json``. Results
+are matched by name (``<benchmark>@<corpus size>``). A result regressed when
+its metric (p50 latency by default) grew by more than --threshold; the exit
+status is 1 when anything regressed, so CI can gate on it.
+
+Latency depends on the machine: compare runs from the same host, database
+backend and Python version (a mismatch is reported as a warning).
+
+Usage:
+------
+    python benchmarks/compare.py current.json baseline.json [--threshold 0.25] [--metric p50_us]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+METRICS = ("p50_us", "p95_us", "p99_us", "mean_us")
+MATCHED_META = ("python", "platform", "database", "seed")
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.25, metric: str = "p50_us") -> list[dict]:
+    """
+    Return one row per benchmark name found in either run.
+
+    ``status`` is ``regression`` / ``improvement`` when the metric moved by
+    more than *threshold* (a fraction), else ``ok``; ``new`` and ``missing``
+    mark names present in only one run, ``skipped`` a result without the metric.
+    """
+    current_results = {result["name"]: result for result in current["results"]}
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    rows = []
+    for name in sorted(current_results.keys() | baseline_results.keys()):
+        now, before = current_results.get(name), baseline_results.get(name)
+        row = {"name": name, "baseline": before and before.get(metric), "current": now and now.get(metric)}
+        if before is None:
+            row["status"] = "new"
+        elif now is None:
+            row["status"] = "missing"
+        elif not row["baseline"] or row["current"] is None:
+            row["status"] = "skipped"
+        else:
+            row["change"] = row["current"] / row["baseline"] - 1
+            if row["change"] > threshold:
+                row["status"] = "regression"
+            elif row["change"] < -threshold:
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def meta_mismatches(current: dict, baseline: dict) -> list[str]:
+    """Names of environment fields that differ between the two runs."""
+    now, before = current.get("meta", {}), baseline.get("meta", {})
+    return [key for key in MATCHED_META if now.get(key) != before.get(key)]
+
+
+def print_report(rows: list[dict], metric: str, threshold: float) -> None:
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>9}  status  ({metric}, ±{threshold:.0%})")
+    for row in rows:
+        baseline = f"{row['baseline']:.1f}" if row["baseline"] is not None else "-"
+        current = f"{row['current']:.1f}" if row["current"] is not None else "-"
+        change = f"{row['change']:+.1%}" if "change" in row else ""
+        print(f"{row['name']:<40} {baseline:>12} {current:>12} {change:>9}  {row['status']}")
+
+
+def load(path: Path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def report(current: dict, baseline: dict, threshold: float, metric: str) -> int:
+    """Print the comparison; return the exit status (1 if anything regressed)."""
+    mismatches = meta_mismatches(current, baseline)
+    if mismatches:
+        print(f"warning: runs differ in {', '.join(mismatches)}; latencies may not be comparable")
+    rows = compare(current, baseline, threshold, metric)
+    print_report(rows, metric, threshold)
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------------------------
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Flag benchmark regressions against a saved baseline.")
+    parser.add_argument("current", type=Path, help="Results of the run to check.")
+    parser.add_argument("baseline", type=Path, help="Saved baseline results.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative slowdown before flagging (default 0.25 = 25%%).")
+    parser.add_argument("--metric", choices=METRICS, default="p50_us")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    return report(load(args.current), load(args.baseline), args.threshold, args.metric)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
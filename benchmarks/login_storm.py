@@ -0,0 +1,185 @@
+"""
+benchmarks/login_storm.py
+
+Purpose:
+--------
+Show whether ticket creation stays responsive while a burst of logins
+(bcrypt verifications) hits the same process.
+
+Each mode runs two phases against an in-process ASGI client and a
+throwaway SQLite database:
+
+- ``baseline``: POST /tickets/ alone
+- ``storm``:    the same ticket load while --logins concurrent logins run
+
+and reports ticket-creation p50 / p99 / max for both, plus how the logins
+were answered (200, or 503 when the bcrypt queue was full).
+
+Modes:
+------
+- ``pool``:       bcrypt in its process pool (BCRYPT_POOL_WORKERS / BCRYPT_MAX_PENDING)
+- ``threadpool``: bcrypt in the request threadpool with no queue bound,
+                  i.e. the behaviour before app/core/bcrypt_executor.py
+
+Usage:
+------
+    python benchmarks/login_storm.py [--mode both] [--tickets 200] [--logins 400] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add project root to path so the benchmark can be run directly
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# A throwaway database; must be set before the app is imported
+_db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_db_file.close()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file.name}"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("DEBUG", "false")  # no SQL echo
+
+import httpx  # noqa: E402
+
+from app.core.bcrypt_executor import bcrypt_executor  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.limiter import limiter  # noqa: E402
+from app.main import create_app  # noqa: E402
+
+EMAIL = "storm@example.com"
+PASSWORD = "Password123!"
+
+
+def _summary(latencies: list[float]) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def _create_tickets(client: httpx.AsyncClient, count: int, concurrency: int, inline: bool) -> list[float]:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    params = {} if inline else {"async": "true"}
+
+    async def one(n: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/tickets/", params=params, json={"message": f"I cannot log in to my account ({n})"})
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    await asyncio.gather(*(one(n) for n in range(count)))
+    return latencies
+
+
+async def _login_storm(client: httpx.AsyncClient, count: int, concurrency: int) -> Counter:
+    statuses: Counter = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            response = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            statuses[response.status_code] += 1
+
+    await asyncio.gather(*(one() for _ in range(count)))
+    return statuses
+
+
+async def run_mode(mode: str, args) -> dict:
+    if mode == "pool":
+        settings.BCRYPT_POOL_WORKERS = args.workers
+        settings.BCRYPT_MAX_PENDING = args.max_pending
+    else:
+        settings.BCRYPT_POOL_WORKERS = 0
+        settings.BCRYPT_MAX_PENDING = sys.maxsize
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post("/auth/register", json={"email": EMAIL, "password": PASSWORD})
+            if response.status_code not in (200, 400):  # 400: registered by the other mode
+                response.raise_for_status()
+            # Warm up (starts the bcrypt workers, loads the classifier)
+            await _login_storm(client, bcrypt_executor.workers or 1, bcrypt_executor.workers or 1)
+            await _create_tickets(client, 10, args.ticket_concurrency, args.inline)
+
+            baseline = await _create_tickets(client, args.tickets, args.ticket_concurrency, args.inline)
+            storm = asyncio.create_task(_login_storm(client, args.logins, args.login_concurrency))
+            await asyncio.sleep(0.05)  # let the storm build up first
+            during = await _create_tickets(client, args.tickets, args.ticket_concurrency, args.inline)
+            logins = await storm
+
+    return {
+        "mode": mode,
+        "bcrypt_workers": bcrypt_executor.workers,
+        "baseline": _summary(baseline),
+        "storm": _summary(during),
+        "logins": {str(code): count for code, count in sorted(logins.items())},
+    }
+
+
+def _print(result: dict) -> None:
+    print(f"\n[{result['mode']}] bcrypt workers: {result['bcrypt_workers'] or 'threadpool'}")
+    for phase in ("baseline", "storm"):
+        row = result[phase]
+        print(f"  {phase:<9} tickets={row['requests']:<5} p50={row['p50_ms']:>8.2f}ms  "
+              f"p99={row['p99_ms']:>8.2f}ms  max={row['max_ms']:>8.2f}ms")
+    print(f"  logins by status: {result['logins']}")
+
+
+# ---------------------------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------------------------
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Ticket-creation latency during a login storm (bcrypt pool vs threadpool).",
+    )
+    parser.add_argument("--mode", choices=("pool", "threadpool", "both"), default="both")
+    parser.add_argument("--tickets", type=int, default=200, help="Ticket creations per phase.")
+    parser.add_argument("--ticket-concurrency", type=int, default=4)
+    parser.add_argument("--logins", type=int, default=400, help="Logins in the storm.")
+    parser.add_argument("--login-concurrency", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="bcrypt processes in pool mode (default: one per core).")
+    parser.add_argument("--max-pending", type=int, default=settings.BCRYPT_MAX_PENDING,
+                        help="BCRYPT_MAX_PENDING in pool mode.")
+    parser.add_argument("--inline", action="store_true",
+                        help="Run ticket automation inline instead of ?async=true.")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> list[dict]:
+    args = _parse_args(argv)
+    limiter.enabled = False  # the storm would trip the per-IP limits
+    modes = ("threadpool", "pool") if args.mode == "both" else (args.mode,)
+    results = []
+    try:
+        for mode in modes:
+            result = asyncio.run(run_mode(mode, args))
+            _print(result)
+            results.append(result)
+    finally:
+        os.unlink(_db_file.name)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
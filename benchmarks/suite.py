@@ -0,0 +1,371 @@
+"""
+benchmarks/suite.py
+
+Purpose:
+--------
+Reproducible throughput / latency benchmarks for the ticket pipeline.
+
+For each corpus size (synthetic resolved tickets across the six intents,
+see benchmarks/corpus.py) the suite measures:
+
+- ``classify_intent``          per message (corpus independent, run once)
+- ``generate_response``        template path (no OpenAI key), run once
+- ``find_similar_ticket``      linear TF-IDF scan over the corpus as a list;
+                               skipped above --linear-max (it is O(corpus) per call)
+- ``find_similar_in_index``    the inverted index the request path uses
+- ``post_ticket``              end-to-end POST /tickets/ (inline automation)
+                               through an in-process ASGI client, against the
+                               corpus seeded into the database
+
+Every result reports ops/s and mean / p50 / p95 / p99 / max latency in
+microseconds. --json writes the results plus the environment they were
+measured in; --baseline compares this run against a saved one and exits
+with status 1 on regressions (see benchmarks/compare.py). --login-storm
+also runs benchmarks/login_storm.py (bcrypt pool mode) and records its
+ticket latencies without and during the storm.
+
+The database defaults to a throwaway SQLite file. --database-url accepts a
+PostgreSQL URL too; use a dedicated database, since its tickets table is
+emptied and re-seeded for every corpus size. Redis and OpenAI are disabled
+so runs only measure this process.
+
+Usage:
+------
+    python benchmarks/suite.py [--sizes 1000,10000] [--json out.json] [--baseline base.json]
+    python benchmarks/suite.py --sizes 1000000 --skip post_ticket   # 1M-ticket index only
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add project root to path so the benchmark can be run directly
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.compare import report  # noqa: E402
+from benchmarks.corpus import iter_resolved_tickets, query_messages, seed_tickets  # noqa: E402
+
+BENCHMARKS = (
+    "classify_intent", "generate_response", "find_similar_ticket", "find_similar_in_index", "post_ticket",
+)
+
+
+def _stats(durations_ns: list[int]) -> dict:
+    ordered = sorted(durations_ns)
+    count = len(ordered)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(count - 1, int(count * q))] / 1000, 2)
+
+    total_s = sum(ordered) / 1e9
+    return {
+        "ops": count,
+        "ops_per_s": round(count / total_s, 1) if total_s else None,
+        "mean_us": round(sum(ordered) / count / 1000, 2),
+        "p50_us": percentile(0.50),
+        "p95_us": percentile(0.95),
+        "p99_us": percentile(0.99),
+        "max_us": round(ordered[-1] / 1000, 2),
+    }
+
+
+def _time_calls(fn, inputs) -> dict:
+    durations = []
+    for item in inputs:
+        started = time.perf_counter_ns()
+        fn(item)
+        durations.append(time.perf_counter_ns() - started)
+    return _stats(durations)
+
+
+def _result(benchmark: str, stats: dict, corpus_size: int | None = None, **extra) -> dict:
+    name = benchmark if corpus_size is None else f"{benchmark}@{corpus_size}"
+    return {"name": name, "benchmark": benchmark, "corpus_size": corpus_size, **stats, **extra}
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_classify(queries: list[str], warmup: list[str]) -> dict:
+    from app.services.classifier import classify_intent
+
+    for message in warmup:
+        classify_intent(message)
+    return _result("classify_intent", _time_calls(classify_intent, queries))
+
+
+def bench_generate_response(queries: list[str], warmup: list[str]) -> dict:
+    from app.services.classifier import classify_intent
+    from app.services.response_generator import generate_response
+
+    def inputs(messages):
+        for message in messages:
+            classification = classify_intent(message)
+            yield classification["intent"], message, classification.get("sub_intent")
+
+    sources = Counter()
+
+    def call(args):
+        intent, message, sub_intent = args
+        sources[generate_response(intent, message, sub_intent=sub_intent)[1]] += 1
+
+    for args in inputs(warmup):
+        call(args)
+    sources.clear()
+    calls = list(inputs(queries))
+    return _result("generate_response", _time_calls(call, calls), sources=dict(sources))
+
+
+def bench_find_similar_ticket(size: int, queries: list[str], seed: int) -> dict:
+    from app.services.similarity_search import find_similar_ticket, similarity_cache
+
+    corpus = list(iter_resolved_tickets(size, seed))
+    similarity_cache.clear()
+    matches = Counter()
+
+    def call(message):
+        matches[find_similar_ticket(message, corpus) is not None] += 1
+
+    return _result("find_similar_ticket", _time_calls(call, queries), size, matched=matches[True])
+
+
+def bench_index_search(size: int, queries: list[str], warmup: list[str], seed: int) -> dict:
+    from app.services.similarity_index import InvertedIndex
+    from app.services.similarity_search import find_similar_in_index, similarity_cache
+
+    index = InvertedIndex()
+    started = time.perf_counter()
+    for ticket_id, ticket in enumerate(iter_resolved_tickets(size, seed), start=1):
+        index.add(ticket_id, ticket["message"], ticket["response"], ticket["quality_score"])
+    build_s = round(time.perf_counter() - started, 2)
+
+    similarity_cache.clear()
+    for message in warmup:
+        find_similar_in_index(message, index)
+    matches = Counter()
+
+    def call(message):
+        matches[find_similar_in_index(message, index) is not None] += 1
+
+    stats = _time_calls(call, queries)
+    similarity_cache.clear()
+    return _result("find_similar_in_index", stats, size, matched=matches[True], index_build_s=build_s)
+
+
+async def _post_tickets(client, messages: list[str], concurrency: int) -> tuple[list[int], Counter]:
+    durations: list[int] = []
+    statuses: Counter = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(message: str) -> None:
+        async with semaphore:
+            started = time.perf_counter_ns()
+            response = await client.post("/tickets/", json={"message": message})
+            durations.append(time.perf_counter_ns() - started)
+            statuses[response.status_code] += 1
+
+    await asyncio.gather(*(one(message) for message in messages))
+    return durations, statuses
+
+
+async def bench_post_ticket(size: int, queries: list[str], warmup: list[str], seed: int, concurrency: int) -> dict:
+    import httpx
+
+    from app.db.session import engine, init_db
+    from app.main import create_app
+    from app.services.similarity_index import similarity_index
+    from app.services.similarity_search import similarity_cache
+
+    init_db()
+    started = time.perf_counter()
+    seed_tickets(engine, size, seed)
+    seed_s = round(time.perf_counter() - started, 2)
+    similarity_index.reset()
+    similarity_cache.clear()
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await _post_tickets(client, warmup, 1)  # the first request loads the similarity index
+            wall = time.perf_counter()
+            durations, statuses = await _post_tickets(client, queries, concurrency)
+            wall = time.perf_counter() - wall
+
+    stats = _stats(durations)
+    stats["ops_per_s"] = round(len(durations) / wall, 1)  # wall clock: requests may overlap
+    return _result(
+        "post_ticket", stats, size,
+        statuses={str(code): count for code, count in sorted(statuses.items())},
+        concurrency=concurrency, seed_s=seed_s,
+    )
+
+
+def run_login_storm(args) -> list[dict]:
+    """Run benchmarks/login_storm.py (pool mode) in its own process; it owns its database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "login_storm.json"
+        subprocess.run(
+            [
+                sys.executable, str(project_root / "benchmarks" / "login_storm.py"),
+                "--mode", "pool", "--tickets", str(args.requests), "--json", str(out),
+            ],
+            check=True,
+        )
+        storm_results = json.loads(out.read_text())
+    results = []
+    for storm in storm_results:
+        for phase in ("baseline", "storm"):
+            row = storm[phase]
+            stats = {
+                "ops": row["requests"],
+                "p50_us": row["p50_ms"] * 1000,
+                "p99_us": row["p99_ms"] * 1000,
+                "max_us": row["max_ms"] * 1000,
+            }
+            results.append(_result(f"login_storm.{storm['mode']}.{phase}", stats, logins=storm["logins"]))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Suite
+# ---------------------------------------------------------------------------
+
+def run_suite(args) -> dict:
+    from app.core.limiter import limiter
+    from app.db.session import engine
+
+    limiter.enabled = False  # one client sends every request
+    selected = [name for name in BENCHMARKS if name not in args.skip]
+    warmup = query_messages(args.warmup, seed=args.seed + 1)
+    queries = query_messages(args.queries, seed=args.seed)
+    results = []
+
+    def record(result: dict) -> None:
+        results.append(result)
+        print(f"{result['name']:<40} ops={result['ops']:<6} p50={result['p50_us']:>10.1f}us  "
+              f"p99={result['p99_us']:>10.1f}us  ops/s={result.get('ops_per_s') or '-'}", flush=True)
+
+    if "classify_intent" in selected:
+        record(bench_classify(queries, warmup))
+    if "generate_response" in selected:
+        record(bench_generate_response(queries, warmup))
+    for size in args.sizes:
+        if "find_similar_ticket" in selected and size <= args.linear_max:
+            record(bench_find_similar_ticket(size, queries[:args.linear_queries], args.seed))
+        if "find_similar_in_index" in selected:
+            record(bench_index_search(size, queries, warmup, args.seed))
+        if "post_ticket" in selected:
+            record(asyncio.run(bench_post_ticket(
+                size, queries[:args.requests], warmup, args.seed, args.concurrency
+            )))
+    if args.login_storm:
+        for result in run_login_storm(args):
+            record(result)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": engine.dialect.name,
+            "sizes": args.sizes,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _configure_environment(args) -> str | None:
+    """Point the app at the benchmark database; return a temp file to delete, if any."""
+    db_file = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        handle = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        handle.close()
+        db_file = handle.name
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    os.environ["DEBUG"] = "false"  # no SQL echo
+    os.environ["OPENAI_API_KEY"] = ""  # template responses only
+    os.environ["REDIS_URL"] = ""
+    os.environ["TICKET_AUTOMATION_ASYNC"] = "false"
+    os.environ["EMBEDDINGS_PATH"] = str(Path(tempfile.gettempdir()) / "srs-benchmark-no-embeddings.json")
+    os.environ["EMBEDDINGS_RELOAD_SECONDS"] = "0"
+    return db_file
+
+
+# ---------------------------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------------------------
+
+def _sizes(value: str) -> list[int]:
+    return [int(size.replace("_", "")) for size in value.split(",") if size]
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput / latency benchmarks for the ticket pipeline.")
+    parser.add_argument("--sizes", type=_sizes, default=_sizes("1000,10000"),
+                        help="Comma-separated corpus sizes (resolved tickets), e.g. 1000,1000000.")
+    parser.add_argument("--queries", type=int, default=500, help="Measured calls per micro benchmark.")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured calls before each benchmark.")
+    parser.add_argument("--requests", type=int, default=200, help="Measured POST /tickets/ per corpus size.")
+    parser.add_argument("--concurrency", type=int, default=1, help="POST /tickets/ in flight at once.")
+    parser.add_argument("--linear-max", type=int, default=10_000,
+                        help="Largest corpus for find_similar_ticket (linear scan).")
+    parser.add_argument("--linear-queries", type=int, default=20, help="Measured find_similar_ticket calls.")
+    parser.add_argument("--skip", nargs="*", choices=BENCHMARKS, default=[], help="Benchmarks to leave out.")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and query seed.")
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: a throwaway SQLite file).")
+    parser.add_argument("--login-storm", action="store_true", help="Also run benchmarks/login_storm.py.")
+    parser.add_argument("--json", type=Path, help="Write the results to this file.")
+    parser.add_argument("--baseline", type=Path, help="Compare against these saved results.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative p50 slowdown flagged as a regression (default 0.25).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    db_file = _configure_environment(args)
+    try:
+        results = run_suite(args)
+    finally:
+        if db_file:
+            from app.db.session import engine
+
+            engine.dispose()
+            os.unlink(db_file)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        return report(results, json.loads(args.baseline.read_text()), args.threshold, "p50_us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,10 @@ import os
 import time
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.db.session import get_db, Base
+from sqlalchemy.pool import NullPool
+from app.db.session import get_async_db, get_db, Base
 from app.main import app
 from app.models.ticket import Ticket
 from app.models.feedback import Feedback
@@ -105,19 +107,29 @@ def user_token(regular_user):
 
 
 @pytest.fixture(scope="function")
-def make_client(db_session):
+def make_client(db_session, temp_db):
     """Helper fixture to create TestClient with database override."""
+    # Async routes read the same temporary database through aiosqlite
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{temp_db}", poolclass=NullPool)
+    AsyncTestingSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
     def _create_client():
         def override_get_db():
             try:
                 yield db_session
             finally:
                 pass
+
+        async def override_get_async_db():
+            async with AsyncTestingSessionLocal() as db:
+                yield db
         
         app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_async_db] = override_get_async_db
         return TestClient(app)
     
-    return _create_client
+    yield _create_client
+    app.dependency_overrides.pop(get_async_db, None)
 
 
 @pytest.fixture(scope="function")
@@ -187,6 +199,25 @@ class TestAdminAPI:
         assert "escalation_rate_status" in metrics["system_health"]
         assert "feedback_coverage" in metrics["system_health"]
 
+        # Verify response cache metrics
+        assert metrics["response_cache"]["hits"] == 0
+        assert "saved_latency_seconds" in metrics["response_cache"]
+
+    def test_admin_metrics_served_from_rollup_unless_fresh(self, admin_client, admin_token, db_session):
+        """A second request reads the rollup; ?fresh=true re-aggregates."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        db_session.add(Ticket(message="Ticket 1", status="open"))
+        db_session.commit()
+        assert admin_client.get("/admin/metrics", headers=headers).json()["tickets"]["total"] == 1
+
+        db_session.add(Ticket(message="Ticket 2", status="open"))
+        db_session.commit()
+
+        assert admin_client.get("/admin/metrics", headers=headers).json()["tickets"]["total"] == 1
+        fresh = admin_client.get("/admin/metrics?fresh=true", headers=headers)
+        assert fresh.status_code == 200
+        assert fresh.json()["tickets"]["total"] == 2
+
     def test_admin_metrics_unauthorized(self, user_client, user_token):
         """Test admin metrics endpoint with regular user."""
         headers = {"Authorization": f"Bearer {user_token}"}
@@ -204,6 +235,82 @@ class TestAdminAPI:
         
         assert response.status_code == 401  # Unauthorized
 
+    def test_admin_requests_read_users_once_per_ttl(self, admin_client, admin_token, db_session):
+        """Repeat admin requests reuse the cached user; a role change applies at once."""
+        from sqlalchemy import event
+
+        user_reads = []
+
+        def count_user_reads(conn, cursor, statement, parameters, context, executemany):
+            if "FROM users" in statement:
+                user_reads.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count_user_reads)
+        try:
+            headers = {"Authorization": f"Bearer {admin_token}"}
+            for _ in range(3):
+                assert admin_client.get("/admin/tickets", headers=headers).status_code == 200
+            assert len(user_reads) == 1
+
+            admin = db_session.query(User).filter(User.email == "admin@test.com").one()
+            admin.role = "user"
+            db_session.commit()
+
+            assert admin_client.get("/admin/tickets", headers=headers).status_code == 403
+        finally:
+            event.remove(engine, "before_cursor_execute", count_user_reads)
+
+    def test_admin_metrics_history(self, admin_client, admin_token, db_session):
+        """History points come from the collector's buckets, zero-filled."""
+        from datetime import datetime
+        from app.services.metrics_history import record_history
+
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        db_session.add_all([
+            Ticket(message="Ticket 1", status="auto_resolved", created_at=datetime(2024, 5, 1, 10, 15)),
+            Ticket(message="Ticket 2", status="escalated", created_at=datetime(2024, 5, 1, 12, 40)),
+        ])
+        db_session.commit()
+        record_history(db_session, now=datetime(2024, 5, 1, 13, 0))
+
+        response = admin_client.get(
+            "/admin/metrics/history",
+            params={"from": "2024-05-01T10:00:00", "to": "2024-05-01T13:00:00", "bucket": "hour"},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["bucket"] == "hour"
+        assert [point["tickets"] for point in body["points"]] == [1, 0, 1]
+        assert body["points"][0]["auto_resolve_rate"] == 100.0
+        assert body["points"][2]["by_status"] == {"escalated": 1}
+
+    def test_admin_metrics_history_rejects_bad_ranges(self, admin_client, admin_token):
+        """Reversed ranges, too many buckets and unknown bucket sizes are 4xx."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        reversed_range = admin_client.get(
+            "/admin/metrics/history",
+            params={"from": "2024-05-02T00:00:00", "to": "2024-05-01T00:00:00"},
+            headers=headers,
+        )
+        assert reversed_range.status_code == 400
+        too_many = admin_client.get(
+            "/admin/metrics/history",
+            params={"from": "2020-01-01T00:00:00", "to": "2024-01-01T00:00:00", "bucket": "minute"},
+            headers=headers,
+        )
+        assert too_many.status_code == 400
+        assert "limit" in too_many.json()["error"]["message"]
+        assert admin_client.get(
+            "/admin/metrics/history", params={"bucket": "week"}, headers=headers
+        ).status_code == 400
+
+    def test_admin_metrics_history_unauthorized(self, user_client, user_token):
+        headers = {"Authorization": f"Bearer {user_token}"}
+        assert user_client.get("/admin/metrics/history", headers=headers).status_code == 403
+
     def test_admin_tickets_list_success(self, admin_client, admin_token, db_session):
         """Test successful admin tickets list retrieval."""
         # Create test tickets
@@ -302,6 +409,22 @@ class TestAdminAPI:
         assert pagination["has_next"] is True
         assert pagination["has_prev"] is False
 
+        # Continue with the cursor instead of a page number
+        cursor = pagination["next_cursor"]
+        response = admin_client.get(f"/admin/tickets?limit=2&cursor={cursor}", headers=headers)
+        second = response.json()
+        assert len(second["tickets"]) == 2
+        assert not {t["id"] for t in second["tickets"]} & {t["id"] for t in tickets_list}
+        assert second["pagination"]["has_prev"] is True
+        assert second["pagination"]["has_next"] is True
+
+    def test_admin_tickets_list_invalid_cursor(self, admin_client, admin_token):
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = admin_client.get("/admin/tickets?cursor=%%%", headers=headers)
+
+        assert response.status_code == 400
+        assert response.json()["error"]["code"] == "VALIDATION_ERROR"
+
     def test_admin_tickets_list_unauthorized(self, user_client, user_token):
         """Test admin tickets list endpoint with regular user."""
         headers = {"Authorization": f"Bearer {user_token}"}
@@ -11,6 +11,7 @@ Covers:
 - Token validation and protected routes
 - JWT token creation and decoding
 - User authentication helper functions
+- 503 + Retry-After when the bcrypt queue is full
 """
 
 import pytest
@@ -329,6 +330,22 @@ class TestAuthEndpoints:
         assert "error" in response.json()
         assert "Incorrect email or password" in response.json()["error"]["message"]
 
+    def test_login_sheds_load_when_bcrypt_queue_full(self, test_client, monkeypatch):
+        """A full bcrypt queue answers 503 with Retry-After instead of waiting."""
+        from app.core.config import settings
+
+        email = unique_email()
+        test_client.post("/auth/register", json={"email": email, "password": "Password123!"})
+        monkeypatch.setattr(settings, "BCRYPT_MAX_PENDING", 0)
+
+        response = test_client.post("/auth/login", json={"email": email, "password": "Password123!"})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(settings.BCRYPT_RETRY_AFTER_SECONDS)
+        assert response.json()["error"]["code"] == "SERVICE_UNAVAILABLE"
+        register = test_client.post("/auth/register", json={"email": unique_email(), "password": "Password123!"})
+        assert register.status_code == 503
+
     def test_protected_route_without_token(self, test_client):
         """Test accessing protected route without token returns 401."""
         response = test_client.get("/auth/me")
@@ -8,9 +8,12 @@ Covers:
 - CORS middleware is registered
 - GET /health returns the exact required response
 - Startup lifecycle calls init_db()
+- Startup lifecycle loads the embedding artifact
 - Shutdown lifecycle calls engine.dispose()
 - Demo router is registered and reachable
 - Health route is accessible at the top level (not nested)
+- GET /metrics serves request and pipeline-stage histograms labelled by
+  route template, and is not mounted when METRICS_ENABLED is off
 """
 import inspect
 from unittest.mock import patch
@@ -195,6 +198,17 @@ class TestLifespan:
                 pass  # entering & exiting the context triggers startup + shutdown
             mock_engine.dispose.assert_called_once()
 
+    def test_startup_loads_embedding_artifact(self):
+        """The configured embedding artifact is loaded as the similarity snapshot."""
+        with patch("app.main.init_db"), \
+             patch("app.main.engine"), \
+             patch("app.main.similarity_index") as mock_index:
+            from app.main import create_app
+            from app.core.config import settings
+            application = create_app()
+            with TestClient(application):
+                mock_index.load_artifact.assert_called_once_with(settings.EMBEDDINGS_PATH)
+
     def test_lifespan_function_exists(self):
         """The lifespan async context manager should be importable from main."""
         from app.main import lifespan
@@ -241,3 +255,48 @@ class TestRouterRegistration:
         assert client.get("/health").status_code == 200
         # Should NOT exist at /demo/health
         assert client.get("/demo/health").status_code == 404
+
+
+# ---------------------------------------------------------------------------
+# TestMetricsEndpoint — /metrics route
+# ---------------------------------------------------------------------------
+
+class TestMetricsEndpoint:
+    """Tests for the Prometheus /metrics endpoint."""
+
+    def test_requests_recorded_by_route_template(self):
+        """Concrete paths are reported under their route template."""
+        from app.core.telemetry import registry
+        registry.clear()
+        _, client = make_client()
+        client.get("/tickets/424242")
+        client.get("/nonexistent-route-xyz")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert 'srs_http_request_duration_seconds_count{method="GET",route="/tickets/{ticket_id}",status="404"} 1' in body
+        assert 'srs_http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in body
+        assert "424242" not in body
+
+    def test_ticket_pipeline_stages_recorded(self):
+        """An inline ticket creation times every pipeline stage."""
+        from app.core.telemetry import registry, stage_seconds
+        registry.clear()
+        _, client = make_client()
+        with client:
+            response = client.post("/tickets/", json={"message": "I forgot my password and cannot log in"})
+        assert response.status_code == 201
+
+        for stage in ("ticket_insert", "classify_intent", "similarity_lookup", "decide_resolution", "db_commit"):
+            assert stage_seconds.count(stage) == 1, stage
+        assert "srs_ticket_automation_duration_seconds_count" in client.get("/metrics").text
+
+    def test_disabled(self):
+        """METRICS_ENABLED=false mounts neither the middleware nor the route."""
+        from app.core.config import settings
+        with patch.object(settings, "METRICS_ENABLED", False):
+            _, client = make_client()
+        assert client.get("/metrics").status_code == 404
@@ -6,7 +6,11 @@ Covers:
 - get_db closes session after use
 - init_db creates tables (if available)
 - Base and SessionLocal
+- Pool options per backend and async URL derivation
+- get_async_db yields a working AsyncSession
 """
+import asyncio
+
 import pytest
 from sqlalchemy import text
 from sqlalchemy import exc as sqlalchemy_exc
@@ -371,3 +375,80 @@ class TestDatabaseSchemaValidation:
         expected_tickets_columns = ['id', 'message', 'intent', 'confidence', 'status', 'created_at']
         for col in expected_tickets_columns:
             assert col in tickets_columns, f"Column '{col}' missing from tickets table"
+
+
+class TestEngineOptions:
+    """Tests for engine_options() and async_database_url()."""
+
+    def test_sqlite_gets_no_pool_sizing(self):
+        options = _session_mod.engine_options("sqlite:///./app.db")
+        assert options == {"connect_args": {"check_same_thread": False}}
+
+    def test_postgres_pool_is_configured_from_settings(self, monkeypatch):
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 7)
+        monkeypatch.setattr(settings, "DATABASE_MAX_OVERFLOW", 3)
+        monkeypatch.setattr(settings, "DATABASE_STATEMENT_TIMEOUT_MS", 5000)
+
+        options = _session_mod.engine_options("postgresql://u:p@db/app")
+
+        assert options["pool_size"] == 7
+        assert options["max_overflow"] == 3
+        assert options["pool_pre_ping"] is True
+        assert options["pool_recycle"] == settings.DATABASE_POOL_RECYCLE_SECONDS
+        assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    def test_asyncpg_statement_timeout_uses_server_settings(self):
+        options = _session_mod.engine_options("postgresql+asyncpg://u:p@db/app")
+        assert "statement_timeout" in options["connect_args"]["server_settings"]
+
+    def test_statement_timeout_can_be_disabled(self, monkeypatch):
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "DATABASE_STATEMENT_TIMEOUT_MS", 0)
+        assert "connect_args" not in _session_mod.engine_options("postgresql://u:p@db/app")
+
+    def test_async_url_swaps_driver(self):
+        assert _session_mod.async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+        assert (
+            _session_mod.async_database_url("postgresql+psycopg2://u:p@db/app?sslmode=require")
+            == "postgresql+asyncpg://u:p@db/app?ssl=require"
+        )
+
+    def test_async_url_override(self, monkeypatch):
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "DATABASE_ASYNC_URL", "postgresql+asyncpg://x@y/z")
+        assert _session_mod.async_database_url() == "postgresql+asyncpg://x@y/z"
+
+    def test_async_url_unknown_driver_raises(self):
+        with pytest.raises(RuntimeError, match="DATABASE_ASYNC_URL"):
+            _session_mod.async_database_url("mysql://u:p@db/app")
+
+
+class TestGetAsyncDb:
+    """Tests for get_async_db() FastAPI dependency."""
+
+    def test_get_async_db_yields_working_session(self):
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        async def run():
+            try:
+                gen = _session_mod.get_async_db()
+                db = await gen.__anext__()
+                assert isinstance(db, AsyncSession)
+                assert await db.scalar(text("SELECT 1")) == 1
+                await gen.aclose()
+            finally:
+                await _session_mod.async_db.dispose()
+
+        asyncio.run(run())
+
+    def test_async_engine_is_rebuilt_after_dispose(self):
+        async def run():
+            first = _session_mod.async_db.engine
+            await _session_mod.async_db.dispose()
+            second = _session_mod.async_db.engine
+            await _session_mod.async_db.dispose()
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first is not second
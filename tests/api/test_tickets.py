@@ -7,6 +7,8 @@ Covers:
 - POST /tickets: ticket creation
 - GET /tickets: list tickets (with status filtering)
 - GET /tickets/{id}: get single ticket
+- POST /tickets/batch: bulk ingestion with per-item errors
+- POST /tickets?async=true: 202 + background automation, long-poll GET
 - Error handling and validation
 - Database integration
 """
@@ -119,6 +121,271 @@ class TestCreateTicket(BaseTestClass):
             assert "database" not in data["error"]["message"].lower()
 
 
+class TestCreateTicketBatch(BaseTestClass):
+    """Test cases for POST /tickets/batch endpoint."""
+
+    def test_batch_success_preserves_order(self):
+        """Every item is created, processed and returned in submission order."""
+        messages = ["I can't log into my account", "I was charged twice", "Dark mode request"]
+
+        response = client.post("/tickets/batch", json={"tickets": [{"message": m} for m in messages]})
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["created"] == 3
+        assert data["failed"] == 0
+        assert [item["index"] for item in data["results"]] == [0, 1, 2]
+        for item, message in zip(data["results"], messages):
+            assert item["error"] is None
+            self.assert_ticket_response(item["ticket"], message)
+            assert item["ticket"]["status"] in ["auto_resolved", "escalated"]
+            assert item["ticket"]["intent"] is not None
+
+    def test_batch_matches_single_ticket_pipeline(self):
+        """Batch automation gives the same outcome as POST /tickets."""
+        message = "I forgot my password and cannot login"
+        single = client.post("/tickets/", json={"message": message}).json()
+        batch = client.post("/tickets/batch", json={"tickets": [{"message": message}]}).json()
+
+        ticket = batch["results"][0]["ticket"]
+        for field in ("intent", "sub_intent", "confidence", "status"):
+            assert ticket[field] == single[field]
+
+    def test_invalid_items_are_reported_without_failing_batch(self):
+        """Malformed items get a per-item error; valid items are still created."""
+        response = client.post(
+            "/tickets/batch",
+            json={"tickets": [{"message": "Payment failed"}, {}, "not an object", {"message": 5}]},
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["created"] == 1
+        assert data["failed"] == 3
+        assert data["results"][0]["ticket"]["message"] == "Payment failed"
+        for item in data["results"][1:]:
+            assert item["ticket"] is None
+            assert item["error"]
+        assert "message" in data["results"][1]["error"]
+
+    def test_batch_size_limits(self):
+        """Empty and oversized batches are rejected as a whole."""
+        from app.constants import MAX_TICKET_BATCH_SIZE
+
+        assert client.post("/tickets/batch", json={"tickets": []}).status_code == 400
+        too_many = [{"message": "hello"}] * (MAX_TICKET_BATCH_SIZE + 1)
+        assert client.post("/tickets/batch", json={"tickets": too_many}).status_code == 400
+
+    def test_one_insert_and_one_update_statement(self):
+        """The batch is stored with one INSERT and resolved with one UPDATE."""
+        from sqlalchemy import event
+        from app.db.session import engine
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split()[0].upper())
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.post(
+                "/tickets/batch", json={"tickets": [{"message": f"refund order {i}"} for i in range(5)]}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert response.status_code == 201
+        assert statements.count("INSERT") == 1
+        assert statements.count("UPDATE") == 1
+
+    def test_response_failure_escalates_only_that_ticket(self):
+        """A response-generation error escalates its own ticket, not the batch."""
+        from app.services.response_generator import generate_response as real_generate
+
+        def flaky(intent, message, **kwargs):
+            if "twice" in message:
+                raise RuntimeError("provider down")
+            return real_generate(intent, message, **kwargs)
+
+        with patch("app.services.ticket_service.generate_response", side_effect=flaky):
+            response = client.post(
+                "/tickets/batch",
+                json={"tickets": [{"message": "I was charged twice for my payment"},
+                                  {"message": "I forgot my password and cannot login"}]},
+            )
+
+        assert response.status_code == 201
+        failed, ok = [item["ticket"] for item in response.json()["results"]]
+        assert failed["status"] == "escalated"
+        assert failed["intent"] is None
+        assert ok["intent"] == "login_issue"
+
+    def test_pipeline_failure_escalates_batch(self):
+        """A batch-wide AI failure escalates every ticket instead of failing."""
+        with patch("app.api.tickets.run_batch_automation", side_effect=RuntimeError("boom")):
+            response = client.post(
+                "/tickets/batch", json={"tickets": [{"message": "a"}, {"message": "b"}]}
+            )
+
+        assert response.status_code == 201
+        tickets = [item["ticket"] for item in response.json()["results"]]
+        assert [t["status"] for t in tickets] == ["escalated", "escalated"]
+        assert all(t["intent"] is None for t in tickets)
+
+    def test_batch_is_charged_per_ticket(self, reset_limiter, monkeypatch):
+        """Each submitted item costs one unit of the batch ticket budget."""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "RATE_LIMIT_BATCH_TICKETS_PER_MINUTE", 10)
+        six = {"tickets": [{"message": f"refund order {i}"} for i in range(6)]}
+
+        assert client.post("/tickets/batch", json=six).status_code == 201
+        assert client.post("/tickets/batch", json=six).status_code == 429
+        assert client.post("/tickets/batch", json={"tickets": six["tickets"][:4]}).status_code == 201
+        assert client.post("/tickets/batch", json={"tickets": [{"message": "one more"}]}).status_code == 429
+
+    def test_responses_generated_in_parallel_up_to_limit(self, monkeypatch):
+        """Per-ticket LLM calls overlap, at most OPENAI_MAX_CONCURRENCY at a time."""
+        import threading
+        import time
+
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "OPENAI_MAX_CONCURRENCY", 3)
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def slow_generate(intent, message, **kwargs):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return f"reply to {message}", "template"
+
+        confident = [{"intent": "payment_issue", "confidence": 0.95, "sub_intent": None}] * 8
+        with patch("app.services.ticket_service.classify_intents", return_value=confident), \
+                patch("app.services.ticket_service.generate_response", side_effect=slow_generate):
+            response = client.post(
+                "/tickets/batch", json={"tickets": [{"message": f"refund order {i}"} for i in range(8)]}
+            )
+
+        assert response.status_code == 201
+        tickets = [item["ticket"] for item in response.json()["results"]]
+        assert [t["response"] for t in tickets] == [f"reply to refund order {i}" for i in range(8)]
+        assert 1 < peak[0] <= 3
+
+    def test_authenticated_batch_sets_user_id(self, regular_user):
+        """The token's user owns every ticket of the batch."""
+        response = client.post(
+            "/tickets/batch",
+            json={"tickets": [{"message": "one"}, {"message": "two"}]},
+            headers={"Authorization": AuthHelper.create_user_token(regular_user.id)},
+        )
+
+        assert response.status_code == 201
+        assert all(item["ticket"]["user_id"] == regular_user.id for item in response.json()["results"])
+
+
+class TestAsyncTicketAutomation(BaseTestClass):
+    """Test cases for the async create mode (202 + background workers)."""
+
+    def test_async_create_returns_202_and_long_poll_sees_result(self):
+        """The ticket comes back open; GET ?wait= returns it once processed."""
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        with TestClient(app) as lifespan_client:
+            response = lifespan_client.post("/tickets/?async=true", json={"message": "I cannot login to my account"})
+            assert response.status_code == 202
+            created = response.json()
+            assert created["status"] == "open"
+            assert created["intent"] is None
+
+            polled = lifespan_client.get(f"/tickets/{created['id']}?wait=10")
+            assert polled.status_code == 200
+            assert polled.json()["status"] in ["auto_resolved", "escalated"]
+            assert polled.json()["intent"] == "login_issue"
+
+    def test_async_create_without_workers_falls_back_to_inline(self):
+        """Without a running worker pool the ticket is automated inline (201)."""
+        response = client.post("/tickets/?async=true", json={"message": "I cannot login to my account"})
+
+        assert response.status_code == 201
+        assert response.json()["status"] in ["auto_resolved", "escalated"]
+
+    def test_setting_enables_async_mode_by_default(self):
+        """TICKET_AUTOMATION_ASYNC makes 202 the default; ?async=false opts out."""
+        with patch("app.api.tickets.settings.TICKET_AUTOMATION_ASYNC", True), \
+                patch("app.api.tickets.automation_queue.submit", return_value=True) as submit:
+            queued = client.post("/tickets/", json={"message": "refund please"})
+            inline = client.post("/tickets/?async=false", json={"message": "refund please"})
+
+        assert queued.status_code == 202
+        assert inline.status_code == 201
+        submit.assert_called_once_with(queued.json()["id"])
+
+    def test_long_poll_returns_open_ticket_after_timeout(self, db):
+        """A ticket nobody processes is returned as-is once the wait expires."""
+        ticket = DatabaseHelper.create_ticket(db, "still waiting")
+
+        response = client.get(f"/tickets/{ticket.id}?wait=0.2")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "open"
+
+    def test_long_poll_skips_database_rechecks_until_marked_done(self, db):
+        """With Redis done markers, the poll loop only re-reads the ticket at the end."""
+        ticket = DatabaseHelper.create_ticket(db, "still waiting")
+
+        from app.api.tickets import _recheck_ticket
+
+        with patch("app.api.tickets.automation_queue.processed_elsewhere", return_value=False) as marker, \
+             patch("app.api.tickets.TICKET_WAIT_POLL_SECONDS", 0.05), \
+             patch("app.api.tickets._recheck_ticket", wraps=_recheck_ticket) as recheck:
+            response = client.get(f"/tickets/{ticket.id}?wait=0.3")
+
+        assert response.json()["status"] == "open"
+        assert marker.await_count >= 3
+        assert recheck.call_count == 1  # the final re-check at the deadline
+
+    def test_long_poll_releases_request_session_while_waiting(self, db):
+        """The request's session holds no transaction (nor pooled connection) during the wait."""
+        from app.db.session import SessionLocal, get_db
+        from app.main import app
+
+        ticket = DatabaseHelper.create_ticket(db, "still waiting")
+        held = SessionLocal()
+        in_transaction = []
+
+        async def wait_for(ticket_id, timeout):
+            in_transaction.append(held.in_transaction())
+            db.query(type(ticket)).filter_by(id=ticket.id).update({"status": "escalated"})
+            db.commit()
+            return True
+
+        original_override = app.dependency_overrides.get(get_db)
+        app.dependency_overrides[get_db] = lambda: held
+        try:
+            with patch("app.api.tickets.automation_queue.wait_for", side_effect=wait_for):
+                response = client.get(f"/tickets/{ticket.id}?wait=5")
+        finally:
+            if original_override is not None:
+                app.dependency_overrides[get_db] = original_override
+            else:
+                app.dependency_overrides.pop(get_db, None)
+            held.close()
+
+        assert in_transaction == [False]
+        assert response.json()["status"] == "escalated"
+
+    def test_long_poll_wait_is_bounded(self, db):
+        """Waits above MAX_TICKET_WAIT_SECONDS are rejected."""
+        ticket = DatabaseHelper.create_ticket(db)
+        assert client.get(f"/tickets/{ticket.id}?wait=3600").status_code == 400
+
+
 class TestListTickets:
     """Test cases for GET /tickets endpoint."""
 
@@ -198,6 +465,59 @@ class TestListTickets:
         assert len(data["tickets"]) == 5
         assert data["total"] == 10
 
+    def test_list_tickets_cursor_walks_every_ticket_once(self, db):
+        """Following next_cursor visits each ticket once, newest first."""
+        from tests.conftest import DatabaseHelper
+
+        created = [DatabaseHelper.create_ticket(db, f"Cursor message {i}").id for i in range(7)]
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            data = client.get("/tickets/", params=params).json()
+            seen.extend(ticket["id"] for ticket in data["tickets"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == sorted(created, reverse=True)
+
+    def test_list_tickets_invalid_cursor(self):
+        response = client.get("/tickets/", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    def test_list_tickets_count_modes(self, db):
+        """count=none skips the total; cached totals are reused until they expire."""
+        from tests.conftest import DatabaseHelper
+
+        DatabaseHelper.create_ticket(db, "First")
+        assert client.get("/tickets/", params={"count": "none"}).json()["total"] is None
+        assert client.get("/tickets/").json()["total"] == 1
+
+        DatabaseHelper.create_ticket(db, "Second")
+        assert client.get("/tickets/").json()["total"] == 1  # cached
+        assert client.get("/tickets/", params={"count": "exact"}).json()["total"] == 2
+        assert client.get("/tickets/", params={"count": "bogus"}).status_code in (400, 422)
+
+    def test_count_cache_drops_expired_and_oldest_keys(self, monkeypatch):
+        from app.core.config import settings
+        from app.utils import pagination
+
+        now = [100.0]
+        monkeypatch.setattr(pagination.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(settings, "LIST_COUNT_CACHE_SECONDS", 30.0)
+        monkeypatch.setattr(settings, "LIST_COUNT_CACHE_MAX_KEYS", 2)
+        cache = pagination._CountCache()
+
+        for user_id in (1, 2, 3):
+            cache.get_or_count(("tickets", None, user_id), lambda: user_id)
+        assert len(cache) == 2
+        assert cache.get_or_count(("tickets", None, 1), lambda: 10) == 10  # evicted, recounted
+
+        now[0] += 31  # every entry has expired; the next insert drops them
+        cache.get_or_count(("tickets", "open", None), lambda: 5)
+        assert len(cache) == 1
+
 
 class TestGetTicket(BaseTestClass):
     """Test cases for GET /tickets/{id} endpoint."""
@@ -307,11 +627,8 @@ class TestTicketAccessControl(BaseTestClass):
 
     def test_authenticated_create_sets_user_id(self, agent_token):
         """Test that authenticated ticket creation sets user_id."""
-        from app.main import app
-        from app.api.auth import decode_token
-        
-        # Mock the authentication to set a specific user ID
-        with patch("app.api.tickets.decode_token") as mock_decode:
+        # Mock token verification to set a specific user ID
+        with patch("app.services.auth_cache.decode_token") as mock_decode:
             mock_decode.return_value = {"sub": "123", "role": "user"}
             
             response = client.post(
@@ -336,11 +653,11 @@ class TestTicketAccessControl(BaseTestClass):
         ticket1 = DatabaseHelper.create_ticket(db, "User 1 Ticket", user1.id)
         ticket2 = DatabaseHelper.create_ticket(db, "User 2 Ticket", user2.id)
         
-        # Mock authentication for user 1
-        with patch("app.api.tickets.decode_token") as mock_decode:
+        # Mock token verification for user 1 (the token itself is not a real JWT)
+        with patch("app.services.auth_cache.decode_token") as mock_decode:
             mock_decode.return_value = {"sub": str(user1.id), "role": "user"}
             
-            response = client.get("/tickets/", headers={"Authorization": AuthHelper.create_user_token(str(user1.id))})
+            response = client.get("/tickets/", headers={"Authorization": "Bearer test-token"})
             data = response.json()
             
             # User 1 should only see their own ticket
@@ -404,3 +721,17 @@ class TestRateLimiting(BaseTestClass):
 
             resp = client.post("/tickets/", json={"message": "one too many"})
             assert resp.status_code == 429
+
+    def test_authenticated_user_has_own_limit(self, reset_limiter, regular_user):
+        """Anonymous clients exhausting the IP's limit do not throttle a signed-in user."""
+        with patch("app.api.tickets.classify_intent", return_value={"intent": "test", "confidence": 0.9}):
+            for i in range(60):
+                assert client.post("/tickets/", json={"message": f"anonymous {i}"}).status_code == 201
+            assert client.post("/tickets/", json={"message": "anonymous"}).status_code == 429
+
+            resp = client.post(
+                "/tickets/",
+                json={"message": "signed in"},
+                headers={"Authorization": AuthHelper.create_user_token(regular_user.id)},
+            )
+            assert resp.status_code == 201
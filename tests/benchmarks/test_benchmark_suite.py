@@ -0,0 +1,78 @@
+"""
+Tests for the benchmark suite helpers (benchmarks/corpus.py, compare.py, suite.py)
+
+Covers:
+- Corpora are deterministic per seed, spread over the six intents, and
+  classified as the intent they were generated for
+- Query messages are not copies of corpus tickets
+- Latency statistics (percentiles in microseconds)
+- Baseline comparison flags regressions / improvements beyond the
+  threshold, and reports new / missing results and environment mismatches
+"""
+from collections import Counter
+
+from app.services.classifier import classify_intent
+from benchmarks.compare import compare, meta_mismatches, report
+from benchmarks.corpus import INTENTS, iter_resolved_tickets, query_messages
+from benchmarks.suite import _stats
+
+
+def test_corpus_is_deterministic_and_balanced():
+    first = list(iter_resolved_tickets(60, seed=3))
+
+    assert first == list(iter_resolved_tickets(60, seed=3))
+    assert first != list(iter_resolved_tickets(60, seed=4))
+    assert Counter(ticket["intent"] for ticket in first) == {intent: 10 for intent in INTENTS}
+    assert len({ticket["message"] for ticket in first}) == 60
+
+
+def test_corpus_messages_classify_as_their_intent():
+    for ticket in iter_resolved_tickets(300):
+        assert classify_intent(ticket["message"])["intent"] == ticket["intent"], ticket["message"]
+
+
+def test_queries_are_not_corpus_messages():
+    corpus = {ticket["message"] for ticket in iter_resolved_tickets(500)}
+    assert not corpus & set(query_messages(500))
+
+
+def test_stats_in_microseconds():
+    stats = _stats([1_000 * n for n in range(1, 101)])  # 1..100 us
+
+    assert stats["ops"] == 100
+    assert stats["p50_us"] == 51.0
+    assert stats["p99_us"] == 100.0
+    assert stats["max_us"] == 100.0
+    assert stats["mean_us"] == 50.5
+
+
+def _run(**p50s) -> dict:
+    return {
+        "meta": {"python": "3.11", "database": "sqlite"},
+        "results": [{"name": name, "p50_us": value} for name, value in p50s.items()],
+    }
+
+
+def test_compare_flags_changes_beyond_threshold():
+    baseline = _run(fast=100.0, slow=100.0, steady=100.0, gone=100.0)
+    current = _run(fast=50.0, slow=130.0, steady=120.0, added=10.0)
+
+    statuses = {row["name"]: row["status"] for row in compare(current, baseline, threshold=0.25)}
+
+    assert statuses == {
+        "fast": "improvement", "slow": "regression", "steady": "ok", "gone": "missing", "added": "new",
+    }
+
+
+def test_report_exit_status(capsys):
+    baseline = _run(classify=100.0)
+
+    assert report(_run(classify=110.0), baseline, 0.25, "p50_us") == 0
+    assert report(_run(classify=200.0), baseline, 0.25, "p50_us") == 1
+    assert "1 regression(s): classify" in capsys.readouterr().out
+
+
+def test_meta_mismatch_reported():
+    other = _run()
+    other["meta"]["database"] = "postgresql"
+    assert meta_mismatches(other, _run()) == ["database"]
@@ -30,6 +30,8 @@ os.environ["SECRET_KEY"] = "test-secret-key-for-pytest"
 # Import app components after setting up environment
 from app.main import app
 from app.db.session import engine, init_db
+from app.models.metrics_history import MetricsHistory
+from app.models.metrics_rollup import MetricsRollup
 from app.models.ticket import Ticket
 from app.models.user import User
 from app.api.auth import create_access_token
@@ -67,6 +69,8 @@ class DatabaseHelper:
         with engine.connect() as conn:
             conn.execute(Ticket.__table__.delete())
             conn.execute(User.__table__.delete())
+            conn.execute(MetricsRollup.__table__.delete())
+            conn.execute(MetricsHistory.__table__.delete())
             conn.commit()
     
     @staticmethod
@@ -134,6 +138,63 @@ def db():
         db.close()
 
 
+@pytest.fixture(autouse=True)
+def reset_similarity_index():
+    """Drop the in-memory similarity index so tickets never leak across tests."""
+    from app.services.similarity_index import similarity_index
+    similarity_index.reset()
+    yield
+    similarity_index.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_similarity_cache():
+    """Drop locally cached similarity results and the corpus generation between tests."""
+    from app.services.similarity_index import corpus_generation
+    from app.services.similarity_search import similarity_cache
+    similarity_cache.clear()
+    corpus_generation.reset()
+    yield
+    similarity_cache.clear()
+    corpus_generation.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_redis_manager():
+    """Close the shared Redis clients and circuit breaker between tests."""
+    from app.services.redis_client import redis_manager
+    redis_manager.reset()
+    yield
+    redis_manager.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_response_cache():
+    """Drop cached LLM replies so generated responses never leak across tests."""
+    from app.services.response_cache import response_cache
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_list_counts():
+    """Drop cached ticket-list totals so counts never leak across tests."""
+    from app.utils.pagination import list_counts
+    list_counts.clear()
+    yield
+    list_counts.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_auth_cache():
+    """Drop cached tokens and users; tests reuse user ids across databases."""
+    from app.services.auth_cache import auth_cache
+    auth_cache.clear()
+    yield
+    auth_cache.clear()
+
+
 @pytest.fixture(autouse=True)
 def reset_limiter():
     """Reset rate limiter between tests."""
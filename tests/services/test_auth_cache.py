@@ -0,0 +1,177 @@
+"""
+Tests for app/services/auth_cache.py
+
+Covers:
+- Verified token claims are reused until the token's exp, bounded by LRU
+- Invalid tokens are not cached
+- Users are read once per AUTH_USER_CACHE_SECONDS
+- ORM updates (role change, deactivation, password reset) and deletes
+  invalidate the cached user; a rolled-back change keeps it invalid only
+  until the next read
+"""
+from datetime import timedelta
+
+import pytest
+from jose import JWTError
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.services.auth_cache as auth_cache_module
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.session import Base
+from app.models.user import User
+from app.services.auth_cache import auth_cache
+
+
+@pytest.fixture()
+def decode_calls(monkeypatch):
+    calls = []
+    real_decode = auth_cache_module.decode_token
+
+    def counting_decode(token):
+        calls.append(token)
+        return real_decode(token)
+
+    monkeypatch.setattr(auth_cache_module, "decode_token", counting_decode)
+    return calls
+
+
+@pytest.fixture()
+def database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    user_reads = []
+
+    def count_user_reads(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "FROM users" in statement:
+            user_reads.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_user_reads)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    yield Session, user_reads
+    engine.dispose()
+
+
+@pytest.fixture()
+def user_id(database):
+    Session, user_reads = database
+    with Session() as db:
+        user = User(email="cache@test.com", hashed_password="x", role="admin")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    user_reads.clear()
+    return user_id
+
+
+class TestTokenCache:
+
+    def test_repeat_verification_is_cached(self, decode_calls):
+        token = create_access_token({"sub": "1", "role": "admin"})
+
+        first = auth_cache.verify_token(token)
+        second = auth_cache.verify_token(token)
+
+        assert first == second
+        assert first["sub"] == "1"
+        assert len(decode_calls) == 1
+        assert auth_cache.stats()["token_hits"] == 1
+
+    def test_entry_expires_with_the_token(self, decode_calls, monkeypatch):
+        token = create_access_token({"sub": "1"}, expires_delta=timedelta(minutes=5))
+        auth_cache.verify_token(token)
+
+        later = auth_cache_module.time.time() + 600
+        monkeypatch.setattr(auth_cache_module.time, "time", lambda: later)
+
+        # Past exp the cached claims are dropped and the token is verified again
+        auth_cache.verify_token(token)
+        assert len(decode_calls) == 2
+
+    def test_invalid_token_is_not_cached(self, decode_calls):
+        for _ in range(2):
+            with pytest.raises(JWTError):
+                auth_cache.verify_token("not-a-token")
+        assert len(decode_calls) == 2
+        assert auth_cache.stats()["tokens"] == 0
+
+    def test_size_bound_evicts_least_recently_used(self, decode_calls, monkeypatch):
+        monkeypatch.setattr(settings, "AUTH_TOKEN_CACHE_SIZE", 2)
+        tokens = [create_access_token({"sub": str(n)}) for n in range(3)]
+        for token in tokens:
+            auth_cache.verify_token(token)
+
+        assert auth_cache.stats()["tokens"] == 2
+        auth_cache.verify_token(tokens[0])
+        assert len(decode_calls) == 4
+
+
+class TestUserCache:
+
+    def test_user_read_once_per_ttl(self, database, user_id, monkeypatch):
+        Session, user_reads = database
+        with Session() as db:
+            for _ in range(3):
+                user = auth_cache.get_user(db, user_id)
+                assert (user.id, user.email, user.role) == (user_id, "cache@test.com", "admin")
+        assert len(user_reads) == 1
+
+        snapshot_expiry = auth_cache_module.time.monotonic() + settings.AUTH_USER_CACHE_SECONDS + 1
+        monkeypatch.setattr(auth_cache_module.time, "monotonic", lambda: snapshot_expiry)
+        with Session() as db:
+            auth_cache.get_user(db, user_id)
+        assert len(user_reads) == 2
+
+    def test_unknown_user_is_not_cached(self, database):
+        Session, user_reads = database
+        with Session() as db:
+            assert auth_cache.get_user(db, 999) is None
+            assert auth_cache.get_user(db, 999) is None
+        assert len(user_reads) == 2
+
+    def test_disabled_with_zero_ttl(self, database, user_id, monkeypatch):
+        monkeypatch.setattr(settings, "AUTH_USER_CACHE_SECONDS", 0)
+        Session, user_reads = database
+        with Session() as db:
+            auth_cache.get_user(db, user_id)
+            auth_cache.get_user(db, user_id)
+        assert len(user_reads) == 2
+
+    @pytest.mark.parametrize("column, value", [
+        ("role", "user"),
+        ("is_active", False),
+        ("hashed_password", "new-hash"),
+    ])
+    def test_update_invalidates(self, database, user_id, column, value):
+        Session, _ = database
+        with Session() as db:
+            auth_cache.get_user(db, user_id)
+        with Session() as db:
+            user = db.get(User, user_id)
+            setattr(user, column, value)
+            db.commit()
+        with Session() as db:
+            assert getattr(auth_cache.get_user(db, user_id), column) == value
+
+    def test_delete_invalidates(self, database, user_id):
+        Session, _ = database
+        with Session() as db:
+            auth_cache.get_user(db, user_id)
+        with Session() as db:
+            db.delete(db.get(User, user_id))
+            db.commit()
+        with Session() as db:
+            assert auth_cache.get_user(db, user_id) is None
+
+    def test_rolled_back_change_is_not_served(self, database, user_id):
+        Session, _ = database
+        with Session() as db:
+            auth_cache.get_user(db, user_id)
+        with Session() as db:
+            db.get(User, user_id).role = "user"
+            db.flush()
+            db.rollback()
+            assert not db.info.get(auth_cache_module._PENDING_KEY)
+        with Session() as db:
+            assert auth_cache.get_user(db, user_id).role == "admin"
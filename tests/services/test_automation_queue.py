@@ -0,0 +1,301 @@
+"""
+Tests for app/services/automation_queue.py
+
+Covers:
+- process_queued_ticket: automates open tickets, skips processed ones,
+  escalates on pipeline failure
+- _AutomationWorkerPool: submit from another thread, wait_for wake-up,
+  fallback when not running or when the memory queue is full, drain on
+  stop, retry of failed tickets, startup sweep of stale open tickets
+- RedisAutomationQueue: BLMOVE onto the processing list, ack, reaper for
+  expired or missing leases, release on stop, one sweeping process
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import fakeredis
+from fakeredis import aioredis
+
+import app.services.automation_queue as queue_module
+from app.constants import TicketStatus
+from app.core.config import settings
+from app.models.ticket import Ticket
+from app.services.automation_queue import (
+    REDIS_LEASES_KEY,
+    REDIS_PROCESSING_KEY,
+    REDIS_QUEUE_KEY,
+    RedisAutomationQueue,
+    _AutomationWorkerPool,
+    process_queued_ticket,
+)
+
+
+def _open_ticket(db, message="I cannot login to my account"):
+    ticket = Ticket(message=message, status=TicketStatus.OPEN.value)
+    db.add(ticket)
+    db.commit()
+    db.refresh(ticket)
+    return ticket
+
+
+class TestProcessQueuedTicket:
+
+    def test_automates_open_ticket(self, db):
+        ticket = _open_ticket(db)
+
+        assert process_queued_ticket(ticket.id) in ("auto_resolved", "escalated")
+        db.refresh(ticket)
+        assert ticket.intent == "login_issue"
+
+    def test_skips_processed_and_missing_tickets(self, db):
+        ticket = _open_ticket(db)
+        ticket.status = TicketStatus.CLOSED.value
+        db.commit()
+
+        assert process_queued_ticket(ticket.id) is None
+        assert process_queued_ticket(999999) is None
+
+    def test_pipeline_failure_escalates(self, db):
+        ticket = _open_ticket(db)
+        with patch("app.services.automation_queue.run_ticket_automation", side_effect=RuntimeError("boom")):
+            assert process_queued_ticket(ticket.id) == TicketStatus.ESCALATED.value
+        db.refresh(ticket)
+        assert ticket.intent is None
+
+
+class TestWorkerPool:
+
+    def test_submit_without_running_pool_returns_false(self):
+        assert _AutomationWorkerPool().submit(1) is False
+
+    def test_submitted_ticket_is_processed_and_waiters_wake(self, db):
+        ticket = _open_ticket(db)
+        pool = _AutomationWorkerPool()
+
+        async def scenario():
+            await pool.start(workers=2, backend="memory")
+            try:
+                waiter = asyncio.create_task(pool.wait_for(ticket.id, timeout=5))
+                await asyncio.sleep(0)
+                # Sync endpoints submit from threadpool threads
+                assert await asyncio.to_thread(pool.submit, ticket.id) is True
+                return await waiter
+            finally:
+                await pool.stop()
+
+        assert asyncio.run(scenario()) is True
+        db.refresh(ticket)
+        assert ticket.status != TicketStatus.OPEN.value
+        assert not pool.running
+
+    def test_wait_for_times_out(self):
+        pool = _AutomationWorkerPool()
+
+        async def scenario():
+            await pool.start(workers=1, backend="memory")
+            try:
+                return await pool.wait_for(123, timeout=0.01)
+            finally:
+                await pool.stop()
+
+        assert asyncio.run(scenario()) is False
+        assert pool._completed == {}
+
+    def test_redis_backend_without_url_uses_memory(self):
+        pool = _AutomationWorkerPool()
+
+        async def scenario():
+            with patch.object(settings, "REDIS_URL", None):
+                await pool.start(workers=1, backend="redis")
+            try:
+                return type(pool._queue).__name__
+            finally:
+                await pool.stop()
+
+        assert asyncio.run(scenario()) == "InMemoryAutomationQueue"
+
+
+    def test_full_memory_queue_falls_back_to_inline(self, monkeypatch):
+        monkeypatch.setattr(settings, "AUTOMATION_QUEUE_MAX_SIZE", 1)
+        release = threading.Event()
+        monkeypatch.setattr(queue_module, "process_queued_ticket", lambda ticket_id: release.wait(5) and None)
+        pool = _AutomationWorkerPool()
+
+        async def scenario():
+            await pool.start(workers=1, backend="memory")
+            try:
+                assert await asyncio.to_thread(pool.submit, 1) is True
+                while not pool._in_flight:  # the worker holds ticket 1
+                    await asyncio.sleep(0.01)
+                assert await asyncio.to_thread(pool.submit, 2) is True
+                return await asyncio.to_thread(pool.submit, 3)
+            finally:
+                release.set()
+                await pool.stop()
+
+        assert asyncio.run(scenario()) is False
+
+    def test_stop_drains_the_memory_queue(self, db):
+        tickets = [_open_ticket(db, f"I cannot login, attempt {n}") for n in range(3)]
+        pool = _AutomationWorkerPool()
+
+        async def scenario():
+            await pool.start(workers=1, backend="memory")
+            for ticket in tickets:
+                assert pool.submit(ticket.id) is True
+            await asyncio.sleep(0)
+            await pool.stop(timeout=10)
+            return pool.submit(tickets[0].id)
+
+        assert asyncio.run(scenario()) is False  # stopped pools refuse work
+        for ticket in tickets:
+            db.refresh(ticket)
+            assert ticket.status != TicketStatus.OPEN.value
+
+    def test_failed_ticket_is_retried(self, monkeypatch):
+        monkeypatch.setattr(queue_module, "RETRY_DELAY_SECONDS", 0.01)
+        outcomes = iter([RuntimeError("database down"), TicketStatus.ESCALATED.value])
+        calls = []
+
+        def flaky(ticket_id):
+            calls.append(ticket_id)
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        monkeypatch.setattr(queue_module, "process_queued_ticket", flaky)
+        pool = _AutomationWorkerPool()
+
+        async def scenario():
+            await pool.start(workers=1, backend="memory")
+            try:
+                waiter = asyncio.create_task(pool.wait_for(7, timeout=5))
+                await asyncio.sleep(0)
+                pool.submit(7)
+                return await waiter
+            finally:
+                await pool.stop()
+
+        assert asyncio.run(scenario()) is True
+        assert calls == [7, 7]
+
+    def test_startup_sweep_queues_stale_open_tickets(self, db, monkeypatch):
+        monkeypatch.setattr(settings, "AUTOMATION_STALE_OPEN_SECONDS", 60)
+        stale = _open_ticket(db, "I cannot login to my account")
+        stale.created_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+        db.commit()
+        fresh = _open_ticket(db, "I was charged twice")
+        pool = _AutomationWorkerPool()
+
+        async def scenario():
+            await pool.start(workers=1, backend="memory")
+            try:
+                return await pool.wait_for(stale.id, timeout=5)
+            finally:
+                pool._accepting = False
+                await pool.stop()
+
+        assert asyncio.run(scenario()) is True
+        db.refresh(stale)
+        db.refresh(fresh)
+        assert stale.status != TicketStatus.OPEN.value
+        assert fresh.status == TicketStatus.OPEN.value
+
+
+def _redis_queue():
+    client = aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    return client, RedisAutomationQueue(client)
+
+
+class TestRedisAutomationQueue:
+
+    def test_taken_tickets_wait_for_ack(self):
+        client, queue = _redis_queue()
+
+        async def scenario():
+            await queue.put(42)
+            await queue.put(43)
+            taken = await queue.get()
+            processing = await client.lrange(REDIS_PROCESSING_KEY, 0, -1)
+            leased = await client.zscore(REDIS_LEASES_KEY, "42")
+            await queue.ack(taken)
+            after_ack = (await client.lrange(REDIS_PROCESSING_KEY, 0, -1), await client.zcard(REDIS_LEASES_KEY))
+            return taken, processing, leased, after_ack, await queue.queued_ids()
+
+        taken, processing, leased, after_ack, queued = asyncio.run(scenario())
+        assert taken == 42  # first in, first out
+        assert processing == ["42"]
+        assert leased is not None
+        assert after_ack == ([], 0)
+        assert queued == {43}
+
+    def test_get_returns_none_when_empty(self):
+        _, queue = _redis_queue()
+        assert asyncio.run(queue.get()) is None
+
+    def test_reaper_requeues_expired_and_unleased_tickets(self):
+        client, queue = _redis_queue()
+
+        async def scenario():
+            for ticket_id in (1, 2):
+                await queue.put(ticket_id)
+            await queue.get()  # 1: leased just now
+            await client.lmove(REDIS_QUEUE_KEY, REDIS_PROCESSING_KEY, "RIGHT", "LEFT")  # 2: taken, never leased
+            fresh = await queue.reap(visibility_timeout=60)
+            await client.zadd(REDIS_LEASES_KEY, {"1": time.time() - 120, "2": time.time() - 120})
+            expired = await queue.reap(visibility_timeout=60)
+            return fresh, expired, await client.lrange(REDIS_QUEUE_KEY, 0, -1), await client.zcard(REDIS_LEASES_KEY)
+
+        fresh, expired, queued, leases = asyncio.run(scenario())
+        assert fresh == 0
+        assert expired == 2
+        assert sorted(queued) == ["1", "2"]
+        assert leases == 0
+
+    def test_release_hands_tickets_back(self):
+        client, queue = _redis_queue()
+
+        async def scenario():
+            await queue.put(5)
+            await queue.get()
+            await queue.release([5])
+            await queue.release([5])  # already handed back: no duplicate
+            return await client.lrange(REDIS_QUEUE_KEY, 0, -1), await client.lrange(REDIS_PROCESSING_KEY, 0, -1)
+
+        assert asyncio.run(scenario()) == (["5"], [])
+
+    def test_pool_acknowledges_processed_tickets(self, db, monkeypatch):
+        ticket = _open_ticket(db)
+        client, queue = _redis_queue()
+        monkeypatch.setattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+        monkeypatch.setattr(RedisAutomationQueue, "from_url", classmethod(lambda cls, url: queue))
+        monkeypatch.setattr(queue, "close", lambda: asyncio.sleep(0))
+        pool = _AutomationWorkerPool()
+
+        async def scenario():
+            await pool.start(workers=1, backend="redis")
+            try:
+                waiter = asyncio.create_task(pool.wait_for(ticket.id, timeout=5))
+                await asyncio.sleep(0)
+                assert await asyncio.to_thread(pool.submit, ticket.id) is True
+                assert await waiter is True
+            finally:
+                await pool.stop()
+            return await client.lrange(REDIS_PROCESSING_KEY, 0, -1), await client.zcard(REDIS_LEASES_KEY)
+
+        assert asyncio.run(scenario()) == ([], 0)
+        db.refresh(ticket)
+        assert ticket.status != TicketStatus.OPEN.value
+
+    def test_only_one_process_sweeps(self):
+        client, first = _redis_queue()
+        second = RedisAutomationQueue(client)
+
+        async def scenario():
+            return await first.claim_sweep(60), await second.claim_sweep(60)
+
+        assert asyncio.run(scenario()) == (True, False)
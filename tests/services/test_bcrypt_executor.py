@@ -0,0 +1,77 @@
+"""
+Tests for app/core/bcrypt_executor.py
+
+Covers:
+- hash / verify round trip through the process pool and the threadpool mode
+- Work beyond BCRYPT_MAX_PENDING is rejected with ServiceUnavailableError
+  (retry_after set) and the pending count recovers afterwards
+- shutdown stops the pool and the next call starts a new one
+"""
+import asyncio
+
+import pytest
+
+from app.core.bcrypt_executor import _BcryptExecutor
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.security import hash_password
+
+
+@pytest.fixture()
+def executor():
+    executor = _BcryptExecutor()
+    yield executor
+    executor.shutdown()
+
+
+def test_process_pool_round_trip(executor, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_POOL_WORKERS", 1)
+
+    async def run():
+        hashed = await executor.hash("Password123!")
+        return hashed, await executor.verify("Password123!", hashed), await executor.verify("wrong", hashed)
+
+    hashed, good, bad = asyncio.run(run())
+
+    assert hashed.startswith("$2")
+    assert good is True
+    assert bad is False
+    assert executor.pending == 0
+
+
+def test_threadpool_mode(executor, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_POOL_WORKERS", 0)
+    hashed = hash_password("Password123!")
+
+    assert asyncio.run(executor.verify("Password123!", hashed)) is True
+    assert executor._pool is None
+
+
+def test_rejects_beyond_max_pending(executor, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_POOL_WORKERS", 1)
+    monkeypatch.setattr(settings, "BCRYPT_MAX_PENDING", 1)
+    monkeypatch.setattr(settings, "BCRYPT_RETRY_AFTER_SECONDS", 3)
+
+    async def run():
+        first = asyncio.create_task(executor.hash("Password123!"))
+        await asyncio.sleep(0)  # first is now pending
+        with pytest.raises(ServiceUnavailableError) as excinfo:
+            await executor.hash("Password123!")
+        await first
+        return excinfo.value
+
+    error = asyncio.run(run())
+
+    assert error.status_code == 503
+    assert error.details["retry_after"] == 3
+    assert executor.rejected == 1
+    assert executor.pending == 0
+
+
+def test_shutdown_restarts_on_next_use(executor, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_POOL_WORKERS", 1)
+    asyncio.run(executor.hash("Password123!"))
+    executor.shutdown()
+    assert executor._pool is None
+
+    assert asyncio.run(executor.hash("Password123!")).startswith("$2")
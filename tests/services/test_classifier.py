@@ -1,5 +1,7 @@
+import re
+
 import pytest
-from app.services.classifier import classify_intent
+from app.services.classifier import INTENT_PATTERNS, _MATCHER, _boundary_match, classify_intent, classify_intents
 
 
 def test_login_issue():
@@ -104,3 +106,44 @@ def test_classifier_sub_intent_reset():
     result = classify_intent("forgot my password")
     assert result["intent"] == "login_issue"
     assert result["sub_intent"] == "password_reset"
+
+
+MATCHER_MESSAGES = [
+    "i cannot login to my account please help me",
+    "sign in issue after the password reset",
+    "blog in the settings is broken",
+    "accessed my profile and it crashed",
+    "how do i explain billing to what is my invoice",
+    "somewhat is wrong with the 2fa two factor code",
+    "can you add a new feature would be great",
+    "contact you about double charge and refund",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", MATCHER_MESSAGES)
+def test_keyword_matcher_agrees_with_boundary_match(text):
+    """The precompiled matcher must find exactly the hits _boundary_match defines."""
+    hits = _MATCHER.match(text)
+    for config in INTENT_PATTERNS.values():
+        for keyword in config["keywords"]:
+            assert (keyword in hits) == _boundary_match(keyword, text), keyword
+        for pattern in config.get("patterns", []):
+            assert (pattern in hits.patterns) == bool(re.search(pattern, text)), pattern
+
+
+def test_keyword_matcher_finds_overlapping_phrases():
+    hits = _MATCHER.match("sign in issue")
+    assert "sign in issue" in hits
+    assert "sign in" in hits
+
+
+def test_classify_intents_matches_single_calls():
+    messages = MATCHER_MESSAGES + ["I cannot login to my account", None, 42]
+    assert classify_intents(messages) == [classify_intent(message) for message in messages]
+
+
+def test_classify_intents_results_are_independent():
+    first, second = classify_intents(["I was charged twice", "I was charged twice"])
+    first["intent"] = "changed"
+    assert second["intent"] == "payment_issue"
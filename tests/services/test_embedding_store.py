@@ -0,0 +1,170 @@
+"""
+Tests for app/services/embedding_store.py
+
+Covers:
+- load_embeddings: reads the embedding builder's JSON artifact into a
+  SparseScoringEngine whose scores match an engine built from raw messages
+- load_embeddings: build metadata, legacy artifacts, invalid files
+- artifact_signature: missing files
+- Binary format: same scores and metadata as JSON, arrays mapped in place,
+  pure-Python fallback, corrupt files
+"""
+import json
+
+import pytest
+
+import app.services.embedding_store as embedding_store
+import app.services.sparse_scoring as sparse_scoring
+from app.services.embedding_store import (
+    BINARY_MAGIC,
+    artifact_signature,
+    load_embeddings,
+    write_binary_embeddings,
+)
+from app.services.sparse_scoring import SparseScoringEngine
+from workers.embedding_builder import build_embeddings, save_embeddings
+
+
+TICKETS = [
+    {"id": 1, "message": "I cannot login to my account"},
+    {"id": 2, "message": "Payment was charged twice"},
+    {"id": 5, "message": "Password reset required for login"},
+]
+
+
+@pytest.fixture()
+def artifact(tmp_path):
+    data = build_embeddings(TICKETS)
+    data["last_ticket_id"] = 5
+    data["built_at"] = "2026-01-01T00:00:00+00:00"
+    path = tmp_path / "embeddings.json"
+    save_embeddings(data, path)
+    return path, data
+
+
+class TestLoadEmbeddings:
+
+    def test_scores_match_engine_built_from_messages(self, artifact):
+        path, data = artifact
+        snapshot = load_embeddings(path)
+        reference = SparseScoringEngine.from_documents(
+            [t["id"] for t in TICKETS], [t["message"] for t in TICKETS], idf=data["idf"]
+        )
+
+        query = "cannot login, password reset"
+        expected = reference.scores(query)
+        actual = snapshot.engine.scores(query)
+        assert actual.keys() == expected.keys()
+        for ticket_id, score in expected.items():
+            assert actual[ticket_id] == pytest.approx(score)
+
+    def test_reads_build_metadata(self, artifact):
+        path, _ = artifact
+        snapshot = load_embeddings(path)
+        assert snapshot.last_ticket_id == 5
+        assert snapshot.built_at == "2026-01-01T00:00:00+00:00"
+        assert snapshot.signature == artifact_signature(path)
+
+    def test_legacy_artifact_uses_max_ticket_id(self, tmp_path):
+        path = tmp_path / "legacy.json"
+        path.write_text(json.dumps(build_embeddings(TICKETS)))
+        assert load_embeddings(path).last_ticket_id == 5
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_embeddings(tmp_path / "missing.json")
+
+    def test_invalid_json_raises_value_error(self, tmp_path):
+        path = tmp_path / "broken.json"
+        path.write_text("{not json")
+        with pytest.raises(ValueError):
+            load_embeddings(path)
+
+    def test_missing_keys_raise_value_error(self, tmp_path):
+        path = tmp_path / "wrong.json"
+        path.write_text(json.dumps({"ticket_count": 0}))
+        with pytest.raises(ValueError):
+            load_embeddings(path)
+
+
+@pytest.fixture()
+def binary_artifact(tmp_path, artifact):
+    _, data = artifact
+    path = tmp_path / "embeddings.bin"
+    save_embeddings(data, path, fmt="binary")
+    return path
+
+
+class TestBinaryFormat:
+
+    QUERIES = ["cannot login, password reset", "charged twice", "unknown words"]
+
+    def test_file_starts_with_magic(self, binary_artifact):
+        assert binary_artifact.read_bytes().startswith(BINARY_MAGIC)
+
+    @pytest.mark.parametrize("query", QUERIES)
+    def test_scores_match_json_artifact(self, artifact, binary_artifact, query):
+        from_json = load_embeddings(artifact[0]).engine
+        from_binary = load_embeddings(binary_artifact).engine
+
+        expected = from_json.scores(query)
+        actual = from_binary.scores(query)
+        assert actual.keys() == expected.keys()
+        for ticket_id, score in expected.items():
+            assert actual[ticket_id] == pytest.approx(score, abs=1e-6)
+        assert [t for t, _ in from_binary.search(query, top_k=3)] == [
+            t for t, _ in from_json.search(query, top_k=3)
+        ]
+
+    def test_reads_build_metadata(self, binary_artifact):
+        snapshot = load_embeddings(binary_artifact)
+        assert snapshot.last_ticket_id == 5
+        assert snapshot.built_at == "2026-01-01T00:00:00+00:00"
+        assert snapshot.signature == artifact_signature(binary_artifact)
+
+    def test_arrays_are_mapped_not_copied(self, binary_artifact):
+        if sparse_scoring.np is None:
+            pytest.skip("numpy is not installed")
+        engine = load_embeddings(binary_artifact).engine
+        for values in (engine.data, engine.indices, *engine.column_view()):
+            assert not values.flags.owndata
+            assert not values.flags.writeable
+
+    def test_pure_python_fallback(self, monkeypatch, artifact, binary_artifact):
+        expected = load_embeddings(artifact[0]).engine.scores(self.QUERIES[0])
+        monkeypatch.setattr(sparse_scoring, "np", None)
+        monkeypatch.setattr(embedding_store, "np", None)
+
+        engine = load_embeddings(binary_artifact).engine
+        actual = engine.scores(self.QUERIES[0])
+        assert actual.keys() == expected.keys()
+        for ticket_id, score in expected.items():
+            assert actual[ticket_id] == pytest.approx(score, abs=1e-6)
+
+    def test_python_written_file_loads_with_numpy(self, monkeypatch, tmp_path, artifact):
+        _, data = artifact
+        path = tmp_path / "python.bin"
+        with monkeypatch.context() as m:
+            m.setattr(sparse_scoring, "np", None)
+            m.setattr(embedding_store, "np", None)
+            save_embeddings(data, path, fmt="binary")
+        expected = load_embeddings(artifact[0]).engine.scores("charged twice")
+        actual = load_embeddings(path).engine.scores("charged twice")
+        assert actual == pytest.approx(expected, abs=1e-6)
+
+    def test_empty_engine_round_trips(self, tmp_path):
+        path = tmp_path / "empty.bin"
+        write_binary_embeddings(SparseScoringEngine.from_documents([], []), path, last_ticket_id=0)
+        snapshot = load_embeddings(path)
+        assert len(snapshot.engine) == 0
+        assert snapshot.engine.search("login") == []
+
+    def test_truncated_file_raises_value_error(self, tmp_path, binary_artifact):
+        path = tmp_path / "truncated.bin"
+        path.write_bytes(binary_artifact.read_bytes()[:40])
+        with pytest.raises(ValueError):
+            load_embeddings(path)
+
+
+def test_artifact_signature_missing_file(tmp_path):
+    assert artifact_signature(tmp_path / "missing.json") is None
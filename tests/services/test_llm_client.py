@@ -0,0 +1,84 @@
+"""
+Tests for app/services/llm_client.py
+
+Runs the real AsyncOpenAI client against the local stub server
+(tests/openai_stub.py), so no network access is needed.
+
+Covers:
+- Connection reuse: sequential calls share one pooled connection
+- Concurrency cap: in-flight upstream calls never exceed OPENAI_MAX_CONCURRENCY
+- Coalescing: concurrent identical prompts make one upstream call
+- Throughput: distinct prompts run concurrently up to the cap
+- response_generator uses the shared client end to end
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.config import settings
+from app.services.llm_client import llm_client
+from app.services.response_generator import generate_response
+from tests.openai_stub import OpenAIStub
+
+@pytest.fixture()
+def stub(monkeypatch):
+    with OpenAIStub(latency=0.2) as server:
+        monkeypatch.setattr(settings, "OPENAI_BASE_URL", server.base_url)
+        monkeypatch.setattr(settings, "OPENAI_API_KEY", "stub-key")
+        monkeypatch.setattr(settings, "OPENAI_MAX_CONCURRENCY", 4)
+        llm_client.reset()
+        try:
+            yield server
+        finally:
+            llm_client.reset()
+
+
+def _complete(key, content="hello"):
+    return llm_client.complete_sync(key, [{"role": "user", "content": content}], model="stub")
+
+
+def test_sequential_calls_reuse_one_connection(stub):
+    stub.latency = 0
+    for number in range(5):
+        assert _complete(number, f"message {number}") == f"stub reply to: message {number}"
+
+    assert stub.requests == 5
+    assert len(stub.connections) == 1
+
+
+def test_concurrent_identical_prompts_are_coalesced(stub):
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda _: _complete("same"), range(10)))
+
+    assert results == ["stub reply to: hello"] * 10
+    assert stub.requests == 1
+
+
+def test_in_flight_calls_are_capped(stub):
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        list(pool.map(lambda number: _complete(number), range(12)))
+
+    assert stub.requests == 12
+    assert stub.max_in_flight == settings.OPENAI_MAX_CONCURRENCY
+    assert len(stub.connections) <= settings.OPENAI_MAX_CONCURRENCY
+
+
+def test_distinct_prompts_run_concurrently(stub):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda number: _complete(number), range(8)))
+    elapsed = time.perf_counter() - started
+
+    # 8 calls x 0.2s at a cap of 4 is two waves (~0.4s); serial would be 1.6s
+    assert elapsed < 1.2
+
+
+def test_generate_response_goes_through_shared_client(stub, monkeypatch):
+    monkeypatch.setattr(settings, "AI_PROVIDER", "openai")
+
+    text, source = generate_response("feature_request", "Please add dark mode")
+
+    assert source == "openai"
+    assert "Customer message: Please add dark mode" in text
+    assert stub.requests == 1
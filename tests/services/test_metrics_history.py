@@ -0,0 +1,186 @@
+"""
+Tests for app/services/metrics_history.py
+
+Covers:
+- Tickets and feedback are counted in the minute they were created
+- Minutes are downsampled into hour and day buckets
+- Later runs re-aggregate only the lookback window, picking up status
+  changes there and leaving older buckets alone
+- Each resolution is pruned after its retention period
+- Reads return one zero-filled point per bucket in the range
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.feedback import Feedback
+from app.models.metrics_history import MetricsHistory
+from app.models.ticket import Ticket
+from app.services.metrics_history import (
+    bucket_count,
+    floor_bucket,
+    history_point,
+    read_history,
+    record_history,
+)
+
+NOW = datetime(2024, 5, 1, 12, 30)
+
+
+@pytest.fixture()
+def database(tmp_path):
+    path = tmp_path / "history.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    yield Session, f"sqlite+aiosqlite:///{path}"
+    engine.dispose()
+
+
+def _ticket(db, created_at, status="open", intent=None) -> Ticket:
+    ticket = Ticket(message="m", status=status, intent=intent, created_at=created_at)
+    db.add(ticket)
+    db.commit()
+    return ticket
+
+
+def _stored(db, bucket) -> dict:
+    rows = db.query(MetricsHistory).filter(MetricsHistory.bucket == bucket).order_by(MetricsHistory.bucket_start)
+    return {row.bucket_start: row.counters for row in rows}
+
+
+def _read(async_url, bucket, start, end):
+    async def run():
+        engine = create_async_engine(async_url, poolclass=NullPool)
+        try:
+            async with async_sessionmaker(bind=engine)() as db:
+                return await read_history(db, bucket, start, end)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+class TestBucketing:
+
+    def test_floor_bucket(self):
+        moment = datetime(2024, 5, 1, 12, 34, 56, 789)
+        assert floor_bucket(moment, "minute") == datetime(2024, 5, 1, 12, 34)
+        assert floor_bucket(moment, "hour") == datetime(2024, 5, 1, 12)
+        assert floor_bucket(moment, "day") == datetime(2024, 5, 1)
+
+    def test_bucket_count_includes_partial_buckets(self):
+        assert bucket_count(datetime(2024, 5, 1, 10), datetime(2024, 5, 1, 13), "hour") == 3
+        assert bucket_count(datetime(2024, 5, 1, 10, 30), datetime(2024, 5, 1, 13, 1), "hour") == 4
+        assert bucket_count(datetime(2024, 5, 1), datetime(2024, 5, 8), "day") == 7
+
+    def test_history_point_rates(self):
+        point = history_point(datetime(2024, 5, 1), {
+            "tickets": 4,
+            "by_status": {"auto_resolved": 3, "escalated": 1},
+            "by_intent": {},
+            "feedback": 2,
+            "feedback_resolved": 1,
+            "rating_sum": 7,
+        })
+        assert point["auto_resolve_rate"] == 75.0
+        assert point["escalation_rate"] == 25.0
+        assert point["average_rating"] == 3.5
+
+
+class TestRecordHistory:
+
+    def test_counts_minutes_and_downsamples(self, database):
+        Session, _ = database
+        with Session() as db:
+            first = _ticket(db, datetime(2024, 5, 1, 10, 5, 10), "auto_resolved", "login_issue")
+            _ticket(db, datetime(2024, 5, 1, 10, 5, 50), "escalated", "billing")
+            _ticket(db, datetime(2024, 5, 1, 11, 20), "open")
+            db.add(Feedback(ticket_id=first.id, rating=5, resolved=True, created_at=datetime(2024, 5, 1, 10, 7)))
+            db.commit()
+
+            assert record_history(db, now=NOW) == 3
+
+            minutes = _stored(db, "minute")
+            assert minutes[datetime(2024, 5, 1, 10, 5)]["tickets"] == 2
+            assert minutes[datetime(2024, 5, 1, 10, 5)]["by_intent"] == {"login_issue": 1, "billing": 1}
+            assert minutes[datetime(2024, 5, 1, 10, 7)]["feedback_resolved"] == 1
+            hours = _stored(db, "hour")
+            assert hours[datetime(2024, 5, 1, 10)]["by_status"] == {"auto_resolved": 1, "escalated": 1}
+            assert hours[datetime(2024, 5, 1, 10)]["rating_sum"] == 5
+            assert hours[datetime(2024, 5, 1, 11)]["tickets"] == 1
+            assert _stored(db, "day")[datetime(2024, 5, 1)]["tickets"] == 3
+
+    def test_rerun_updates_lookback_window_only(self, database, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_HISTORY_LOOKBACK_SECONDS", 3600)
+        Session, _ = database
+        with Session() as db:
+            old = _ticket(db, datetime(2024, 5, 1, 9, 0), "open")
+            recent = _ticket(db, datetime(2024, 5, 1, 12, 0), "open")
+            record_history(db, now=NOW)
+
+            old.status = "closed"
+            recent.status = "auto_resolved"
+            _ticket(db, datetime(2024, 5, 1, 12, 20), "escalated")
+            db.commit()
+            record_history(db, now=NOW + timedelta(minutes=5))
+
+            hours = _stored(db, "hour")
+            # 09:00 is outside the lookback window and keeps its first status
+            assert hours[datetime(2024, 5, 1, 9)]["by_status"] == {"open": 1}
+            assert hours[datetime(2024, 5, 1, 12)]["by_status"] == {"auto_resolved": 1, "escalated": 1}
+            assert _stored(db, "day")[datetime(2024, 5, 1)]["tickets"] == 3
+
+    def test_prunes_each_resolution_after_retention(self, database, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_HISTORY_MINUTE_RETENTION_DAYS", 2)
+        monkeypatch.setattr(settings, "METRICS_HISTORY_HOUR_RETENTION_DAYS", 5)
+        Session, _ = database
+        with Session() as db:
+            _ticket(db, NOW - timedelta(days=3))
+            _ticket(db, NOW - timedelta(days=10))
+            record_history(db, now=NOW)
+
+            assert len(_stored(db, "minute")) == 0
+            assert list(_stored(db, "hour")) == [floor_bucket(NOW - timedelta(days=3), "hour")]
+            assert len(_stored(db, "day")) == 2
+
+    def test_empty_tables(self, database):
+        Session, _ = database
+        with Session() as db:
+            assert record_history(db, now=NOW) == 0
+            assert db.query(MetricsHistory).count() == 0
+
+
+class TestReadHistory:
+
+    def test_zero_fills_missing_buckets(self, database):
+        Session, async_url = database
+        with Session() as db:
+            _ticket(db, datetime(2024, 5, 1, 10, 30), "auto_resolved")
+            record_history(db, now=NOW)
+
+        points = _read(async_url, "hour", datetime(2024, 5, 1, 9), datetime(2024, 5, 1, 12))
+
+        assert [point["bucket_start"] for point in points] == [
+            "2024-05-01T09:00:00", "2024-05-01T10:00:00", "2024-05-01T11:00:00",
+        ]
+        assert [point["tickets"] for point in points] == [0, 1, 0]
+        assert points[0]["auto_resolve_rate"] == 0.0
+
+    def test_range_end_is_exclusive(self, database):
+        Session, async_url = database
+        with Session() as db:
+            _ticket(db, datetime(2024, 5, 1, 12, 0))
+            record_history(db, now=NOW)
+
+        points = _read(async_url, "hour", datetime(2024, 5, 1, 11), datetime(2024, 5, 1, 12))
+
+        assert len(points) == 1
+        assert points[0]["tickets"] == 0
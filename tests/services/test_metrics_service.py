@@ -0,0 +1,168 @@
+"""
+Tests for app/services/metrics_service.py
+
+Covers:
+- One aggregate query yields every counter (status, intent, unassigned,
+  quality, feedback), also with empty tables
+- admin_metrics shapes the counters like the previous per-query endpoint
+- load_counters serves a current rollup, re-aggregates a stale one, and
+  bypasses it with fresh=True
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.feedback import Feedback
+from app.models.metrics_rollup import MetricsRollup
+from app.models.ticket import Ticket
+from app.services.metrics_service import (
+    ROLLUP_NAME,
+    admin_metrics,
+    aggregate_counters,
+    load_counters,
+    refresh_rollup,
+)
+
+
+@pytest.fixture()
+def database(tmp_path):
+    path = tmp_path / "metrics.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    yield engine, Session, f"sqlite+aiosqlite:///{path}"
+    engine.dispose()
+
+
+@pytest.fixture()
+def seeded(database):
+    engine, Session, async_url = database
+    with Session() as db:
+        tickets = [
+            Ticket(message="a", status="auto_resolved", intent="login_issue", quality_score=0.9),
+            Ticket(message="b", status="auto_resolved", intent="login_issue", quality_score=0.3),
+            Ticket(message="c", status="escalated", intent="billing"),
+            Ticket(message="d", status="escalated", intent="billing", assigned_agent_id=7),
+            Ticket(message="e", status="open"),
+        ]
+        db.add_all(tickets)
+        db.flush()
+        db.add_all([
+            Feedback(ticket_id=tickets[0].id, rating=5, resolved=True),
+            Feedback(ticket_id=tickets[1].id, rating=2, resolved=False),
+        ])
+        db.commit()
+    return database
+
+
+def _run_async(async_url, coroutine_factory):
+    async def run():
+        engine = create_async_engine(async_url, poolclass=NullPool)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await coroutine_factory(db)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+class TestAggregateCounters:
+
+    def test_counters_from_one_query(self, seeded):
+        engine, Session, _ = seeded
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        with Session() as db:
+            counters = aggregate_counters(db)
+
+        assert len(statements) == 1
+        assert counters["tickets_total"] == 5
+        assert counters["by_status"] == {"auto_resolved": 2, "escalated": 2, "open": 1}
+        assert counters["by_intent"] == {"login_issue": 2, "billing": 2}
+        assert counters["unassigned_escalated"] == 1
+        assert counters["low_quality_count"] == 1
+        assert counters["feedback_total"] == 2
+        assert counters["feedback_resolved"] == 1
+        assert counters["average_rating"] == pytest.approx(3.5)
+
+    def test_empty_tables(self, database):
+        _, Session, _ = database
+        with Session() as db:
+            counters = aggregate_counters(db)
+
+        assert counters["tickets_total"] == 0
+        assert counters["by_status"] == {}
+        assert counters["feedback_total"] == 0
+        assert counters["average_rating"] is None
+
+    def test_admin_metrics_shape(self, seeded):
+        _, Session, _ = seeded
+        with Session() as db:
+            metrics = admin_metrics(aggregate_counters(db))
+
+        assert metrics["tickets"]["auto_resolve_rate"] == 40.0
+        assert metrics["tickets"]["unassigned_escalated"] == 1
+        assert metrics["feedback"]["average_rating"] == 3.5
+        assert metrics["feedback"]["resolution_rate"] == 50.0
+        assert metrics["quality"] == {"low_quality_count": 1, "by_intent": {"login_issue": 0.6}}
+        assert metrics["system_health"]["feedback_coverage"] == 40.0
+
+
+class TestRollup:
+
+    def test_current_rollup_is_served(self, seeded):
+        _, Session, async_url = seeded
+        with Session() as db:
+            refresh_rollup(db)
+            db.add(Ticket(message="new", status="open"))
+            db.commit()
+
+        counters = _run_async(async_url, load_counters)
+
+        assert counters["tickets_total"] == 5  # rollup, not the table
+
+    def test_fresh_bypasses_rollup_and_updates_it(self, seeded):
+        _, Session, async_url = seeded
+        with Session() as db:
+            refresh_rollup(db)
+            db.add(Ticket(message="new", status="open"))
+            db.commit()
+
+        counters = _run_async(async_url, lambda db: load_counters(db, fresh=True))
+
+        assert counters["tickets_total"] == 6
+        with Session() as db:
+            assert db.get(MetricsRollup, ROLLUP_NAME).counters["tickets_total"] == 6
+
+    def test_stale_rollup_is_recomputed(self, seeded):
+        _, Session, async_url = seeded
+        with Session() as db:
+            refresh_rollup(db)
+            rollup = db.get(MetricsRollup, ROLLUP_NAME)
+            rollup.computed_at = datetime.now(timezone.utc) - timedelta(
+                seconds=settings.METRICS_ROLLUP_MAX_AGE_SECONDS + 1
+            )
+            db.add(Ticket(message="new", status="open"))
+            db.commit()
+
+        counters = _run_async(async_url, load_counters)
+
+        assert counters["tickets_total"] == 6
+
+    def test_missing_rollup_is_created(self, seeded):
+        _, Session, async_url = seeded
+
+        counters = _run_async(async_url, load_counters)
+
+        assert counters["tickets_total"] == 5
+        with Session() as db:
+            assert db.get(MetricsRollup, ROLLUP_NAME) is not None
@@ -0,0 +1,154 @@
+"""
+Tests for app/services/rate_limit_storage.py and the limiter key function
+
+Covers:
+- Local token buckets reject a key only after this process used its limit,
+  refill over the window and stay within RATE_LIMIT_LOCAL_BUCKETS keys
+- Without Redis (not configured, or failing) the storage enforces the
+  limit per process and records the failure with the circuit breaker
+- The sliding-window script shares one limit across storage instances
+  (fakeredis runs the Lua script through lupa)
+- reset clears local state and the prefixed Redis keys
+- rate_limit_key uses the token's user when valid, the client IP otherwise
+"""
+import fakeredis
+import pytest
+from limits import RateLimitItemPerMinute
+from limits.strategies import SlidingWindowCounterRateLimiter
+from starlette.requests import Request
+
+import app.services.rate_limit_storage as storage_module
+from app.core.config import settings
+from app.core.limiter import rate_limit_key
+from app.core.security import create_access_token
+from app.services.rate_limit_storage import LocalTokenBuckets, SharedRedisStorage
+from app.services.redis_client import _RedisClientManager
+
+
+@pytest.fixture()
+def manager(monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+    manager = _RedisClientManager(
+        pool_kwargs={"connection_class": fakeredis.FakeConnection, "server": fakeredis.FakeServer()},
+    )
+    monkeypatch.setattr(storage_module, "redis_manager", manager)
+    yield manager
+    manager.reset()
+
+
+def _limiter(storage):
+    return SlidingWindowCounterRateLimiter(storage)
+
+
+class TestLocalTokenBuckets:
+
+    def test_rejects_after_limit_and_refills(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(storage_module.time, "monotonic", lambda: now[0])
+        buckets = LocalTokenBuckets(max_keys=10)
+
+        assert all(buckets.take("k", limit=3, window=60) for _ in range(3))
+        assert buckets.take("k", limit=3, window=60) is False
+
+        now[0] += 20  # one token back (3 per 60 s)
+        assert buckets.take("k", limit=3, window=60) is True
+        assert buckets.take("k", limit=3, window=60) is False
+
+    def test_bounded_by_max_keys(self):
+        buckets = LocalTokenBuckets(max_keys=2)
+        for key in ("a", "b", "c"):
+            buckets.take(key, limit=1, window=60)
+
+        assert len(buckets) == 2
+        assert buckets.take("a", limit=1, window=60) is True  # evicted, so full again
+
+    def test_zero_keys_disables(self):
+        buckets = LocalTokenBuckets(max_keys=0)
+        assert all(buckets.take("k", limit=1, window=60) for _ in range(5))
+        assert len(buckets) == 0
+
+
+class TestSharedRedisStorage:
+
+    def test_without_redis_limits_per_process(self, monkeypatch):
+        monkeypatch.setattr(settings, "REDIS_URL", None)
+        monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_BUCKETS", 0)
+        storage = SharedRedisStorage()
+        item = RateLimitItemPerMinute(3)
+
+        results = [_limiter(storage).hit(item, "ip:1") for _ in range(4)]
+
+        assert results == [True, True, True, False]
+        assert storage.fallbacks == 4
+        assert storage.check() is False
+
+    def test_prefilter_skips_redis(self, manager):
+        storage = SharedRedisStorage()
+        item = RateLimitItemPerMinute(2)
+        storage.prefilter.take(item.key_for("ip:1"), 2, 60, amount=2)  # bucket now empty
+
+        assert _limiter(storage).hit(item, "ip:1") is False
+        assert storage.prefiltered == 1
+        assert storage.redis_hits == 0
+
+    def test_redis_error_falls_back_and_records_failure(self, manager, monkeypatch):
+        storage = SharedRedisStorage()
+
+        def broken_script(client):
+            raise ConnectionError("down")
+
+        monkeypatch.setattr(storage, "_sliding_window_script", broken_script)
+        item = RateLimitItemPerMinute(1)
+
+        assert _limiter(storage).hit(item, "ip:1") is True
+        assert storage.fallbacks == 1
+        assert len(manager.breaker._failures) == 1
+
+    def test_window_read_and_reset(self, manager):
+        storage = SharedRedisStorage()
+        client = manager.get()
+        previous, current = storage._keys("ip:1")
+        client.set(previous, 4, px=30_000)
+        client.set(current, 2, px=90_000)
+        client.set("unrelated", 1)
+
+        prev_count, prev_ttl, cur_count, cur_ttl = storage.get_sliding_window("ip:1", 60)
+        assert (prev_count, cur_count) == (4, 2)
+        assert 29 < prev_ttl <= 30 and 89 < cur_ttl <= 90
+
+        client.pexpire(current, 45_000)  # its window has ended: it is the previous one now
+        prev_count, prev_ttl, cur_count, cur_ttl = storage.get_sliding_window("ip:1", 60)
+        assert (prev_count, cur_count) == (2, 0)
+        assert 44 < prev_ttl <= 45 and 104 < cur_ttl <= 105
+
+        storage.reset()
+        assert client.exists(previous, current) == 0
+        assert client.get("unrelated") == "1"
+
+    def test_limit_shared_across_instances(self, manager):
+        item = RateLimitItemPerMinute(3)
+        first, second = SharedRedisStorage(), SharedRedisStorage()
+
+        hits = [_limiter(storage).hit(item, "user:7") for storage in (first, second, first, second)]
+
+        assert hits == [True, True, True, False]
+        assert first.redis_hits + second.redis_hits == 4
+
+
+def _request(headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("203.0.113.9", 1234),
+    })
+
+
+class TestRateLimitKey:
+
+    def test_authenticated_request_keyed_by_user(self):
+        token = create_access_token({"sub": "42", "role": "user"})
+        assert rate_limit_key(_request({"Authorization": f"Bearer {token}"})) == "user:42"
+
+    def test_anonymous_and_invalid_token_keyed_by_ip(self):
+        assert rate_limit_key(_request({})) == "ip:203.0.113.9"
+        assert rate_limit_key(_request({"Authorization": "Bearer garbage"})) == "ip:203.0.113.9"
@@ -0,0 +1,180 @@
+"""
+Tests for app/services/redis_client.py
+
+Runs redis-py against fakeredis (an in-process Redis stand-in) and against
+an unreachable port for failure paths, so no Redis server is needed.
+
+Covers:
+- CircuitBreaker: opens on repeated failures, half-open probe, recovery
+- _RedisClientManager: pooled client reuse, breaker skipping, PING probe
+- asyncio variant: per-loop client, shared breaker
+- Long-poll done markers in automation_queue
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+import redis
+
+from app.core.config import settings
+from app.services.automation_queue import REDIS_DONE_KEY_PREFIX, _AutomationWorkerPool
+from app.services.redis_client import CircuitBreaker, _RedisClientManager
+
+# redis-py 5 sends CLIENT SETINFO on connect, which fakeredis does not know
+_FAKE_ASYNC = {"connection_class": fakeredis.aioredis.FakeConnection, "lib_name": None, "lib_version": None}
+
+
+@pytest.fixture()
+def server(monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture()
+def manager(server):
+    manager = _RedisClientManager(
+        pool_kwargs={"connection_class": fakeredis.FakeConnection, "server": server},
+        async_pool_kwargs={**_FAKE_ASYNC, "server": server},
+    )
+    yield manager
+    manager.reset()
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_failures_in_window(self):
+        breaker = CircuitBreaker(failure_threshold=3, window_seconds=10, cooldown_seconds=30)
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.acquire() == "closed"
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.acquire() is None
+        assert breaker.trips == 1
+
+    def test_spread_out_failures_do_not_open(self):
+        breaker = CircuitBreaker(failure_threshold=2, window_seconds=1, cooldown_seconds=30)
+        with patch("app.services.redis_client.time.monotonic", side_effect=[0.0, 5.0]):
+            breaker.record_failure()
+            breaker.record_failure()
+        assert breaker.state == "closed"
+
+    def test_single_probe_after_cooldown(self):
+        breaker = CircuitBreaker(failure_threshold=1, window_seconds=10, cooldown_seconds=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        assert breaker.acquire() == "probe"
+        assert breaker.acquire() is None  # only one caller probes
+        breaker.record_failure()
+        assert breaker.state == "open"  # failed probe restarts the cool-down
+
+        time.sleep(0.06)
+        assert breaker.acquire() == "probe"
+        breaker.record_success()
+        assert breaker.acquire() == "closed"
+
+
+class TestRedisClientManager:
+
+    def test_pooled_client_is_reused(self, manager):
+        client = manager.get()
+        assert client is manager.get()
+        pool = client.connection_pool
+        assert isinstance(pool, redis.BlockingConnectionPool)
+        assert pool.max_connections == settings.REDIS_MAX_CONNECTIONS
+        assert pool.connection_kwargs["health_check_interval"] == settings.REDIS_HEALTH_CHECK_INTERVAL
+
+        client.set("key", "value")
+        assert manager.get().get("key") == "value"
+
+    def test_failures_keep_the_pool_until_the_breaker_opens(self, manager):
+        client = manager.get()
+        for _ in range(settings.REDIS_CIRCUIT_FAILURE_THRESHOLD - 1):
+            manager.record_failure()
+        assert manager.get() is client  # no teardown / reconnect storm
+
+        manager.record_failure()
+        assert manager.get() is None
+
+    def test_probe_closes_breaker_when_redis_is_back(self, manager, monkeypatch):
+        client = manager.get()
+        monkeypatch.setattr(manager.breaker, "cooldown_seconds", 0)
+        for _ in range(settings.REDIS_CIRCUIT_FAILURE_THRESHOLD):
+            manager.record_failure()
+
+        with patch.object(client, "ping", wraps=client.ping) as ping:
+            assert manager.get() is client
+            assert manager.get() is client
+        ping.assert_called_once()
+        assert manager.breaker.state == "closed"
+
+    def test_unreachable_redis_is_skipped_once_the_breaker_opens(self, monkeypatch):
+        monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1/0")
+        manager = _RedisClientManager()
+        attempts = 0
+        for _ in range(20):
+            client = manager.get()
+            if client is None:
+                continue
+            attempts += 1
+            try:
+                client.get("key")
+            except redis.RedisError:
+                manager.record_failure()
+
+        assert attempts == settings.REDIS_CIRCUIT_FAILURE_THRESHOLD
+        assert manager.breaker.state == "open"
+        manager.reset()
+
+    def test_not_configured(self, monkeypatch):
+        monkeypatch.setattr(settings, "REDIS_URL", None)
+        assert _RedisClientManager().get() is None
+
+
+class TestAsyncClient:
+
+    def test_async_client_per_loop(self, manager):
+        manager.get().set("shared", "1")
+
+        async def scenario():
+            client = await manager.get_async()
+            again = await manager.get_async()
+            value = await client.get("shared")
+            await manager.aclose()
+            return client is again, value, client
+
+        same, value, first = asyncio.run(scenario())
+        assert same and value == "1"
+        _, _, second = asyncio.run(scenario())
+        assert second is not first
+
+    def test_async_client_respects_breaker(self, manager):
+        for _ in range(settings.REDIS_CIRCUIT_FAILURE_THRESHOLD):
+            manager.record_failure()
+        assert asyncio.run(manager.get_async()) is None
+
+
+class TestAutomationDoneMarkers:
+
+    def test_marker_round_trip(self, manager):
+        pool = _AutomationWorkerPool()
+
+        async def scenario():
+            before = await pool.processed_elsewhere(7)
+            await pool._mark_done(7, "auto_resolved")
+            after = await pool.processed_elsewhere(7)
+            await manager.aclose()
+            return before, after
+
+        with patch("app.services.automation_queue.redis_manager", manager):
+            assert asyncio.run(scenario()) == (False, True)
+        assert manager.get().get(f"{REDIS_DONE_KEY_PREFIX}:7") == "auto_resolved"
+
+    def test_without_redis_the_caller_checks_the_database(self, monkeypatch):
+        monkeypatch.setattr(settings, "REDIS_URL", None)
+        assert asyncio.run(_AutomationWorkerPool().processed_elsewhere(7)) is None
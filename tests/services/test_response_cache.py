@@ -0,0 +1,212 @@
+"""
+Tests for app/services/response_cache.py
+
+Covers:
+- simhash: stable, order/case insensitive, near messages land few bits apart
+- negation_cues: n't forms, bare contractions and negation words
+- ResponseCache: exact and near-duplicate hits, misses across intents,
+  LRU eviction, TTL expiry, Redis tier, statistics
+- Messages that negate differently never share a reply, even within the
+  near-match distance; one-word near misses do not hit at the default
+- generate_response: equivalent messages make one upstream call
+"""
+import json
+from unittest.mock import MagicMock, patch
+
+from app.core.config import settings
+import pytest
+
+from app.services.response_cache import ResponseCache, negation_cues, response_cache, simhash
+from app.services.response_generator import generate_response
+
+NEAR_A = "I was charged twice for my subscription this month please refund the extra payment"
+NEAR_B = "I was charged twice for my subscription this month, please refund the extra payment asap"
+
+# (cached message, new message that must not reuse its reply)
+NEGATED_PAIRS = [
+    ("please delete my account and all my data", "please do not delete my account and all my data"),
+    ("I was charged twice for my subscription", "I was not charged twice for my subscription"),
+    ("I want a refund for my order", "I do not want a refund for my order"),
+    ("I want a refund for my order", "I don't want a refund for my order"),
+    ("I have been charged for the upgrade", "I have never been charged for the upgrade"),
+]
+NEAR_MISS_PAIRS = [
+    ("I cannot upload a photo", "I cannot upload a video"),
+    ("Please cancel my monthly plan", "Please cancel my yearly plan"),
+    ("forgot my password", "cant remember password"),
+]
+
+
+def _cache(**overrides):
+    params = {"max_entries": 16, "ttl_seconds": 60, "max_distance": 8}
+    params.update(overrides)
+    return ResponseCache(**params)
+
+
+class TestSimhash:
+
+    def test_stable_and_order_insensitive(self):
+        assert simhash("Reset my password") == simhash("password my RESET!")
+        assert simhash("Reset my password") != simhash("Refund my payment")
+
+    def test_near_duplicates_are_close(self):
+        assert (simhash(NEAR_A) ^ simhash(NEAR_B)).bit_count() <= 8
+
+    def test_negation_is_only_a_few_bits(self):
+        # Why the cache cannot rely on distance alone
+        cached, negated = NEGATED_PAIRS[0]
+        assert (simhash(cached) ^ simhash(negated)).bit_count() <= 4
+
+
+class TestNegationCues:
+
+    def test_forms_of_not_are_equivalent(self):
+        for message in ("do not delete it", "don't delete it", "dont delete it", "I cannot log in", "it isn't working"):
+            assert negation_cues(message) == ("not",), message
+
+    def test_other_negations_and_none(self):
+        assert negation_cues("never charged, no refund") == ("never", "no")
+        assert negation_cues("Reset my password at AT&T") == ()
+
+
+class TestResponseCache:
+
+    def test_exact_hit(self):
+        cache = _cache()
+        cache.put("billing", "refund", NEAR_A, "Refund issued", latency=1.5)
+
+        assert cache.get("billing", "refund", NEAR_A) == "Refund issued"
+        stats = cache.stats()
+        assert stats["exact_hits"] == 1
+        assert stats["saved_latency_seconds"] == 1.5
+
+    def test_near_duplicate_hit(self):
+        cache = _cache()
+        cache.put("billing", "refund", NEAR_A, "Refund issued")
+
+        assert cache.get("billing", "refund", NEAR_B) == "Refund issued"
+        assert cache.stats()["near_hits"] == 1
+
+    @pytest.mark.parametrize("cached, negated", NEGATED_PAIRS)
+    def test_different_negation_never_hits(self, cached, negated):
+        cache = _cache(max_distance=16)
+        cache.put("account_issue", None, cached, "reply for the cached message")
+
+        assert cache.get("account_issue", None, negated) is None
+        assert cache.get("account_issue", None, cached) == "reply for the cached message"
+
+    def test_same_negation_can_hit(self):
+        cache = _cache(max_distance=16)
+        cache.put("account_issue", None, "please do not delete my account", "Nothing will be deleted")
+
+        assert cache.get("account_issue", None, "please don't delete my account") == "Nothing will be deleted"
+
+    @pytest.mark.parametrize("cached, other", NEAR_MISS_PAIRS)
+    def test_one_word_changes_miss_at_default_distance(self, cached, other):
+        cache = _cache(max_distance=settings.RESPONSE_CACHE_MAX_DISTANCE)
+        cache.put("technical_issue", None, cached, "reply")
+
+        assert cache.get("technical_issue", None, other) is None
+
+    def test_near_lookup_disabled_with_zero_distance(self):
+        cache = _cache(max_distance=0)
+        cache.put("billing", "refund", NEAR_A, "Refund issued")
+
+        assert cache.get("billing", "refund", NEAR_B) is None
+
+    def test_unrelated_message_and_other_intent_miss(self):
+        cache = _cache()
+        cache.put("billing", "refund", NEAR_A, "Refund issued")
+
+        assert cache.get("billing", "refund", "The export button crashes the dashboard") is None
+        assert cache.get("billing", None, NEAR_A) is None
+        assert cache.get("login_issue", "refund", NEAR_A) is None
+        stats = cache.stats()
+        assert stats["misses"] == 3
+        assert stats["hit_rate"] == 0.0
+
+    def test_lru_eviction(self):
+        cache = _cache(max_entries=2, max_distance=0)
+        cache.put("general", None, "first message", "one")
+        cache.put("general", None, "second message", "two")
+        cache.get("general", None, "first message")  # now most recent
+        cache.put("general", None, "third message", "three")
+
+        assert len(cache) == 2
+        assert cache.get("general", None, "second message") is None
+        assert cache.get("general", None, "first message") == "one"
+        assert cache.stats()["lru_evictions"] == 1
+
+    def test_ttl_expiry(self):
+        cache = _cache()
+        with patch("app.services.response_cache.time.monotonic", return_value=100.0):
+            cache.put("general", None, NEAR_A, "reply")
+        with patch("app.services.response_cache.time.monotonic", return_value=161.0):
+            assert cache.get("general", None, NEAR_A) is None
+
+        stats = cache.stats()
+        assert stats["expirations"] == 1
+        assert stats["evictions"] == 1
+        assert len(cache) == 0
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = _cache(max_entries=0)
+        cache.put("general", None, NEAR_A, "reply")
+
+        assert cache.get("general", None, NEAR_A) is None
+        assert len(cache) == 0
+
+    def test_redis_tier_round_trip(self):
+        client = MagicMock()
+        writer = _cache(redis_client=lambda: client)
+        writer.put("billing", "refund", NEAR_A, "Refund issued", latency=2.0)
+
+        key, ttl, payload = client.setex.call_args.args
+        assert key == f"srs:response:billing:refund:-:{simhash(NEAR_A):016x}"
+        assert ttl == 60
+        client.get.return_value = payload
+
+        # Another process: local miss, shared hit, then promoted locally
+        reader = _cache(redis_client=lambda: client)
+        assert reader.get("billing", "refund", NEAR_A) == "Refund issued"
+        assert reader.get("billing", "refund", NEAR_A) == "Refund issued"
+        stats = reader.stats()
+        assert (stats["redis_hits"], stats["exact_hits"]) == (1, 1)
+        assert stats["saved_latency_seconds"] == 4.0
+        assert json.loads(payload)["latency"] == 2.0
+
+    def test_redis_errors_are_ignored(self):
+        client = MagicMock()
+        client.get.side_effect = ConnectionError("down")
+        client.setex.side_effect = ConnectionError("down")
+        cache = _cache(redis_client=lambda: client)
+
+        cache.put("general", None, NEAR_A, "reply")
+        assert cache.get("general", None, "something else entirely") is None
+        assert cache.get("general", None, NEAR_A) == "reply"
+
+
+class TestGenerateResponseCaching:
+
+    def test_equivalent_messages_call_openai_once(self, monkeypatch):
+        monkeypatch.setattr(settings, "AI_PROVIDER", "openai")
+        monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+        reworded = "Please refund the extra payment: I was charged twice for my subscription this month!"
+
+        with patch("app.services.response_generator._call_openai", return_value="Refund issued") as call:
+            first = generate_response("billing", NEAR_A)
+            second = generate_response("billing", reworded)
+
+        assert first == second == ("Refund issued", "openai")
+        call.assert_called_once()
+        assert response_cache.stats()["hits"] == 1
+
+    def test_failed_openai_call_is_not_cached(self, monkeypatch):
+        monkeypatch.setattr(settings, "AI_PROVIDER", "openai")
+        monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+
+        with patch("app.services.response_generator._call_openai", return_value=None):
+            _, source = generate_response("billing", NEAR_A)
+
+        assert source != "openai"
+        assert len(response_cache) == 0
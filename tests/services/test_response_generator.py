@@ -2,7 +2,7 @@
 Tests for OpenAI integration in response generator with proper fallback chain.
 """
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from app.services.response_generator import generate_response
 
 
@@ -233,11 +233,9 @@ def test_generate_response_openai_exception_fallback():
         mock_settings.AI_PROVIDER = "openai"
         mock_settings.OPENAI_API_KEY = "test-key"
         
-        # Mocking the client creation or the completion call to raise Exception
-        with patch('app.services.response_generator.OpenAI') as mock_openai_class:
-            mock_client = MagicMock()
-            mock_openai_class.return_value = mock_client
-            mock_client.chat.completions.create.side_effect = Exception("OpenAI Down")
+        # Make the shared client's completion call raise
+        with patch('app.services.response_generator.llm_client.complete_sync') as mock_complete:
+            mock_complete.side_effect = Exception("OpenAI Down")
             
             response_text, source_label = generate_response(
                 intent="login_issue",
@@ -255,15 +253,8 @@ def test_generate_response_openai_valid_response():
         mock_settings.AI_PROVIDER = "openai"
         mock_settings.OPENAI_API_KEY = "test-key"
         
-        with patch('app.services.response_generator.OpenAI') as mock_openai_class:
-            mock_client = MagicMock()
-            mock_openai_class.return_value = mock_client
-            
-            # Mock the response structure: response.choices[0].message.content
-            mock_response = MagicMock()
-            mock_response.choices = [MagicMock()]
-            mock_response.choices[0].message.content = "This is a custom OpenAI response."
-            mock_client.chat.completions.create.return_value = mock_response
+        with patch('app.services.response_generator.llm_client.complete_sync') as mock_complete:
+            mock_complete.return_value = "This is a custom OpenAI response."
             
             response_text, source_label = generate_response(
                 intent="login_issue",
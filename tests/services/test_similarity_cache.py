@@ -1,7 +1,36 @@
 from unittest.mock import MagicMock, patch
 import json
+import threading
+import time
+
+import fakeredis
+
 import app.services.similarity_search as ss
-from app.services.similarity_search import find_similar_ticket
+from app.core.config import settings
+from app.services.similarity_index import (
+    GENERATION_KEY,
+    _CorpusGeneration,
+    corpus_generation,
+    similarity_index,
+)
+from app.services.similarity_search import (
+    _cache_key,
+    find_similar_in_index,
+    find_similar_ticket,
+    similarity_cache,
+)
+
+def _redis(*values, generation="0"):
+    """Mock Redis client: GET answers the corpus generation, then *values* in order."""
+    entries = iter(values)
+    cache = MagicMock()
+    cache.get.side_effect = lambda key: generation if key == GENERATION_KEY else next(entries, None)
+    return cache
+
+
+def _entry_reads(cache):
+    return [c for c in cache.get.call_args_list if c.args[0] != GENERATION_KEY]
+
 
 def test_cache_prevents_duplicate_db_queries():
     """
@@ -13,9 +42,8 @@ def test_cache_prevents_duplicate_db_queries():
     # Ensure clean state for the singleton before test
     ss._redis_client = None
     
-    mock_cache = MagicMock()
     # First call: None (miss), Second call: JSON string (hit)
-    mock_cache.get.side_effect = [None, json.dumps({"matched_text": "cached", "similarity_score": 1.0})]
+    mock_cache = _redis(None, json.dumps({"matched_text": "cached", "similarity_score": 1.0}))
 
     resolved_tickets = [
         {"message": "test issue", "response": "restart", "quality_score": 1.0}
@@ -33,15 +61,252 @@ def test_cache_prevents_duplicate_db_queries():
                 assert res1 is not None
                 assert res1["matched_text"] == "test issue"
                 # Verify first call did real work (cache miss -> computation -> write)
-                assert mock_cache.setex.call_count == 1
+                assert mock_cache.pipeline.return_value.setex.call_count == 1
 
-                # Second call (Hit)
+                # Second call in another process (empty local tier): Redis hit
+                similarity_cache.clear()
                 res2 = find_similar_ticket("test issue", resolved_tickets)
                 assert res2 is not None
                 assert res2["matched_text"] == "cached"  # Came from mock, not computation
                 
                 # Verify total cache reads
-                assert mock_cache.get.call_count == 2
+                assert len(_entry_reads(mock_cache)) == 2
     finally:
         # Prevent singleton leak: always reset after the test ends
         ss._redis_client = None
+
+
+class _Index:
+    """Minimal search source counting how often it is scored."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.searches = 0
+        self.documents = {1: {"id": 1, "message": "cannot login", "response": "Reset it", "quality_score": None}}
+
+    def search(self, message, top_k=1):
+        self.searches += 1
+        time.sleep(self.delay)
+        return [(1, 0.9)]
+
+    def get_document(self, ticket_id):
+        return self.documents.get(ticket_id)
+
+
+class TestTwoTierSimilarityCache:
+
+    def test_repeat_lookup_is_served_in_process(self):
+        cache = _redis()
+        index = _Index()
+
+        with patch("app.services.similarity_search._get_cache_client", return_value=cache):
+            first = find_similar_in_index("cannot login", index, similarity_threshold=0.5)
+            second = find_similar_in_index("cannot login", index, similarity_threshold=0.5)
+
+        assert first == second
+        assert index.searches == 1
+        assert len(_entry_reads(cache)) == 1  # the second lookup never reached Redis
+
+    def test_write_and_lock_release_share_one_pipeline(self):
+        cache = MagicMock()
+        cache.get.return_value = None
+        cache.set.return_value = True
+        pipe = cache.pipeline.return_value
+
+        with patch("app.services.similarity_search._get_cache_client", return_value=cache):
+            find_similar_in_index("cannot login", _Index(), similarity_threshold=0.5)
+
+        key = _cache_key("cannot login")
+        cache.set.assert_called_once_with(f"{key}:lock", "1", nx=True, ex=ss.SIMILARITY_LOCK_SECONDS)
+        pipe.setex.assert_called_once()
+        assert pipe.setex.call_args.args[:2] == (key, settings.SIMILARITY_CACHE_TTL_SECONDS)
+        pipe.delete.assert_called_once_with(f"{key}:lock")
+        pipe.execute.assert_called_once()
+        cache.setex.assert_not_called()
+
+    def test_concurrent_identical_messages_compute_once(self):
+        index = _Index(delay=0.05)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def lookup():
+            barrier.wait()
+            results.append(find_similar_in_index("cannot login", index, similarity_threshold=0.5))
+
+        with patch("app.services.similarity_search._get_cache_client", return_value=None):
+            threads = [threading.Thread(target=lookup) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert index.searches == 1
+        assert len(results) == 8 and all(result["ticket"]["id"] == 1 for result in results)
+
+    def test_waits_for_result_of_process_holding_the_lock(self):
+        computed = {"matched_text": "elsewhere", "similarity_score": 0.95, "ticket": {"id": 7}, "quality_score": None}
+        cache = MagicMock()
+        cache.get.side_effect = [None, None, json.dumps(computed)]
+        cache.set.return_value = None  # SET NX lost: another process is computing
+        index = _Index()
+
+        with patch("app.services.similarity_search._get_cache_client", return_value=cache):
+            result = find_similar_in_index("cannot login", index, similarity_threshold=0.5)
+
+        assert result == computed
+        assert index.searches == 0
+        cache.pipeline.assert_not_called()
+
+    def test_lock_wait_gives_up_and_computes(self, monkeypatch):
+        monkeypatch.setattr(ss, "SIMILARITY_LOCK_WAIT_SECONDS", 0.1)
+        cache = MagicMock()
+        cache.get.return_value = None
+        cache.set.return_value = None
+        index = _Index()
+
+        with patch("app.services.similarity_search._get_cache_client", return_value=cache):
+            result = find_similar_in_index("cannot login", index, similarity_threshold=0.5)
+
+        assert result["ticket"]["id"] == 1
+        assert index.searches == 1
+        assert similarity_cache.stats["lock_timeouts"] == 1
+        cache.pipeline.return_value.delete.assert_not_called()  # not our lock
+
+    def test_redis_failure_falls_back_to_compute(self):
+        cache = MagicMock()
+        cache.get.side_effect = ConnectionError("down")
+        cache.set.side_effect = ConnectionError("down")
+        cache.pipeline.side_effect = ConnectionError("down")
+
+        with patch("app.services.similarity_search._get_cache_client", return_value=cache), \
+             patch.object(ss._redis_manager, "record_failure") as record_failure:
+            result = find_similar_in_index("cannot login", _Index(), similarity_threshold=0.5)
+
+        assert result["ticket"]["id"] == 1
+        assert record_failure.called
+
+    def test_local_tier_is_size_and_ttl_bounded(self, monkeypatch):
+        monkeypatch.setattr(settings, "SIMILARITY_CACHE_LOCAL_MAX_ENTRIES", 2)
+        with patch("app.services.similarity_search._get_cache_client", return_value=None):
+            similarity_cache.set_many({"a": None, "b": None, "c": None})
+            assert len(similarity_cache) == 2
+            assert similarity_cache.get_many(["a", "b", "c"]) == {"b": None, "c": None}
+
+            with patch("app.services.similarity_search.time.monotonic", return_value=time.monotonic() + 3600):
+                assert similarity_cache.get_many(["b", "c"]) == {}
+
+    def test_local_tier_can_be_disabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "SIMILARITY_CACHE_LOCAL_MAX_ENTRIES", 0)
+        index = _Index()
+        with patch("app.services.similarity_search._get_cache_client", return_value=None):
+            find_similar_in_index("cannot login", index, similarity_threshold=0.5)
+            find_similar_in_index("cannot login", index, similarity_threshold=0.5)
+
+        assert index.searches == 2
+        assert len(similarity_cache) == 0
+
+
+def test_ticket_automation_makes_one_redis_lookup(db):
+    from app.models.ticket import Ticket
+    from app.services.ticket_service import run_ticket_automation
+
+    cache = _redis()
+    cache.set.return_value = True
+    cache.incr.return_value = 1
+    ticket = Ticket(message="I cannot login to my account", status="open")
+    db.add(ticket)
+    db.commit()
+
+    with patch("app.services.similarity_search._get_cache_client", return_value=cache):
+        run_ticket_automation(ticket, db)
+
+    assert [c.args[0] for c in _entry_reads(cache)] == [_cache_key("I cannot login to my account", 0)]
+    cache.pipeline.return_value.execute.assert_called_once()
+
+
+class TestCorpusGeneration:
+
+    def test_bump_makes_cached_results_unreachable(self):
+        index = _Index()
+        with patch("app.services.similarity_search._get_cache_client", return_value=None):
+            find_similar_in_index("cannot login", index, similarity_threshold=0.5)
+            find_similar_in_index("cannot login", index, similarity_threshold=0.5)
+            assert index.searches == 1
+
+            similarity_index.bump_generation()
+            find_similar_in_index("cannot login", index, similarity_threshold=0.5)
+
+        assert index.searches == 2
+        assert _cache_key("cannot login", 0) != _cache_key("cannot login", 1)
+
+    def test_shared_generation_is_read_once_per_refresh_interval(self, monkeypatch):
+        monkeypatch.setattr(settings, "SIMILARITY_CACHE_GENERATION_REFRESH_SECONDS", 60)
+        shared = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+        shared.set(GENERATION_KEY, 7)
+        cache = MagicMock(wraps=shared)
+
+        with patch("app.services.similarity_search._get_cache_client", return_value=cache):
+            assert corpus_generation.current() == 7
+            assert corpus_generation.current() == 7
+            assert corpus_generation.bump([42]) == 8
+            assert corpus_generation.current() == 8
+            assert corpus_generation.changes_since(7, 8) == {42}
+
+        cache.get.assert_called_once_with(GENERATION_KEY)
+        assert shared.get(GENERATION_KEY) == "8"
+
+    def test_index_catches_up_when_another_process_bumped(self, db, monkeypatch):
+        from app.models.ticket import Ticket
+
+        monkeypatch.setattr(settings, "SIMILARITY_CACHE_GENERATION_REFRESH_SECONDS", 0)
+        cache = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+        other_process = _CorpusGeneration()
+
+        with patch("app.services.similarity_search._get_cache_client", return_value=cache), \
+             patch.object(similarity_index, "_sync", wraps=similarity_index._sync) as sync:
+            similarity_index.get(db)
+            similarity_index.get(db)
+            assert sync.call_count == 1
+
+            # Our own change is already in the local index: no re-sync
+            similarity_index.bump_generation()
+            similarity_index.get(db)
+            assert sync.call_count == 1
+
+            # Another process resolved a ticket: only that ticket is re-read
+            ticket = Ticket(message="cannot login", status="auto_resolved", response="Reset password")
+            db.add(ticket)
+            db.commit()
+            other_process.bump([ticket.id])
+            similarity_index.get(db)
+            assert sync.call_count == 1
+            assert ticket.id in similarity_index.index
+
+            # Its changes were trimmed from the log: full re-sync
+            monkeypatch.setattr(settings, "SIMILARITY_CHANGE_LOG_GENERATIONS", 0)
+            other_process.bump([ticket.id])
+            similarity_index.get(db)
+            assert sync.call_count == 2
+
+    def test_corpus_writes_bump_the_generation(self, db):
+        from app.models.ticket import Ticket
+        from app.services.feedback_service import create_feedback_record
+        from app.services.ticket_service import run_ticket_automation
+
+        with patch("app.services.similarity_search._get_cache_client", return_value=None):
+            escalated = Ticket(message="xyzzy plugh", status="open")
+            db.add(escalated)
+            db.commit()
+            run_ticket_automation(escalated, db)
+            assert escalated.status == "escalated"
+            assert corpus_generation.current() == 0
+
+            resolved = Ticket(message="I cannot login to my account", status="open")
+            db.add(resolved)
+            db.commit()
+            run_ticket_automation(resolved, db)
+            assert resolved.status == "auto_resolved"
+            assert corpus_generation.current() == 1
+
+            create_feedback_record(db, resolved.id, rating=5, resolved=True)
+            assert corpus_generation.current() == 2
@@ -0,0 +1,440 @@
+"""
+Tests for app/services/similarity_index.py
+
+Covers:
+- InvertedIndex: best match agrees with the reference find_similar_ticket
+  path; scores are exact TF-IDF cosines under the pinned IDF
+- InvertedIndex: IDF and norms are recomputed once the corpus drifts
+- InvertedIndex: only candidates sharing a term are scored
+- InvertedIndex: add / remove / update_quality bookkeeping
+- find_similar_in_index: threshold handling and return format
+- find_similar_in_index_batch: parity with single lookups, cache round trips
+- _SimilarityIndexManager: DB bootstrap and write-path hooks
+- _SimilarityIndexManager: sync picks up changes to old tickets (updated_at)
+- Generation bumps carry changed ticket IDs: another process applies a close
+  or a quality change before caching anything under the new generation
+- _SimilarityIndexManager: embedding artifact snapshot, delta sync, hot-swap
+- _SimilarityIndexManager: tickets changed since the artifact was built are
+  indexed even below its high-water mark
+"""
+import os
+import json
+import math
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.models.ticket import Ticket
+from app.services.similarity_index import (
+    GENERATION_KEY,
+    InvertedIndex,
+    _SimilarityIndexManager,
+    corpus_generation,
+    similarity_index,
+)
+from app.services.similarity_search import (
+    find_similar_in_index,
+    find_similar_in_index_batch,
+    find_similar_ticket,
+)
+from app.utils.text_processing import tf_idf_vector
+from workers.embedding_builder import build_embeddings, save_embeddings
+
+
+CORPUS = [
+    (1, "I cannot login to my account", "Reset your password"),
+    (2, "Payment was charged twice", "Refund processed"),
+    (3, "Password reset required for login", "Use the reset link"),
+    (4, "How do I cancel my subscription", "Go to billing settings"),
+]
+
+
+def _cosine(index, query, message):
+    """TF-IDF cosine of two texts under the index's pinned IDF."""
+    vectors = [
+        {word: weight * index.idf_of(word) for word, weight in tf_idf_vector(text, {}).items()}
+        for text in (query, message)
+    ]
+    dot = sum(weight * vectors[1].get(word, 0.0) for word, weight in vectors[0].items())
+    return dot / math.prod(math.sqrt(sum(v * v for v in vector.values())) for vector in vectors)
+
+
+@pytest.fixture()
+def index():
+    idx = InvertedIndex()
+    for ticket_id, message, response in CORPUS:
+        idx.add(ticket_id, message, response)
+    return idx
+
+
+class TestInvertedIndexScoring:
+
+    @pytest.mark.parametrize("query", [
+        "I cannot login to my account",
+        "Login problem with password",
+        "charged twice for my subscription",
+    ])
+    def test_best_match_agrees_with_reference_implementation(self, index, query):
+        resolved = [{"message": m, "response": r} for _, m, r in CORPUS]
+        with patch("app.services.similarity_search._get_cache_client", return_value=None):
+            reference = find_similar_ticket(query, resolved, similarity_threshold=0.0)
+
+        ticket_id, score = index.search(query)[0]
+        assert index.get_document(ticket_id)["message"] == reference["matched_text"]
+        assert score == pytest.approx(_cosine(index, query, index.get_document(ticket_id)["message"]))
+
+    def test_idf_is_recomputed_after_the_corpus_drifts(self, index, monkeypatch):
+        monkeypatch.setattr(settings, "SIMILARITY_INDEX_IDF_DRIFT", 0.3)
+        index.search("login")
+        pinned = index.idf_of("login")
+        index.add(5, "login page is blank", "Clear the cache")
+        index.search("login")
+        assert index.idf_of("login") == pinned  # 5 vs 4 tickets: within the drift
+
+        index.add(6, "login code never arrives", "Check spam")
+        ticket_id, score = index.search("login code")[0]
+        assert index.idf_of("login") != pinned
+        assert ticket_id == 6
+        assert score == pytest.approx(_cosine(index, "login code", "login code never arrives"))
+
+    def test_only_candidates_sharing_terms_are_returned(self, index):
+        results = index.search("charged", top_k=10)
+        assert [ticket_id for ticket_id, _ in results] == [2]
+
+    def test_no_shared_terms_returns_empty(self, index):
+        assert index.search("dark mode feature") == []
+
+    def test_empty_query_returns_empty(self, index):
+        assert index.search("") == []
+        assert index.search(None) == []
+
+    def test_top_k_orders_best_first(self, index):
+        results = index.search("login password reset", top_k=3)
+        scores = [score for _, score in results]
+        assert scores == sorted(scores, reverse=True)
+        assert results[0][0] == 3
+
+
+class TestInvertedIndexMaintenance:
+
+    def test_remove_drops_postings(self, index):
+        index.remove(2)
+        assert 2 not in index
+        assert index.search("charged twice") == []
+
+    def test_re_adding_with_new_message_replaces_postings(self, index):
+        index.add(2, "Dark mode is broken", "Toggle it off and on")
+        assert index.search("charged twice") == []
+        assert index.search("dark mode")[0][0] == 2
+
+    def test_update_quality(self, index):
+        index.update_quality(1, 0.9)
+        assert index.get_document(1)["quality_score"] == 0.9
+
+    def test_message_without_tokens_is_not_indexed(self):
+        idx = InvertedIndex()
+        assert idx.add(1, "!!!", "response") is False
+        assert len(idx) == 0
+
+
+class TestFindSimilarInIndex:
+
+    def test_returns_reference_format(self, index):
+        with patch("app.services.similarity_search._get_cache_client", return_value=None):
+            result = find_similar_in_index("I cannot login to my account", index, similarity_threshold=0.5)
+
+        assert result["matched_text"] == "I cannot login to my account"
+        assert result["similarity_score"] >= 0.9
+        assert result["ticket"]["response"] == "Reset your password"
+        assert "quality_score" in result
+
+    def test_below_threshold_returns_none(self, index):
+        with patch("app.services.similarity_search._get_cache_client", return_value=None):
+            assert find_similar_in_index("login", index, similarity_threshold=0.99) is None
+
+    def test_invalid_threshold_raises(self, index):
+        with pytest.raises(ValueError):
+            find_similar_in_index("login", index, similarity_threshold=1.5)
+
+
+class TestFindSimilarInIndexBatch:
+
+    QUERIES = ["I cannot login to my account", "login", "charged twice", "", "dark mode"]
+
+    def test_matches_single_lookups(self, index):
+        with patch("app.services.similarity_search._get_cache_client", return_value=None):
+            expected = [find_similar_in_index(q, index, similarity_threshold=0.3) for q in self.QUERIES]
+            assert find_similar_in_index_batch(self.QUERIES, index, similarity_threshold=0.3) == expected
+
+    def test_one_mget_and_one_pipeline(self, index):
+        cached = {"matched_text": "cached", "similarity_score": 1.0, "ticket": {}, "quality_score": None}
+        cache = MagicMock()
+        cache.mget.return_value = [json.dumps(cached), None]
+        pipe = cache.pipeline.return_value
+
+        with patch("app.services.similarity_search._get_cache_client", return_value=cache):
+            results = find_similar_in_index_batch(["cannot login", "charged twice"], index, similarity_threshold=0.3)
+
+        assert results[0]["matched_text"] == "cached"
+        assert results[1]["ticket"]["id"] == 2
+        cache.mget.assert_called_once()
+        cache.get.assert_called_once_with(GENERATION_KEY)  # no per-message GETs
+        assert pipe.setex.call_count == 1  # only the miss is written back
+        pipe.execute.assert_called_once()
+
+
+class TestSimilarityIndexManager:
+
+    def _add_ticket(self, db, status, message, response=None):
+        ticket = Ticket(message=message, status=status, response=response)
+        db.add(ticket)
+        db.commit()
+        db.refresh(ticket)
+        return ticket
+
+    def test_bootstraps_resolved_tickets_with_responses(self, db):
+        resolved = self._add_ticket(db, "auto_resolved", "cannot login", "Reset password")
+        closed = self._add_ticket(db, "closed", "refund please", "Refund issued")
+        self._add_ticket(db, "escalated", "server is down")
+        self._add_ticket(db, "closed", "closed without response")
+
+        manager = _SimilarityIndexManager()
+        index = manager.get(db)
+
+        assert len(index) == 2
+        assert resolved.id in index
+        assert closed.id in index
+
+    def test_index_ticket_hook_skips_unresolved(self, db):
+        manager = _SimilarityIndexManager()
+        manager.get(db)
+
+        escalated = self._add_ticket(db, "escalated", "server is down")
+        manager.index_ticket(escalated)
+        assert escalated.id not in manager.index
+
+        resolved = self._add_ticket(db, "auto_resolved", "cannot login", "Reset password")
+        manager.index_ticket(resolved)
+        assert resolved.id in manager.index
+
+    def test_sync_applies_changes_to_old_tickets(self, db, monkeypatch):
+        resolved = self._add_ticket(db, "auto_resolved", "cannot login", "Reset password")
+        escalated = self._add_ticket(db, "escalated", "refund my double payment")
+        db.query(Ticket).update({Ticket.created_at: datetime(2020, 1, 1)}, synchronize_session=False)
+        db.commit()
+        manager = _SimilarityIndexManager()
+        manager.get(db)
+        assert escalated.id not in manager.index
+
+        # Another process rates one old ticket and closes the other with an agent reply
+        resolved.quality_score = 0.2
+        escalated.status, escalated.response = "closed", "Refund issued"
+        db.commit()
+        monkeypatch.setattr(settings, "SIMILARITY_INDEX_SYNC_SECONDS", 0)
+        manager.get(db)
+
+        assert manager.index.get_document(resolved.id)["quality_score"] == 0.2
+        assert escalated.id in manager.index
+
+        escalated.response = None
+        db.commit()
+        manager.get(db)
+        assert escalated.id not in manager.index
+
+    def test_reset_forces_rebootstrap(self, db):
+        manager = _SimilarityIndexManager()
+        manager.get(db)
+        ticket = self._add_ticket(db, "auto_resolved", "cannot login", "Reset password")
+
+        manager.reset()
+        assert ticket.id in manager.get(db)
+
+
+class TestCrossProcessChanges:
+    """Two workers share Redis: ``writer`` is another process, the module's manager this one."""
+
+    @pytest.fixture()
+    def shared_redis(self, monkeypatch):
+        cache = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+        monkeypatch.setattr(settings, "SIMILARITY_CACHE_GENERATION_REFRESH_SECONDS", 0)
+        # No periodic updated_at sync: only the logged ticket IDs can bring the index up to date
+        monkeypatch.setattr(settings, "SIMILARITY_INDEX_SYNC_SECONDS", 3600)
+        with patch("app.services.similarity_search._get_cache_client", return_value=cache):
+            yield cache
+
+    def _add_ticket(self, db, status, message, response=None):
+        ticket = Ticket(message=message, status=status, response=response)
+        db.add(ticket)
+        db.commit()
+        db.refresh(ticket)
+        return ticket
+
+    def _lookup(self, db, message):
+        return find_similar_in_index(message, similarity_index.get(db), similarity_threshold=0.5)
+
+    def test_close_and_quality_change_reach_other_process(self, db, shared_redis):
+        login = self._add_ticket(db, "auto_resolved", "I cannot login to my account", "Reset password")
+        refund = self._add_ticket(db, "escalated", "Payment was charged twice")
+        writer = _SimilarityIndexManager()
+        writer.get(db)
+        assert self._lookup(db, "I cannot login to my account")["quality_score"] is None
+        assert self._lookup(db, "Payment was charged twice") is None  # cached as a miss
+
+        # The writer closes the escalated ticket with an agent reply ...
+        refund.status, refund.response = "closed", "Refund issued"
+        db.commit()
+        writer.index_ticket(refund)
+        closed_generation = writer.bump_generation([refund.id])
+
+        result = self._lookup(db, "Payment was charged twice")
+        assert similarity_index.generation == closed_generation
+        assert result["ticket"]["id"] == refund.id
+
+        # ... then records feedback on the resolved one
+        login.quality_score = 0.1
+        db.commit()
+        writer.update_quality(login.id, 0.1)
+        rated_generation = writer.bump_generation([login.id])
+
+        result = self._lookup(db, "I cannot login to my account")
+        assert similarity_index.generation == rated_generation
+        assert result["quality_score"] == 0.1
+
+    def test_trimmed_change_log_falls_back_to_sync(self, shared_redis, monkeypatch):
+        monkeypatch.setattr(settings, "SIMILARITY_CHANGE_LOG_GENERATIONS", 1)
+        corpus_generation.bump([1])
+        corpus_generation.bump([2])
+        generation = corpus_generation.bump([3])
+
+        assert corpus_generation.changes_since(generation - 1, generation) == {3}
+        assert corpus_generation.changes_since(generation - 2, generation) is None
+
+
+class TestSnapshotLayering:
+
+    def _add_ticket(self, db, status, message, response=None):
+        ticket = Ticket(message=message, status=status, response=response)
+        db.add(ticket)
+        db.commit()
+        db.refresh(ticket)
+        return ticket
+
+    def _write_artifact(self, path, tickets, last_ticket_id=None, built_at=None):
+        data = build_embeddings([{"id": t.id, "message": t.message} for t in tickets])
+        data["last_ticket_id"] = last_ticket_id or max(t.id for t in tickets)
+        data["built_at"] = built_at
+        save_embeddings(data, path)
+
+    def test_missing_artifact_falls_back_to_db_bootstrap(self, db, tmp_path):
+        ticket = self._add_ticket(db, "auto_resolved", "cannot login", "Reset password")
+        manager = _SimilarityIndexManager()
+
+        assert manager.load_artifact(tmp_path / "missing.json") is False
+        assert ticket.id in manager.get(db)
+
+    def test_snapshot_hits_are_hydrated_from_db(self, db, tmp_path):
+        login = self._add_ticket(db, "auto_resolved", "I cannot login to my account", "Reset password")
+        refund = self._add_ticket(db, "closed", "Payment was charged twice", "Refund issued")
+        path = tmp_path / "embeddings.json"
+        self._write_artifact(path, [login, refund])
+
+        manager = _SimilarityIndexManager()
+        assert manager.load_artifact(path) is True
+        source = manager.get(db)
+
+        assert len(manager.index) == 0  # nothing newer than the snapshot
+        with patch("app.services.similarity_search._get_cache_client", return_value=None):
+            result = find_similar_in_index("I cannot login to my account", source, similarity_threshold=0.5)
+        assert result["ticket"]["id"] == login.id
+        assert result["ticket"]["response"] == "Reset password"
+
+    def test_snapshot_hits_without_response_are_dropped(self, db, tmp_path):
+        closed = self._add_ticket(db, "closed", "server is down again")
+        path = tmp_path / "embeddings.json"
+        self._write_artifact(path, [closed])
+
+        manager = _SimilarityIndexManager()
+        manager.load_artifact(path)
+        assert manager.get(db).search("server is down again") == []
+
+    def test_tickets_newer_than_snapshot_go_to_delta(self, db, tmp_path):
+        old = self._add_ticket(db, "auto_resolved", "I cannot login", "Reset password")
+        path = tmp_path / "embeddings.json"
+        self._write_artifact(path, [old])
+        new = self._add_ticket(db, "auto_resolved", "refund my double payment", "Refund issued")
+
+        manager = _SimilarityIndexManager()
+        manager.load_artifact(path)
+        source = manager.get(db)
+
+        assert new.id in manager.index
+        assert old.id not in manager.index
+        assert source.search("refund my double payment")[0][0] == new.id
+
+    def test_tickets_changed_since_the_build_go_to_delta(self, db, tmp_path):
+        login = self._add_ticket(db, "auto_resolved", "I cannot login", "Reset password")
+        escalated = self._add_ticket(db, "escalated", "server is down again")
+        db.query(Ticket).update({Ticket.updated_at: datetime(2020, 1, 1)}, synchronize_session=False)
+        db.commit()
+        path = tmp_path / "embeddings.json"
+        self._write_artifact(path, [login], last_ticket_id=escalated.id, built_at="2021-01-01T00:00:00+00:00")
+
+        # An agent closes the escalated ticket after the artifact was built
+        escalated.status, escalated.response = "closed", "Restart the server"
+        db.commit()
+        manager = _SimilarityIndexManager()
+        manager.load_artifact(path)
+        source = manager.get(db)
+
+        assert escalated.id in manager.index
+        assert login.id not in manager.index
+        assert source.search("server is down again")[0][0] == escalated.id
+
+    def test_reload_if_changed_hot_swaps(self, db, tmp_path):
+        first = self._add_ticket(db, "auto_resolved", "I cannot login", "Reset password")
+        path = tmp_path / "embeddings.json"
+        self._write_artifact(path, [first])
+
+        manager = _SimilarityIndexManager()
+        manager.load_artifact(path)
+        assert manager.reload_if_changed() is False
+
+        second = self._add_ticket(db, "auto_resolved", "refund my double payment", "Refund issued")
+        self._write_artifact(path, [first, second])
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert manager.reload_if_changed() is True
+        assert manager.snapshot.last_ticket_id == second.id
+        assert len(manager.snapshot.engine) == 2
+
+    def test_search_many_hydrates_batch_in_one_query(self, db, tmp_path):
+        login = self._add_ticket(db, "auto_resolved", "I cannot login to my account", "Reset password")
+        refund = self._add_ticket(db, "closed", "Payment was charged twice", "Refund issued")
+        path = tmp_path / "embeddings.json"
+        self._write_artifact(path, [login, refund])
+
+        manager = _SimilarityIndexManager()
+        manager.load_artifact(path)
+        source = manager.get(db)
+        queries = ["cannot login", "charged twice", "unrelated words"]
+
+        with patch.object(db, "query", wraps=db.query) as query:
+            results = source.search_many(queries)
+        assert query.call_count == 1
+        assert [hits[0][0] if hits else None for hits in results] == [login.id, refund.id, None]
+        assert results == [source.search(q) for q in queries]
+
+    def test_binary_artifact_is_served(self, db, tmp_path):
+        login = self._add_ticket(db, "auto_resolved", "I cannot login to my account", "Reset password")
+        data = build_embeddings([{"id": login.id, "message": login.message}])
+        path = tmp_path / "embeddings.bin"
+        save_embeddings(data, path, fmt="binary")
+
+        manager = _SimilarityIndexManager()
+        assert manager.load_artifact(path) is True
+        assert manager.snapshot.last_ticket_id == login.id
+        assert manager.get(db).search("cannot login")[0][0] == login.id
@@ -0,0 +1,167 @@
+"""
+Tests for app/services/sparse_scoring.py
+
+Covers:
+- Parity: CSR scores equal the dict-based reference (_cosine_similarity over
+  tf_idf_vector) for every row, on both the numpy and pure-Python backends
+- CSR structure: row normalization, sorted fixed vocabulary
+- search: top-k ordering, tie-breaking, empty and unknown-term queries
+- search_many: identical results to per-query search
+- find_similar_in_index accepts the engine as a similarity source
+"""
+import math
+from unittest.mock import patch
+
+import pytest
+
+import app.services.sparse_scoring as sparse_scoring
+from app.services.similarity_search import _cosine_similarity, find_similar_in_index
+from app.services.sparse_scoring import SparseScoringEngine
+from app.utils.text_processing import compute_idf, tf_idf_vector
+
+
+CORPUS = {
+    1: "I cannot login to my account",
+    2: "Payment was charged twice on my card",
+    3: "Password reset required for login",
+    4: "How do I cancel my subscription",
+    5: "The app crashes when I upload a file",
+    6: "Refund for the double payment please",
+    7: "login login login",
+}
+
+QUERIES = [
+    "I cannot login to my account",
+    "forgot password cannot login",
+    "charged twice, need a refund",
+    "app keeps crashing on upload",
+    "completely unrelated words here",
+]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        if sparse_scoring.np is None:
+            pytest.skip("numpy is not installed")
+    else:
+        monkeypatch.setattr(sparse_scoring, "np", None)
+    return request.param
+
+
+def _build(idf=None):
+    return SparseScoringEngine.from_documents(list(CORPUS), list(CORPUS.values()), idf=idf)
+
+
+class TestParityWithDictPath:
+
+    @pytest.mark.parametrize("query", QUERIES)
+    def test_scores_match_reference(self, backend, query):
+        idf = compute_idf(list(CORPUS.values()))
+        engine = _build(idf)
+        assert engine.backend == backend
+
+        expected = {
+            ticket_id: _cosine_similarity(tf_idf_vector(query, idf), tf_idf_vector(message, idf))
+            for ticket_id, message in CORPUS.items()
+        }
+        actual = engine.scores(query)
+
+        for ticket_id, score in expected.items():
+            assert actual.get(ticket_id, 0.0) == pytest.approx(score, abs=1e-9)
+
+    @pytest.mark.parametrize("query", QUERIES)
+    def test_best_match_matches_reference(self, backend, query):
+        idf = compute_idf(list(CORPUS.values()))
+        engine = _build(idf)
+        expected = max(
+            CORPUS,
+            key=lambda tid: (_cosine_similarity(tf_idf_vector(query, idf), tf_idf_vector(CORPUS[tid], idf)), tid),
+        )
+        results = engine.search(query)
+        if results:
+            assert results[0][0] == expected
+
+
+class TestMatrixStructure:
+
+    def test_rows_are_unit_length(self, backend):
+        engine = _build()
+        for row in range(len(engine)):
+            start, end = engine.indptr[row], engine.indptr[row + 1]
+            norm = math.sqrt(sum(float(engine.data[i]) ** 2 for i in range(start, end)))
+            assert norm == pytest.approx(1.0)
+
+    def test_vocabulary_is_sorted_and_dense(self, backend):
+        engine = _build()
+        assert list(engine.vocabulary) == sorted(engine.vocabulary)
+        assert sorted(engine.vocabulary.values()) == list(range(len(engine.vocabulary)))
+
+    def test_messages_without_tokens_are_skipped(self, backend):
+        engine = SparseScoringEngine.from_documents([1, 2], ["login issue", "!!!"])
+        assert [int(t) for t in engine.ticket_ids] == [1]
+
+    def test_rejects_inconsistent_arrays(self):
+        with pytest.raises(ValueError):
+            SparseScoringEngine({}, [], [0], [0], [], [])
+
+
+class TestSearch:
+
+    def test_top_k_is_sorted(self, backend):
+        results = _build().search("login password account", top_k=3)
+        scores = [score for _, score in results]
+        assert len(results) == 3
+        assert scores == sorted(scores, reverse=True)
+
+    def test_ties_prefer_highest_ticket_id(self, backend):
+        engine = SparseScoringEngine.from_documents([3, 9, 5], ["refund", "refund", "refund"])
+        assert [tid for tid, _ in engine.search("refund", top_k=3)] == [9, 5, 3]
+
+    def test_unknown_terms_return_empty(self, backend):
+        assert _build().search("zzz qqq") == []
+
+    def test_empty_query_returns_empty(self, backend):
+        assert _build().search("") == []
+        assert _build().search("login", top_k=0) == []
+
+    def test_empty_engine_returns_empty(self, backend):
+        engine = SparseScoringEngine.from_documents([], [])
+        assert engine.search("login") == []
+
+
+class TestSearchMany:
+
+    @pytest.mark.parametrize("top_k", [1, 3, 10])
+    def test_matches_per_query_search(self, backend, top_k):
+        engine = _build()
+        queries = QUERIES + ["", "login", "login login", "zzz"]
+        assert engine.search_many(queries, top_k=top_k) == [
+            engine.search(query, top_k=top_k) for query in queries
+        ]
+
+    def test_ties_at_cutoff_prefer_highest_ticket_id(self, backend):
+        engine = SparseScoringEngine.from_documents([3, 9, 5, 7], ["refund", "refund", "refund", "refund now"])
+        assert engine.search_many(["refund", "now"], top_k=2) == [
+            [(9, 1.0), (5, 1.0)],
+            engine.search("now", top_k=2),
+        ]
+
+    def test_empty_inputs(self, backend):
+        assert _build().search_many([]) == []
+        assert _build().search_many(["login"], top_k=0) == [[]]
+        assert SparseScoringEngine.from_documents([], []).search_many(["login"]) == [[]]
+
+
+def test_engine_works_as_similarity_source():
+    documents = {
+        tid: {"id": tid, "message": msg, "response": f"answer {tid}", "quality_score": None}
+        for tid, msg in CORPUS.items()
+    }
+    engine = SparseScoringEngine.from_documents(list(CORPUS), list(CORPUS.values()), documents=documents)
+
+    with patch("app.services.similarity_search._get_cache_client", return_value=None):
+        result = find_similar_in_index("I cannot login to my account", engine, similarity_threshold=0.5)
+
+    assert result["ticket"]["id"] == 1
+    assert result["ticket"]["response"] == "answer 1"
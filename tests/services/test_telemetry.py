@@ -0,0 +1,80 @@
+"""
+Tests for app/core/telemetry.py
+
+Covers:
+- Observations land in the right bucket; rendering is cumulative with
+  +Inf, _sum and _count per label set
+- Label values are escaped and the label count is enforced
+- The timer context manager records even when the block raises
+- The middleware records status 500 when the app raises
+- Non-standard request methods share the "other" label
+"""
+import asyncio
+
+import pytest
+
+from app.core.telemetry import Histogram, RequestMetricsMiddleware, request_seconds
+
+
+def test_render_is_cumulative():
+    histogram = Histogram("test_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "a")
+
+    lines = histogram.render()
+
+    assert lines[:2] == ["# HELP test_seconds Test.", "# TYPE test_seconds histogram"]
+    assert lines[2:] == [
+        'test_seconds_bucket{stage="a",le="0.1"} 1',
+        'test_seconds_bucket{stage="a",le="1.0"} 3',
+        'test_seconds_bucket{stage="a",le="+Inf"} 4',
+        'test_seconds_sum{stage="a"} 6.05',
+        'test_seconds_count{stage="a"} 4',
+    ]
+
+
+def test_label_escaping_and_arity():
+    histogram = Histogram("test_seconds", "Test.", ("route",), buckets=(1.0,))
+    histogram.observe(0.5, 'a"b\\c')
+    assert 'route="a\\"b\\\\c"' in histogram.render()[2]
+
+    with pytest.raises(ValueError):
+        histogram.observe(0.5, "a", "b")
+
+
+def test_timer_records_on_error():
+    histogram = Histogram("test_seconds", "Test.", ("stage",))
+    with pytest.raises(RuntimeError):
+        with histogram.time("boom"):
+            raise RuntimeError("boom")
+    assert histogram.count("boom") == 1
+
+
+def test_middleware_records_unhandled_error():
+    async def failing_app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    middleware = RequestMetricsMiddleware(failing_app)
+    before = request_seconds.count("GET", "unmatched", "500")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(middleware({"type": "http", "method": "GET"}, None, None))
+
+    assert request_seconds.count("GET", "unmatched", "500") == before + 1
+
+
+def test_middleware_buckets_unknown_methods():
+    async def ok_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 405})
+
+    async def send(message):
+        pass
+
+    middleware = RequestMetricsMiddleware(ok_app)
+    before = request_seconds.count("other", "unmatched", "405")
+
+    for method in ("PROPFIND", "X-RANDOM-1", "get"):
+        asyncio.run(middleware({"type": "http", "method": method}, None, send))
+
+    assert request_seconds.count("other", "unmatched", "405") == before + 3
+    assert request_seconds.count("PROPFIND", "unmatched", "405") == 0
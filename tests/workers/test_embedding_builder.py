@@ -7,14 +7,19 @@ Covers:
 - _tf_idf_vector: TF-IDF values, empty text
 - build_embeddings: full embedding construction, empty ticket list
 - fetch_resolved_tickets: only returns resolved/closed tickets
+- iter_resolved_tickets: streams the same rows in chunks
 - save_embeddings: writes valid JSON to disk
-- run_embedding_builder: end-to-end integration
-- _parse_args: CLI defaults and --output override
+- update_embeddings / idf_drift: incremental extension with a frozen IDF
+- --workers: parallel builds are byte-identical to serial builds
+- run_embedding_builder: end-to-end integration, incremental runs (including
+  old tickets resolved after the previous build, via updated_at)
+- _parse_args: CLI defaults, --output override and --format
 """
 import json
 import math
 import os
 import tempfile
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import pytest
@@ -31,8 +36,12 @@ from workers.embedding_builder import (
     _tokenize,
     build_embeddings,
     fetch_resolved_tickets,
+    idf_drift,
+    iter_resolved_tickets,
+    load_previous_embeddings,
     run_embedding_builder,
     save_embeddings,
+    update_embeddings,
 )
 
 
@@ -233,6 +242,48 @@ class TestBuildEmbeddings:
             assert word in result["idf"]
 
 
+# ---------------------------------------------------------------------------
+# update_embeddings / idf_drift
+# ---------------------------------------------------------------------------
+
+class TestUpdateEmbeddings:
+
+    BASE = [
+        {"id": 1, "message": "I cannot login to my account"},
+        {"id": 2, "message": "Payment was charged twice"},
+        {"id": 3, "message": "Password reset for login"},
+    ]
+
+    def test_adds_new_tickets_with_frozen_idf(self):
+        previous = build_embeddings(self.BASE)
+        result = update_embeddings(previous, [{"id": 4, "message": "login refund"}], drift_threshold=1.0)
+
+        vectors = list(result["vectors"])
+        assert result["ticket_count"] == 4
+        assert vectors[:3] == previous["vectors"]
+        assert result["idf"]["login"] == previous["idf"]["login"]
+        assert result["doc_freq"]["login"] == previous["doc_freq"]["login"] + 1
+        assert result["document_count"] == 4
+        # New words get the IDF implied by the updated counts
+        assert result["idf"]["refund"] == pytest.approx(math.log(5 / 2) + 1)
+        assert vectors[3]["vector"] == _tf_idf_vector("login refund", result["idf"])
+
+    def test_skips_already_embedded_tickets(self):
+        previous = build_embeddings(self.BASE)
+        result = update_embeddings(previous, self.BASE[:1], drift_threshold=1.0)
+        assert result["ticket_count"] == 3
+        assert result["document_count"] == 3
+
+    def test_drift_past_threshold_requests_rebuild(self):
+        previous = build_embeddings(self.BASE)
+        new = [{"id": i, "message": "login again"} for i in range(10, 30)]
+        assert update_embeddings(previous, new, drift_threshold=0.01) is None
+
+    def test_no_new_documents_means_no_drift(self):
+        previous = build_embeddings(self.BASE)
+        assert idf_drift(previous["idf"], previous["idf"], previous["doc_freq"]) == 0.0
+
+
 # ---------------------------------------------------------------------------
 # fetch_resolved_tickets
 # ---------------------------------------------------------------------------
@@ -281,6 +332,26 @@ class TestFetchResolvedTickets:
         assert results == []
 
 
+class TestIterResolvedTickets:
+
+    def test_streams_same_rows_as_fetch(self, db_session):
+        for i, status in enumerate(["closed", "open", "auto_resolved", "closed", "escalated"]):
+            db_session.add(Ticket(message=f"ticket {i}", status=status))
+        db_session.commit()
+
+        streamed = iter_resolved_tickets(db_session, chunk_size=2)
+        assert not isinstance(streamed, list)
+        assert list(streamed) == fetch_resolved_tickets(db_session)
+
+    def test_up_to_id_bounds_the_scan(self, db_session):
+        for i in range(4):
+            db_session.add(Ticket(message=f"ticket {i}", status="closed"))
+        db_session.commit()
+
+        ids = [t["id"] for t in iter_resolved_tickets(db_session, after_id=1, up_to_id=3)]
+        assert ids == [2, 3]
+
+
 # ---------------------------------------------------------------------------
 # save_embeddings
 # ---------------------------------------------------------------------------
@@ -337,6 +408,26 @@ class TestRunEmbeddingBuilder:
         assert "ticket_count" in result
         assert out.exists()
 
+    def test_records_build_metadata(self, monkeypatch, tmp_path, isolated_session_factory):
+        _engine, TestSession = isolated_session_factory
+        import workers.embedding_builder as wb
+        monkeypatch.setattr(wb, "SessionLocal", TestSession)
+        monkeypatch.setattr(wb, "init_db", lambda: None)
+
+        db = TestSession()
+        for status in ("closed", "auto_resolved", "open"):
+            db.add(Ticket(message=f"{status} ticket", status=status))
+        db.commit()
+        db.close()
+
+        out = tmp_path / "emb.json"
+        result = run_embedding_builder(output_path=out)
+
+        assert result["last_ticket_id"] == 2
+        assert "built_at" in result
+        assert json.loads(out.read_text())["last_ticket_id"] == 2
+        assert not (tmp_path / "emb.json.tmp").exists()
+
     def test_empty_db_produces_empty_cache(self, monkeypatch, tmp_path, isolated_session_factory):
         _engine, TestSession = isolated_session_factory
         import workers.embedding_builder as wb
@@ -347,7 +438,216 @@ class TestRunEmbeddingBuilder:
         result = run_embedding_builder(output_path=out)
 
         assert result["ticket_count"] == 0
-        assert result["vectors"] == []
+        assert json.loads(out.read_text())["vectors"] == []
+
+
+class TestStreamingBuild:
+
+    def test_streamed_artifact_matches_in_memory_build(self, monkeypatch, tmp_path, temp_db_path):
+        engine = create_engine(f"sqlite:///{temp_db_path}", connect_args={"check_same_thread": False})
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        from app.models import feedback, ticket, user  # noqa: F401
+        Base.metadata.create_all(bind=engine)
+        import workers.embedding_builder as wb
+        monkeypatch.setattr(wb, "SessionLocal", Session)
+        monkeypatch.setattr(wb, "init_db", lambda: None)
+
+        messages = ["cannot login", "charged twice", "", "password reset for login", "refund"]
+        db = Session()
+        for message in messages:
+            db.add(Ticket(message=message, status="closed"))
+        db.commit()
+        db.close()
+
+        out = tmp_path / "emb.json"
+        result = run_embedding_builder(output_path=out, chunk_size=2)
+
+        expected = build_embeddings([{"id": i, "message": m} for i, m in enumerate(messages, 1)])
+        written = json.loads(out.read_text())
+        assert written["vectors"] == expected["vectors"]
+        assert written["idf"] == expected["idf"]
+        assert written["ticket_count"] == result["ticket_count"] == 4
+        assert "vectors" not in result
+        engine.dispose()
+
+
+class TestParallelBuild:
+
+    MESSAGES = [
+        "I cannot login to my account",
+        "Payment was charged twice",
+        "",
+        "Password reset required for login",
+        "refund refund please",
+        "!!!",
+        "app crashes on upload",
+    ] * 3
+
+    @pytest.fixture()
+    def builder(self, monkeypatch, temp_db_path):
+        engine = create_engine(f"sqlite:///{temp_db_path}", connect_args={"check_same_thread": False})
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        from app.models import feedback, ticket, user  # noqa: F401
+        Base.metadata.create_all(bind=engine)
+        db = Session()
+        for message in self.MESSAGES:
+            db.add(Ticket(message=message, status="closed"))
+        db.commit()
+        db.close()
+
+        import workers.embedding_builder as wb
+        from datetime import datetime as real_datetime
+
+        class FixedDatetime(real_datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return real_datetime(2026, 1, 1, tzinfo=tz)
+
+        monkeypatch.setattr(wb, "SessionLocal", Session)
+        monkeypatch.setattr(wb, "init_db", lambda: None)
+        monkeypatch.setattr(wb, "datetime", FixedDatetime)
+        yield run_embedding_builder
+        engine.dispose()
+
+    @pytest.mark.parametrize("fmt", ["json", "binary"])
+    def test_output_is_byte_identical_to_serial(self, builder, tmp_path, fmt):
+        serial, parallel = tmp_path / f"serial.{fmt}", tmp_path / f"parallel.{fmt}"
+        builder(output_path=serial, fmt=fmt, chunk_size=4)
+        builder(output_path=parallel, fmt=fmt, chunk_size=4, workers=2)
+        assert serial.read_bytes() == parallel.read_bytes()
+
+    def test_idf_keys_are_sorted(self, builder, tmp_path):
+        out = tmp_path / "emb.json"
+        builder(output_path=out, workers=2, chunk_size=3)
+        written = json.loads(out.read_text())
+        assert list(written["idf"]) == sorted(written["idf"])
+        assert written["ticket_count"] == len(self.MESSAGES) - 3
+
+
+class TestIncrementalBuild:
+
+    @pytest.fixture()
+    def session_factory(self, monkeypatch, temp_db_path):
+        engine = create_engine(f"sqlite:///{temp_db_path}", connect_args={"check_same_thread": False})
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        from app.models import feedback, ticket, user  # noqa: F401
+        Base.metadata.create_all(bind=engine)
+        import workers.embedding_builder as wb
+        monkeypatch.setattr(wb, "SessionLocal", Session)
+        monkeypatch.setattr(wb, "init_db", lambda: None)
+        yield Session
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+    def _add(self, Session, *messages, status="closed"):
+        db = Session()
+        for message in messages:
+            db.add(Ticket(message=message, status=status))
+        db.commit()
+        db.close()
+
+    @pytest.mark.parametrize("fmt", ["json", "binary"])
+    def test_extends_previous_artifact(self, session_factory, tmp_path, fmt):
+        out = tmp_path / f"emb.{fmt}"
+        self._add(session_factory, "cannot login", "charged twice", "password reset", "refund please")
+        first = run_embedding_builder(output_path=out, fmt=fmt)
+
+        self._add(session_factory, "login fails again")
+        second = run_embedding_builder(output_path=out, fmt=fmt, incremental=True, drift_threshold=1.0)
+
+        assert second["ticket_count"] == 5
+        assert second["last_ticket_id"] == 5
+        assert second["idf"]["login"] == pytest.approx(first["idf"]["login"], rel=1e-6)
+        assert load_previous_embeddings(out)["document_count"] == 5
+
+    def test_binary_previous_rows_stream_through_unchanged(self, session_factory, tmp_path):
+        out = tmp_path / "emb.bin"
+        self._add(session_factory, "cannot login", "charged twice", "password reset", "refund please")
+        run_embedding_builder(output_path=out, fmt="binary")
+        previous = load_previous_embeddings(out)
+        assert previous["ticket_ids"] == [1, 2, 3, 4]
+        assert not isinstance(previous["vectors"], list)  # read lazily from the memory map
+        before = list(load_previous_embeddings(out)["vectors"])
+
+        self._add(session_factory, "login fails again")
+        run_embedding_builder(output_path=out, fmt="binary", incremental=True, drift_threshold=1.0)
+
+        after = list(load_previous_embeddings(out)["vectors"])
+        assert [v["ticket_id"] for v in after] == [1, 2, 3, 4, 5]
+        for old, new in zip(before, after):
+            assert new["vector"] == pytest.approx(old["vector"])
+
+    def test_only_fetches_above_high_water_mark(self, session_factory, tmp_path, monkeypatch):
+        out = tmp_path / "emb.json"
+        self._add(session_factory, "cannot login", "charged twice")
+        run_embedding_builder(output_path=out)
+        self._add(session_factory, "refund please")
+
+        import workers.embedding_builder as wb
+        fetched = []
+        real_fetch = wb.fetch_resolved_tickets
+
+        def spy(db, **kwargs):
+            result = real_fetch(db, **kwargs)
+            fetched.append((kwargs, [t["id"] for t in result]))
+            return result
+
+        monkeypatch.setattr(wb, "fetch_resolved_tickets", spy)
+        run_embedding_builder(output_path=out, incremental=True, drift_threshold=1.0)
+
+        (kwargs, ids), = fetched
+        assert kwargs["after_id"] == 2
+        # The updated_at lookback re-checks the earlier tickets; they are skipped
+        assert 3 in ids
+
+    def test_old_ticket_closed_after_the_build_is_added(self, session_factory, tmp_path):
+        out = tmp_path / "emb.json"
+        self._add(session_factory, "cannot login", "charged twice")
+        self._add(session_factory, "server is down", status="escalated")
+        db = session_factory()
+        stale = datetime.now(timezone.utc) - timedelta(days=30)
+        db.query(Ticket).update({Ticket.created_at: stale, Ticket.updated_at: stale}, synchronize_session=False)
+        db.commit()
+        run_embedding_builder(output_path=out)
+
+        # Closed a month after it was created, below the high-water mark
+        db.query(Ticket).filter(Ticket.id == 3).update({"status": "closed"})
+        db.commit()
+        db.close()
+        result = run_embedding_builder(output_path=out, incremental=True, drift_threshold=1.0)
+
+        assert result["ticket_count"] == 3
+        assert [v["ticket_id"] for v in load_previous_embeddings(out)["vectors"]] == [1, 2, 3]
+
+    def test_artifact_without_updated_at_mark_is_rebuilt(self, session_factory, tmp_path):
+        out = tmp_path / "emb.json"
+        self._add(session_factory, "cannot login", "charged twice")
+        run_embedding_builder(output_path=out)
+        data = json.loads(out.read_text())
+        del data["last_updated_at"]
+        out.write_text(json.dumps(data))
+
+        result = run_embedding_builder(output_path=out, incremental=True, drift_threshold=1.0)
+
+        assert "idf_drift" not in result  # full build, not an incremental one
+        assert result["last_updated_at"] is not None
+
+    def test_excess_drift_falls_back_to_full_rebuild(self, session_factory, tmp_path):
+        out = tmp_path / "emb.json"
+        self._add(session_factory, "cannot login", "charged twice")
+        run_embedding_builder(output_path=out)
+        self._add(session_factory, *["login again"] * 10)
+
+        result = run_embedding_builder(output_path=out, incremental=True, drift_threshold=0.0)
+
+        tickets = [{"id": i, "message": m} for i, m in enumerate(["cannot login", "charged twice"] + ["login again"] * 10, 1)]
+        assert result["idf"] == build_embeddings(tickets)["idf"]
+        assert "idf_drift" not in result
+
+    def test_missing_previous_artifact_builds_from_scratch(self, session_factory, tmp_path):
+        self._add(session_factory, "cannot login")
+        result = run_embedding_builder(output_path=tmp_path / "emb.json", incremental=True)
+        assert result["ticket_count"] == 1
 
 
 # ---------------------------------------------------------------------------
@@ -365,3 +665,25 @@ class TestParseArgs:
         custom = str(tmp_path / "custom.json")
         args = _parse_args(["--output", custom])
         assert str(args.output) == custom
+
+    def test_binary_format_defaults_to_bin_output(self):
+        args = _parse_args(["--format", "binary"])
+        assert args.format == "binary"
+        assert str(args.output).endswith("embeddings.bin")
+
+    def test_rejects_unknown_format(self):
+        with pytest.raises(SystemExit):
+            _parse_args(["--format", "xml"])
+
+    def test_chunk_size(self):
+        assert _parse_args(["--chunk-size", "250"]).chunk_size == 250
+
+    def test_workers(self):
+        assert _parse_args([]).workers == 1
+        assert _parse_args(["--workers", "4"]).workers == 4
+
+    def test_incremental_flags(self):
+        args = _parse_args(["--incremental", "--idf-drift-threshold", "0.2"])
+        assert args.incremental is True
+        assert args.idf_drift_threshold == 0.2
+        assert _parse_args([]).incremental is False
@@ -2,12 +2,13 @@
 Tests for workers/feedback_analyzer.py
 
 Covers:
-- _safe_avg: empty list, single value, multiple values
+- _RunningMean: empty, single value, multiple values, rounding
 - analyze_feedback: empty records, aggregation correctness, per-intent/status
   breakdowns, rating distribution, null handling
 - fetch_feedback_with_tickets: joins feedback with ticket data from DB
+- iter_feedback_with_tickets: streams the same records in chunks
 - run_feedback_analyzer: end-to-end integration, JSON output
-- _parse_args: CLI defaults and --output override
+- _parse_args: CLI defaults, --output override and --chunk-size
 """
 import json
 import os
@@ -22,10 +23,11 @@ from app.db.session import Base
 from app.models.feedback import Feedback
 from app.models.ticket import Ticket
 from workers.feedback_analyzer import (
+    _RunningMean,
     _parse_args,
-    _safe_avg,
     analyze_feedback,
     fetch_feedback_with_tickets,
+    iter_feedback_with_tickets,
     run_feedback_analyzer,
 )
 
@@ -96,24 +98,31 @@ def _make_record(rating=4, resolved=True, intent="login_issue", ticket_status="a
 
 
 # ---------------------------------------------------------------------------
-# _safe_avg
+# _RunningMean
 # ---------------------------------------------------------------------------
 
-class TestSafeAvg:
+def _mean(values) -> float:
+    running = _RunningMean()
+    for value in values:
+        running.add(value)
+    return running.average()
 
-    def test_empty_list_returns_zero(self):
-        assert _safe_avg([]) == 0.0
+
+class TestRunningMean:
+
+    def test_empty_returns_zero(self):
+        assert _mean([]) == 0.0
 
     def test_single_value(self):
-        assert _safe_avg([5.0]) == 5.0
+        assert _mean([5.0]) == 5.0
 
     def test_multiple_values(self):
-        result = _safe_avg([1.0, 3.0, 5.0])
+        result = _mean([1.0, 3.0, 5.0])
         assert abs(result - 3.0) < 1e-6
 
     def test_rounded_to_three_decimals(self):
-        result = _safe_avg([1, 2])
-        assert result == 1.5
+        assert _mean([1, 2]) == 1.5
+        assert _mean([1, 1, 2]) == 1.333
 
 
 # ---------------------------------------------------------------------------
@@ -289,6 +298,28 @@ class TestFetchFeedbackWithTickets:
         assert results[0]["resolved"] is False
 
 
+class TestIterFeedbackWithTickets:
+
+    def test_streams_same_records_as_fetch(self, db_session):
+        for i in range(5):
+            ticket = _make_ticket(db_session, intent="login_issue" if i % 2 else None)
+            _make_feedback(db_session, ticket.id, rating=i + 1, resolved=bool(i % 2))
+
+        streamed = iter_feedback_with_tickets(db_session, chunk_size=2)
+        assert not isinstance(streamed, list)
+        assert list(streamed) == fetch_feedback_with_tickets(db_session)
+
+    def test_analyze_feedback_consumes_a_generator(self, db_session):
+        for rating, resolved in ((5, True), (3, False)):
+            ticket = _make_ticket(db_session, intent="login_issue")
+            _make_feedback(db_session, ticket.id, rating=rating, resolved=resolved)
+
+        streamed = analyze_feedback(iter_feedback_with_tickets(db_session, chunk_size=1))
+        assert streamed == analyze_feedback(fetch_feedback_with_tickets(db_session))
+        assert streamed["total_feedback"] == 2
+        assert streamed["average_rating"] == 4.0
+
+
 # ---------------------------------------------------------------------------
 # run_feedback_analyzer integration
 # ---------------------------------------------------------------------------
@@ -359,6 +390,10 @@ class TestParseArgs:
         args = _parse_args(["--output", custom])
         assert str(args.output) == custom
 
+    def test_chunk_size(self):
+        assert _parse_args([]).chunk_size > 0
+        assert _parse_args(["--chunk-size", "50"]).chunk_size == 50
+
 
 def test_analyze_feedback_includes_quality_score_in_output():
     """Test that analyze_feedback includes quality score in output."""
@@ -4,7 +4,7 @@ Tests for workers/metrics_collector.py
 Covers:
 - collect_metrics: empty DB returns zeros, counts tickets by status and intent,
   auto_resolve_rate / escalation_rate calculation, feedback averages
-- run_metrics_collector: end-to-end, JSON output with correct keys
+- run_metrics_collector: end-to-end, JSON output with correct keys, rollup refresh
 - _parse_args: CLI defaults and --output override
 """
 import json
@@ -284,6 +284,37 @@ class TestRunMetricsCollector:
         assert "tickets" in loaded
         assert "feedback" in loaded
 
+    def test_refreshes_metrics_rollup(self, monkeypatch, tmp_path, isolated_session_factory):
+        from app.models.metrics_rollup import MetricsRollup
+        import workers.metrics_collector as wmc
+        _, TestSession = isolated_session_factory
+        monkeypatch.setattr(wmc, "SessionLocal", TestSession)
+        monkeypatch.setattr(wmc, "init_db", lambda: None)
+        with TestSession() as db:
+            _add_ticket(db, status="escalated", intent="billing")
+
+        run_metrics_collector(output_path=tmp_path / "metrics.json")
+
+        with TestSession() as db:
+            rollup = db.get(MetricsRollup, "global")
+        assert rollup.counters["tickets_total"] == 1
+        assert rollup.counters["by_status"] == {"escalated": 1}
+
+    def test_records_metrics_history(self, monkeypatch, tmp_path, isolated_session_factory):
+        from app.models.metrics_history import MetricsHistory
+        import workers.metrics_collector as wmc
+        _, TestSession = isolated_session_factory
+        monkeypatch.setattr(wmc, "SessionLocal", TestSession)
+        monkeypatch.setattr(wmc, "init_db", lambda: None)
+        with TestSession() as db:
+            _add_ticket(db, status="escalated", intent="billing")
+
+        run_metrics_collector(output_path=tmp_path / "metrics.json")
+
+        with TestSession() as db:
+            buckets = {row.bucket: row.counters["tickets"] for row in db.query(MetricsHistory)}
+        assert buckets == {"minute": 1, "hour": 1, "day": 1}
+
     def test_empty_db_zero_totals(self, monkeypatch, tmp_path, isolated_session_factory):
         _engine, TestSession = isolated_session_factory
         import workers.metrics_collector as wmc
@@ -26,28 +26,64 @@ Responsibilities:
 - Generate embeddings (TF-IDF / sentence embeddings)
 - Store embeddings for fast retrieval
 
+The API loads the output at startup (``EMBEDDINGS_PATH``) and hot-swaps it
+when a newer build replaces the file, so similarity search never has to
+recompute corpus vectors on the request path.
+
 DO NOT:
 -------
 - Perform similarity search here
 - Access FastAPI routes
 - Make resolution decisions
 
+Incremental builds:
+-------------------
+With ``--incremental`` the previous artifact is extended instead of rebuilt.
+Every artifact records its high-water mark (``last_ticket_id`` and
+``last_updated_at``) plus the per-word document frequencies, so a run only
+fetches tickets above the mark or changed since it (e.g. an old escalated
+ticket an agent closed), adds their counts, and vectorizes them with
+the IDF frozen at the last full build; existing vectors stay valid. Once the
+frozen IDF drifts from the IDF the updated counts imply by more than
+``--idf-drift-threshold``, the run falls back to a full rebuild.
+
+Only the new tickets are fetched and vectorized, but the artifact is a
+single file, so each run still reads and rewrites every previous vector
+(O(history) I/O). Binary artifacts stream the previous rows from the memory
+map into the new one; JSON artifacts are parsed whole first.
+
 Usage:
 ------
-    python workers/embedding_builder.py [--output embeddings.json]
+    python workers/embedding_builder.py [--format json|binary] [--output PATH]
+        [--incremental] [--idf-drift-threshold 0.05] [--chunk-size 1000]
+        [--workers N]
+
+``--workers N`` shards tokenization and vectorization of a full build across
+N processes; the artifact is byte-identical to a single-process build.
+
+``--format binary`` writes the compact memory-mappable artifact described in
+``app/services/embedding_store.py``; ``json`` (the default) keeps the legacy
+layout for existing consumers.
 """
 
 import argparse
 import json
 import logging
+import os
 import sys
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 
 # Add project root to path so worker can be run directly
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from sqlalchemy import or_
+
 from app.db.session import SessionLocal, init_db
 from app.models.ticket import Ticket
 
@@ -56,41 +92,236 @@ logger = logging.getLogger(__name__)
 # Statuses considered "resolved" and therefore useful for embedding pre-computation
 RESOLVED_STATUSES = {"auto_resolved", "closed"}
 
-# Default output path (relative to project root)
+# Default output paths (relative to project root)
 DEFAULT_OUTPUT = project_root / "embeddings.json"
+DEFAULT_BINARY_OUTPUT = project_root / "embeddings.bin"
+
+OUTPUT_FORMATS = ("json", "binary")
+
+# Rows fetched per round trip when streaming tickets (--chunk-size)
+DEFAULT_CHUNK_SIZE = 1000
+
+# Incremental builds fall back to a full rebuild past this IDF drift
+DEFAULT_IDF_DRIFT_THRESHOLD = 0.05
 
-from app.utils.text_processing import tokenize as _tokenize, compute_idf as _compute_idf, tf_idf_vector as _tf_idf_vector
+# Incremental builds re-check tickets updated this long before the previous
+# high-water mark: rows stamped before that build read them but committed after
+INCREMENTAL_LOOKBACK = timedelta(minutes=10)
+
+from app.services.embedding_store import is_binary_artifact, load_embeddings, write_binary_embeddings
+from app.services.sparse_scoring import SparseScoringEngine
+from app.utils.text_processing import (
+    compute_idf as _compute_idf,  # noqa: F401 - re-exported for callers and tests
+    document_frequencies as _document_frequencies,
+    idf_from_document_frequencies as _idf_from_document_frequencies,
+    tokenize as _tokenize,
+    tf_idf_vector as _tf_idf_vector,
+)
 
 
 # ---------------------------------------------------------------------------
 # Core logic
 # ---------------------------------------------------------------------------
 
-def fetch_resolved_tickets(db) -> List[Dict]:
+def iter_resolved_tickets(
+    db,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    after_id: Optional[int] = None,
+    updated_since: Optional[datetime] = None,
+    up_to_id: Optional[int] = None,
+) -> Iterator[Dict]:
+    """
+    Stream resolved tickets from the database in ID order.
+
+    Rows are read through a server-side cursor *chunk_size* at a time, so
+    memory stays bounded by the chunk size rather than the table size.
+
+    Args:
+        db: Database session.
+        chunk_size: Rows fetched per round trip.
+        after_id: When given, only tickets with a higher ID are returned...
+        updated_since: ...plus, when also given, tickets updated at or after
+            this time (older tickets that may have resolved since).
+        up_to_id: When given, tickets with a higher ID are excluded.
+
+    Yields:
+        Dicts with keys ``id``, ``message``, ``intent``, ``response``,
+        ``status``, ``updated_at``.
+    """
+    query = db.query(
+        Ticket.id, Ticket.message, Ticket.intent, Ticket.response, Ticket.status, Ticket.updated_at
+    ).filter(Ticket.status.in_(RESOLVED_STATUSES))
+    if after_id is not None:
+        if updated_since is not None:
+            query = query.filter(or_(Ticket.id > after_id, Ticket.updated_at >= updated_since))
+        else:
+            query = query.filter(Ticket.id > after_id)
+    if up_to_id is not None:
+        query = query.filter(Ticket.id <= up_to_id)
+
+    for row in query.order_by(Ticket.id).yield_per(chunk_size):
+        yield {
+            "id": row.id,
+            "message": row.message,
+            "intent": row.intent,
+            "response": row.response,
+            "status": row.status,
+            "updated_at": row.updated_at,
+        }
+
+
+def fetch_resolved_tickets(
+    db,
+    after_id: Optional[int] = None,
+    updated_since: Optional[datetime] = None,
+) -> List[Dict]:
     """
-    Load all resolved tickets from the database.
+    Load resolved tickets from the database into a list.
+
+    Prefer :func:`iter_resolved_tickets` for whole-table scans; this is meant
+    for small result sets such as the tickets added since the last build.
+
+    Args:
+        db: Database session.
+        after_id: See :func:`iter_resolved_tickets`.
+        updated_since: See :func:`iter_resolved_tickets`.
 
     Returns:
-        List of dicts with keys ``id``, ``message``, ``intent``, ``response``.
+        List of dicts with keys ``id``, ``message``, ``intent``, ``response``,
+        ``status``, ``updated_at``.
     """
-    tickets = (
-        db.query(Ticket)
-        .filter(Ticket.status.in_(RESOLVED_STATUSES))
-        .order_by(Ticket.id)
-        .all()
-    )
+    return list(iter_resolved_tickets(db, after_id=after_id, updated_since=updated_since))
+
+
+class CorpusScan:
+    """Document counts and high-water marks gathered in one pass over tickets."""
+
+    def __init__(self) -> None:
+        self.doc_freq: Counter = Counter()
+        self.document_count = 0
+        self.last_ticket_id = 0
+        self.last_updated_at: Optional[datetime] = None
+
+    def add(self, ticket: Dict) -> None:
+        self.last_ticket_id = max(self.last_ticket_id, ticket["id"])
+        updated_at = ticket.get("updated_at")
+        if updated_at is not None and (self.last_updated_at is None or updated_at > self.last_updated_at):
+            self.last_updated_at = updated_at
+        message = ticket.get("message")
+        if message:
+            self.doc_freq.update(set(_tokenize(message)))
+            self.document_count += 1
+
+
+def scan_corpus(tickets: Iterable[Dict]) -> CorpusScan:
+    """First pass of a build: count document frequencies over *tickets*."""
+    scan = CorpusScan()
+    for ticket in tickets:
+        scan.add(ticket)
+    return scan
+
+
+def iter_vectors(tickets: Iterable[Dict], idf: Dict[str, float]) -> Iterator[Dict]:
+    """Second pass of a build: yield ``{ticket_id, vector}`` for each ticket with a message."""
+    for ticket in tickets:
+        msg = ticket.get("message", "")
+        if not msg:
+            continue
+        yield {"ticket_id": ticket["id"], "vector": _tf_idf_vector(msg, idf)}
+
+
+# ---------------------------------------------------------------------------
+# Parallel build (--workers N)
+# ---------------------------------------------------------------------------
+#
+# Tickets are streamed from the database by the parent process and cut into
+# shards of (id, message) pairs. Pass 1 maps each shard to its document
+# frequencies and the parent reduces them into the global counts; pass 2
+# vectorizes shards in a pool whose workers receive the IDF table once, at
+# start-up. Shards are consumed in submission order, so the output is the
+# same as the serial build, byte for byte.
+
+# Shards in flight per worker; bounds parent memory while keeping workers busy
+_SHARDS_IN_FLIGHT_PER_WORKER = 2
+
+_worker_idf: Optional[Dict[str, float]] = None
+
+
+def _shard_document_frequencies(messages: List[str]) -> tuple:
+    return _document_frequencies(messages), len(messages)
+
+
+def _init_vectorizer(idf: Dict[str, float]) -> None:
+    global _worker_idf
+    _worker_idf = idf
+
+
+def _vectorize_shard(shard: List[tuple]) -> List[Dict]:
     return [
-        {
-            "id": t.id,
-            "message": t.message,
-            "intent": t.intent,
-            "response": t.response,
-            "status": t.status,
-        }
-        for t in tickets
+        {"ticket_id": ticket_id, "vector": _tf_idf_vector(message, _worker_idf)}
+        for ticket_id, message in shard
     ]
 
 
+def _iter_shards(tickets: Iterable[Dict], shard_size: int, on_ticket=None) -> Iterator[List[tuple]]:
+    """Group tickets with a message into lists of ``(id, message)`` pairs."""
+    shard = []
+    for ticket in tickets:
+        if on_ticket is not None:
+            on_ticket(ticket)
+        if ticket.get("message"):
+            shard.append((ticket["id"], ticket["message"]))
+            if len(shard) >= shard_size:
+                yield shard
+                shard = []
+    if shard:
+        yield shard
+
+
+def _ordered_map(pool: ProcessPoolExecutor, fn, items: Iterable, workers: int) -> Iterator:
+    """Like ``pool.map`` but with a bounded number of submitted items, results in order."""
+    pending = deque()
+    limit = workers * _SHARDS_IN_FLIGHT_PER_WORKER
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def scan_corpus_parallel(tickets: Iterable[Dict], workers: int, shard_size: int = DEFAULT_CHUNK_SIZE) -> CorpusScan:
+    """Pass 1 of a parallel build: :func:`scan_corpus` with the counting sharded over *workers*."""
+    scan = CorpusScan()
+
+    def observe(ticket: Dict) -> None:
+        # The parent only tracks the high-water mark; messages are counted in the pool
+        scan.add({"id": ticket["id"], "updated_at": ticket.get("updated_at")})
+
+    shards = (
+        [message for _, message in shard]
+        for shard in _iter_shards(tickets, shard_size, on_ticket=observe)
+    )
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for shard_counts, shard_documents in _ordered_map(pool, _shard_document_frequencies, shards, workers):
+            scan.doc_freq.update(shard_counts)
+            scan.document_count += shard_documents
+    return scan
+
+
+def iter_vectors_parallel(
+    tickets: Iterable[Dict],
+    idf: Dict[str, float],
+    workers: int,
+    shard_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Dict]:
+    """Pass 2 of a parallel build: :func:`iter_vectors` computed over *workers* processes."""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_vectorizer, initargs=(idf,)) as pool:
+        shards = _iter_shards(tickets, shard_size)
+        for vectors in _ordered_map(pool, _vectorize_shard, shards, workers):
+            yield from vectors
+
+
 def build_embeddings(tickets: List[Dict]) -> Dict:
     """
     Build TF-IDF embeddings for a list of ticket dicts.
@@ -105,63 +336,351 @@ def build_embeddings(tickets: List[Dict]) -> Dict:
         - ``idf``: shared IDF vocabulary mapping word → score
         - ``vectors``: list of ``{ticket_id, vector}`` dicts
         - ``ticket_count``: total number of tickets embedded
+        - ``doc_freq`` / ``document_count``: the counts the IDF was derived
+          from, used by :func:`update_embeddings` (omitted when empty)
     """
-    messages = [t["message"] for t in tickets if t.get("message")]
-    if not messages:
+    data = _embedding_data(scan_corpus(tickets))
+    data["vectors"] = list(iter_vectors(tickets, data["idf"]))
+    return data
+
+
+def _embedding_data(scan: CorpusScan) -> Dict:
+    """Embedding data for *scan* with ``vectors`` left for the caller to fill."""
+    if not scan.document_count:
         return {"idf": {}, "vectors": [], "ticket_count": 0}
+    # Sorted so the artifact does not depend on set iteration order (which
+    # varies with the hash seed, and so between processes)
+    doc_freq = dict(sorted(scan.doc_freq.items()))
+    return {
+        "idf": _idf_from_document_frequencies(doc_freq, scan.document_count),
+        "vectors": [],
+        "ticket_count": scan.document_count,
+        "doc_freq": doc_freq,
+        "document_count": scan.document_count,
+    }
 
-    idf = _compute_idf(messages)
 
-    vectors = []
-    for ticket in tickets:
-        msg = ticket.get("message", "")
-        if not msg:
+def idf_drift(frozen_idf: Dict[str, float], current_idf: Dict[str, float], doc_freq: Dict[str, int]) -> float:
+    """
+    Measure how far a frozen IDF table has drifted from the current counts.
+
+    Returns the relative IDF change averaged over the frozen vocabulary and
+    weighted by document frequency, so common words (which appear in most
+    vectors) dominate and one-off typos do not.
+    """
+    total_weight = 0
+    weighted_change = 0.0
+    for word, frozen in frozen_idf.items():
+        weight = doc_freq.get(word, 0)
+        if not weight:
             continue
-        vec = _tf_idf_vector(msg, idf)
-        vectors.append({"ticket_id": ticket["id"], "vector": vec})
+        total_weight += weight
+        weighted_change += weight * abs(current_idf[word] - frozen) / frozen
+    return weighted_change / total_weight if total_weight else 0.0
+
+
+def update_embeddings(
+    previous: Dict,
+    tickets: List[Dict],
+    drift_threshold: float = DEFAULT_IDF_DRIFT_THRESHOLD,
+) -> Optional[Dict]:
+    """
+    Extend a previous build with *tickets* without re-vectorizing it.
+
+    Previous vectors are passed through unchanged: the returned ``vectors``
+    is an iterator that yields them, then the new ones, for
+    :func:`save_embeddings` to stream into the new artifact.
+
+    Document frequencies and the document count are updated with the new
+    messages. Words already in the previous IDF keep their frozen weight (so
+    existing vectors remain comparable); new words get the IDF implied by
+    the updated counts.
 
+    Args:
+        previous: Embedding data from a previous build; must include
+            ``doc_freq`` and ``document_count``. Its ``vectors`` may be a
+            one-shot iterable when ``ticket_ids`` lists the embedded tickets.
+        tickets: Ticket dicts to add. Tickets already embedded are skipped.
+        drift_threshold: Maximum tolerated :func:`idf_drift`.
+
+    Returns:
+        The updated embedding data (same structure as :func:`build_embeddings`
+        plus ``idf_drift``), or None when the drift exceeds *drift_threshold*
+        and a full rebuild is needed.
+    """
+    if "ticket_ids" in previous:
+        embedded = set(previous["ticket_ids"])
+    else:
+        embedded = {v["ticket_id"] for v in previous["vectors"]}
+    messages = [
+        (t["id"], t["message"]) for t in tickets
+        if t.get("message") and t["id"] not in embedded
+    ]
+
+    doc_freq = Counter(previous["doc_freq"])
+    doc_freq.update(_document_frequencies(message for _, message in messages))
+    document_count = previous["document_count"] + len(messages)
+    current_idf = _idf_from_document_frequencies(doc_freq, document_count)
+
+    drift = idf_drift(previous["idf"], current_idf, doc_freq)
+    if drift > drift_threshold:
+        logger.info(
+            "IDF drift %.4f exceeds threshold %.4f; full rebuild required.", drift, drift_threshold
+        )
+        return None
+
+    idf = dict(previous["idf"])
+    for word, value in current_idf.items():
+        idf.setdefault(word, value)
+    idf = dict(sorted(idf.items()))
+
+    vectors = chain(
+        previous["vectors"],
+        ({"ticket_id": ticket_id, "vector": _tf_idf_vector(message, idf)} for ticket_id, message in messages),
+    )
+    logger.info("Adding %d ticket(s) incrementally (IDF drift %.4f).", len(messages), drift)
     return {
         "idf": idf,
         "vectors": vectors,
-        "ticket_count": len(vectors),
+        "ticket_count": len(embedded) + len(messages),
+        "doc_freq": dict(sorted(doc_freq.items())),
+        "document_count": document_count,
+        "idf_drift": drift,
     }
 
 
-def save_embeddings(data: Dict, output_path: Path) -> None:
-    """Persist *data* to *output_path* as JSON."""
+def load_previous_embeddings(path: Path) -> Optional[Dict]:
+    """
+    Read a previous artifact back into embedding data for an incremental run.
+
+    Binary artifacts hold normalized vectors; they are returned as such,
+    which leaves cosine scores unchanged. Their ``vectors`` are read lazily
+    from the memory map (one pass), with ``ticket_ids`` listing the rows.
+
+    Returns:
+        The embedding data with its build metadata, or None when the file is
+        missing, unreadable, or predates document-frequency tracking.
+    """
+    path = Path(path)
+    try:
+        if is_binary_artifact(path):
+            data = _binary_to_embedding_data(load_embeddings(path))
+        else:
+            with path.open("r", encoding="utf-8") as fh:
+                data = json.load(fh)
+    except FileNotFoundError:
+        logger.info("No previous artifact at %s.", path)
+        return None
+    except ValueError as e:
+        logger.warning("Previous artifact %s is unreadable: %s", path, e)
+        return None
+
+    if not isinstance(data, dict) or not {"idf", "vectors", "doc_freq", "document_count"} <= data.keys():
+        logger.info("Previous artifact %s has no document frequencies.", path)
+        return None
+    return data
+
+
+def _binary_to_embedding_data(snapshot) -> Dict:
+    if snapshot.doc_freq is None:
+        return {}
+    engine = snapshot.engine
+    words = sorted(engine.vocabulary, key=engine.vocabulary.get)
+    return {
+        "idf": {word: float(engine.idf[column]) for column, word in enumerate(words)},
+        "vectors": _iter_binary_vectors(engine, words),
+        "ticket_ids": [int(ticket_id) for ticket_id in engine.ticket_ids],
+        "ticket_count": len(engine),
+        "doc_freq": {word: int(snapshot.doc_freq[column]) for column, word in enumerate(words)},
+        **snapshot.metadata,
+        "last_ticket_id": snapshot.last_ticket_id,
+        "built_at": snapshot.built_at,
+    }
+
+
+def _iter_binary_vectors(engine: SparseScoringEngine, words: List[str]) -> Iterator[Dict]:
+    for row, ticket_id in enumerate(engine.ticket_ids):
+        start, end = int(engine.indptr[row]), int(engine.indptr[row + 1])
+        yield {
+            "ticket_id": int(ticket_id),
+            "vector": {
+                words[int(engine.indices[i])]: float(engine.data[i]) for i in range(start, end)
+            },
+        }
+
+
+def save_embeddings(data: Dict, output_path: Path, fmt: str = "json") -> None:
+    """
+    Persist *data* to *output_path* as JSON or in the binary format.
+
+    ``data["vectors"]`` may be any iterable, including a generator that is
+    still reading tickets from the database; vectors are written as they are
+    produced and ``ticket_count`` is set to the number actually written.
+
+    The file is written next to the target and then atomically renamed over
+    it, so an API process hot-swapping the artifact never reads a partial build.
+
+    Args:
+        data: Output of :func:`build_embeddings`, optionally with build metadata.
+        output_path: Destination file.
+        fmt: ``"json"`` or ``"binary"``.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown embedding format {fmt!r}; expected one of {OUTPUT_FORMATS}")
+    output_path = Path(output_path)
+
+    if fmt == "binary":
+        engine = SparseScoringEngine.from_vectors(
+            data["idf"], ((v["ticket_id"], v["vector"]) for v in data["vectors"])
+        )
+        data["ticket_count"] = len(engine)
+        last_ticket_id = data.get("last_ticket_id")
+        if last_ticket_id is None:
+            last_ticket_id = max((int(t) for t in engine.ticket_ids), default=0)
+        metadata = {
+            key: value for key, value in data.items()
+            if key not in ("idf", "vectors", "doc_freq", "ticket_count", "last_ticket_id", "built_at")
+        }
+        write_binary_embeddings(
+            engine,
+            output_path,
+            last_ticket_id,
+            data.get("built_at"),
+            doc_freq=data.get("doc_freq"),
+            metadata=metadata,
+        )
+        return
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as fh:
-        json.dump(data, fh, indent=2)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as fh:
+        _write_json_streaming(data, fh)
+    os.replace(tmp_path, output_path)
     logger.info("Embeddings written to %s (%d vectors).", output_path, data.get("ticket_count", 0))
 
 
-def run_embedding_builder(output_path: Path = DEFAULT_OUTPUT) -> Dict:
+def _write_json_streaming(data: Dict, fh) -> None:
+    """Write *data* as a JSON object, one vector per line, without buffering the vectors."""
+    fh.write("{")
+    for position, (key, value) in enumerate(list(data.items())):
+        fh.write(("\n" if position == 0 else ",\n") + f"  {json.dumps(key)}: ")
+        if key != "vectors":
+            # ticket_count is read late: it follows the vectors it counts
+            fh.write(json.dumps(data[key]))
+            continue
+        written = 0
+        fh.write("[")
+        for vector in value:
+            fh.write(("\n    " if written == 0 else ",\n    ") + json.dumps(vector))
+            written += 1
+        fh.write("\n  ]" if written else "]")
+        data["ticket_count"] = written
+    fh.write("\n}\n")
+
+
+def run_embedding_builder(
+    output_path: Path | None = None,
+    fmt: str = "json",
+    incremental: bool = False,
+    drift_threshold: float = DEFAULT_IDF_DRIFT_THRESHOLD,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+) -> Dict:
     """
     Fetch resolved tickets, compute TF-IDF embeddings, and save them.
 
+    A full build makes two streaming passes over the resolved tickets: the
+    first counts document frequencies, the second vectorizes each ticket and
+    writes it straight to the artifact. Neither pass holds more than
+    *chunk_size* rows, so memory does not grow with the table (the binary
+    format still collects the matrix in compact typed arrays before writing).
+
     Args:
-        output_path: File path where the JSON embedding cache is stored.
+        output_path: File path where the embedding cache is stored. Defaults
+            to :data:`DEFAULT_OUTPUT` or :data:`DEFAULT_BINARY_OUTPUT` by format.
+        fmt: Artifact format, ``"json"`` or ``"binary"``.
+        incremental: Extend the artifact already at *output_path* with tickets
+            above its high-water mark instead of rebuilding from scratch.
+        drift_threshold: IDF drift beyond which an incremental run performs
+            a full rebuild instead.
+        chunk_size: Rows fetched per database round trip (and tickets per
+            shard when *workers* > 1).
+        workers: Processes used for tokenization and vectorization in a
+            full build. The artifact is identical for any value.
 
     Returns:
-        The embedding data dict (same structure as :func:`build_embeddings`).
+        The embedding data written, without the ``vectors`` list: ``idf``,
+        ``ticket_count``, the document counts, and ``last_ticket_id``,
+        ``last_updated_at`` and ``built_at`` build metadata.
     """
+    if output_path is None:
+        output_path = DEFAULT_BINARY_OUTPUT if fmt == "binary" else DEFAULT_OUTPUT
+    previous = load_previous_embeddings(output_path) if incremental else None
+
     init_db()
     db = SessionLocal()
     try:
-        logger.info("Fetching resolved tickets from the database…")
-        tickets = fetch_resolved_tickets(db)
-        logger.info("Found %d resolved ticket(s).", len(tickets))
+        data = None
+        if previous is not None and "last_updated_at" not in previous:
+            logger.info("Previous artifact predates the updated_at high-water mark; full rebuild.")
+            previous = None
+        if previous is not None:
+            last_updated_at = previous["last_updated_at"]
+            updated_since = (
+                datetime.fromisoformat(last_updated_at) - INCREMENTAL_LOOKBACK
+                if last_updated_at else None
+            )
+            logger.info("Fetching resolved tickets above ID %d or updated since the last build…",
+                        previous["last_ticket_id"])
+            tickets = fetch_resolved_tickets(
+                db, after_id=previous["last_ticket_id"], updated_since=updated_since
+            )
+            logger.info("Found %d candidate ticket(s).", len(tickets))
+            data = update_embeddings(previous, tickets, drift_threshold)
+            if data is not None:
+                # High-water mark: the API serves tickets above it from its
+                # live index, and incremental builds resume from it
+                scan = scan_corpus(tickets)
+                scan.add({"id": previous["last_ticket_id"], "updated_at": _parse_timestamp(last_updated_at)})
+                _set_high_water_mark(data, scan)
+
+        if data is None:
+            logger.info("Scanning resolved tickets (chunk size %d, %d worker(s))…", chunk_size, workers)
+            tickets = iter_resolved_tickets(db, chunk_size)
+            if workers > 1:
+                scan = scan_corpus_parallel(tickets, workers, chunk_size)
+            else:
+                scan = scan_corpus(tickets)
+            logger.info("Found %d resolved ticket(s).", scan.document_count)
+            if not scan.document_count:
+                logger.warning("No resolved tickets found. Embedding cache will be empty.")
+            data = _embedding_data(scan)
+            # Second pass; tickets resolved after the scan are left to the next build
+            tickets = iter_resolved_tickets(db, chunk_size, up_to_id=scan.last_ticket_id)
+            if workers > 1:
+                data["vectors"] = iter_vectors_parallel(tickets, data["idf"], workers, chunk_size)
+            else:
+                data["vectors"] = iter_vectors(tickets, data["idf"])
+            _set_high_water_mark(data, scan)
+
+        data["built_at"] = datetime.now(timezone.utc).isoformat()
+        save_embeddings(data, output_path, fmt=fmt)
     finally:
         db.close()
 
-    if not tickets:
-        logger.warning("No resolved tickets found. Embedding cache will be empty.")
-
-    data = build_embeddings(tickets)
-    save_embeddings(data, output_path)
+    del data["vectors"]
     return data
 
 
+def _set_high_water_mark(data: Dict, scan: CorpusScan) -> None:
+    data["last_ticket_id"] = scan.last_ticket_id
+    data["last_updated_at"] = scan.last_updated_at.isoformat() if scan.last_updated_at else None
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
 # ---------------------------------------------------------------------------
 # CLI entry point
 # ---------------------------------------------------------------------------
@@ -170,13 +689,48 @@ def _parse_args(argv=None):
     parser = argparse.ArgumentParser(
         description="Embedding builder — precompute TF-IDF vectors for resolved tickets.",
     )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="Artifact format (default: json). 'binary' is memory-mappable by the API.",
+    )
     parser.add_argument(
         "--output",
         type=Path,
-        default=DEFAULT_OUTPUT,
-        help="Path to write the JSON embedding cache (default: embeddings.json).",
+        default=None,
+        help="Path to write the embedding cache (default: embeddings.json or embeddings.bin).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Rows fetched per database round trip (default: {DEFAULT_CHUNK_SIZE}).",
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to tokenize and vectorize a full build (default: 1).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Extend the existing artifact with new tickets instead of rebuilding it.",
+    )
+    parser.add_argument(
+        "--idf-drift-threshold",
+        type=float,
+        default=DEFAULT_IDF_DRIFT_THRESHOLD,
+        help=(
+            "With --incremental, rebuild from scratch once the frozen IDF drifts "
+            f"past this relative change (default: {DEFAULT_IDF_DRIFT_THRESHOLD})."
+        ),
+    )
+    args = parser.parse_args(argv)
+    if args.output is None:
+        args.output = DEFAULT_BINARY_OUTPUT if args.format == "binary" else DEFAULT_OUTPUT
+    return args
 
 
 if __name__ == "__main__":
@@ -185,4 +739,11 @@ if __name__ == "__main__":
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     )
     args = _parse_args()
-    run_embedding_builder(output_path=args.output)
+    run_embedding_builder(
+        output_path=args.output,
+        fmt=args.format,
+        incremental=args.incremental,
+        drift_threshold=args.idf_drift_threshold,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+    )
@@ -34,16 +34,16 @@ DO NOT:
 
 Usage:
 ------
-    python workers/feedback_analyzer.py [--output feedback_analysis.json]
+    python workers/feedback_analyzer.py [--output feedback_analysis.json] [--chunk-size 1000]
 """
 
 import argparse
 import json
 import logging
 import sys
-from collections import Counter, defaultdict
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List
 
 # Add project root to path so worker can be run directly
 project_root = Path(__file__).parent.parent
@@ -57,49 +57,177 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_OUTPUT = project_root / "feedback_analysis.json"
 
+# Rows fetched per round trip when streaming feedback (--chunk-size)
+DEFAULT_CHUNK_SIZE = 1000
+
 
 # ---------------------------------------------------------------------------
 # Data fetching
 # ---------------------------------------------------------------------------
 
-def fetch_feedback_with_tickets(db) -> List[Dict]:
+def iter_feedback_with_tickets(db, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
     """
-    Return all feedback records joined with their parent ticket's intent.
+    Stream feedback records joined with their parent ticket's intent.
 
-    Returns:
-        List of dicts containing feedback fields and the ticket's ``intent``.
+    Rows are read through a server-side cursor *chunk_size* at a time, so
+    memory stays bounded by the chunk size rather than the table size.
+
+    Yields:
+        Dicts containing feedback fields and the ticket's ``intent``.
     """
     rows = (
-        db.query(Feedback, Ticket)
+        db.query(
+            Feedback.id,
+            Feedback.ticket_id,
+            Feedback.rating,
+            Feedback.resolved,
+            Feedback.created_at,
+            Ticket.intent,
+            Ticket.status,
+            Ticket.quality_score,
+        )
         .join(Ticket, Feedback.ticket_id == Ticket.id)
         .order_by(Feedback.id)
-        .all()
+        .yield_per(chunk_size)
     )
-    return [
-        {
-            "feedback_id": fb.id,
-            "ticket_id": fb.ticket_id,
-            "rating": fb.rating,
-            "resolved": fb.resolved,
-            "created_at": fb.created_at.isoformat() if fb.created_at else None,
-            "intent": ticket.intent,
-            "ticket_status": ticket.status,
-            "quality_score": ticket.quality_score,
+    for row in rows:
+        yield {
+            "feedback_id": row.id,
+            "ticket_id": row.ticket_id,
+            "rating": row.rating,
+            "resolved": row.resolved,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "intent": row.intent,
+            "ticket_status": row.status,
+            "quality_score": row.quality_score,
         }
-        for fb, ticket in rows
-    ]
+
+
+def fetch_feedback_with_tickets(db) -> List[Dict]:
+    """
+    Return all feedback records joined with their parent ticket's intent.
+
+    Prefer :func:`iter_feedback_with_tickets` for whole-table scans.
+
+    Returns:
+        List of dicts containing feedback fields and the ticket's ``intent``.
+    """
+    return list(iter_feedback_with_tickets(db))
 
 
 # ---------------------------------------------------------------------------
 # Analysis helpers
 # ---------------------------------------------------------------------------
 
-def _safe_avg(values: List[float]) -> float:
-    """Return the average of *values*, or 0.0 if the list is empty."""
-    return round(sum(values) / len(values), 3) if values else 0.0
+class _RunningMean:
+    """Sum and count of a stream of values; the average is 0.0 while empty."""
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.count = 0
+
+    def add(self, value) -> None:
+        self.total += value
+        self.count += 1
+
+    def average(self) -> float:
+        return round(self.total / self.count, 3) if self.count else 0.0
+
+
+class _GroupStats:
+    """Running rating / resolution / quality aggregates for one group."""
+
+    def __init__(self) -> None:
+        self.ratings = _RunningMean()
+        self.resolved = _RunningMean()
+        self.quality_scores = _RunningMean()
+
+
+class FeedbackAggregator:
+    """
+    Single-pass aggregation of feedback records.
+
+    Records are folded into running sums and counts as they arrive, so the
+    analysis needs constant memory per intent / status instead of the whole
+    record list. :meth:`summary` returns exactly what :func:`analyze_feedback`
+    does.
+    """
 
+    def __init__(self) -> None:
+        self.total = 0
+        self.overall = _GroupStats()
+        self.by_intent: Dict[str, _GroupStats] = {}
+        self.by_status: Dict[str, _GroupStats] = {}
+        self.rating_distribution: Counter = Counter()
 
-def analyze_feedback(records: List[Dict]) -> Dict:
+    def add(self, rec: Dict) -> None:
+        self.total += 1
+        rating, resolved, quality = rec["rating"], rec["resolved"], rec.get("quality_score")
+        intent_key = rec.get("intent") or "unknown"
+        status_key = rec.get("ticket_status") or "unknown"
+
+        if rating is not None:
+            self.overall.ratings.add(rating)
+            self._group(self.by_intent, intent_key).ratings.add(rating)
+            self._group(self.by_status, status_key).ratings.add(rating)
+            self.rating_distribution[rating] += 1
+        if resolved is not None:
+            self.overall.resolved.add(resolved)
+            self._group(self.by_intent, intent_key).resolved.add(resolved)
+            self._group(self.by_status, status_key).resolved.add(resolved)
+        if quality is not None:
+            self.overall.quality_scores.add(quality)
+            self._group(self.by_intent, intent_key).quality_scores.add(quality)
+
+    @staticmethod
+    def _group(groups: Dict[str, _GroupStats], key: str) -> _GroupStats:
+        stats = groups.get(key)
+        if stats is None:
+            stats = groups[key] = _GroupStats()
+        return stats
+
+    def summary(self) -> Dict:
+        if not self.total:
+            return {
+                "total_feedback": 0,
+                "average_rating": 0.0,
+                "resolution_rate": 0.0,
+                "by_intent": {},
+                "by_ticket_status": {},
+                "rating_distribution": {},
+            }
+
+        intent_summary = {
+            intent: {
+                "count": stats.ratings.count,
+                "average_rating": stats.ratings.average(),
+                "resolution_rate": stats.resolved.average(),
+                "average_quality_score": stats.quality_scores.average(),
+            }
+            for intent, stats in self.by_intent.items()
+        }
+        status_summary = {
+            status: {
+                "count": stats.ratings.count,
+                "average_rating": stats.ratings.average(),
+                "resolution_rate": stats.resolved.average(),
+            }
+            for status, stats in self.by_status.items()
+        }
+        return {
+            "total_feedback": self.total,
+            "average_rating": self.overall.ratings.average(),
+            "resolution_rate": self.overall.resolved.average(),
+            "by_intent": intent_summary,
+            "by_ticket_status": status_summary,
+            # Keys are explicitly converted to strings so the JSON representation
+            # is consistent (JSON always coerces object keys to strings anyway).
+            "rating_distribution": {str(k): v for k, v in self.rating_distribution.items()},
+            "average_quality_score": self.overall.quality_scores.average(),
+        }
+
+
+def analyze_feedback(records: Iterable[Dict]) -> Dict:
     """
     Aggregate feedback records into actionable metrics.
 
@@ -113,100 +241,32 @@ def analyze_feedback(records: List[Dict]) -> Dict:
     - ``rating_distribution`` — count of each rating value
 
     Args:
-        records: List of feedback+ticket dicts from :func:`fetch_feedback_with_tickets`.
+        records: Feedback+ticket dicts from :func:`iter_feedback_with_tickets`
+            (or :func:`fetch_feedback_with_tickets`). Consumed in one pass.
 
     Returns:
         Dict containing all computed metrics.
     """
-    if not records:
-        return {
-            "total_feedback": 0,
-            "average_rating": 0.0,
-            "resolution_rate": 0.0,
-            "by_intent": {},
-            "by_ticket_status": {},
-            "rating_distribution": {},
-        }
-
-    total = len(records)
-    all_ratings = [r["rating"] for r in records if r["rating"] is not None]
-    all_resolved = [r["resolved"] for r in records if r["resolved"] is not None]
-
-    # Per-intent aggregation
-    by_intent: Dict[str, Dict] = defaultdict(lambda: {"ratings": [], "resolved": [], "quality_scores": []})
-    for rec in records:
-        intent_key = rec.get("intent") or "unknown"
-        if rec["rating"] is not None:
-            by_intent[intent_key]["ratings"].append(rec["rating"])
-        if rec["resolved"] is not None:
-            by_intent[intent_key]["resolved"].append(rec["resolved"])
-        if rec.get("quality_score") is not None:
-            by_intent[intent_key]["quality_scores"].append(rec["quality_score"])
-
-    intent_summary = {
-        intent: {
-            "count": len(vals["ratings"]),
-            "average_rating": _safe_avg(vals["ratings"]),
-            "resolution_rate": round(sum(vals["resolved"]) / len(vals["resolved"]), 3)
-            if vals["resolved"]
-            else 0.0,
-            "average_quality_score": _safe_avg(vals["quality_scores"]),
-        }
-        for intent, vals in by_intent.items()
-    }
-
-    # Per-ticket-status aggregation
-    by_status: Dict[str, Dict] = defaultdict(lambda: {"ratings": [], "resolved": []})
+    aggregator = FeedbackAggregator()
     for rec in records:
-        status_key = rec.get("ticket_status") or "unknown"
-        if rec["rating"] is not None:
-            by_status[status_key]["ratings"].append(rec["rating"])
-        if rec["resolved"] is not None:
-            by_status[status_key]["resolved"].append(rec["resolved"])
-
-    status_summary = {
-        status: {
-            "count": len(vals["ratings"]),
-            "average_rating": _safe_avg(vals["ratings"]),
-            "resolution_rate": round(sum(vals["resolved"]) / len(vals["resolved"]), 3)
-            if vals["resolved"]
-            else 0.0,
-        }
-        for status, vals in by_status.items()
-    }
-
-    # Rating distribution.
-    # Keys are explicitly converted to strings so the JSON representation
-    # is consistent (JSON always coerces object keys to strings anyway).
-    rating_distribution = {
-        str(k): v
-        for k, v in Counter(r["rating"] for r in records if r["rating"] is not None).items()
-    }
-
-    # Compute overall quality score
-    all_quality_scores = [r["quality_score"] for r in records if r.get("quality_score") is not None]
-
-    return {
-        "total_feedback": total,
-        "average_rating": _safe_avg(all_ratings),
-        "resolution_rate": round(sum(all_resolved) / len(all_resolved), 3) if all_resolved else 0.0,
-        "by_intent": intent_summary,
-        "by_ticket_status": status_summary,
-        "rating_distribution": rating_distribution,
-        "average_quality_score": _safe_avg(all_quality_scores),
-    }
+        aggregator.add(rec)
+    return aggregator.summary()
 
 
 # ---------------------------------------------------------------------------
 # Runner
 # ---------------------------------------------------------------------------
 
-def run_feedback_analyzer(output_path: Path = DEFAULT_OUTPUT) -> Dict:
+def run_feedback_analyzer(output_path: Path = DEFAULT_OUTPUT, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
     """
-    Fetch feedback records, compute metrics, and save the analysis.
+    Stream feedback records, compute metrics, and save the analysis.
+
+    Records are aggregated as they are read, so memory does not grow with
+    the size of the feedback table.
 
     Args:
         output_path: Destination file for the JSON analysis report.
+        chunk_size: Rows fetched per database round trip.
 
     Returns:
         The analysis dict produced by :func:`analyze_feedback`.
@@ -214,14 +274,12 @@ def run_feedback_analyzer(output_path: Path = DEFAULT_OUTPUT) -> Dict:
     init_db()
     db = SessionLocal()
     try:
-        logger.info("Fetching feedback records…")
-        records = fetch_feedback_with_tickets(db)
-        logger.info("Found %d feedback record(s).", len(records))
+        logger.info("Streaming feedback records (chunk size %d)…", chunk_size)
+        analysis = analyze_feedback(iter_feedback_with_tickets(db, chunk_size))
+        logger.info("Analyzed %d feedback record(s).", analysis["total_feedback"])
     finally:
         db.close()
 
-    analysis = analyze_feedback(records)
-
     output_path.parent.mkdir(parents=True, exist_ok=True)
     with output_path.open("w", encoding="utf-8") as fh:
         json.dump(analysis, fh, indent=2)
@@ -250,6 +308,12 @@ def _parse_args(argv=None):
         default=DEFAULT_OUTPUT,
         help="Path to write the JSON analysis report (default: feedback_analysis.json).",
     )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Rows fetched per database round trip (default: {DEFAULT_CHUNK_SIZE}).",
+    )
     return parser.parse_args(argv)
 
 
@@ -259,4 +323,4 @@ if __name__ == "__main__":
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     )
     args = _parse_args()
-    run_feedback_analyzer(output_path=args.output)
+    run_feedback_analyzer(output_path=args.output, chunk_size=args.chunk_size)
@@ -22,8 +22,10 @@ Why this is a worker:
 
 Responsibilities:
 -----------------
-- Query ticket and feedback tables
-- Compute aggregate statistics
+- Aggregate ticket and feedback tables (one query, see metrics_service)
+- Refresh the metrics_rollup table that /admin/metrics reads
+- Append per-minute counters to the metrics history (downsampled to hours
+  and days) that /admin/metrics/history reads
 - Store results for admin dashboards
 
 DO NOT:
@@ -49,11 +51,9 @@ from typing import Dict
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from sqlalchemy import func
-
 from app.db.session import SessionLocal, init_db
-from app.models.feedback import Feedback
-from app.models.ticket import Ticket
+from app.services.metrics_history import record_history
+from app.services.metrics_service import aggregate_counters, refresh_rollup
 
 logger = logging.getLogger(__name__)
 
@@ -82,27 +82,17 @@ def collect_metrics(db) -> Dict:
     Returns:
         Dict with all computed metrics.
     """
+    return format_metrics(aggregate_counters(db))
+
+
+def format_metrics(counters: Dict) -> Dict:
+    """Shape metrics_service counters into the collector snapshot."""
     # ------------------------------------------------------------------
     # Ticket metrics
     # ------------------------------------------------------------------
-    total_tickets: int = db.query(func.count(Ticket.id)).scalar() or 0
-
-    # Count per status using a single query
-    status_rows = (
-        db.query(Ticket.status, func.count(Ticket.id))
-        .group_by(Ticket.status)
-        .all()
-    )
-    tickets_by_status = {status: count for status, count in status_rows}
-
-    # Count per intent
-    intent_rows = (
-        db.query(Ticket.intent, func.count(Ticket.id))
-        .filter(Ticket.intent.isnot(None))
-        .group_by(Ticket.intent)
-        .all()
-    )
-    tickets_by_intent = {intent: count for intent, count in intent_rows}
+    total_tickets: int = counters["tickets_total"]
+    tickets_by_status = counters["by_status"]
+    tickets_by_intent = counters["by_intent"]
 
     # Resolved / escalated ticket counts.
     # "Decided" = all tickets that have left the open state.
@@ -120,14 +110,12 @@ def collect_metrics(db) -> Dict:
     # ------------------------------------------------------------------
     # Feedback metrics
     # ------------------------------------------------------------------
-    total_feedback: int = db.query(func.count(Feedback.id)).scalar() or 0
+    total_feedback: int = counters["feedback_total"]
 
-    avg_rating_row = db.query(func.avg(Feedback.rating)).scalar()
+    avg_rating_row = counters["average_rating"]
     average_rating = round(float(avg_rating_row), 3) if avg_rating_row is not None else 0.0
 
-    resolved_count: int = (
-        db.query(func.count(Feedback.id)).filter(Feedback.resolved.is_(True)).scalar() or 0
-    )
+    resolved_count: int = counters["feedback_resolved"]
     resolution_rate = round(resolved_count / total_feedback, 3) if total_feedback else 0.0
 
     # ------------------------------------------------------------------
@@ -156,7 +144,8 @@ def collect_metrics(db) -> Dict:
 
 def run_metrics_collector(output_path: Path = DEFAULT_OUTPUT) -> Dict:
     """
-    Collect system metrics and persist them to *output_path*.
+    Collect system metrics, refresh the metrics rollup and history, and
+    persist the snapshot to *output_path*.
 
     Args:
         output_path: Destination file for the JSON metrics snapshot.
@@ -168,7 +157,8 @@ def run_metrics_collector(output_path: Path = DEFAULT_OUTPUT) -> Dict:
     db = SessionLocal()
     try:
         logger.info("Collecting system metrics…")
-        metrics = collect_metrics(db)
+        metrics = format_metrics(refresh_rollup(db))
+        record_history(db)
     finally:
         db.close()
 